@@ -8,6 +8,7 @@ import azure.functions as func
 # Add the root directory to Python path for proper imports
 sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
 
+from shared.llm_streaming import create_event_log_response, iter_text_chunks, multiplex_streams, wants_event_log
 from shared.middleware import enhanced_security_middleware
 
 logger = logging.getLogger(__name__)
@@ -195,6 +196,9 @@ async def execute_anonymous_llm(req: func.HttpRequest, ip_address: str) -> func.
 
         logger.info(f"Anonymous LLM execution for IP: {ip_address}, remaining: {remaining_calls}")
 
+        if wants_event_log(req, body):
+            return await create_event_log_response(stream_anonymous_response(prompt, mock_response))
+
         return func.HttpResponse(
             json.dumps(mock_response, default=str),
             status_code=200,
@@ -210,6 +214,19 @@ async def execute_anonymous_llm(req: func.HttpRequest, ip_address: str) -> func.
         )
 
 
+async def stream_anonymous_response(prompt: str, completion: dict):
+    """Events for an anonymous completion, then its usage and remaining-call info."""
+
+    async def open_stream():
+        return iter_text_chunks(completion["choices"][0]["text"])
+
+    async for event in multiplex_streams({"openai": open_stream}, prompt, models={"openai": completion["model"]}):
+        if event.event == "end":
+            event.data["anonymous_info"] = completion["anonymous_info"]
+            event.data["_mock"] = completion.get("_mock", False)
+        yield event
+
+
 async def list_anonymous_models(req: func.HttpRequest) -> func.HttpResponse:
     """List available models for anonymous users."""
     try:
@@ -353,6 +353,30 @@ class TestAnonymousLLMAPI:
             data2 = json.loads(response2.get_body())
             assert data2["anonymous_info"]["remaining_calls"] == 4  # Full limit for new IP
 
+    @pytest.mark.asyncio
+    async def test_anonymous_llm_execute_event_log(self):
+        """Test the event log of an anonymous completion."""
+        with patch("api.anonymous_llm_api.ip_usage", {}):
+            req = self.create_anonymous_request(
+                method="POST",
+                url="http://localhost/api/anonymous/llm/execute",
+                body={"prompt": "What is artificial intelligence?", "stream": True},
+                route_params={"action": "execute"},
+                ip_address="192.168.1.900",
+            )
+
+            response = await anonymous_llm_main(req)
+
+        assert response.status_code == 200
+        assert response.mimetype == "application/json"
+        body = json.loads(response.get_body())
+        assert body["streamed"] is False
+        events = [e["event"] for e in body["events"]]
+        assert events[0] == "start"
+        assert events.count("token") > 1
+        assert events[-2:] == ["done", "end"]
+        assert body["events"][-1]["anonymous_info"]["remaining_calls"] == 4
+
 
 if __name__ == "__main__":
     pytest.main([__file__])
@@ -0,0 +1,147 @@
+"""
+Response parsing benchmark for MultiLLMConsensusEngine.
+
+Builds large (~4,000 token) technical analyses wrapped in prose and runs the four
+consensus calculators over them in two modes:
+
+1. reparse    - every extractor re-runs the old greedy ``\\{.*\\}`` regex and
+                ``json.loads`` on the full response (the previous behaviour)
+2. parse_once - each response is parsed once into a ParsedTechnicalResponse that
+                every calculator reuses
+
+Usage:
+    python benchmarks/bench_consensus_parsing.py [--responses 5] [--rounds 20] [--padding-items 100]
+"""
+
+import argparse
+import json
+import re
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+# Add API directory to path
+api_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(api_dir))
+
+from shared.multi_llm_consensus import LLMResponse, MultiLLMConsensusEngine, ParsedTechnicalResponse  # noqa: E402
+
+PATTERNS = ["Microservices", "Modular Monolith", "Serverless"]
+
+
+class ReparsingEngine(MultiLLMConsensusEngine):
+    """Engine that parses the full response on every access, as before."""
+
+    def _parsed(self, response: LLMResponse) -> ParsedTechnicalResponse:
+        match = re.search(r"\{.*\}", response.response_content, re.DOTALL)
+        data = json.loads(match.group())
+        return ParsedTechnicalResponse(
+            architecture_recommendation=data.get("architectureRecommendation", {}),
+            technology_stack=data.get("technologyStack", {}),
+            feasibility_assessment=data.get("feasibilityAssessment", {}),
+            risk_assessment=data.get("riskAssessment", {}),
+            technical_scores=data.get("technicalScores", {}),
+            recommendations=data.get("recommendations", []),
+            confidence=data.get("confidence", 0.7),
+            raw=data,
+        )
+
+
+def _analysis(index: int, padding_items: int) -> Dict[str, Any]:
+    return {
+        "architectureRecommendation": {
+            "pattern": PATTERNS[index % len(PATTERNS)],
+            "rationale": "Independent scaling of task scoring and notification workloads. " * 4,
+            "alternativePatterns": PATTERNS,
+            "scalabilityAssessment": "Horizontal scaling behind a queue",
+        },
+        "technologyStack": {
+            category: {"name": name, "score": 8.0, "reasons": [f"{name} reason {i}" for i in range(5)]}
+            for category, name in [("frontend", "React"), ("backend", "FastAPI"), ("database", "PostgreSQL")]
+        },
+        "feasibilityAssessment": {
+            "overall_score": 6.5 + index % 3,
+            "timeline_weeks": 10 + index,
+            "team_size": 4,
+            "technical_challenges": [f"Challenge {i}: integrating {{external}} systems" for i in range(padding_items)],
+            "success_factors": [f"Factor {i}" for i in range(padding_items)],
+        },
+        "riskAssessment": {
+            "overall_risk_level": 4.0 + index % 2,
+            "categories": {
+                f"category_{i}": {"severity": 3.0 + i % 5, "mitigation": f"Mitigation plan {i}"} for i in range(20)
+            },
+            "monitoring_requirements": [f"Monitor metric {i}" for i in range(padding_items)],
+        },
+        "technicalScores": {"maintainability": 8.0, "scalability_potential": 7.5},
+        "recommendations": [f"Recommendation {i}" for i in range(padding_items)],
+        "confidence": 0.85,
+    }
+
+
+def _responses(count: int, padding_items: int) -> List[LLMResponse]:
+    responses = []
+    for index in range(count):
+        content = (
+            "Here is my technical analysis of the project.\n```json\n"
+            + json.dumps(_analysis(index, padding_items), indent=2)
+            + "\n```\nLet me know if you want more detail."
+        )
+        responses.append(
+            LLMResponse(
+                model=f"model-{index}",
+                response_content=content,
+                confidence_score=0.85,
+                processing_time=1.0,
+                cost=0.01,
+                tokens_used=len(content) // 4,
+                technical_scores={},
+                recommendations=[],
+                risk_assessment={},
+                timestamp="",
+            )
+        )
+    return responses
+
+
+def _run_calculators(engine: MultiLLMConsensusEngine, responses: List[LLMResponse]) -> None:
+    for response in responses:
+        response.parsed = None  # a fresh consensus run
+    engine._calculate_architecture_consensus(responses)
+    engine._calculate_technology_stack_consensus(responses)
+    engine._calculate_feasibility_consensus(responses)
+    engine._calculate_risk_consensus(responses)
+
+
+def _time(engine: MultiLLMConsensusEngine, responses: List[LLMResponse], rounds: int) -> float:
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        _run_calculators(engine, responses)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--responses", type=int, default=5)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--padding-items", type=int, default=100)
+    args = parser.parse_args()
+
+    responses = _responses(args.responses, args.padding_items)
+    average_tokens = statistics.mean(r.tokens_used for r in responses)
+    print(f"{args.responses} responses, ~{average_tokens:.0f} tokens each, {args.rounds} rounds")
+    print(f"{'mode':<12} {'median ms':>10} {'speedup':>8}")
+
+    baseline = None
+    for mode, engine in [("reparse", ReparsingEngine()), ("parse_once", MultiLLMConsensusEngine())]:
+        median = _time(engine, responses, args.rounds)
+        baseline = baseline or median
+        print(f"{mode:<12} {median:>10.2f} {baseline / median:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Event-loop latency benchmark for DatabaseManager.
+
+Runs 50 concurrent "slow" cross-partition queries against a fake synchronous
+container and measures how late a 1 ms heartbeat task wakes up, comparing:
+
+1. inline   - the previous behaviour, draining the sync iterator on the event loop
+2. offload  - DatabaseManager's bounded executor with per-container limits
+
+Usage:
+    python benchmarks/bench_database_event_loop.py [--queries 50] [--page-ms 5] [--pages 4]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+# Add API directory to path
+api_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(api_dir))
+
+from shared.database import DatabaseManager  # noqa: E402
+
+
+class SlowContainer:
+    """Synchronous container stand-in whose query pages block for a fixed time."""
+
+    def __init__(self, page_seconds: float, pages: int):
+        self.page_seconds = page_seconds
+        self.pages = pages
+
+    def query_items(self, query, parameters=None, **kwargs):
+        for page in range(self.pages):
+            time.sleep(self.page_seconds)
+            yield {"id": f"item-{page}"}
+
+
+async def _heartbeat(stop: asyncio.Event, lags: list, interval: float = 0.001) -> None:
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        lags.append(max(0.0, loop.time() - expected) * 1000)
+
+
+async def _run(mode: str, container: SlowContainer, queries: int) -> dict:
+    with patch.dict(os.environ, {"COSMOS_DB_CONNECTION_STRING": "bench", "ENVIRONMENT": "production"}):
+        manager = DatabaseManager()
+    manager._containers["Prompts"] = container
+
+    async def inline_query():
+        # Mirrors the old implementation: list() over the sync iterator on the loop
+        return list(container.query_items(query="SELECT * FROM c"))
+
+    async def offload_query():
+        return await manager.query_items("Prompts", "SELECT * FROM c")
+
+    query = inline_query if mode == "inline" else offload_query
+
+    stop = asyncio.Event()
+    lags: list = []
+    heartbeat = asyncio.create_task(_heartbeat(stop, lags))
+    await asyncio.sleep(0.01)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(query() for _ in range(queries)))
+    elapsed = (time.perf_counter() - start) * 1000
+
+    stop.set()
+    await heartbeat
+    if manager._executor:
+        manager._executor.shutdown(wait=True)
+
+    lags.sort()
+    return {
+        "mode": mode,
+        "wall_ms": elapsed,
+        "heartbeats": len(lags),
+        "p50_lag_ms": statistics.median(lags) if lags else 0.0,
+        "p95_lag_ms": lags[int(len(lags) * 0.95) - 1] if lags else 0.0,
+        "max_lag_ms": lags[-1] if lags else 0.0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--page-ms", type=float, default=5.0)
+    parser.add_argument("--pages", type=int, default=4)
+    args = parser.parse_args()
+
+    container = SlowContainer(args.page_ms / 1000, args.pages)
+    print(f"{args.queries} concurrent queries, {args.pages} pages x {args.page_ms:.1f} ms each")
+    print(f"{'mode':<8} {'wall ms':>10} {'beats':>7} {'p50 lag':>10} {'p95 lag':>10} {'max lag':>10}")
+    for mode in ("inline", "offload"):
+        result = asyncio.run(_run(mode, container, args.queries))
+        print(
+            f"{result['mode']:<8} {result['wall_ms']:>10.1f} {result['heartbeats']:>7} "
+            f"{result['p50_lag_ms']:>10.2f} {result['p95_lag_ms']:>10.2f} {result['max_lag_ms']:>10.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,301 @@
+"""
+Serialization benchmark for ForgeProject.
+
+Builds projects of representative sizes (an empty draft, a project midway through
+the workflow, and one at the final stage with large plans) and times
+serialization in both directions in two modes:
+
+1. legacy   - ``dataclasses.asdict`` plus a recursive conversion pass for
+              ``to_dict``, the hand-written field walk for ``from_dict``, and
+              ``json.dumps(to_dict())`` for JSON (the previous behaviour)
+2. compiled - the schema-compiled codec behind ``to_dict``/``from_dict`` and
+              ``to_json``/``from_json`` working on bytes directly
+
+Both modes are checked to produce the same documents before timing.
+
+Usage:
+    python benchmarks/bench_forge_serialization.py [--rounds 50] [--sizes small,medium,large]
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from dataclasses import asdict
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from enum import Enum
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+# Add API directory to path
+api_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(api_dir))
+
+from shared.models.forge_models import (  # noqa: E402
+    ArtifactType,
+    DeploymentEnvironment,
+    DeploymentStatus,
+    ForgeArtifact,
+    ForgeProject,
+    ForgeStage,
+    IdeaRefinementData,
+    ImplementationPlaybookData,
+    ImplementationTask,
+    PRDGenerationData,
+    ProjectMilestone,
+    ProjectPriority,
+    ProjectResource,
+    ProjectStatus,
+    TaskStatus,
+    TechnicalAnalysisData,
+    UXRequirementsData,
+    ValidationCriteria,
+    ValidationStatus,
+)
+
+# (artifacts per stage, tasks, milestones, criteria, resources, environments)
+SIZES = {
+    "small": (0, 0, 0, 0, 0, 0),
+    "medium": (4, 40, 8, 12, 10, 3),
+    "large": (20, 400, 40, 60, 50, 6),
+}
+
+
+def _legacy_serialize(obj: Any) -> Any:
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, dict):
+        return {k: _legacy_serialize(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [_legacy_serialize(v) for v in obj]
+    return obj
+
+
+def legacy_to_dict(project: ForgeProject) -> Dict[str, Any]:
+    return _legacy_serialize(asdict(project))
+
+
+def _legacy_datetime(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def _legacy_items(items, build: Callable[[Dict[str, Any]], Any]):
+    return [build(item) if isinstance(item, dict) else item for item in items]
+
+
+def legacy_from_dict(data: Dict[str, Any]) -> ForgeProject:
+    """The previous ForgeProject.from_dict field walk, condensed."""
+    for name, value in data.items():
+        if name.endswith("_at") and isinstance(value, str):
+            try:
+                data[name] = _legacy_datetime(value)
+            except ValueError:
+                pass
+    for name, enum in (("current_stage", ForgeStage), ("status", ProjectStatus), ("priority", ProjectPriority)):
+        if name in data:
+            data[name] = enum(data[name])
+
+    if isinstance(data.get("idea_refinement_data"), dict):
+        data["idea_refinement_data"] = IdeaRefinementData(**data["idea_refinement_data"])
+
+    if isinstance(data.get("prd_generation_data"), dict):
+        prd = data["prd_generation_data"].copy()
+
+        def criteria(item):
+            item["status"] = ValidationStatus(item["status"])
+            return ValidationCriteria(**item)
+
+        prd["validation_criteria"] = _legacy_items(prd.get("validation_criteria", []), criteria)
+        prd["validation_status"] = ValidationStatus(prd["validation_status"])
+        data["prd_generation_data"] = PRDGenerationData(**prd)
+
+    if isinstance(data.get("ux_requirements_data"), dict):
+        ux = data["ux_requirements_data"].copy()
+
+        def milestone(item):
+            for name in ("due_date", "actual_completion_date"):
+                if isinstance(item.get(name), str):
+                    item[name] = _legacy_datetime(item[name])
+            item["status"] = TaskStatus(item["status"])
+            return ProjectMilestone(**item)
+
+        ux["resource_requirements"] = _legacy_items(ux.get("resource_requirements", []), lambda r: ProjectResource(**r))
+        ux["milestones"] = _legacy_items(ux.get("milestones", []), milestone)
+        data["ux_requirements_data"] = UXRequirementsData(**ux)
+
+    if isinstance(data.get("technical_analysis_data"), dict):
+        technical = data["technical_analysis_data"].copy()
+
+        def task(item):
+            for name in ("start_date", "due_date", "completion_date"):
+                if isinstance(item.get(name), str):
+                    item[name] = _legacy_datetime(item[name])
+            item["status"] = TaskStatus(item["status"])
+            item["priority"] = ProjectPriority(item["priority"])
+            return ImplementationTask(**item)
+
+        technical["tasks"] = _legacy_items(technical.get("tasks", []), task)
+        data["technical_analysis_data"] = TechnicalAnalysisData(**technical)
+
+    if isinstance(data.get("implementation_playbook_data"), dict):
+        playbook = data["implementation_playbook_data"].copy()
+
+        def environment(item):
+            if isinstance(item.get("deployed_at"), str):
+                item["deployed_at"] = _legacy_datetime(item["deployed_at"])
+            item["status"] = DeploymentStatus(item["status"])
+            return DeploymentEnvironment(**item)
+
+        playbook["environments"] = _legacy_items(playbook.get("environments", []), environment)
+        data["implementation_playbook_data"] = ImplementationPlaybookData(**playbook)
+
+    if isinstance(data.get("artifacts"), dict):
+
+        def artifact(item):
+            for name in ("created_at", "updated_at"):
+                if isinstance(item.get(name), str):
+                    item[name] = _legacy_datetime(item[name])
+            item["type"] = ArtifactType(item["type"])
+            return ForgeArtifact(**item)
+
+        data["artifacts"] = {stage: _legacy_items(items, artifact) for stage, items in data["artifacts"].items()}
+
+    return ForgeProject(**data)
+
+
+def build_project(size: str) -> ForgeProject:
+    artifacts, tasks, milestones, criteria, resources, environments = SIZES[size]
+    now = datetime.now(timezone.utc)
+    project = ForgeProject(
+        id=f"forge_{size}",
+        name=f"{size.title()} project",
+        description="Task prioritisation for distributed teams",
+        owner_id="user-1",
+        current_stage=ForgeStage.IMPLEMENTATION_PLAYBOOK if size == "large" else ForgeStage.IDEA_REFINEMENT,
+        collaborators=[f"user-{i}" for i in range(5)],
+        tags=["productivity", "b2b"],
+        custom_fields={"segment": "smb", "scores": {"impact": 8, "effort": 5}},
+        total_cost=Decimal("12.50"),
+    )
+    project.idea_refinement_data.problem_statement = "Teams cannot agree on what to build next. " * 5
+    project.prd_generation_data.validation_criteria = [
+        ValidationCriteria(
+            id=f"vc-{i}",
+            name=f"Criterion {i}",
+            description="Users confirm the problem in interviews",
+            weight=0.5,
+            status=ValidationStatus.PASSED,
+            evidence=[f"Interview {j}" for j in range(5)],
+            validated_at=now,
+        )
+        for i in range(criteria)
+    ]
+    project.ux_requirements_data.resource_requirements = [
+        ProjectResource(id=f"r-{i}", name="Engineer", type="human", quantity=2.0, unit="people", cost_per_unit=Decimal("95"))
+        for i in range(resources)
+    ]
+    project.ux_requirements_data.milestones = [
+        ProjectMilestone(
+            id=f"m-{i}",
+            name=f"Milestone {i}",
+            description="Ship the scoring service",
+            due_date=now + timedelta(days=7 * i),
+            deliverables=["API", "UI"],
+            status=TaskStatus.IN_PROGRESS,
+        )
+        for i in range(milestones)
+    ]
+    project.technical_analysis_data.tasks = [
+        ImplementationTask(
+            id=f"t-{i}",
+            name=f"Task {i}",
+            description="Implement and test the endpoint",
+            status=TaskStatus.TODO,
+            priority=ProjectPriority.HIGH,
+            estimated_hours=8.0,
+            start_date=now,
+            due_date=now + timedelta(days=3),
+            dependencies=[f"t-{i - 1}"] if i else [],
+            tags=["backend"],
+        )
+        for i in range(tasks)
+    ]
+    project.technical_analysis_data.burn_down_data = [{"day": i, "remaining": tasks - i} for i in range(min(tasks, 60))]
+    project.implementation_playbook_data.environments = [
+        DeploymentEnvironment(
+            id=f"env-{i}",
+            name=f"env-{i}",
+            status=DeploymentStatus.STAGING,
+            deployed_at=now,
+            configuration={"replicas": 3, "region": "westeurope"},
+        )
+        for i in range(environments)
+    ]
+    for stage in ForgeStage:
+        for i in range(artifacts):
+            project.add_artifact(
+                stage,
+                ForgeArtifact(
+                    id=f"{stage.value}-{i}",
+                    name=f"Artifact {i}",
+                    type=ArtifactType.DOCUMENT,
+                    content="",
+                    description="Externalized document",
+                    content_ref={"digest": "0" * 64, "size": 48213, "stored_size": 9120, "encoding": "gzip"},
+                ),
+            )
+    for stage in list(ForgeStage)[:3]:
+        project.stage_completed_at[stage.value] = now
+    return project
+
+
+def _time(operation: Callable[[], Any], rounds: int) -> float:
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        operation()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=50)
+    parser.add_argument("--sizes", default="small,medium,large")
+    args = parser.parse_args()
+
+    print(f"{'size':<8} {'operation':<10} {'KB':>7} {'legacy ms':>10} {'compiled ms':>12} {'speedup':>8}")
+    for size in args.sizes.split(","):
+        project = build_project(size)
+        document = legacy_to_dict(project)
+
+        # Same documents either way
+        assert project.to_dict() == document
+        assert json.loads(project.to_json()) == document
+        assert ForgeProject.from_dict(document).to_dict() == legacy_to_dict(legacy_from_dict(json.loads(json.dumps(document))))
+
+        encoded = json.dumps(document)
+        kilobytes = len(encoded) / 1024
+        cases = [
+            ("to_dict", lambda: legacy_to_dict(project), project.to_dict),
+            ("to_json", lambda: json.dumps(legacy_to_dict(project)).encode("utf-8"), project.to_json),
+            # Both sides parse the stored JSON first, as a Cosmos read does
+            ("from_dict", lambda: legacy_from_dict(json.loads(encoded)), lambda: ForgeProject.from_dict(json.loads(encoded))),
+            ("from_json", lambda: legacy_from_dict(json.loads(encoded)), lambda: ForgeProject.from_json(encoded)),
+        ]
+        for name, legacy, compiled in cases:
+            legacy_ms, compiled_ms = _time(legacy, args.rounds), _time(compiled, args.rounds)
+            print(
+                f"{size:<8} {name:<10} {kilobytes:>7.1f} {legacy_ms:>10.3f} {compiled_ms:>12.3f} "
+                f"{legacy_ms / compiled_ms:>7.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
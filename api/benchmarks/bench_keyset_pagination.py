@@ -0,0 +1,152 @@
+"""
+OFFSET/LIMIT vs keyset pagination benchmark.
+
+Compares the cost of fetching page N of a user's prompts ordered by
+``(updatedAt, id)`` with the two strategies used by the listing endpoints:
+
+1. offset - ``ORDER BY c.updatedAt DESC OFFSET {n * limit} LIMIT {limit}``
+2. keyset - ``apply_keyset`` seeking strictly after the previous page's last row
+
+By default the benchmark runs against an in-memory model of a single Cosmos
+partition, where RU is approximated as a fixed query charge plus a per-document
+read charge (skipped documents are still read). Pass ``--cosmos`` with
+COSMOS_DB_CONNECTION_STRING set (e.g. the Cosmos emulator) to seed a real
+container and report measured request charges instead.
+
+Usage:
+    python benchmarks/bench_keyset_pagination.py [--docs 20000] [--limit 50] [--cosmos]
+"""
+
+import argparse
+import bisect
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# Add API directory to path
+api_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(api_dir))
+
+from shared.pagination import apply_keyset, encode_keyset_cursor  # noqa: E402
+
+USER_ID = "bench-user"
+BASE_QUERY = "SELECT * FROM c WHERE c.userId = @user_id"
+BASE_PARAMS = [{"name": "@user_id", "value": USER_ID}]
+
+# Rough single-partition query cost model (RU)
+QUERY_BASE_RU = 2.8
+PER_DOCUMENT_RU = 0.03
+
+
+def seed_documents(count: int) -> list:
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    docs = []
+    for i in range(count):
+        # Duplicate timestamps on purpose so the id tie-breaker matters
+        updated = start + timedelta(seconds=i // 3)
+        docs.append({"id": str(uuid.uuid4()), "userId": USER_ID, "updatedAt": updated.isoformat(), "title": f"Prompt {i}"})
+    docs.sort(key=lambda d: (d["updatedAt"], d["id"]), reverse=True)
+    return docs
+
+
+def _page_depths(total_pages: int) -> list:
+    depths = [1, 2, 5, 10, 25, 50, 100, 200, 400]
+    return [d for d in depths if d <= total_pages]
+
+
+def run_simulated(docs: list, limit: int) -> None:
+    # Ascending keys for bisect; the index stands in for Cosmos' composite index seek
+    keys = [(d["updatedAt"], d["id"]) for d in reversed(docs)]
+
+    print(f"Simulated partition: {len(docs)} docs, page size {limit}")
+    print(f"{'page':>6} {'offset RU':>10} {'keyset RU':>10} {'offset us':>10} {'keyset us':>10}")
+    for depth in _page_depths(len(docs) // limit):
+        skip = (depth - 1) * limit
+
+        start = time.perf_counter()
+        scanned = docs[: skip + limit]
+        offset_page = scanned[skip:]
+        offset_us = (time.perf_counter() - start) * 1e6
+        offset_ru = QUERY_BASE_RU + PER_DOCUMENT_RU * len(scanned)
+
+        cursor = encode_keyset_cursor(docs[skip - 1], "updatedAt") if skip else None
+        start = time.perf_counter()
+        apply_keyset(BASE_QUERY, BASE_PARAMS, limit, "c.updatedAt", cursor)
+        if skip:
+            last = docs[skip - 1]
+            end = bisect.bisect_left(keys, (last["updatedAt"], last["id"]))
+        else:
+            end = len(keys)
+        keyset_rows = keys[max(0, end - limit - 1) : end][::-1]
+        keyset_us = (time.perf_counter() - start) * 1e6
+        keyset_ru = QUERY_BASE_RU + PER_DOCUMENT_RU * len(keyset_rows)
+
+        assert [d["id"] for d in offset_page] == [k[1] for k in keyset_rows[:limit]]
+        print(f"{depth:>6} {offset_ru:>10.2f} {keyset_ru:>10.2f} {offset_us:>10.1f} {keyset_us:>10.1f}")
+
+
+def run_cosmos(docs: list, limit: int) -> None:
+    from azure.cosmos import CosmosClient, PartitionKey
+
+    client = CosmosClient.from_connection_string(os.environ["COSMOS_DB_CONNECTION_STRING"])
+    database = client.create_database_if_not_exists("SutraBench")
+    container = database.create_container_if_not_exists(
+        id=f"KeysetBench{len(docs)}",
+        partition_key=PartitionKey(path="/userId"),
+        indexing_policy={
+            "indexingMode": "consistent",
+            "includedPaths": [{"path": "/*"}],
+            "compositeIndexes": [[{"path": "/updatedAt", "order": "descending"}, {"path": "/id", "order": "descending"}]],
+        },
+    )
+
+    existing = list(container.query_items("SELECT VALUE COUNT(1) FROM c", partition_key=USER_ID))[0]
+    if existing < len(docs):
+        print(f"Seeding {len(docs)} documents...")
+        for doc in docs:
+            container.upsert_item(doc)
+    docs = list(
+        container.query_items("SELECT c.id, c.updatedAt FROM c ORDER BY c.updatedAt DESC, c.id DESC", partition_key=USER_ID)
+    )
+
+    def measure(query: str, parameters: list) -> tuple:
+        start = time.perf_counter()
+        charge = 0.0
+        rows = 0
+        for page in container.query_items(query, parameters=parameters, partition_key=USER_ID).by_page():
+            rows += len(list(page))
+            charge += float(container.client_connection.last_response_headers.get("x-ms-request-charge", 0))
+        return charge, (time.perf_counter() - start) * 1000, rows
+
+    print(f"Cosmos container: {len(docs)} docs, page size {limit}")
+    print(f"{'page':>6} {'offset RU':>10} {'keyset RU':>10} {'offset ms':>10} {'keyset ms':>10}")
+    for depth in _page_depths(len(docs) // limit):
+        skip = (depth - 1) * limit
+        offset_ru, offset_ms, _ = measure(
+            f"{BASE_QUERY} ORDER BY c.updatedAt DESC, c.id DESC OFFSET {skip} LIMIT {limit}", BASE_PARAMS
+        )
+        cursor = encode_keyset_cursor(docs[skip - 1], "updatedAt") if skip else None
+        query, parameters = apply_keyset(BASE_QUERY, BASE_PARAMS, limit, "c.updatedAt", cursor)
+        keyset_ru, keyset_ms, _ = measure(query, parameters)
+        print(f"{depth:>6} {offset_ru:>10.2f} {keyset_ru:>10.2f} {offset_ms:>10.1f} {keyset_ms:>10.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=20000)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--cosmos", action="store_true", help="Run against COSMOS_DB_CONNECTION_STRING")
+    args = parser.parse_args()
+
+    docs = seed_documents(args.docs)
+    if args.cosmos:
+        run_cosmos(docs, args.limit)
+    else:
+        run_simulated(docs, args.limit)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Fan-out latency benchmark for LLMManager.execute_multi_llm.
+
+Uses fake providers with injected latency (no network, no Key Vault) and compares:
+
+1. sequential - awaiting each provider in turn (the previous behaviour)
+2. concurrent - execute_multi_llm, which runs providers concurrently
+3. first_n    - execute_multi_llm(first_n=1), returning on the first success
+
+Usage:
+    python benchmarks/bench_multi_llm_fanout.py [--latencies-ms 800,1200,1500] [--rounds 3]
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, AsyncGenerator, Dict, Union
+
+# Add API directory to path
+api_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(api_dir))
+
+from shared.llm_client import LLMManager  # noqa: E402
+from shared.llm_providers.base_provider import BaseLLMProvider, LLMResponse, ModelInfo, TokenUsage  # noqa: E402
+
+
+class FakeProvider(BaseLLMProvider):
+    """Provider stand-in that sleeps for a fixed latency instead of calling an API."""
+
+    def __init__(self, name: str, latency_seconds: float):
+        super().__init__(name)
+        self.latency_seconds = latency_seconds
+        self.enabled = True
+        self.budget_limit = 1000.0
+        self.models = self._get_available_models()
+        self.default_model = "fake-model"
+        self._initialized = True
+
+    @property
+    def provider_name(self) -> str:
+        return self.name
+
+    def _get_available_models(self) -> Dict[str, ModelInfo]:
+        return {
+            "fake-model": ModelInfo(
+                name="fake-model", display_name="Fake", max_tokens=4096, cost_per_input_token=0.0, cost_per_output_token=0.0
+            )
+        }
+
+    async def _execute_request(
+        self, prompt: str, model: str, context: Dict[str, Any], stream: bool = False
+    ) -> Union[LLMResponse, AsyncGenerator[str, None]]:
+        await asyncio.sleep(self.latency_seconds)
+        return LLMResponse.create(
+            provider=self.name,
+            model=model,
+            response=f"{self.name} says hi",
+            usage=TokenUsage(prompt_tokens=len(prompt.split()), completion_tokens=3),
+            cost=0.0,
+        )
+
+
+def _manager(latencies: list) -> LLMManager:
+    manager = LLMManager()
+    manager.providers = {f"fake{i}": FakeProvider(f"fake{i}", latency) for i, latency in enumerate(latencies)}
+    manager._initialized = True
+    return manager
+
+
+async def _sequential(manager: LLMManager, prompt: str) -> int:
+    results = []
+    for name in manager.providers:
+        results.append(await manager.execute_prompt(name, prompt, {}))
+    return len(results)
+
+
+async def _concurrent(manager: LLMManager, prompt: str, **options) -> int:
+    result = await manager.execute_multi_llm(prompt, list(manager.providers), {}, **options)
+    return result["successful_providers"]
+
+
+async def _time(call) -> float:
+    start = time.perf_counter()
+    await call
+    return (time.perf_counter() - start) * 1000
+
+
+async def _run(latencies: list, rounds: int) -> None:
+    manager = _manager(latencies)
+    prompt = "Compare these answers"
+    modes = {
+        "sequential": lambda: _sequential(manager, prompt),
+        "concurrent": lambda: _concurrent(manager, prompt),
+        "first_n=1": lambda: _concurrent(manager, prompt, first_n=1),
+    }
+
+    print(f"{len(latencies)} fake providers, latencies {[int(l * 1000) for l in latencies]} ms, {rounds} rounds")
+    print(f"{'mode':<12} {'median ms':>10} {'speedup':>8}")
+    baseline = None
+    for mode, call in modes.items():
+        timings = [await _time(call()) for _ in range(rounds)]
+        median = statistics.median(timings)
+        baseline = baseline or median
+        print(f"{mode:<12} {median:>10.1f} {baseline / median:>7.2f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latencies-ms", default="800,1200,1500")
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    latencies = [float(value) / 1000 for value in args.latencies_ms.split(",")]
+    asyncio.run(_run(latencies, args.rounds))
+
+
+if __name__ == "__main__":
+    main()
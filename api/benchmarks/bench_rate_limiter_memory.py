@@ -0,0 +1,152 @@
+"""
+Memory and throughput benchmark for the middleware rate limiter.
+
+Replays requests from many distinct client IPs through two per-IP limiters:
+
+1. deque   - the previous behaviour, one timestamp per request in a deque per IP
+2. counter - RateLimiter with the two-window SlidingWindowCounter
+
+Memory is the tracemalloc peak of the limiter state after the replay; throughput
+is is_allowed() calls per second. A second scenario pushes a single key to a
+10k-per-hour limit (the api_global rule) to show per-key growth.
+
+Usage:
+    python benchmarks/bench_rate_limiter_memory.py [--ips 100000] [--requests-per-ip 20]
+"""
+
+import argparse
+import gc
+import os
+import random
+import sys
+import time
+import tracemalloc
+from collections import defaultdict, deque
+from pathlib import Path
+
+# Add API directory to path
+api_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(api_dir))
+
+os.environ.setdefault("SUTRA_MAX_REQUESTS_PER_MINUTE", "100")
+
+from shared.middleware import RateLimiter  # noqa: E402
+from shared.rate_limiter import SlidingWindowCounter  # noqa: E402
+
+
+class DequeRateLimiter:
+    """The deque-per-IP limiter RateLimiter used to be, kept for comparison."""
+
+    def __init__(self, max_requests: int, time_window: int = 60):
+        self.clients = defaultdict(deque)
+        self.max_requests = max_requests
+        self.time_window = time_window
+
+    def is_allowed(self, client_ip: str, current_time: float) -> tuple:
+        client_requests = self.clients[client_ip]
+        while client_requests and current_time - client_requests[0] > self.time_window:
+            client_requests.popleft()
+        current_count = len(client_requests)
+        is_allowed = current_count < self.max_requests
+        if is_allowed:
+            client_requests.append(current_time)
+        return is_allowed, {
+            "limit": self.max_requests,
+            "remaining": max(0, self.max_requests - current_count - (1 if is_allowed else 0)),
+            "reset_time": int(current_time + self.time_window),
+            "retry_after": self.time_window if not is_allowed else None,
+        }
+
+
+def make_traffic(ips: int, requests_per_ip: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    addresses = [f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}" for i in range(ips)]
+    traffic = [(ip, 1000.0 + rng.random() * 60) for ip in addresses for _ in range(requests_per_ip)]
+    traffic.sort(key=lambda item: item[1])
+    return traffic
+
+
+def measure(label: str, build, replay, traffic: list) -> None:
+    # Time without tracemalloc (it slows every allocation), then replay again for memory
+    limiter = build()
+    start = time.perf_counter()
+    replay(limiter, traffic)
+    elapsed = time.perf_counter() - start
+    del limiter
+
+    gc.collect()
+    tracemalloc.start()
+    limiter = build()
+    replay(limiter, traffic)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    keys = len(limiter.clients)
+    print(
+        f"{label:>8} {keys:>9} {current / 1e6:>10.1f} {current / max(keys, 1):>10.0f} "
+        f"{len(traffic) / elapsed / 1e3:>12.0f}"
+    )
+
+
+class _Clock:
+    """Stands in for the time module so both limiters see the replayed timestamps."""
+
+    now = 0.0
+
+    @classmethod
+    def time(cls) -> float:
+        return cls.now
+
+
+def replay_deque(limiter: DequeRateLimiter, traffic: list) -> None:
+    for ip, ts in traffic:
+        _Clock.now = ts
+        limiter.is_allowed(ip, _Clock.time())
+
+
+def replay_counter(limiter: RateLimiter, traffic: list) -> None:
+    import shared.middleware as middleware
+
+    real_time = middleware.time
+    middleware.time = _Clock
+    try:
+        for ip, ts in traffic:
+            _Clock.now = ts
+            limiter.is_allowed(ip)
+    finally:
+        middleware.time = real_time
+
+
+def single_key(limit: int, window: int) -> None:
+    print(f"\nSingle key at its limit ({limit} requests per {window}s)")
+    for label, build, hit in (
+        ("deque", lambda: deque(), lambda d, ts: d.append(ts)),
+        ("counter", lambda: SlidingWindowCounter(window, limit), lambda c, ts: c.add_request(ts)),
+    ):
+        gc.collect()
+        tracemalloc.start()
+        state = build()
+        for i in range(limit):
+            hit(state, 1000.0 + i * (window / limit / 2))
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{label:>8} {current:>10} bytes")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ips", type=int, default=100_000)
+    parser.add_argument("--requests-per-ip", type=int, default=20)
+    args = parser.parse_args()
+
+    traffic = make_traffic(args.ips, args.requests_per_ip)
+    max_requests = int(os.environ["SUTRA_MAX_REQUESTS_PER_MINUTE"])
+    print(f"{args.ips} IPs x {args.requests_per_ip} requests within one minute, limit {max_requests}/min")
+    print(f"{'limiter':>8} {'keys':>9} {'MB':>10} {'B/key':>10} {'k checks/s':>12}")
+    measure("deque", lambda: DequeRateLimiter(max_requests), replay_deque, traffic)
+    measure("counter", RateLimiter, replay_counter, traffic)
+
+    single_key(10_000, 3600)
+
+
+if __name__ == "__main__":
+    main()
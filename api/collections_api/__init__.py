@@ -17,13 +17,15 @@ from shared.database import get_database_manager
 from shared.error_handling import SutraAPIError, handle_api_error
 from shared.middleware import enhanced_security_middleware
 from shared.models import Collection, User, ValidationError
+from shared.list_totals import invalidate_list_totals, resolve_list_total
+from shared.pagination import query_cursor_page
 from shared.real_time_cost import get_cost_manager
 
 # NEW: Use unified authentication and validation systems
 from shared.unified_auth import get_user_from_request, require_authentication
 from shared.utils.fieldConverter import convert_camel_to_snake, convert_snake_to_camel
 from shared.utils.schemaValidator import validate_entity
-from shared.validation import validate_collection_data
+from shared.validation import ValidationException, validate_collection_data
 
 # Initialize logging
 logger = logging.getLogger(__name__)
@@ -111,9 +113,11 @@ async def list_collections(user: User, req: func.HttpRequest) -> func.HttpRespon
         params = req.params
         page = int(params.get("page", 1))
         limit = min(int(params.get("limit", 20)), 100)  # Max 100 items
+        cursor = params.get("cursor")  # Opaque cursor from a previous page's nextCursor
         collection_type = params.get("type")  # private, shared_team, public_marketplace
         search = params.get("search", "").strip()
         team_id = params.get("teamId")
+        estimate_total = params.get("estimateTotal", "").lower() == "true"
 
         db_manager = get_database_manager()
 
@@ -136,16 +140,20 @@ async def list_collections(user: User, req: func.HttpRequest) -> func.HttpRespon
             )
             query_params.append({"name": "@search", "value": search})
 
-        # Add ordering and pagination
+        # Add ordering; paging is driven by continuation-token cursors
         query_parts.append("ORDER BY c.updatedAt DESC")
-        query_parts.append(f"OFFSET {(page - 1) * limit} LIMIT {limit}")
 
         query = " ".join(query_parts)
 
         # Execute query
-        items = await db_manager.query_items(container_name="Collections", query=query, parameters=query_params)
+        try:
+            items, next_cursor = await query_cursor_page(
+                db_manager, "Collections", query, query_params, user_id, limit, cursor=cursor, offset=(page - 1) * limit
+            )
+        except ValidationException as e:
+            return func.HttpResponse(json.dumps({"error": e.message}), status_code=400, mimetype="application/json")
 
-        # Get total count for pagination
+        # Count query shares the list filters; it only runs when the total is not cached or derivable
         count_query = "SELECT VALUE COUNT(1) FROM c WHERE c.userId = @user_id"
         count_params = [{"name": "@user_id", "value": user_id}]
 
@@ -161,15 +169,27 @@ async def list_collections(user: User, req: func.HttpRequest) -> func.HttpRespon
             count_query += " AND (CONTAINS(LOWER(c.name), LOWER(@search)) OR CONTAINS(LOWER(c.description), LOWER(@search)))"
             count_params.append({"name": "@search", "value": search})
 
-        count_result = await db_manager.query_items(container_name="Collections", query=count_query, parameters=count_params)
-
-        # Handle development mode where we get mock data
-        if count_result and isinstance(count_result[0], dict) and "_mock" in count_result[0]:
-            total_count = 2  # Mock count for development
-        else:
-            total_count = count_result[0] if count_result else 0
+        # Cursor pages know whether more results exist; legacy page numbers assume a full page means more
+        cursor_mode = bool(cursor) or page <= 1
+        has_more = bool(next_cursor) if cursor_mode else len(items) >= limit
+
+        total = await resolve_list_total(
+            db_manager,
+            "Collections",
+            user_id,
+            {"type": collection_type, "teamId": team_id, "search": search},
+            count_query,
+            count_params,
+            page_size=len(items),
+            has_more=has_more,
+            offset=None if cursor else (page - 1) * limit,
+            estimate=estimate_total,
+            partition_key=user_id,
+        )
+        total_count = total.count
 
         total_pages = (total_count + limit - 1) // limit
+        has_next = has_more if cursor_mode else page < total_pages
 
         response_data = {
             "collections": items,
@@ -177,9 +197,11 @@ async def list_collections(user: User, req: func.HttpRequest) -> func.HttpRespon
                 "current_page": page,
                 "total_pages": total_pages,
                 "total_count": total_count,
+                "total_is_estimate": total.estimated,
                 "limit": limit,
-                "has_next": page < total_pages,
-                "has_prev": page > 1,
+                "next_cursor": next_cursor,
+                "has_next": has_next,
+                "has_prev": page > 1 or bool(cursor),
             },
         }
 
@@ -251,6 +273,7 @@ async def create_collection(user: User, req: func.HttpRequest) -> func.HttpRespo
 
         # Save to database
         created_item = await db_manager.create_item(container_name="Collections", item=collection_data, partition_key=user_id)
+        invalidate_list_totals("Collections", user_id)
 
         logger.info(f"Created collection {collection_id} for user {user_id}")
 
@@ -376,6 +399,10 @@ async def update_collection(user: User, collection_id: str, req: func.HttpReques
             partition_key=user_id,
         )
 
+        if any(field in body for field in ("name", "description", "type", "teamId")):
+            # Collection totals are filtered on these fields
+            invalidate_list_totals("Collections", user_id)
+
         logger.info(f"Updated collection {collection_id} for user {user_id}")
 
         return func.HttpResponse(
@@ -446,6 +473,8 @@ async def delete_collection(user: User, collection_id: str) -> func.HttpResponse
             item_id=collection_id,
             partition_key=user_id,
         )
+        invalidate_list_totals("Collections", user_id)
+        invalidate_list_totals("Prompts", collection_id)
 
         logger.info(f"Deleted collection {collection_id} for user {user_id}")
 
@@ -470,6 +499,7 @@ async def get_collection_prompts(user: User, collection_id: str, req: func.HttpR
         limit = min(int(params.get("limit", 20)), 100)
         search = params.get("search", "").strip()
         tags = params.get("tags", "").strip()
+        estimate_total = params.get("estimateTotal", "").lower() == "true"
 
         db_manager = get_database_manager()
 
@@ -514,16 +544,19 @@ async def get_collection_prompts(user: User, collection_id: str, req: func.HttpR
                 query_params.append({"name": param_name, "value": tag})
             query_parts.append(f"AND ({' OR '.join(tag_conditions)})")
 
-        # Add ordering and pagination
+        # Add ordering and pagination; one look-ahead row tells us whether another page exists
+        offset = (page - 1) * limit
         query_parts.append("ORDER BY c.updatedAt DESC")
-        query_parts.append(f"OFFSET {(page - 1) * limit} LIMIT {limit}")
+        query_parts.append(f"OFFSET {offset} LIMIT {limit + 1}")
 
         query = " ".join(query_parts)
 
         # Execute query
         prompts = await db_manager.query_items(container_name="Prompts", query=query, parameters=query_params)
+        has_more = len(prompts) > limit
+        prompts = prompts[:limit]
 
-        # Get total count
+        # Count query shares the list filters; it only runs when the total is not cached or derivable
         count_query = "SELECT VALUE COUNT(1) FROM c WHERE c.collectionId = @collection_id"
         count_params = [{"name": "@collection_id", "value": collection_id}]
 
@@ -540,8 +573,19 @@ async def get_collection_prompts(user: User, collection_id: str, req: func.HttpR
                 count_params.append({"name": param_name, "value": tag})
             count_query += f" AND ({' OR '.join(tag_conditions)})"
 
-        total_count_result = await db_manager.query_items(container_name="Prompts", query=count_query, parameters=count_params)
-        total_count = total_count_result[0] if total_count_result else 0
+        total = await resolve_list_total(
+            db_manager,
+            "Prompts",
+            collection_id,
+            {"search": search, "tags": tags},
+            count_query,
+            count_params,
+            page_size=len(prompts),
+            has_more=has_more,
+            offset=offset,
+            estimate=estimate_total,
+        )
+        total_count = total.count
 
         total_pages = (total_count + limit - 1) // limit
 
@@ -552,8 +596,9 @@ async def get_collection_prompts(user: User, collection_id: str, req: func.HttpR
                 "current_page": page,
                 "total_pages": total_pages,
                 "total_count": total_count,
+                "total_is_estimate": total.estimated,
                 "limit": limit,
-                "has_next": page < total_pages,
+                "has_next": has_more,
                 "has_prev": page > 1,
             },
         }
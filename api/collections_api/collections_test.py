@@ -1,7 +1,7 @@
 import asyncio
 import json
 from datetime import datetime
-from unittest.mock import AsyncMock, Mock, patch
+from unittest.mock import ANY, AsyncMock, Mock, patch
 
 import azure.functions as func
 import pytest
@@ -243,7 +243,7 @@ class TestCollectionsAPI:
             with patch(
                 "api.collections_api.get_database_manager",
                 return_value=mock_database_manager,
-            ):
+            ), patch("api.collections_api.invalidate_list_totals") as mock_invalidate:
                 req = create_auth_request(
                     method="PUT",
                     url=f"http://localhost/api/collections/{collection_id}",
@@ -260,6 +260,8 @@ class TestCollectionsAPI:
             assert response_data["name"] == "Updated Name"
             assert response_data["description"] == "Updated description"
             mock_database_manager.update_item.assert_called_once()
+            # A rename changes which searches match, so cached totals are dropped
+            mock_invalidate.assert_called_once_with("Collections", ANY)
 
     @pytest.mark.asyncio
     async def test_delete_collection_success(self, auth_test_user, mock_database_manager):
@@ -194,6 +194,7 @@ def mock_database_manager():
         mock_manager = Mock()
         # Make database methods async
         mock_manager.query_items = AsyncMock()
+        mock_manager.query_page = AsyncMock()
         mock_manager.create_item = AsyncMock()
         mock_manager.replace_item = AsyncMock()
         mock_manager.update_item = AsyncMock()
@@ -227,6 +228,68 @@ def reset_database_manager():
     shared.database._db_manager = None
 
 
+@pytest.fixture(autouse=True)
+def reset_list_total_cache():
+    """Reset cached list totals so counts never leak between tests."""
+    import shared.list_totals
+
+    shared.list_totals._list_total_cache = None
+    yield
+    shared.list_totals._list_total_cache = None
+
+
+@pytest.fixture(autouse=True)
+def reset_llm_response_cache():
+    """Reset the LLM response cache so one test's completions never answer another's."""
+
+    def reset():
+        for name in ("shared.llm_cache", "api.shared.llm_cache"):
+            if name in sys.modules:
+                sys.modules[name]._response_cache = None
+
+    reset()
+    yield
+    reset()
+
+
+@pytest.fixture(autouse=True)
+def reset_batch_job_manager():
+    """Reset the batch job manager so jobs started in one test never outlive it."""
+
+    def reset():
+        for name in ("shared.batch_jobs", "api.shared.batch_jobs"):
+            if name in sys.modules:
+                sys.modules[name]._batch_job_manager = None
+
+    reset()
+    yield
+    reset()
+
+
+@pytest.fixture(autouse=True)
+def reset_artifact_store():
+    """Reset the artifact store so each test picks up its own FORGE_ARTIFACT_STORE settings."""
+
+    def reset():
+        for name in ("shared.artifact_store", "api.shared.artifact_store"):
+            if name in sys.modules:
+                sys.modules[name]._artifact_store = None
+
+    reset()
+    yield
+    reset()
+
+
+@pytest.fixture(autouse=True)
+def disable_write_behind():
+    """Write telemetry synchronously unless a test opts into the write-behind buffer."""
+    with patch.dict(os.environ, {"WRITE_BEHIND_ENABLED": "false"}):
+        yield
+    for name in ("shared.write_behind", "api.shared.write_behind"):
+        if name in sys.modules:
+            sys.modules[name]._buffers.clear()
+
+
 # Environment setup fixtures
 @pytest.fixture(autouse=True)
 def setup_test_environment():
@@ -406,6 +469,7 @@ def create_auth_request(
     user_id=None,
     role="user",
     route_params=None,
+    params=None,
 ):
     """Create a request for use with unified auth system.
 
@@ -435,7 +499,7 @@ def create_auth_request(
         body=json.dumps(body).encode("utf-8") if body else b"",
         headers=headers,
         route_params=route_params,
-        params={},
+        params=params or {},
     )
 
 
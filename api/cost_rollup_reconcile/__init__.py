@@ -0,0 +1,48 @@
+"""
+Nightly reconciliation of per-user cost rollups.
+Rebuilds the settled day rollups and the month rollup from raw CostEntries so
+any increment lost to a failed write is corrected. Runs at 02:30 UTC; on the first day of a
+month it also closes out the previous month.
+"""
+
+import logging
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+import azure.functions as func
+
+# Add the root directory to Python path for proper imports
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from shared.async_database import DATABASE_NAME, get_connection_string, get_cosmos_pool
+from shared.cost_rollups import MONTH, CostRollupStore, period_key
+
+# Initialize logging
+logger = logging.getLogger(__name__)
+
+
+async def main(timer: func.TimerRequest) -> None:
+    """Rebuild cost rollups for the current (and, early in a month, the previous) month."""
+    if not get_connection_string():
+        logger.warning("Cost rollup reconciliation skipped: no Cosmos DB connection string configured")
+        return
+
+    now = datetime.now(timezone.utc)
+    months = [period_key(MONTH, now)]
+    if now.day == 1:
+        months.insert(0, period_key(MONTH, now - timedelta(days=1)))
+
+    pool = get_cosmos_pool()
+    entry = await pool.acquire(get_connection_string())
+    try:
+        store = CostRollupStore(entry.client, DATABASE_NAME)
+        for month in months:
+            report = await store.reconcile(month=month)
+            logger.info(f"Reconciled cost rollups for {month}: {report}")
+    except Exception as e:
+        pool.release(entry, e)
+        logger.error(f"Cost rollup reconciliation failed: {e}")
+        raise
+    else:
+        pool.release(entry)
@@ -3,21 +3,22 @@ Forge API endpoints for project management and workflow operations.
 Handles all CRUD operations for Forge projects, artifacts, and stage management.
 """
 
+import asyncio
 import json
 import logging
-from dataclasses import asdict
 from datetime import datetime, timezone
-from decimal import Decimal
-from enum import Enum
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 import azure.functions as func
-from azure.cosmos.exceptions import CosmosResourceNotFoundError
+from azure.cosmos.exceptions import CosmosAccessConditionFailedError, CosmosResourceNotFoundError
+from shared.artifact_store import artifact_content_size, externalize_artifact, load_artifact_content
 from shared.async_database import FORGE_ANALYTICS_CONTAINER, FORGE_TEMPLATES_CONTAINER, AsyncCosmosHelper
 from shared.auth_helpers import extract_user_info
 from shared.cost_tracker import CostTracker
-from shared.llm_client import LLMManager
+from shared.llm_client import LLMManager, get_llm_manager
 from shared.middleware import enhanced_security_middleware
+from shared.pagination import apply_keyset, keyset_page
+from shared.models.dataclass_codec import dumps, encode_value
 from shared.models.forge_models import (
     ArtifactType,
     ForgeAnalytics,
@@ -32,6 +33,7 @@ from shared.models.forge_models import (
     validate_stage_transition,
 )
 from shared.quality_engine import QualityAssessmentEngine
+from shared.validation import ValidationException
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -42,20 +44,61 @@ logger = logging.getLogger(__name__)
 # Initialize services
 quality_engine = QualityAssessmentEngine()
 
+# Cosmos system properties that are not ForgeProject fields
+COSMOS_SYSTEM_FIELDS = ("_rid", "_self", "_etag", "_attachments", "_ts")
+
+# Fields every stage-scoped read needs: identity, access control and stage position
+PROJECT_ACCESS_FIELDS = (
+    "name",
+    "description",
+    "owner_id",
+    "organization_id",
+    "current_stage",
+    "status",
+    "priority",
+    "collaborators",
+    "shared_with",
+    "permissions",
+    "version",
+    "updated_at",
+)
+
+STAGE_DATA_FIELDS = {
+    ForgeStage.IDEA_REFINEMENT: "idea_refinement_data",
+    ForgeStage.PRD_GENERATION: "prd_generation_data",
+    ForgeStage.UX_REQUIREMENTS: "ux_requirements_data",
+    ForgeStage.TECHNICAL_ANALYSIS: "technical_analysis_data",
+    ForgeStage.IMPLEMENTATION_PLAYBOOK: "implementation_playbook_data",
+}
+
+# What update_forge_project reads; artifacts and version history stay in the database
+PROJECT_UPDATE_FIELDS = PROJECT_ACCESS_FIELDS + ("custom_fields",) + tuple(STAGE_DATA_FIELDS.values())
+
+# What list_forge_projects shows; artifacts are reduced to their ids, enough to count them
+PROJECT_SUMMARY_FIELDS = (
+    "name",
+    "description",
+    "owner_id",
+    "current_stage",
+    "status",
+    "priority",
+    "created_at",
+    "updated_at",
+    "tags",
+    "collaborators",
+    "stage_completed_at",
+)
+PROJECT_SUMMARY_SELECT = ", ".join(
+    ["c.id", *(f"c.{name}" for name in PROJECT_SUMMARY_FIELDS)]
+    + [
+        "{"
+        + ", ".join(f'"{stage.value}": ARRAY(SELECT VALUE a.id FROM a IN c.artifacts.{stage.value})' for stage in ForgeStage)
+        + "} AS artifacts"
+    ]
+)
 
-def _serialize_for_json(obj):
-    """Recursively convert enums, datetimes, and Decimals for JSON serialization."""
-    if isinstance(obj, Enum):
-        return obj.value
-    if isinstance(obj, datetime):
-        return obj.isoformat()
-    if isinstance(obj, Decimal):
-        return float(obj)
-    if isinstance(obj, dict):
-        return {k: _serialize_for_json(v) for k, v in obj.items()}
-    if isinstance(obj, list):
-        return [_serialize_for_json(v) for v in obj]
-    return obj
+# Re-reads after a concurrent writer changed the project between our read and patch
+MAX_PROJECT_PATCH_RETRIES = 3
 
 
 @enhanced_security_middleware
@@ -185,9 +228,7 @@ async def create_forge_project(req: func.HttpRequest) -> func.HttpResponse:
         logger.info(f"Created Forge project: {project.name} ({project.id})")
 
         return func.HttpResponse(
-            json.dumps(
-                {"success": True, "project": project.to_dict(), "message": f"Project '{project.name}' created successfully"}
-            ),
+            dumps({"success": True, "project": project, "message": f"Project '{project.name}' created successfully"}),
             status_code=201,
             mimetype="application/json",
         )
@@ -215,16 +256,21 @@ async def list_forge_projects(req: func.HttpRequest) -> func.HttpResponse:
         stage_filter = params.get("stage")
         limit = int(params.get("limit", 50))
         offset = int(params.get("offset", 0))
+        cursor = params.get("cursor")
 
         # Get projects from database
-        projects = await get_user_forge_projects(
-            user_id=user_info["user_id"],
-            organization_id=user_info.get("organization_id"),
-            status_filter=status_filter,
-            stage_filter=stage_filter,
-            limit=limit,
-            offset=offset,
-        )
+        try:
+            projects, next_cursor = await get_user_forge_projects_page(
+                user_id=user_info["user_id"],
+                organization_id=user_info.get("organization_id"),
+                status_filter=status_filter,
+                stage_filter=stage_filter,
+                limit=limit,
+                offset=offset,
+                cursor=cursor,
+            )
+        except ValidationException as e:
+            return func.HttpResponse(json.dumps({"error": e.message}), status_code=400, mimetype="application/json")
 
         # Calculate progress for each project
         project_summaries = []
@@ -247,7 +293,14 @@ async def list_forge_projects(req: func.HttpRequest) -> func.HttpResponse:
 
         return func.HttpResponse(
             json.dumps(
-                {"projects": project_summaries, "total_count": len(project_summaries), "limit": limit, "offset": offset}
+                {
+                    "projects": project_summaries,
+                    "total_count": len(project_summaries),
+                    "limit": limit,
+                    "offset": offset,
+                    "next_cursor": next_cursor,
+                    "has_more": next_cursor is not None,
+                }
             ),
             status_code=200,
             mimetype="application/json",
@@ -278,9 +331,10 @@ async def get_forge_project(req: func.HttpRequest) -> func.HttpResponse:
             )
 
         # Load project from database
-        project = await load_forge_project(project_id)
-        if not project:
+        loaded = await load_forge_project_with_etag(project_id)
+        if not loaded:
             return func.HttpResponse(json.dumps({"error": "Project not found"}), status_code=404, mimetype="application/json")
+        project, etag = loaded
 
         # Check access permissions
         if not await user_has_project_access(user_info["user_id"], project):
@@ -291,12 +345,17 @@ async def get_forge_project(req: func.HttpRequest) -> func.HttpResponse:
         for stage in ForgeStage:
             stage_progress[stage.value] = calculate_stage_completion_percentage(project, stage)
 
-        # Prepare response with full project details
+        # Prepare response with full project details; artifact content is fetched via get_project_artifacts
         response_data = project.to_dict()
+        response_data["artifacts"] = {
+            stage: [_artifact_metadata(artifact) for artifact in artifacts] for stage, artifacts in project.artifacts.items()
+        }
         response_data["stage_progress"] = stage_progress
         response_data["overall_progress"] = project.calculate_overall_progress()
 
-        return func.HttpResponse(json.dumps(response_data), status_code=200, mimetype="application/json")
+        return func.HttpResponse(
+            dumps(response_data), status_code=200, mimetype="application/json", headers=_etag_headers(etag)
+        )
 
     except Exception as e:
         logger.error(f"Error getting Forge project: {str(e)}")
@@ -324,61 +383,37 @@ async def update_forge_project(req: func.HttpRequest) -> func.HttpResponse:
                 json.dumps({"error": "Project ID required"}), status_code=400, mimetype="application/json"
             )
 
-        # Load existing project
-        project = await load_forge_project(project_id)
-        if not project:
-            return func.HttpResponse(json.dumps({"error": "Project not found"}), status_code=404, mimetype="application/json")
-
-        # Check permissions
-        if not await user_has_project_access(user_info["user_id"], project, required_permission="edit"):
-            return func.HttpResponse(json.dumps({"error": "Edit access denied"}), status_code=403, mimetype="application/json")
-
         # Update project fields
         updates = body.get("updates", {})
         if not updates:
             updates = {key: value for key, value in body.items() if key not in ["project_id", "updates"]}
 
-        # Update basic fields
-        if "name" in updates:
-            project.name = updates["name"]
-        if "description" in updates:
-            project.description = updates["description"]
-        if "priority" in updates:
-            project.priority = ProjectPriority(updates["priority"])
-        if "status" in updates:
-            project.status = ProjectStatus(updates["status"])
-        if "tags" in updates:
-            project.tags = updates["tags"]
-        if "custom_fields" in updates:
-            project.custom_fields.update(updates["custom_fields"])
-
-        # Update stage-specific data
-        if "stage_data" in updates:
-            stage_data = updates["stage_data"]
-            current_stage = project.current_stage
-
-            if current_stage == ForgeStage.IDEA_REFINEMENT and "idea_refinement_data" in stage_data:
-                for key, value in stage_data["idea_refinement_data"].items():
-                    setattr(project.idea_refinement_data, key, value)
-            elif current_stage == ForgeStage.PRD_GENERATION and "prd_generation_data" in stage_data:
-                for key, value in stage_data["prd_generation_data"].items():
-                    setattr(project.prd_generation_data, key, value)
-            elif current_stage == ForgeStage.UX_REQUIREMENTS and "ux_requirements_data" in stage_data:
-                for key, value in stage_data["ux_requirements_data"].items():
-                    setattr(project.ux_requirements_data, key, value)
-            elif current_stage == ForgeStage.TECHNICAL_ANALYSIS and "technical_analysis_data" in stage_data:
-                for key, value in stage_data["technical_analysis_data"].items():
-                    setattr(project.technical_analysis_data, key, value)
-            elif current_stage == ForgeStage.IMPLEMENTATION_PLAYBOOK and "implementation_playbook_data" in stage_data:
-                for key, value in stage_data["implementation_playbook_data"].items():
-                    setattr(project.implementation_playbook_data, key, value)
-
-        # Update timestamp and version
-        project.updated_at = datetime.now(timezone.utc)
-        project.version += 1
-
-        # Save updated project
-        await save_forge_project(project)
+        # Patch only the changed fields; retry on a concurrent write unless the client pinned an ETag
+        client_etag = _if_match(req)
+        for _ in range(MAX_PROJECT_PATCH_RETRIES):
+            loaded = await load_forge_project_fields(project_id, PROJECT_UPDATE_FIELDS)
+            if not loaded:
+                return func.HttpResponse(
+                    json.dumps({"error": "Project not found"}), status_code=404, mimetype="application/json"
+                )
+            project, etag = loaded
+
+            # Check permissions
+            if not await user_has_project_access(user_info["user_id"], project, required_permission="edit"):
+                return func.HttpResponse(
+                    json.dumps({"error": "Edit access denied"}), status_code=403, mimetype="application/json"
+                )
+
+            try:
+                project, etag = await patch_forge_project(
+                    project_id, project_update_operations(project, updates), etag=client_etag or etag
+                )
+                break
+            except CosmosAccessConditionFailedError:
+                if client_etag:
+                    return _conflict_response("Project was modified since it was read", status_code=412)
+        else:
+            return _conflict_response("Project is being modified concurrently, please retry")
 
         # Track analytics
         await track_forge_event(
@@ -391,9 +426,10 @@ async def update_forge_project(req: func.HttpRequest) -> func.HttpResponse:
         logger.info(f"Updated Forge project: {project.name} ({project.id})")
 
         return func.HttpResponse(
-            json.dumps({"success": True, "project": project.to_dict(), "message": "Project updated successfully"}),
+            dumps({"success": True, "project": project, "message": "Project updated successfully"}),
             status_code=200,
             mimetype="application/json",
+            headers=_etag_headers(etag),
         )
 
     except Exception as e:
@@ -430,10 +466,11 @@ async def advance_project_stage(req: func.HttpRequest) -> func.HttpResponse:
                 json.dumps({"error": "Project ID required"}), status_code=400, mimetype="application/json"
             )
 
-        # Load project
-        project = await load_forge_project(project_id)
-        if not project:
+        # Load only access fields, stage position and stage data; artifacts are not needed here
+        loaded = await load_forge_project_fields(project_id, PROJECT_ACCESS_FIELDS + tuple(STAGE_DATA_FIELDS.values()))
+        if not loaded:
             return func.HttpResponse(json.dumps({"error": "Project not found"}), status_code=404, mimetype="application/json")
+        project, _ = loaded
 
         # Check permissions
         if not await user_has_project_access(user_info["user_id"], project, required_permission="edit"):
@@ -509,8 +546,23 @@ async def advance_project_stage(req: func.HttpRequest) -> func.HttpResponse:
                 mimetype="application/json",
             )
 
-        # Save updated project
-        await save_forge_project(project)
+        # Apply only if no concurrent request moved the project off this stage
+        try:
+            project, etag = await patch_forge_project(
+                project_id,
+                [
+                    {"op": "set", "path": "/current_stage", "value": project.current_stage.value},
+                    {
+                        "op": "set",
+                        "path": f"/stage_completed_at/{current_stage.value}",
+                        "value": project.stage_completed_at[current_stage.value].isoformat(),
+                    },
+                    {"op": "set", "path": "/updated_at", "value": project.updated_at.isoformat()},
+                ],
+                filter_predicate=f"FROM c WHERE c.current_stage = '{current_stage.value}'",
+            )
+        except CosmosAccessConditionFailedError:
+            return _conflict_response(f"Project is no longer in the {current_stage.value} stage")
 
         # Track analytics
         await track_forge_event(
@@ -528,10 +580,10 @@ async def advance_project_stage(req: func.HttpRequest) -> func.HttpResponse:
         logger.info(f"Advanced project {project.name} from {current_stage.value} to {project.current_stage.value}")
 
         return func.HttpResponse(
-            json.dumps(
+            dumps(
                 {
                     "success": True,
-                    "project": project.to_dict(),
+                    "project": project,
                     "message": f"Project advanced to {project.current_stage.value} stage",
                     "previous_stage": current_stage.value,
                     "current_stage": project.current_stage.value,
@@ -540,6 +592,7 @@ async def advance_project_stage(req: func.HttpRequest) -> func.HttpResponse:
             ),
             status_code=200,
             mimetype="application/json",
+            headers=_etag_headers(etag),
         )
 
     except Exception as e:
@@ -569,8 +622,9 @@ async def add_project_artifact(req: func.HttpRequest) -> func.HttpResponse:
                 json.dumps({"error": "Project ID and stage required"}), status_code=400, mimetype="application/json"
             )
 
-        # Load project
-        project = await load_forge_project(project_id)
+        # Load only what the permission check needs; existing artifacts are not read
+        loaded = await load_forge_project_fields(project_id)
+        project = loaded[0] if loaded else None
         if not project:
             return func.HttpResponse(json.dumps({"error": "Project not found"}), status_code=404, mimetype="application/json")
 
@@ -593,12 +647,22 @@ async def add_project_artifact(req: func.HttpRequest) -> func.HttpResponse:
             created_by=user_info["user_id"],
         )
 
-        # Add artifact to project
-        forge_stage = ForgeStage(stage)
-        project.add_artifact(forge_stage, artifact)
+        # Large content goes to the artifact store; the project keeps the reference
+        await externalize_artifact(artifact)
 
-        # Save updated project
-        await save_forge_project(project)
+        # Append the artifact in place; concurrent appends do not conflict
+        forge_stage = ForgeStage(stage)
+        await patch_forge_project(
+            project_id,
+            [
+                {
+                    "op": "add",
+                    "path": f"/artifacts/{forge_stage.value}/-",
+                    "value": encode_value(artifact),
+                },
+                {"op": "set", "path": "/updated_at", "value": datetime.now(timezone.utc).isoformat()},
+            ],
+        )
 
         # Track analytics
         await track_forge_event(
@@ -614,7 +678,7 @@ async def add_project_artifact(req: func.HttpRequest) -> func.HttpResponse:
             json.dumps(
                 {
                     "success": True,
-                    "artifact": _serialize_for_json(asdict(artifact)),
+                    "artifact": _artifact_metadata(artifact),
                     "message": f"Artifact '{artifact.name}' added to {stage} stage",
                 }
             ),
@@ -662,7 +726,7 @@ async def ai_enhance_project(req: func.HttpRequest) -> func.HttpResponse:
             return func.HttpResponse(json.dumps({"error": "Edit access denied"}), status_code=403, mimetype="application/json")
 
         # Generate AI enhancement
-        llm_client = LLMManager()
+        llm_client = get_llm_manager()
         enhancement_result = await generate_ai_enhancement(
             llm_client=llm_client,
             project=project,
@@ -672,8 +736,7 @@ async def ai_enhance_project(req: func.HttpRequest) -> func.HttpResponse:
         )
 
         # Track AI interaction
-        project.ai_interactions_count += 1
-        await save_forge_project(project)
+        await patch_forge_project(project_id, [{"op": "incr", "path": "/ai_interactions_count", "value": 1}])
 
         # Track analytics
         await track_forge_event(
@@ -706,8 +769,11 @@ async def ai_enhance_project(req: func.HttpRequest) -> func.HttpResponse:
 
 
 async def save_forge_project(project: ForgeProject) -> None:
-    """Save a Forge project to the database."""
+    """Save a Forge project to the database, moving large artifact content to the artifact store."""
     try:
+        for artifacts in project.artifacts.values():
+            for artifact in artifacts:
+                await externalize_artifact(artifact)
         async with AsyncCosmosHelper() as db:
             await db.upsert_item(project.to_dict())
     except Exception as e:
@@ -717,15 +783,128 @@ async def save_forge_project(project: ForgeProject) -> None:
 
 async def load_forge_project(project_id: str) -> Optional[ForgeProject]:
     """Load a Forge project from the database."""
+    loaded = await load_forge_project_with_etag(project_id)
+    return loaded[0] if loaded else None
+
+
+async def load_forge_project_with_etag(project_id: str) -> Optional[Tuple[ForgeProject, Optional[str]]]:
+    """Load a Forge project together with its ETag, for clients to send back as If-Match."""
     try:
         async with AsyncCosmosHelper() as db:
             item = await db.read_item(project_id, partition_key=project_id)
-            return ForgeProject.from_dict(item)
     except CosmosResourceNotFoundError:
         return None
     except Exception as e:
         logger.error(f"Error loading Forge project: {str(e)}")
         raise
+    return _project_from_document(item), item.get("_etag")
+
+
+async def load_forge_project_fields(
+    project_id: str, fields: Iterable[str] = PROJECT_ACCESS_FIELDS
+) -> Optional[Tuple[ForgeProject, Optional[str]]]:
+    """
+    Load only the named fields of a project, with the ETag for a follow-up patch.
+
+    Fields that are not loaded keep their defaults, so the result must only be
+    written back with patch_forge_project, never save_forge_project.
+    """
+    try:
+        async with AsyncCosmosHelper() as db:
+            item = await db.read_item_fields(project_id, partition_key=project_id, fields=fields)
+    except CosmosResourceNotFoundError:
+        return None
+    except Exception as e:
+        logger.error(f"Error loading Forge project fields: {str(e)}")
+        raise
+    return _project_from_document(item), item.get("_etag")
+
+
+async def patch_forge_project(
+    project_id: str,
+    operations: List[Dict[str, Any]],
+    etag: Optional[str] = None,
+    filter_predicate: Optional[str] = None,
+) -> Tuple[ForgeProject, Optional[str]]:
+    """
+    Apply Cosmos partial document update operations to a project and return it with its new ETag.
+
+    Raises CosmosAccessConditionFailedError when ``etag`` or ``filter_predicate``
+    no longer matches the stored project.
+    """
+    try:
+        async with AsyncCosmosHelper() as db:
+            item = await db.patch_item(
+                project_id, partition_key=project_id, operations=operations, etag=etag, filter_predicate=filter_predicate
+            )
+    except CosmosAccessConditionFailedError:
+        raise
+    except Exception as e:
+        logger.error(f"Error patching Forge project: {str(e)}")
+        raise
+    return _project_from_document(item), item.get("_etag")
+
+
+def project_update_operations(project: ForgeProject, updates: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Patch operations for an update_forge_project request.
+
+    ``project`` must have been loaded with custom_fields and the stage data; nested
+    objects are set whole (merged with the loaded value) to stay within the
+    patch operation limit, which is safe because the patch is ETag-guarded.
+    """
+    operations = [
+        {"op": "set", "path": f"/{name}", "value": updates[name]}
+        for name in ("name", "description", "tags")
+        if name in updates
+    ]
+    if "priority" in updates:
+        operations.append({"op": "set", "path": "/priority", "value": ProjectPriority(updates["priority"]).value})
+    if "status" in updates:
+        operations.append({"op": "set", "path": "/status", "value": ProjectStatus(updates["status"]).value})
+    if "custom_fields" in updates:
+        custom_fields = {**project.custom_fields, **updates["custom_fields"]}
+        operations.append({"op": "set", "path": "/custom_fields", "value": custom_fields})
+
+    # Only the current stage's data can be edited
+    stage_field = STAGE_DATA_FIELDS[project.current_stage]
+    stage_updates = updates.get("stage_data", {}).get(stage_field)
+    if stage_updates:
+        stage_data = project.get_current_stage_data()
+        for key, value in stage_updates.items():
+            setattr(stage_data, key, value)
+        operations.append({"op": "set", "path": f"/{stage_field}", "value": encode_value(stage_data)})
+
+    operations.append({"op": "set", "path": "/updated_at", "value": datetime.now(timezone.utc).isoformat()})
+    operations.append({"op": "incr", "path": "/version", "value": 1})
+    return operations
+
+
+def _project_from_document(item: Dict[str, Any]) -> ForgeProject:
+    return ForgeProject.from_dict({key: value for key, value in item.items() if key not in COSMOS_SYSTEM_FIELDS})
+
+
+def _artifact_metadata(artifact: ForgeArtifact) -> Dict[str, Any]:
+    """Artifact fields without its content, which can be large."""
+    metadata = encode_value(artifact)
+    del metadata["content"]
+    metadata["content_size"] = artifact_content_size(artifact)
+    return metadata
+
+
+def _if_match(req: func.HttpRequest) -> Optional[str]:
+    """The client's If-Match ETag, when it sent one."""
+    value = req.headers.get("If-Match") if req.headers else None
+    return value if isinstance(value, str) and value else None
+
+
+def _etag_headers(etag: Optional[str]) -> Optional[Dict[str, str]]:
+    """ETag response header for a project, so clients can make conditional updates with If-Match."""
+    return {"ETag": etag} if etag else None
+
+
+def _conflict_response(message: str, status_code: int = 409) -> func.HttpResponse:
+    return func.HttpResponse(json.dumps({"error": message}), status_code=status_code, mimetype="application/json")
 
 
 async def get_user_forge_projects(
@@ -735,11 +914,44 @@ async def get_user_forge_projects(
     stage_filter: Optional[str] = None,
     limit: int = 50,
     offset: int = 0,
+    cursor: Optional[str] = None,
 ) -> List[ForgeProject]:
     """Get Forge projects for a user with filtering."""
+    projects, _ = await get_user_forge_projects_page(
+        user_id=user_id,
+        organization_id=organization_id,
+        status_filter=status_filter,
+        stage_filter=stage_filter,
+        limit=limit,
+        offset=offset,
+        cursor=cursor,
+        summary_only=False,
+    )
+    return projects
+
+
+async def get_user_forge_projects_page(
+    user_id: str,
+    organization_id: Optional[str] = None,
+    status_filter: Optional[str] = None,
+    stage_filter: Optional[str] = None,
+    limit: int = 50,
+    offset: int = 0,
+    cursor: Optional[str] = None,
+    summary_only: bool = True,
+) -> Tuple[List[ForgeProject], Optional[str]]:
+    """
+    Get one page of a user's Forge projects and the cursor for the next page.
+
+    Pages seek on (updated_at, id) so later pages cost the same as the first.
+    A non-zero offset without a cursor keeps the legacy OFFSET/LIMIT behaviour.
+    With ``summary_only`` only PROJECT_SUMMARY_FIELDS and artifact ids are read;
+    such projects must never be written back.
+    """
     try:
         # Build query
-        query = "SELECT * FROM c WHERE (c.owner_id = @user_id OR ARRAY_CONTAINS(c.collaborators, @user_id))"
+        select = PROJECT_SUMMARY_SELECT if summary_only else "*"
+        query = f"SELECT {select} FROM c WHERE (c.owner_id = @user_id OR ARRAY_CONTAINS(c.collaborators, @user_id))"
         parameters = [{"name": "@user_id", "value": user_id}]
 
         if organization_id:
@@ -754,11 +966,19 @@ async def get_user_forge_projects(
             query += " AND c.current_stage = @stage"
             parameters.append({"name": "@stage", "value": stage_filter})
 
-        query += f" ORDER BY c.updated_at DESC OFFSET {offset} LIMIT {limit}"
+        if offset and not cursor:
+            query += f" ORDER BY c.updated_at DESC OFFSET {offset} LIMIT {limit}"
+            async with AsyncCosmosHelper() as db:
+                items = await db.query_items(query=query, parameters=parameters)
+            return [_project_from_document(item) for item in items], None
+
+        query, parameters = apply_keyset(query, parameters, limit, "c.updated_at", cursor)
 
         async with AsyncCosmosHelper() as db:
             items = await db.query_items(query=query, parameters=parameters)
-            return [ForgeProject.from_dict(item) for item in items]
+
+        items, next_cursor = keyset_page(items, limit, "updated_at")
+        return [_project_from_document(item) for item in items], next_cursor
 
     except Exception as e:
         logger.error(f"Error getting user Forge projects: {str(e)}")
@@ -793,7 +1013,7 @@ async def track_forge_event(user_id: str, project_id: str, event_type: str, even
         )
 
         async with AsyncCosmosHelper() as db:
-            await db.create_item(asdict(analytics), container_name=FORGE_ANALYTICS_CONTAINER)
+            await db.create_item(encode_value(analytics), container_name=FORGE_ANALYTICS_CONTAINER)
 
     except Exception as e:
         logger.error(f"Error tracking Forge event: {str(e)}")
@@ -960,24 +1180,40 @@ async def get_project_artifacts(req: func.HttpRequest) -> func.HttpResponse:
 
         project_id = req.route_params.get("project_id") or req.params.get("project_id")
         stage = req.params.get("stage")
+        artifact_id = req.params.get("artifact_id")
+        include_content = req.params.get("include_content", "").lower() == "true"
         if not project_id:
             return func.HttpResponse(
                 json.dumps({"error": "Project ID required"}), status_code=400, mimetype="application/json"
             )
 
-        project = await load_forge_project(project_id)
+        # Artifact entries hold metadata and store references, so reading them is cheap
+        loaded = await load_forge_project_fields(project_id, PROJECT_ACCESS_FIELDS + ("artifacts",))
+        project = loaded[0] if loaded else None
         if not project:
             return func.HttpResponse(json.dumps({"error": "Project not found"}), status_code=404, mimetype="application/json")
 
         if not await user_has_project_access(user_info["user_id"], project, required_permission="view"):
             return func.HttpResponse(json.dumps({"error": "Access denied"}), status_code=403, mimetype="application/json")
 
-        # Get artifacts, optionally filtered by stage
-        artifacts = project.artifacts if hasattr(project, "artifacts") else []
-        if stage:
-            artifacts = [a for a in artifacts if getattr(a, "stage", None) == stage]
-
-        artifact_list = [asdict(a) if hasattr(a, "__dataclass_fields__") else a for a in artifacts]
+        # Get artifacts, optionally filtered by stage or id
+        artifacts = [
+            (stage_name, artifact)
+            for stage_name, stage_artifacts in project.artifacts.items()
+            if not stage or stage_name == stage
+            for artifact in stage_artifacts
+            if not artifact_id or artifact.id == artifact_id
+        ]
+        if artifact_id and not artifacts:
+            return func.HttpResponse(json.dumps({"error": "Artifact not found"}), status_code=404, mimetype="application/json")
+
+        artifact_list = [{**_artifact_metadata(artifact), "stage": stage_name} for stage_name, artifact in artifacts]
+
+        # Content is only fetched for a single artifact or when asked for
+        if artifact_id or include_content:
+            contents = await asyncio.gather(*(load_artifact_content(artifact) for _, artifact in artifacts))
+            for entry, content in zip(artifact_list, contents):
+                entry["content"] = content
 
         return func.HttpResponse(
             json.dumps(
@@ -66,6 +66,23 @@ def auth_none():
         yield m
 
 
+def _apply_patch(doc, operations):
+    """Apply Cosmos patch operations to a document the way the service would."""
+    doc = json.loads(json.dumps(doc))
+    for operation in operations:
+        *parents, leaf = [part.replace("~1", "/").replace("~0", "~") for part in operation["path"].split("/")[1:]]
+        target = doc
+        for part in parents:
+            target = target[part]
+        if operation["op"] == "add" and leaf == "-":
+            target.append(operation["value"])
+        elif operation["op"] == "incr":
+            target[leaf] = target.get(leaf, 0) + operation["value"]
+        else:
+            target[leaf] = operation["value"]
+    return doc
+
+
 @pytest.fixture
 def mock_db():
     """Patch AsyncCosmosHelper so no real DB calls are made."""
@@ -76,6 +93,17 @@ def mock_db():
     helper.create_item = AsyncMock(return_value={})
     helper.delete_item = AsyncMock(return_value=None)
 
+    # Projected reads and patches act on whatever read_item currently returns
+    async def read_item_fields(item_id, partition_key, fields, **kwargs):
+        item = await helper.read_item(item_id, partition_key=partition_key)
+        return {key: value for key, value in item.items() if key in ("id", "_etag", *fields)}
+
+    async def patch_item(item_id, partition_key, operations, **kwargs):
+        return _apply_patch(await helper.read_item(item_id, partition_key=partition_key), operations)
+
+    helper.read_item_fields = AsyncMock(side_effect=read_item_fields)
+    helper.patch_item = AsyncMock(side_effect=patch_item)
+
     ctx_manager = AsyncMock()
     ctx_manager.__aenter__ = AsyncMock(return_value=helper)
     ctx_manager.__aexit__ = AsyncMock(return_value=False)
@@ -211,6 +239,43 @@ class TestListForgeProjects:
         assert data["total_count"] == 1
         assert data["projects"][0]["name"] == "Test Project"
 
+    @pytest.mark.asyncio
+    async def test_lists_projected_summaries(self, auth_patch, mock_db):
+        from forge_api import PROJECT_SUMMARY_FIELDS, list_forge_projects
+
+        document = _sample_project().to_dict()
+        summary = {name: document[name] for name in ("id", *PROJECT_SUMMARY_FIELDS)}
+        summary["artifacts"] = {"idea_refinement": ["a1", "a2"], "prd_generation": []}
+        mock_db.query_items = AsyncMock(return_value=[{**summary, "_rid": "r", "_etag": "e"}])
+
+        resp = await list_forge_projects(_make_request("GET"))
+
+        assert resp.status_code == 200
+        listed = json.loads(resp.get_body())["projects"][0]
+        assert listed["name"] == "Test Project"
+        assert listed["artifacts_count"] == 2
+        assert "SELECT *" not in mock_db.query_items.call_args.kwargs["query"]
+
+    @pytest.mark.asyncio
+    async def test_returns_next_cursor(self, auth_patch, mock_db):
+        from forge_api import list_forge_projects
+
+        projects = [_sample_project(name=f"P{i}").to_dict() for i in range(3)]
+        mock_db.query_items = AsyncMock(return_value=projects)
+        resp = await list_forge_projects(_make_request("GET", params={"limit": "2"}))
+        assert resp.status_code == 200
+        data = json.loads(resp.get_body())
+        assert data["total_count"] == 2
+        assert data["has_more"] is True
+        assert data["next_cursor"]
+
+    @pytest.mark.asyncio
+    async def test_invalid_cursor_returns_400(self, auth_patch, mock_db):
+        from forge_api import list_forge_projects
+
+        resp = await list_forge_projects(_make_request("GET", params={"cursor": "garbage"}))
+        assert resp.status_code == 400
+
     @pytest.mark.asyncio
     async def test_passes_filters(self, auth_patch, mock_db):
         from forge_api import list_forge_projects
@@ -231,12 +296,14 @@ class TestGetForgeProject:
         from forge_api import get_forge_project
 
         project = _sample_project()
-        mock_db.read_item = AsyncMock(return_value=project.to_dict())
+        mock_db.read_item = AsyncMock(return_value={**project.to_dict(), "_etag": "etag-1"})
         req = _make_request("GET", params={"project_id": project.id})
         resp = await get_forge_project(req)
         assert resp.status_code == 200
+        assert resp.headers["ETag"] == "etag-1"
         data = json.loads(resp.get_body())
         assert data["name"] == "Test Project"
+        assert "_etag" not in data
         assert "stage_progress" in data
         assert "overall_progress" in data
 
@@ -327,6 +394,66 @@ class TestUpdateForgeProject:
         assert resp.status_code == 403
 
 
+    @pytest.mark.asyncio
+    async def test_patches_changed_fields_without_reading_artifacts(self, auth_patch, mock_db):
+        from forge_api import update_forge_project
+
+        project = _sample_project()
+        project.add_artifact(
+            ForgeStage.IDEA_REFINEMENT,
+            ForgeArtifact(id="a1", name="Doc", type=ArtifactType.DOCUMENT, content="x" * 1000, description=""),
+        )
+        mock_db.read_item = AsyncMock(return_value={**project.to_dict(), "_etag": "etag-1"})
+        req = _make_request(
+            "PUT",
+            body={
+                "project_id": project.id,
+                "updates": {
+                    "name": "Renamed",
+                    "stage_data": {"idea_refinement_data": {"problem_statement": "Too many tasks"}},
+                },
+            },
+        )
+
+        resp = await update_forge_project(req)
+
+        assert resp.status_code == 200
+        assert resp.headers["ETag"] == "etag-1"
+        assert "artifacts" not in mock_db.read_item_fields.call_args.kwargs["fields"]
+        patch_call = mock_db.patch_item.call_args
+        assert [op["path"] for op in patch_call.kwargs["operations"]] == [
+            "/name",
+            "/idea_refinement_data",
+            "/updated_at",
+            "/version",
+        ]
+        assert patch_call.kwargs["etag"] == "etag-1"
+        data = json.loads(resp.get_body())["project"]
+        assert data["idea_refinement_data"]["problem_statement"] == "Too many tasks"
+        assert data["version"] == 2
+        assert data["artifacts"]["idea_refinement"][0]["id"] == "a1"
+
+    @pytest.mark.asyncio
+    async def test_concurrent_writes_retry_then_conflict(self, auth_patch, mock_db):
+        from azure.cosmos.exceptions import CosmosAccessConditionFailedError
+        from forge_api import MAX_PROJECT_PATCH_RETRIES, update_forge_project
+
+        project = _sample_project()
+        mock_db.read_item = AsyncMock(return_value=project.to_dict())
+        mock_db.patch_item = AsyncMock(
+            side_effect=CosmosAccessConditionFailedError(status_code=412, message="Precondition failed")
+        )
+
+        resp = await update_forge_project(_make_request("PUT", body={"project_id": project.id, "updates": {"name": "N"}}))
+        assert resp.status_code == 409
+        assert mock_db.patch_item.await_count == MAX_PROJECT_PATCH_RETRIES
+
+        req = _make_request("PUT", body={"project_id": project.id, "updates": {"name": "N"}})
+        req.headers = {"If-Match": "stale-etag"}
+        resp = await update_forge_project(req)
+        assert resp.status_code == 412
+        assert mock_db.patch_item.call_args.kwargs["etag"] == "stale-etag"
+
 # ---- Tests: delete_forge_project ----
 
 
@@ -407,6 +534,32 @@ class TestAdvanceProjectStage:
         if resp.status_code == 400:
             assert "quality" in data.get("error", "").lower() or "qualityGateStatus" in data
 
+    @pytest.mark.asyncio
+    async def test_advance_patches_only_if_stage_unchanged(self, auth_patch, mock_db):
+        from azure.cosmos.exceptions import CosmosAccessConditionFailedError
+        from forge_api import advance_project_stage
+
+        project = _sample_project()
+        mock_db.read_item = AsyncMock(return_value={**project.to_dict(), "_etag": "etag-2"})
+        req = _make_request("POST", body={"project_id": project.id, "forceAdvance": True})
+
+        resp = await advance_project_stage(req)
+
+        assert resp.status_code == 200
+        assert resp.headers["ETag"] == "etag-2"
+        patch_call = mock_db.patch_item.call_args
+        assert patch_call.kwargs["filter_predicate"] == "FROM c WHERE c.current_stage = 'idea_refinement'"
+        assert [op["path"] for op in patch_call.kwargs["operations"]] == [
+            "/current_stage",
+            "/stage_completed_at/idea_refinement",
+            "/updated_at",
+        ]
+        mock_db.upsert_item.assert_not_awaited()
+
+        mock_db.patch_item = AsyncMock(side_effect=CosmosAccessConditionFailedError(status_code=412, message="Changed"))
+        resp = await advance_project_stage(req)
+        assert resp.status_code == 409
+
     @pytest.mark.asyncio
     async def test_advance_requires_project_id(self, auth_patch, mock_db):
         from forge_api import advance_project_stage
@@ -441,6 +594,10 @@ class TestAddProjectArtifact:
         data = json.loads(resp.get_body())
         assert data["success"] is True
         assert data["artifact"]["name"] == "Design Doc"
+        operations = mock_db.patch_item.call_args.kwargs["operations"]
+        assert operations[0]["op"] == "add"
+        assert operations[0]["path"] == "/artifacts/idea_refinement/-"
+        mock_db.upsert_item.assert_not_awaited()
 
     @pytest.mark.asyncio
     async def test_artifact_requires_project_and_stage(self, auth_patch, mock_db):
@@ -451,6 +608,56 @@ class TestAddProjectArtifact:
         assert resp.status_code == 400
 
 
+class TestArtifactStorage:
+    @pytest.mark.asyncio
+    async def test_large_content_is_stored_externally_and_fetched_lazily(self, auth_patch, mock_db, tmp_path, monkeypatch):
+        from forge_api import add_project_artifact, get_forge_project, get_project_artifacts
+
+        monkeypatch.setenv("FORGE_ARTIFACT_STORE", "local")
+        monkeypatch.setenv("FORGE_ARTIFACT_STORE_PATH", str(tmp_path))
+        content = "Wireframe notes. " * 500
+        project = _sample_project()
+        mock_db.read_item = AsyncMock(return_value=project.to_dict())
+
+        resp = await add_project_artifact(
+            _make_request(
+                "POST",
+                body={"project_id": project.id, "stage": "ux_requirements", "name": "Wireframes", "content": content},
+            )
+        )
+
+        assert resp.status_code == 201
+        stored = mock_db.patch_item.call_args.kwargs["operations"][0]["value"]
+        assert stored["content"] == ""
+        assert stored["content_ref"]["size"] == len(content)
+        assert stored["content_ref"]["stored_size"] < len(content)
+        assert "content" not in json.loads(resp.get_body())["artifact"]
+
+        document = project.to_dict()
+        document["artifacts"]["ux_requirements"].append(stored)
+        mock_db.read_item = AsyncMock(return_value=document)
+
+        resp = await get_forge_project(_make_request("GET", params={"project_id": project.id}))
+        listed = json.loads(resp.get_body())["artifacts"]["ux_requirements"][0]
+        assert "content" not in listed
+        assert listed["content_size"] == len(content)
+
+        resp = await get_project_artifacts(_make_request("GET", params={"project_id": project.id, "stage": "ux_requirements"}))
+        data = json.loads(resp.get_body())
+        assert data["totalCount"] == 1
+        assert "content" not in data["artifacts"][0]
+        assert "artifacts" in mock_db.read_item_fields.call_args.kwargs["fields"]
+
+        resp = await get_project_artifacts(
+            _make_request("GET", params={"project_id": project.id, "artifact_id": stored["id"]})
+        )
+        data = json.loads(resp.get_body())
+        assert data["artifacts"][0]["content"] == content
+        assert data["artifacts"][0]["stage"] == "ux_requirements"
+
+        resp = await get_project_artifacts(_make_request("GET", params={"project_id": project.id, "artifact_id": "missing"}))
+        assert resp.status_code == 404
+
 # ---- Tests: list_forge_templates ----
 
 
@@ -566,6 +773,33 @@ class TestDatabaseHelpers:
         assert result == []
         mock_db.query_items.assert_awaited()
 
+    @pytest.mark.asyncio
+    async def test_get_user_forge_projects_page_keyset(self, mock_db):
+        from forge_api import get_user_forge_projects_page
+
+        projects = [_sample_project(name=f"P{i}").to_dict() for i in range(3)]
+        last_on_page = dict(projects[1])
+        mock_db.query_items = AsyncMock(return_value=projects)
+        result, next_cursor = await get_user_forge_projects_page("user-1", limit=2)
+
+        assert [p.name for p in result] == ["P0", "P1"]
+        assert next_cursor is not None
+        query = mock_db.query_items.call_args.kwargs["query"]
+        assert "ORDER BY c.updated_at DESC, c.id DESC OFFSET 0 LIMIT 3" in query
+        assert query.startswith("SELECT c.id, c.name,")
+        assert '"idea_refinement": ARRAY(SELECT VALUE a.id FROM a IN c.artifacts.idea_refinement)' in query
+
+        mock_db.query_items = AsyncMock(return_value=projects[2:])
+        result, next_cursor = await get_user_forge_projects_page("user-1", limit=2, cursor=next_cursor)
+
+        assert [p.name for p in result] == ["P2"]
+        assert next_cursor is None
+        kwargs = mock_db.query_items.call_args.kwargs
+        assert "c.updated_at < @keyset_sort" in kwargs["query"]
+        params = {p["name"]: p["value"] for p in kwargs["parameters"]}
+        assert params["@keyset_id"] == last_on_page["id"]
+        assert params["@keyset_sort"] == last_on_page["updated_at"]
+
     @pytest.mark.asyncio
     async def test_track_forge_event(self, mock_db):
         from forge_api import track_forge_event
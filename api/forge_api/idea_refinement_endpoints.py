@@ -10,11 +10,11 @@ from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional
 
 import azure.functions as func
-from azure.cosmos.exceptions import CosmosResourceNotFoundError
-from shared.async_database import AsyncCosmosHelper
+from azure.cosmos.exceptions import CosmosAccessConditionFailedError, CosmosResourceNotFoundError
+from shared.async_database import AsyncCosmosHelper, set_member_operation
 from shared.auth_helpers import extract_user_info
 from shared.cost_tracker import CostTracker
-from shared.llm_client import LLMManager
+from shared.llm_client import LLMManager, get_llm_manager
 from shared.quality_engine import ContextualQualityValidator, QualityAssessmentEngine
 
 logger = logging.getLogger(__name__)
@@ -145,7 +145,7 @@ async def refine_idea_with_llm(req: func.HttpRequest, project_id: str) -> func.H
         refinement_prompt = _create_refinement_prompt(current_idea, improvement_focus, project_context)
 
         # Execute LLM call with cost tracking
-        llm_client = LLMManager()
+        llm_client = get_llm_manager()
 
         # Track cost before execution
         await cost_tracker.track_llm_call_start(
@@ -321,20 +321,16 @@ async def complete_stage(req: func.HttpRequest, project_id: str) -> func.HttpRes
                 headers={"Content-Type": "application/json"},
             )
 
-        # Update project in database
+        # Update only this stage's data, provided the project is unchanged since it was read
         async with AsyncCosmosHelper() as db:
             try:
-                project = await db.read_item(project_id, partition_key=user_info["user_id"])
+                project = await db.read_item_fields(project_id, partition_key=user_info["user_id"], fields=["forgeData"])
             except CosmosResourceNotFoundError:
                 return func.HttpResponse(
                     json.dumps({"error": "Project not found"}), status_code=404, headers={"Content-Type": "application/json"}
                 )
 
-            # Update forge data
-            if "forgeData" not in project:
-                project["forgeData"] = {}
-
-            project["forgeData"]["ideaRefinement"] = {
+            idea_stage_data = {
                 **final_idea_data,
                 "status": "completed",
                 "completedAt": datetime.now(timezone.utc).isoformat(),
@@ -346,12 +342,22 @@ async def complete_stage(req: func.HttpRequest, project_id: str) -> func.HttpRes
                 },
                 "contextForNextStage": _prepare_context_for_prd(final_idea_data, quality_result),
             }
-
-            # Update project status
-            project["updatedAt"] = datetime.now(timezone.utc).isoformat()
-
-            # Save updated project
-            await db.upsert_item(project)
+            try:
+                await db.patch_item(
+                    project_id,
+                    partition_key=user_info["user_id"],
+                    operations=[
+                        set_member_operation(project, "forgeData", "ideaRefinement", idea_stage_data),
+                        {"op": "set", "path": "/updatedAt", "value": datetime.now(timezone.utc).isoformat()},
+                    ],
+                    etag=project.get("_etag"),
+                )
+            except CosmosAccessConditionFailedError:
+                return func.HttpResponse(
+                    json.dumps({"error": "Project was modified while the stage was being completed, please retry"}),
+                    status_code=409,
+                    headers={"Content-Type": "application/json"},
+                )
 
         # Prepare completion result
         completion_result = {
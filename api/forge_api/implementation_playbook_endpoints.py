@@ -21,7 +21,7 @@ from shared.async_database import AsyncCosmosHelper
 from shared.auth_helpers import extract_user_info
 from shared.coding_agent_optimizer import CodingAgentOptimizer
 from shared.cost_tracker import CostTracker
-from shared.llm_client import LLMManager
+from shared.llm_client import get_llm_manager
 from shared.quality_engine import QualityAssessmentEngine
 from shared.quality_validators import CrossStageQualityValidator
 
@@ -108,7 +108,7 @@ def generate_coding_prompts_endpoint(req: func.HttpRequest) -> func.HttpResponse
             )
 
         # Initialize LLM client
-        llm_client = LLMManager()
+        llm_client = get_llm_manager()
 
         # Generate context-aware coding prompts
         coding_prompts = coding_optimizer.generate_context_optimized_prompts(
@@ -1761,17 +1761,25 @@ async def save_implementation_playbook(project_id: str, playbook: Dict, user_inf
     try:
         async with AsyncCosmosHelper() as db:
             try:
-                project_doc = await db.read_item(project_id, partition_key=project_id)
-                project_doc["implementationData"] = {
-                    "playbook": playbook,
-                    "quality": quality,
-                    "generated_at": datetime.now(timezone.utc).isoformat(),
-                    "generated_by": user_info.get("user_id"),
-                    "version": "1.0.0",
-                }
-                project_doc["lastModified"] = datetime.now(timezone.utc).isoformat()
-
-                await db.upsert_item(project_doc)
+                # Set the playbook fields in place; the rest of the project is neither read nor rewritten
+                await db.patch_item(
+                    project_id,
+                    partition_key=project_id,
+                    operations=[
+                        {
+                            "op": "set",
+                            "path": "/implementationData",
+                            "value": {
+                                "playbook": playbook,
+                                "quality": quality,
+                                "generated_at": datetime.now(timezone.utc).isoformat(),
+                                "generated_by": user_info.get("user_id"),
+                                "version": "1.0.0",
+                            },
+                        },
+                        {"op": "set", "path": "/lastModified", "value": datetime.now(timezone.utc).isoformat()},
+                    ],
+                )
 
                 logger.info(f"Successfully saved implementation playbook for project {project_id}")
                 return {"success": True, "message": "Playbook saved successfully"}
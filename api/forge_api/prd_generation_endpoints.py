@@ -11,11 +11,11 @@ from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional
 
 import azure.functions as func
-from azure.cosmos.exceptions import CosmosResourceNotFoundError
-from shared.async_database import AsyncCosmosHelper
+from azure.cosmos.exceptions import CosmosAccessConditionFailedError, CosmosResourceNotFoundError
+from shared.async_database import AsyncCosmosHelper, set_member_operation
 from shared.auth_helpers import extract_user_info
 from shared.cost_tracker import CostTracker
-from shared.llm_client import LLMManager
+from shared.llm_client import LLMManager, get_llm_manager
 from shared.quality_engine import QualityAssessmentEngine
 from shared.quality_validators import CrossStageQualityValidator
 
@@ -106,7 +106,7 @@ async def extract_requirements(req: func.HttpRequest, project_id: str) -> func.H
         extraction_prompt = _create_requirements_extraction_prompt(idea_context, requirement_focus)
 
         # Execute LLM call with cost tracking
-        llm_client = LLMManager()
+        llm_client = get_llm_manager()
 
         await cost_tracker.track_llm_call_start(
             user_id=user_info.get("user_id"),
@@ -117,7 +117,12 @@ async def extract_requirements(req: func.HttpRequest, project_id: str) -> func.H
 
         try:
             response = await llm_client.execute_prompt(
-                provider_name=provider_name, prompt=extraction_prompt, model=selected_llm, temperature=0.5, max_tokens=3000
+                provider_name=provider_name,
+                prompt=extraction_prompt,
+                model=selected_llm,
+                temperature=0.5,
+                max_tokens=3000,
+                context={"cache": True},
             )
 
             await cost_tracker.track_llm_call_complete(
@@ -194,7 +199,7 @@ async def generate_user_stories(req: func.HttpRequest, project_id: str) -> func.
         story_prompt = _create_user_story_prompt(requirements, idea_context, story_format)
 
         # Execute LLM call with cost tracking
-        llm_client = LLMManager()
+        llm_client = get_llm_manager()
 
         await cost_tracker.track_llm_call_start(
             user_id=user_info.get("user_id"), operation="forge_prd_user_stories", model=selected_llm, project_id=project_id
@@ -202,7 +207,12 @@ async def generate_user_stories(req: func.HttpRequest, project_id: str) -> func.
 
         try:
             response = await llm_client.execute_prompt(
-                provider_name=provider_name, prompt=story_prompt, model=selected_llm, temperature=0.4, max_tokens=4000
+                provider_name=provider_name,
+                prompt=story_prompt,
+                model=selected_llm,
+                temperature=0.4,
+                max_tokens=4000,
+                context={"cache": True},
             )
 
             await cost_tracker.track_llm_call_complete(
@@ -290,7 +300,7 @@ async def prioritize_features(req: func.HttpRequest, project_id: str) -> func.Ht
         )
 
         # Execute LLM call with cost tracking
-        llm_client = LLMManager()
+        llm_client = get_llm_manager()
 
         await cost_tracker.track_llm_call_start(
             user_id=user_info.get("user_id"),
@@ -301,7 +311,12 @@ async def prioritize_features(req: func.HttpRequest, project_id: str) -> func.Ht
 
         try:
             response = await llm_client.execute_prompt(
-                provider_name=provider_name, prompt=prioritization_prompt, model=selected_llm, temperature=0.3, max_tokens=3000
+                provider_name=provider_name,
+                prompt=prioritization_prompt,
+                model=selected_llm,
+                temperature=0.3,
+                max_tokens=3000,
+                context={"cache": True},
             )
 
             await cost_tracker.track_llm_call_complete(
@@ -506,10 +521,10 @@ async def complete_prd_stage(req: func.HttpRequest, project_id: str) -> func.Htt
         final_prd_data = request_data.get("finalPRDData", {})
         force_complete = request_data.get("forceComplete", False)
 
-        # Get project from database
+        # Get the project's stage data from database (artifacts are not read)
         async with AsyncCosmosHelper() as db:
             try:
-                project = await db.read_item(project_id, partition_key=user_info["user_id"])
+                project = await db.read_item_fields(project_id, partition_key=user_info["user_id"], fields=["forgeData"])
             except CosmosResourceNotFoundError:
                 return func.HttpResponse(
                     json.dumps({"error": "Project not found"}), status_code=404, headers={"Content-Type": "application/json"}
@@ -561,8 +576,8 @@ async def complete_prd_stage(req: func.HttpRequest, project_id: str) -> func.Htt
                 "prd_generation", "ux_requirements", project_data_with_prd
             )
 
-            # Update project in database
-            project["forgeData"]["prd_generation"] = {
+            # Update only this stage's data, provided the project is unchanged since it was read
+            prd_stage_data = {
                 **final_prd_data,
                 "status": "completed",
                 "completedAt": datetime.now(timezone.utc).isoformat(),
@@ -574,11 +589,22 @@ async def complete_prd_stage(req: func.HttpRequest, project_id: str) -> func.Htt
                 },
                 "contextForNextStage": ux_context_handoff.context_data,
             }
-
-            project["updatedAt"] = datetime.now(timezone.utc).isoformat()
-
-            # Save updated project
-            await db.upsert_item(project)
+            try:
+                await db.patch_item(
+                    project_id,
+                    partition_key=user_info["user_id"],
+                    operations=[
+                        set_member_operation(project, "forgeData", "prd_generation", prd_stage_data),
+                        {"op": "set", "path": "/updatedAt", "value": datetime.now(timezone.utc).isoformat()},
+                    ],
+                    etag=project.get("_etag"),
+                )
+            except CosmosAccessConditionFailedError:
+                return func.HttpResponse(
+                    json.dumps({"error": "Project was modified while the stage was being completed, please retry"}),
+                    status_code=409,
+                    headers={"Content-Type": "application/json"},
+                )
 
             # Prepare completion result
             completion_result = {
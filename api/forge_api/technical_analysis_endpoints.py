@@ -14,7 +14,7 @@ import azure.functions as func
 from shared.async_database import AsyncCosmosHelper
 from shared.auth_helpers import extract_user_info
 from shared.cost_tracker import CostTracker
-from shared.llm_client import LLMManager
+from shared.llm_client import LLMManager, get_llm_manager
 from shared.multi_llm_consensus import MultiLLMConsensusEngine, evaluate_technical_architecture
 from shared.quality_engine import QualityAssessmentEngine
 from shared.quality_validators import CrossStageQualityValidator
@@ -82,7 +82,7 @@ async def evaluate_architecture_endpoint(req: func.HttpRequest) -> func.HttpResp
             )
 
         # Initialize services
-        llm_client = LLMManager()
+        llm_client = get_llm_manager()
         cost_tracker = CostTracker()
         quality_engine = QualityAssessmentEngine()
         cross_stage_validator = CrossStageQualityValidator()
@@ -111,9 +111,13 @@ async def evaluate_architecture_endpoint(req: func.HttpRequest) -> func.HttpResp
             metadata={"session_id": session_id, "selected_models": selected_models, "evaluation_params": evaluation_params},
         )
 
-        # Perform multi-LLM consensus evaluation
+        # Perform multi-LLM consensus evaluation; clients opt in to stopping once the models strongly agree
+        early_consensus = bool(evaluation_params.get("early_consensus", False))
         technical_evaluation = await consensus_engine.evaluate_technical_architecture(
-            project_context=project_context, selected_models=selected_models, llm_client=llm_client
+            project_context=project_context,
+            selected_models=selected_models,
+            llm_client=llm_client,
+            early_consensus=early_consensus,
         )
 
         # Calculate operation cost
@@ -135,6 +139,7 @@ async def evaluate_architecture_endpoint(req: func.HttpRequest) -> func.HttpResp
                     project_context=project_context,
                     selected_models=selected_models + additional_models[:1],
                     llm_client=llm_client,
+                    early_consensus=early_consensus,
                 )
 
                 if enhanced_evaluation.quality_score > technical_evaluation.quality_score:
@@ -173,6 +178,7 @@ async def evaluate_architecture_endpoint(req: func.HttpRequest) -> func.HttpResp
                     "confidence_level": technical_evaluation.consensus_metadata.confidence_level,
                     "total_cost": technical_evaluation.consensus_metadata.total_cost,
                     "models_used": selected_models,
+                    "pending_models": technical_evaluation.pending_models,
                     "conflict_areas": technical_evaluation.consensus_metadata.conflict_areas,
                 },
                 "quality_assessment": {
@@ -215,6 +221,8 @@ async def evaluate_architecture_endpoint(req: func.HttpRequest) -> func.HttpResp
                         "confidence_level": technical_evaluation.consensus_metadata.confidence_level,
                         "conflict_areas": technical_evaluation.consensus_metadata.conflict_areas,
                         "models_used": selected_models,
+                        "pending_models": technical_evaluation.pending_models,
+                        "provisional": technical_evaluation.is_provisional,
                     },
                     "quality_metrics": {
                         "overall_score": technical_evaluation.quality_score,
@@ -262,8 +270,8 @@ async def generate_technical_specs_endpoint(req: func.HttpRequest) -> func.HttpR
         session_id = request_data.get("session_id")
         architecture_evaluation = request_data.get("architecture_evaluation", {})
         spec_requirements = request_data.get("spec_requirements", {})
-        selected_llm = request_data.get("model") or request_data.get("selectedLLM", "gpt-4")
-        provider_name = request_data.get("provider") or LLMManager.resolve_provider_from_model(selected_llm)
+        selected_llm = request_data.get("model") or request_data.get("selectedLLM")
+        provider_name = request_data.get("provider")
 
         if not user_id or not session_id or not architecture_evaluation:
             return func.HttpResponse(
@@ -271,7 +279,7 @@ async def generate_technical_specs_endpoint(req: func.HttpRequest) -> func.HttpR
             )
 
         # Initialize services
-        llm_client = LLMManager()
+        llm_client = get_llm_manager()
         cost_tracker = CostTracker()
 
         # Track operation
@@ -282,8 +290,14 @@ async def generate_technical_specs_endpoint(req: func.HttpRequest) -> func.HttpR
         # Generate detailed technical specifications
         specs_prompt = create_technical_specs_prompt(architecture_evaluation, spec_requirements)
 
-        response = await llm_client.execute_prompt(
-            provider_name=provider_name, prompt=specs_prompt, model=selected_llm, temperature=0.1, max_tokens=6000
+        response = await llm_client.execute_routed(
+            specs_prompt,
+            tier="capable",
+            model=selected_llm,
+            provider=provider_name,
+            temperature=0.1,
+            max_tokens=6000,
+            context={"cache": True},
         )
 
         # Parse and structure technical specifications
@@ -358,8 +372,8 @@ async def assess_feasibility_endpoint(req: func.HttpRequest) -> func.HttpRespons
         user_id = user_info["user_id"]
         project_requirements = request_data.get("project_requirements", {})
         constraints = request_data.get("constraints", {})
-        selected_llm = request_data.get("model") or request_data.get("selectedLLM", "gpt-4")
-        provider_name = request_data.get("provider") or LLMManager.resolve_provider_from_model(selected_llm)
+        selected_llm = request_data.get("model") or request_data.get("selectedLLM")
+        provider_name = request_data.get("provider")
 
         if not user_id or not project_requirements:
             return func.HttpResponse(
@@ -367,7 +381,7 @@ async def assess_feasibility_endpoint(req: func.HttpRequest) -> func.HttpRespons
             )
 
         # Initialize services
-        llm_client = LLMManager()
+        llm_client = get_llm_manager()
         cost_tracker = CostTracker()
 
         # Track operation
@@ -378,8 +392,14 @@ async def assess_feasibility_endpoint(req: func.HttpRequest) -> func.HttpRespons
         # Generate feasibility assessment prompt
         feasibility_prompt = create_feasibility_assessment_prompt(project_requirements, constraints)
 
-        response = await llm_client.execute_prompt(
-            provider_name=provider_name, prompt=feasibility_prompt, model=selected_llm, temperature=0.2, max_tokens=4000
+        response = await llm_client.execute_routed(
+            feasibility_prompt,
+            tier="capable",
+            model=selected_llm,
+            provider=provider_name,
+            temperature=0.2,
+            max_tokens=4000,
+            context={"cache": True},
         )
 
         # Parse feasibility assessment
@@ -444,7 +464,7 @@ async def analyze_risks_endpoint(req: func.HttpRequest) -> func.HttpResponse:
             )
 
         # Initialize services
-        llm_client = LLMManager()
+        llm_client = get_llm_manager()
         cost_tracker = CostTracker()
 
         # Track operation
@@ -461,6 +481,7 @@ async def analyze_risks_endpoint(req: func.HttpRequest) -> func.HttpResponse:
             model=selected_llm,
             temperature=0.2,
             max_tokens=5000,
+            context={"cache": True},
         )
 
         # Parse risk analysis
@@ -610,8 +631,8 @@ async def generate_implementation_roadmap_endpoint(req: func.HttpRequest) -> fun
         user_id = user_info["user_id"]
         technical_analysis = request_data.get("technical_analysis", {})
         project_constraints = request_data.get("project_constraints", {})
-        selected_llm = request_data.get("model") or request_data.get("selectedLLM", "gpt-4")
-        provider_name = request_data.get("provider") or LLMManager.resolve_provider_from_model(selected_llm)
+        selected_llm = request_data.get("model") or request_data.get("selectedLLM")
+        provider_name = request_data.get("provider")
 
         if not user_id or not technical_analysis:
             return func.HttpResponse(
@@ -619,7 +640,7 @@ async def generate_implementation_roadmap_endpoint(req: func.HttpRequest) -> fun
             )
 
         # Initialize services
-        llm_client = LLMManager()
+        llm_client = get_llm_manager()
         cost_tracker = CostTracker()
 
         # Track operation
@@ -630,8 +651,14 @@ async def generate_implementation_roadmap_endpoint(req: func.HttpRequest) -> fun
         # Generate roadmap
         roadmap_prompt = create_implementation_roadmap_prompt(technical_analysis, project_constraints)
 
-        response = await llm_client.execute_prompt(
-            provider_name=provider_name, prompt=roadmap_prompt, model=selected_llm, temperature=0.2, max_tokens=5000
+        response = await llm_client.execute_routed(
+            roadmap_prompt,
+            tier="capable",
+            model=selected_llm,
+            provider=provider_name,
+            temperature=0.2,
+            max_tokens=5000,
+            context={"cache": True},
         )
 
         # Parse implementation roadmap
@@ -11,12 +11,12 @@ from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional
 
 import azure.functions as func
-from azure.cosmos.exceptions import CosmosResourceNotFoundError
+from azure.cosmos.exceptions import CosmosAccessConditionFailedError, CosmosResourceNotFoundError
 from shared.accessibility_validator import AccessibilityValidator
-from shared.async_database import AsyncCosmosHelper
+from shared.async_database import AsyncCosmosHelper, set_member_operation
 from shared.auth_helpers import extract_user_info
 from shared.cost_tracker import CostTracker
-from shared.llm_client import LLMManager
+from shared.llm_client import LLMManager, get_llm_manager
 from shared.quality_engine import QualityAssessmentEngine
 from shared.quality_validators import CrossStageQualityValidator
 
@@ -110,7 +110,7 @@ async def map_user_journeys(req: func.HttpRequest, project_id: str) -> func.Http
         journey_prompt = _create_user_journey_prompt(prd_context, journey_focus)
 
         # Execute LLM call with cost tracking
-        llm_client = LLMManager()
+        llm_client = get_llm_manager()
 
         await cost_tracker.track_llm_call_start(
             user_id=user_info.get("user_id"), operation="forge_ux_user_journeys", model=selected_llm, project_id=project_id
@@ -118,7 +118,12 @@ async def map_user_journeys(req: func.HttpRequest, project_id: str) -> func.Http
 
         try:
             response = await llm_client.execute_prompt(
-                provider_name=provider_name, prompt=journey_prompt, model=selected_llm, temperature=0.4, max_tokens=4000
+                provider_name=provider_name,
+                prompt=journey_prompt,
+                model=selected_llm,
+                temperature=0.4,
+                max_tokens=4000,
+                context={"cache": True},
             )
 
             await cost_tracker.track_llm_call_complete(
@@ -204,7 +209,7 @@ async def generate_wireframes(req: func.HttpRequest, project_id: str) -> func.Ht
         wireframe_prompt = _create_wireframe_prompt(user_journeys, prd_context, design_preferences)
 
         # Execute LLM call with cost tracking
-        llm_client = LLMManager()
+        llm_client = get_llm_manager()
 
         await cost_tracker.track_llm_call_start(
             user_id=user_info.get("user_id"), operation="forge_ux_wireframes", model=selected_llm, project_id=project_id
@@ -212,7 +217,12 @@ async def generate_wireframes(req: func.HttpRequest, project_id: str) -> func.Ht
 
         try:
             response = await llm_client.execute_prompt(
-                provider_name=provider_name, prompt=wireframe_prompt, model=selected_llm, temperature=0.3, max_tokens=5000
+                provider_name=provider_name,
+                prompt=wireframe_prompt,
+                model=selected_llm,
+                temperature=0.3,
+                max_tokens=5000,
+                context={"cache": True},
             )
 
             await cost_tracker.track_llm_call_complete(
@@ -364,7 +374,7 @@ async def specify_interactions(req: func.HttpRequest, project_id: str) -> func.H
         interaction_prompt = _create_interaction_prompt(wireframes, user_journeys, interaction_focus)
 
         # Execute LLM call with cost tracking
-        llm_client = LLMManager()
+        llm_client = get_llm_manager()
 
         await cost_tracker.track_llm_call_start(
             user_id=user_info.get("user_id"), operation="forge_ux_interactions", model=selected_llm, project_id=project_id
@@ -372,7 +382,12 @@ async def specify_interactions(req: func.HttpRequest, project_id: str) -> func.H
 
         try:
             response = await llm_client.execute_prompt(
-                provider_name=provider_name, prompt=interaction_prompt, model=selected_llm, temperature=0.3, max_tokens=4000
+                provider_name=provider_name,
+                prompt=interaction_prompt,
+                model=selected_llm,
+                temperature=0.3,
+                max_tokens=4000,
+                context={"cache": True},
             )
 
             await cost_tracker.track_llm_call_complete(
@@ -594,10 +609,10 @@ async def complete_ux_stage(req: func.HttpRequest, project_id: str) -> func.Http
         final_ux_data = request_data.get("finalUXData", {})
         force_complete = request_data.get("forceComplete", False)
 
-        # Get project from database
+        # Get the project's stage data from database (artifacts are not read)
         async with AsyncCosmosHelper() as db:
             try:
-                project = await db.read_item(project_id, partition_key=user_info["user_id"])
+                project = await db.read_item_fields(project_id, partition_key=user_info["user_id"], fields=["forgeData"])
             except CosmosResourceNotFoundError:
                 return func.HttpResponse(
                     json.dumps({"error": "Project not found"}), status_code=404, headers={"Content-Type": "application/json"}
@@ -654,8 +669,8 @@ async def complete_ux_stage(req: func.HttpRequest, project_id: str) -> func.Http
                 "ux_requirements", "technical_analysis", project_data_with_ux
             )
 
-            # Update project in database
-            project["forgeData"]["ux_requirements"] = {
+            # Update only this stage's data, provided the project is unchanged since it was read
+            ux_stage_data = {
                 **final_ux_data,
                 "status": "completed",
                 "completedAt": datetime.now(timezone.utc).isoformat(),
@@ -674,11 +689,22 @@ async def complete_ux_stage(req: func.HttpRequest, project_id: str) -> func.Http
                 },
                 "contextForNextStage": tech_context_handoff.context_data,
             }
-
-            project["updatedAt"] = datetime.now(timezone.utc).isoformat()
-
-            # Save updated project
-            await db.upsert_item(project)
+            try:
+                await db.patch_item(
+                    project_id,
+                    partition_key=user_info["user_id"],
+                    operations=[
+                        set_member_operation(project, "forgeData", "ux_requirements", ux_stage_data),
+                        {"op": "set", "path": "/updatedAt", "value": datetime.now(timezone.utc).isoformat()},
+                    ],
+                    etag=project.get("_etag"),
+                )
+            except CosmosAccessConditionFailedError:
+                return func.HttpResponse(
+                    json.dumps({"error": "Project was modified while the stage was being completed, please retry"}),
+                    status_code=409,
+                    headers={"Content-Type": "application/json"},
+                )
 
             # Prepare completion result
             completion_result = {
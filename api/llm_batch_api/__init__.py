@@ -0,0 +1,119 @@
+import json
+import os
+import sys
+
+import azure.functions as func
+
+# Add the root directory to Python path for proper imports
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+import logging
+import traceback
+
+from shared.batch_jobs import BatchJobError, get_batch_job_manager
+from shared.middleware import enhanced_security_middleware
+from shared.unified_auth import require_authentication
+
+# Initialize logging
+logger = logging.getLogger(__name__)
+
+
+def _json_response(body, status_code: int = 200) -> func.HttpResponse:
+    return func.HttpResponse(json.dumps(body, default=str), status_code=status_code, mimetype="application/json")
+
+
+@enhanced_security_middleware
+async def main(req: func.HttpRequest) -> func.HttpResponse:
+    """
+    Batch LLM job API for running one prompt template over many variable rows.
+
+    Supports:
+    - POST /api/llm/batch - Submit a job (template, rows, models)
+    - GET /api/llm/batch/{job_id} - Job status and progress
+    - GET /api/llm/batch/{job_id}/results - Download results as JSON lines
+    - POST /api/llm/batch/{job_id}/cancel - Cancel a running job
+    - POST /api/llm/batch/{job_id}/resume - Resume a job whose worker stopped
+    """
+    try:
+        user = await require_authentication(req)
+        user_id = user.id
+        method = req.method
+        job_id = req.route_params.get("job_id")
+        action = req.route_params.get("action")
+
+        logger.info(f"LLM Batch API called by {user.email}: {method} {req.url}")
+
+        if method == "POST" and not job_id:
+            return await submit_batch_job(user_id, req)
+        if method == "GET" and job_id and not action:
+            return await get_batch_job(user_id, job_id)
+        if method == "GET" and job_id and action == "results":
+            return await download_batch_results(user_id, job_id)
+        if method == "POST" and job_id and action in ("cancel", "resume"):
+            return await control_batch_job(user_id, job_id, action)
+        return _json_response({"error": "Method not allowed"}, 405)
+
+    except Exception as e:
+        logger.error(f"LLM Batch API error: {str(e)}")
+        logger.error(traceback.format_exc())
+
+        if "Authentication required" in str(e) or "401" in str(e):
+            return _json_response(
+                {"error": "authentication_required", "message": "Please log in to access this resource"}, 401
+            )
+        return _json_response({"error": "internal_error", "message": "An internal error occurred"}, 500)
+
+
+async def submit_batch_job(user_id: str, req: func.HttpRequest) -> func.HttpResponse:
+    """Submit a batch job; it starts running immediately and is polled by id."""
+    try:
+        body = req.get_json()
+    except ValueError:
+        return _json_response({"error": "Invalid JSON in request body"}, 400)
+
+    try:
+        job = await get_batch_job_manager().submit(
+            user_id,
+            template=body.get("promptText") or body.get("template"),
+            rows=body.get("rows"),
+            models=body.get("models"),
+            temperature=body.get("temperature", 0.7),
+            max_tokens=body.get("maxTokens", 1000),
+        )
+    except BatchJobError as e:
+        return _json_response({"error": str(e)}, 400)
+
+    return _json_response(job.summary(), 202)
+
+
+async def get_batch_job(user_id: str, job_id: str) -> func.HttpResponse:
+    """Job status and progress counters."""
+    job = await get_batch_job_manager().get_job(user_id, job_id)
+    if job is None:
+        return _json_response({"error": "Batch job not found"}, 404)
+    return _json_response(job.summary())
+
+
+async def download_batch_results(user_id: str, job_id: str) -> func.HttpResponse:
+    """Results written so far, one JSON object per line in row order."""
+    manager = get_batch_job_manager()
+    job = await manager.get_job(user_id, job_id)
+    if job is None:
+        return _json_response({"error": "Batch job not found"}, 404)
+
+    body = "".join([json.dumps(result, default=str) + "\n" async for result in manager.iter_results(user_id, job_id)])
+    return func.HttpResponse(
+        body,
+        status_code=200,
+        mimetype="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{job_id}.jsonl"', "X-Batch-Status": job.status},
+    )
+
+
+async def control_batch_job(user_id: str, job_id: str, action: str) -> func.HttpResponse:
+    """Cancel or resume a job."""
+    manager = get_batch_job_manager()
+    job = await (manager.cancel(user_id, job_id) if action == "cancel" else manager.resume(user_id, job_id))
+    if job is None:
+        return _json_response({"error": "Batch job not found"}, 404)
+    return _json_response(job.summary())
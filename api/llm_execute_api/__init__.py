@@ -8,15 +8,20 @@ import azure.functions as func
 sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
 
 import asyncio
+import functools
 import logging
+import time
 import traceback
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 
 import httpx
+from shared.batch_jobs import render_prompt
 from shared.database import get_database_manager
 from shared.error_handling import SutraAPIError, handle_api_error
-from shared.llm_client import LLMManager, get_llm_client
+from shared.llm_client import LLMManager, get_llm_client, get_llm_manager
+from shared.keyvault_manager import get_keyvault_manager
+from shared.llm_streaming import create_event_log_response, multiplex_streams, record_stream_usage, wants_event_log
 from shared.middleware import enhanced_security_middleware
 from shared.models import User
 from shared.real_time_cost import get_cost_manager
@@ -28,6 +33,14 @@ from shared.utils.fieldConverter import convert_camel_to_snake, convert_snake_to
 # Initialize logging
 logger = logging.getLogger(__name__)
 
+# Concurrency and time limits for multi-provider execution (overridable per request)
+MAX_CONCURRENT_PROVIDERS = int(os.getenv("LLM_EXECUTE_MAX_CONCURRENCY", "4"))
+DEFAULT_PROVIDER_TIMEOUT_SECONDS = float(os.getenv("LLM_EXECUTE_PROVIDER_TIMEOUT_SECONDS", "60"))
+DEFAULT_DEADLINE_SECONDS = float(os.getenv("LLM_EXECUTE_DEADLINE_SECONDS", "120"))
+
+# Provider ids used by this API that are named differently in LLMManager
+STREAM_PROVIDER_ALIASES = {"google_gemini": "google"}
+
 
 @enhanced_security_middleware
 async def main(req: func.HttpRequest) -> func.HttpResponse:
@@ -117,35 +130,29 @@ async def execute_llm_prompt(user_id: str, req: func.HttpRequest) -> func.HttpRe
             )
 
         # Replace variables in prompt text
-        processed_prompt = prompt_text
-        for var_name, var_value in variables.items():
-            processed_prompt = processed_prompt.replace(f"{{{{{var_name}}}}}", str(var_value))
+        processed_prompt = render_prompt(prompt_text, variables)
 
         # Get user's LLM API keys
-        db_manager = get_database_manager()
-        users_container = db_manager.get_container("Users")
-
-        query = "SELECT * FROM c WHERE c.id = @user_id"
-        parameters = [{"name": "@user_id", "value": user_id}]
-
-        user_items = list(users_container.query_items(query=query, parameters=parameters, enable_cross_partition_query=True))
-
-        if not user_items:
+        user_llm_keys = get_user_llm_keys(user_id)
+        if user_llm_keys is None:
             return func.HttpResponse(
                 json.dumps({"error": "User not found"}),
                 status_code=404,
                 mimetype="application/json",
             )
 
-        user_data = user_items[0]
-        user_llm_keys = user_data.get("llmApiKeys", {})
+        if wants_event_log(req, body):
+            return await stream_llm_prompt(
+                user_id, processed_prompt, llm_providers, user_llm_keys, temperature, max_tokens, body.get("models")
+            )
 
         # Execute prompts in parallel across selected LLMs
-        execution_tasks = []
+        execution_calls = {}
 
         for provider in llm_providers:
             if provider in user_llm_keys:
-                task = execute_single_llm(
+                execution_calls[provider] = functools.partial(
+                    execute_single_llm,
                     provider=provider,
                     prompt=processed_prompt,
                     api_config=user_llm_keys[provider],
@@ -153,9 +160,8 @@ async def execute_llm_prompt(user_id: str, req: func.HttpRequest) -> func.HttpRe
                     max_tokens=max_tokens,
                     output_format=output_format,
                 )
-                execution_tasks.append((provider, task))
 
-        if not execution_tasks:
+        if not execution_calls:
             return func.HttpResponse(
                 json.dumps(
                     {
@@ -167,17 +173,14 @@ async def execute_llm_prompt(user_id: str, req: func.HttpRequest) -> func.HttpRe
                 mimetype="application/json",
             )
 
+        provider_timeout = float(body.get("providerTimeoutMs", DEFAULT_PROVIDER_TIMEOUT_SECONDS * 1000)) / 1000
+        deadline = float(body.get("deadlineMs", DEFAULT_DEADLINE_SECONDS * 1000)) / 1000
+
         # Execute all LLMs in parallel
-        results = {}
         execution_start = datetime.utcnow()
-
-        for provider, task in execution_tasks:
-            try:
-                result = await task
-                results[provider] = result
-            except Exception as e:
-                results[provider] = {"error": str(e), "status": "failed"}
-
+        results, provider_timings = await run_providers_concurrently(
+            execution_calls, provider_timeout=provider_timeout, deadline=deadline
+        )
         execution_end = datetime.utcnow()
         total_duration = (execution_end - execution_start).total_seconds() * 1000
 
@@ -193,12 +196,14 @@ async def execute_llm_prompt(user_id: str, req: func.HttpRequest) -> func.HttpRe
                 "startTime": execution_start.isoformat() + "Z",
                 "endTime": execution_end.isoformat() + "Z",
                 "totalDurationMs": int(total_duration),
-                "providersExecuted": len(execution_tasks),
+                "providersExecuted": len(execution_calls),
                 "successfulProviders": len([r for r in results.values() if "error" not in r]),
+                "timedOutProviders": [p for p, r in results.items() if r.get("status") == "timed_out"],
+                "providerTimings": provider_timings,
             },
         }
 
-        logger.info(f"Executed prompt across {len(execution_tasks)} LLMs for user {user_id}")
+        logger.info(f"Executed prompt across {len(execution_calls)} LLMs for user {user_id}")
 
         return func.HttpResponse(
             json.dumps(response_data, default=str),
@@ -211,6 +216,155 @@ async def execute_llm_prompt(user_id: str, req: func.HttpRequest) -> func.HttpRe
         raise SutraAPIError(f"Failed to execute LLM prompt: {str(e)}", 500)
 
 
+def get_user_llm_keys(user_id: str) -> Optional[Dict[str, Any]]:
+    """The user's configured ``llmApiKeys`` by provider, or None when the user does not exist."""
+    db_manager = get_database_manager()
+    users_container = db_manager.get_container("Users")
+
+    query = "SELECT * FROM c WHERE c.id = @user_id"
+    parameters = [{"name": "@user_id", "value": user_id}]
+
+    user_items = list(users_container.query_items(query=query, parameters=parameters, enable_cross_partition_query=True))
+    if not user_items:
+        return None
+    return user_items[0].get("llmApiKeys", {})
+
+
+async def stream_llm_prompt(
+    user_id: str,
+    prompt: str,
+    llm_providers: List[str],
+    user_llm_keys: Dict[str, Any],
+    temperature: float,
+    max_tokens: int,
+    models: Optional[Dict[str, str]] = None,
+) -> func.HttpResponse:
+    """
+    Run several providers' streams concurrently and return the merged event log.
+
+    Like the regular execution path, only providers with an entry in the user's
+    ``llmApiKeys`` run, and they run on the user's own key from Key Vault, never
+    on the platform keys.
+    """
+    llm_manager = get_llm_manager()
+    keyvault_manager = get_keyvault_manager()
+    models = models or {}
+
+    factories = {}
+    stream_models = {}
+    for provider in llm_providers:
+        provider_name = STREAM_PROVIDER_ALIASES.get(provider, provider)
+        if provider not in user_llm_keys or provider_name not in llm_manager.providers:
+            continue
+        api_key = await keyvault_manager.get_api_key(user_id, provider)
+        if not api_key:
+            logger.warning(f"No stored API key for {provider}, user {user_id}; skipping")
+            continue
+        try:
+            user_provider = llm_manager.providers[provider_name].with_api_key(api_key)
+        except NotImplementedError as e:
+            logger.info(f"Skipping {provider} in event mode: {e}")
+            continue
+
+        stream_models[provider_name] = models.get(provider)
+        factories[provider_name] = functools.partial(
+            user_provider.execute_prompt,
+            prompt,
+            {"user_id": user_id},
+            model=stream_models[provider_name],
+            stream=True,
+            temperature=temperature,
+            max_tokens=max_tokens,
+        )
+
+    if not factories:
+        return func.HttpResponse(
+            json.dumps(
+                {
+                    "error": "No valid LLM providers configured",
+                    "message": "Please configure API keys for the selected LLM providers",
+                }
+            ),
+            status_code=400,
+            mimetype="application/json",
+        )
+
+    async def track_usage(stats):
+        await record_stream_usage(llm_manager.cost_tracker, user_id, stats)
+
+    events = multiplex_streams(factories, prompt, models=stream_models, on_complete=track_usage)
+    logger.info(f"Running prompt streams across {len(factories)} LLMs for user {user_id}")
+    return await create_event_log_response(events)
+
+
+async def run_providers_concurrently(
+    calls: Dict[str, Callable[[], Awaitable[Dict[str, Any]]]],
+    provider_timeout: float = DEFAULT_PROVIDER_TIMEOUT_SECONDS,
+    deadline: float = DEFAULT_DEADLINE_SECONDS,
+    max_concurrency: int = MAX_CONCURRENT_PROVIDERS,
+) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, Dict[str, Any]]]:
+    """
+    Run one call per provider in a task group and return ``(results, timings)``.
+
+    At most ``max_concurrency`` providers run at once, each is bounded by
+    ``provider_timeout`` seconds, and any still running when ``deadline`` passes
+    are cancelled and reported as timed out. A failing provider never cancels
+    the others.
+    """
+    results: Dict[str, Dict[str, Any]] = {}
+    timings: Dict[str, Dict[str, Any]] = {}
+    started_at: Dict[str, float] = {}
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+    group_start = time.perf_counter()
+
+    async def run(provider: str, call: Callable[[], Awaitable[Dict[str, Any]]]) -> None:
+        async with semaphore:
+            started = started_at[provider] = time.perf_counter()
+            try:
+                result = await asyncio.wait_for(call(), provider_timeout)
+            except asyncio.TimeoutError:
+                result = {
+                    "error": f"Provider timed out after {provider_timeout:g}s",
+                    "status": "timed_out",
+                    "provider": provider,
+                }
+            except Exception as e:
+                result = {"error": str(e), "status": "failed", "provider": provider}
+            finished = time.perf_counter()
+        results[provider] = result
+        timings[provider] = {
+            "startOffsetMs": int((started - group_start) * 1000),
+            "durationMs": int((finished - started) * 1000),
+            "status": result.get("status", "completed"),
+        }
+
+    try:
+        async with asyncio.timeout(deadline):
+            async with asyncio.TaskGroup() as group:
+                for provider, call in calls.items():
+                    group.create_task(run(provider, call))
+    except TimeoutError:
+        logger.warning(f"LLM execution deadline of {deadline:g}s exceeded, cancelled stragglers")
+
+    # Providers cancelled at the deadline never recorded a result
+    cancelled_at = time.perf_counter()
+    for provider in calls:
+        if provider not in results:
+            results[provider] = {
+                "error": f"Execution deadline of {deadline:g}s exceeded",
+                "status": "timed_out",
+                "provider": provider,
+            }
+            started = started_at.get(provider)
+            timings[provider] = {
+                "startOffsetMs": int((started - group_start) * 1000) if started else None,
+                "durationMs": int((cancelled_at - started) * 1000) if started else 0,
+                "status": "timed_out",
+            }
+
+    return results, {provider: timings[provider] for provider in calls}
+
+
 async def execute_single_llm(
     provider: str,
     prompt: str,
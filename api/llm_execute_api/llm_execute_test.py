@@ -12,3 +12,183 @@ from . import (
 Test file for LLM Execute API.
 
 """
+
+import asyncio
+import json
+from unittest.mock import AsyncMock, Mock, patch
+
+import azure.functions as func
+import pytest
+
+from api.llm_execute_api import execute_llm_prompt, run_providers_concurrently
+
+
+def _delayed(seconds: float, provider: str):
+    async def call():
+        await asyncio.sleep(seconds)
+        return {"text": f"{provider} output", "status": "completed", "provider": provider}
+
+    return call
+
+
+class TestRunProvidersConcurrently:
+    """Test suite for concurrent provider execution."""
+
+    @pytest.mark.asyncio
+    async def test_providers_run_in_parallel(self):
+        calls = {name: _delayed(0.1, name) for name in ("openai", "anthropic", "google_gemini")}
+
+        start = asyncio.get_running_loop().time()
+        results, timings = await run_providers_concurrently(calls)
+        elapsed = asyncio.get_running_loop().time() - start
+
+        assert elapsed < 0.25
+        assert all(r["status"] == "completed" for r in results.values())
+        assert list(timings) == ["openai", "anthropic", "google_gemini"]
+        assert all(t["durationMs"] >= 100 for t in timings.values())
+
+    @pytest.mark.asyncio
+    async def test_provider_timeout_does_not_cancel_others(self):
+        calls = {"openai": _delayed(0.01, "openai"), "anthropic": _delayed(5, "anthropic")}
+
+        results, timings = await run_providers_concurrently(calls, provider_timeout=0.05)
+
+        assert results["openai"]["status"] == "completed"
+        assert results["anthropic"]["status"] == "timed_out"
+        assert timings["anthropic"]["status"] == "timed_out"
+
+    @pytest.mark.asyncio
+    async def test_deadline_cancels_stragglers(self):
+        calls = {"openai": _delayed(0.01, "openai"), "anthropic": _delayed(5, "anthropic")}
+
+        start = asyncio.get_running_loop().time()
+        results, timings = await run_providers_concurrently(calls, provider_timeout=10, deadline=0.1)
+
+        assert asyncio.get_running_loop().time() - start < 1
+        assert results["openai"]["status"] == "completed"
+        assert "deadline" in results["anthropic"]["error"]
+        assert timings["anthropic"]["durationMs"] >= 90
+
+    @pytest.mark.asyncio
+    async def test_failure_is_isolated(self):
+        async def broken():
+            raise RuntimeError("bad key")
+
+        results, _ = await run_providers_concurrently({"openai": broken, "anthropic": _delayed(0.01, "anthropic")})
+
+        assert results["openai"] == {"error": "bad key", "status": "failed", "provider": "openai"}
+        assert results["anthropic"]["status"] == "completed"
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_bounded(self):
+        calls = {name: _delayed(0.05, name) for name in ("openai", "anthropic", "google_gemini")}
+
+        _, timings = await run_providers_concurrently(calls, max_concurrency=1)
+
+        offsets = sorted(t["startOffsetMs"] for t in timings.values())
+        assert offsets[1] >= 50 and offsets[2] >= 100
+
+
+class TestExecuteLLMPrompt:
+    """Test suite for the execute endpoint's execution block."""
+
+    @pytest.mark.asyncio
+    async def test_execution_block_reports_wall_clock_and_timings(self):
+        users_container = Mock()
+        users_container.query_items.return_value = [{"id": "user-1", "llmApiKeys": {"openai": "k1", "anthropic": "k2"}}]
+        db_manager = Mock()
+        db_manager.get_container.return_value = users_container
+
+        async def fake_execute_single_llm(provider, **kwargs):
+            await asyncio.sleep(0.1)
+            return {"text": "word " * 60, "status": "completed", "provider": provider}
+
+        req = func.HttpRequest(
+            method="POST",
+            url="http://localhost/api/llm/execute",
+            body=json.dumps({"promptText": "Hi", "llms": ["openai", "anthropic"]}).encode(),
+        )
+        with patch("api.llm_execute_api.get_database_manager", return_value=db_manager), patch(
+            "api.llm_execute_api.execute_single_llm", side_effect=fake_execute_single_llm
+        ):
+            response = await execute_llm_prompt("user-1", req)
+
+        execution = json.loads(response.get_body())["execution"]
+        assert response.status_code == 200
+        assert execution["successfulProviders"] == 2
+        assert set(execution["providerTimings"]) == {"openai", "anthropic"}
+        assert execution["totalDurationMs"] < 190
+
+    @pytest.mark.asyncio
+    async def test_event_mode_runs_user_keys_and_tracks_cost(self):
+        users_container = Mock()
+        users_container.query_items.return_value = [{"id": "user-1", "llmApiKeys": {"openai": "kv-ref-openai"}}]
+        db_manager = Mock()
+        db_manager.get_container.return_value = users_container
+
+        def provider(name):
+            async def execute_prompt(prompt, context=None, model=None, stream=False, **kwargs):
+                async def chunks():
+                    for word in ("hello ", "from ", name):
+                        yield word
+
+                return chunks()
+
+            scoped = Mock()
+            scoped.execute_prompt = AsyncMock(side_effect=execute_prompt)
+            platform = Mock()
+            platform.with_api_key.return_value = scoped
+            return platform
+
+        llm_manager = Mock()
+        llm_manager.providers = {"openai": provider("openai"), "anthropic": provider("anthropic")}
+        llm_manager.execute_prompt = AsyncMock()
+        llm_manager.cost_tracker = Mock()
+        llm_manager.cost_tracker.track_llm_usage = AsyncMock()
+        keyvault_manager = Mock()
+        keyvault_manager.get_api_key = AsyncMock(return_value="sk-user")
+
+        req = func.HttpRequest(
+            method="POST",
+            url="http://localhost/api/llm/execute",
+            body=json.dumps({"promptText": "Hi there", "llms": ["openai", "anthropic"], "stream": True}).encode(),
+        )
+        with patch("api.llm_execute_api.get_database_manager", return_value=db_manager), patch(
+            "api.llm_execute_api.get_llm_manager", return_value=llm_manager
+        ), patch("api.llm_execute_api.get_keyvault_manager", return_value=keyvault_manager):
+            response = await execute_llm_prompt("user-1", req)
+
+        body = json.loads(response.get_body())
+        assert response.mimetype == "application/json"
+        assert body["streamed"] is False
+        # anthropic has no entry in the user's llmApiKeys, so it never runs
+        assert {e["provider"] for e in body["events"] if e["event"] == "token"} == {"openai"}
+        assert body["events"][-1]["event"] == "end"
+        llm_manager.providers["openai"].with_api_key.assert_called_once_with("sk-user")
+        llm_manager.providers["anthropic"].with_api_key.assert_not_called()
+        # Platform keys are never used
+        llm_manager.execute_prompt.assert_not_called()
+        keyvault_manager.get_api_key.assert_awaited_once_with("user-1", "openai")
+        assert llm_manager.cost_tracker.track_llm_usage.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_event_mode_without_user_keys_is_rejected(self):
+        users_container = Mock()
+        users_container.query_items.return_value = [{"id": "user-1", "llmApiKeys": {}}]
+        db_manager = Mock()
+        db_manager.get_container.return_value = users_container
+        llm_manager = Mock()
+        llm_manager.providers = {"openai": Mock()}
+
+        req = func.HttpRequest(
+            method="POST",
+            url="http://localhost/api/llm/execute",
+            body=json.dumps({"promptText": "Hi", "llms": ["openai"], "stream": True}).encode(),
+        )
+        with patch("api.llm_execute_api.get_database_manager", return_value=db_manager), patch(
+            "api.llm_execute_api.get_llm_manager", return_value=llm_manager
+        ):
+            response = await execute_llm_prompt("user-1", req)
+
+        assert response.status_code == 400
+        llm_manager.providers["openai"].with_api_key.assert_not_called()
@@ -18,13 +18,15 @@ from shared.database import get_database_manager
 from shared.error_handling import SutraAPIError, handle_api_error
 from shared.middleware import enhanced_security_middleware
 from shared.models import Playbook, PlaybookExecution, User, ValidationError
+from shared.list_totals import invalidate_list_totals, resolve_list_total
+from shared.pagination import query_cursor_page
 from shared.real_time_cost import get_cost_manager
 
 # NEW: Use unified authentication and validation systems
 from shared.unified_auth import get_user_from_request, require_authentication
 from shared.utils.fieldConverter import convert_camel_to_snake, convert_snake_to_camel
 from shared.utils.schemaValidator import validate_entity
-from shared.validation import validate_playbook_data
+from shared.validation import ValidationException, validate_playbook_data
 
 # Initialize logging
 logger = logging.getLogger(__name__)
@@ -115,9 +117,11 @@ async def list_playbooks(user_id: str, req: func.HttpRequest) -> func.HttpRespon
         params = req.params
         page = int(params.get("page", 1))
         limit = min(int(params.get("limit", 20)), 100)
+        cursor = params.get("cursor")  # Opaque cursor from a previous page's next_cursor
         visibility = params.get("visibility")  # private, shared
         search = params.get("search", "").strip()
         team_id = params.get("teamId")
+        estimate_total = params.get("estimateTotal", "").lower() == "true"
 
         db_manager = get_database_manager()
 
@@ -140,16 +144,20 @@ async def list_playbooks(user_id: str, req: func.HttpRequest) -> func.HttpRespon
             )
             query_params.append({"name": "@search", "value": search})
 
-        # Add ordering and pagination
+        # Add ordering; paging is driven by continuation-token cursors
         query_parts.append("ORDER BY c.updatedAt DESC")
-        query_parts.append(f"OFFSET {(page - 1) * limit} LIMIT {limit}")
 
         query = " ".join(query_parts)
 
         # Execute query
-        items = await db_manager.query_items(container_name="Playbooks", query=query, parameters=query_params)
+        try:
+            items, next_cursor = await query_cursor_page(
+                db_manager, "Playbooks", query, query_params, user_id, limit, cursor=cursor, offset=(page - 1) * limit
+            )
+        except ValidationException as e:
+            return func.HttpResponse(json.dumps({"error": e.message}), status_code=400, mimetype="application/json")
 
-        # Get total count for pagination
+        # Count query shares the list filters; it only runs when the total is not cached or derivable
         count_query = "SELECT VALUE COUNT(1) FROM c WHERE c.userId = @user_id"
         count_params = [{"name": "@user_id", "value": user_id}]
 
@@ -165,17 +173,24 @@ async def list_playbooks(user_id: str, req: func.HttpRequest) -> func.HttpRespon
             count_query += " AND (CONTAINS(LOWER(c.name), LOWER(@search)) OR CONTAINS(LOWER(c.description), LOWER(@search)))"
             count_params.append({"name": "@search", "value": search})
 
-        count_result = await db_manager.query_items(container_name="Playbooks", query=count_query, parameters=count_params)
-
-        # Handle development mode where we get mock data
-        if count_result and isinstance(count_result[0], dict) and "_mock" in count_result[0]:
-            total_count = 2  # Mock count for development
-        else:
-            total_count = count_result[0] if count_result else 0
-
-        # Ensure total_count is an integer for calculation
-        if not isinstance(total_count, int):
-            total_count = 0
+        # Cursor pages know whether more results exist; legacy page numbers assume a full page means more
+        cursor_mode = bool(cursor) or page <= 1
+        has_more = bool(next_cursor) if cursor_mode else len(items) >= limit
+
+        total = await resolve_list_total(
+            db_manager,
+            "Playbooks",
+            user_id,
+            {"visibility": visibility, "teamId": team_id, "search": search},
+            count_query,
+            count_params,
+            page_size=len(items),
+            has_more=has_more,
+            offset=None if cursor else (page - 1) * limit,
+            estimate=estimate_total,
+            partition_key=user_id,
+        )
+        total_count = total.count
 
         # Ensure limit is an integer for calculation
         if not isinstance(limit, int):
@@ -187,15 +202,19 @@ async def list_playbooks(user_id: str, req: func.HttpRequest) -> func.HttpRespon
         if not isinstance(page, int):
             page = 1
 
+        has_next = has_more if cursor_mode else page < total_pages
+
         response_data = {
             "playbooks": items,
             "pagination": {
                 "current_page": page,
                 "total_pages": total_pages,
                 "total_count": total_count,
+                "total_is_estimate": total.estimated,
                 "limit": limit,
-                "has_next": page < total_pages,
-                "has_prev": page > 1,
+                "next_cursor": next_cursor,
+                "has_next": has_next,
+                "has_prev": page > 1 or bool(cursor),
             },
         }
 
@@ -309,6 +328,7 @@ async def create_playbook(user_id: str, req: func.HttpRequest) -> func.HttpRespo
         }
 
         created_item = await db_manager.create_item(container_name="Playbooks", item=db_data, partition_key=user_id)
+        invalidate_list_totals("Playbooks", user_id)
 
         logger.info(f"Created playbook {playbook_id} for user {user_id}")
 
@@ -424,6 +444,10 @@ async def update_playbook(user_id: str, playbook_id: str, req: func.HttpRequest)
         # Update in database
         updated_item = container.replace_item(item=existing_playbook["id"], body=existing_playbook)
 
+        if any(field in body for field in ("name", "description", "visibility", "teamId")):
+            # Playbook totals are filtered on these fields
+            invalidate_list_totals("Playbooks", user_id)
+
         logger.info(f"Updated playbook {playbook_id} for user {user_id}")
 
         return func.HttpResponse(
@@ -488,6 +512,7 @@ async def delete_playbook(user_id: str, playbook_id: str) -> func.HttpResponse:
 
         # Delete playbook
         container.delete_item(item=playbook_id, partition_key=playbook_id)
+        invalidate_list_totals("Playbooks", user_id)
 
         logger.info(f"Deleted playbook {playbook_id} for user {user_id}")
 
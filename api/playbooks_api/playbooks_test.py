@@ -8,6 +8,7 @@ import pytest
 from conftest import create_auth_request
 
 from api.playbooks_api import main as playbooks_main
+from api.shared.database import QueryPage
 
 
 class TestPlaybooksAPI:
@@ -27,6 +28,7 @@ class TestPlaybooksAPI:
             mock_manager = Mock()
             # Make database methods async
             mock_manager.query_items = AsyncMock()
+            mock_manager.query_page = AsyncMock()
             mock_manager.create_item = AsyncMock()
             mock_manager.replace_item = AsyncMock()
             mock_manager.update_item = AsyncMock()
@@ -128,10 +130,7 @@ class TestPlaybooksAPI:
         ]
 
         # Mock database responses
-        mock_cosmos_client.query_items.side_effect = [
-            mock_playbooks,  # First call for items
-            [2],  # Second call for count
-        ]
+        mock_cosmos_client.query_page.return_value = QueryPage(items=mock_playbooks)
 
         # Create request
         req = create_auth_request(method="GET")
@@ -144,6 +143,81 @@ class TestPlaybooksAPI:
         response_data = json.loads(response.get_body())
         assert len(response_data["playbooks"]) == 2
         assert response_data["pagination"]["total_count"] == 2
+        assert response_data["pagination"]["next_cursor"] is None
+        assert response_data["pagination"]["has_next"] is False
+        # A single complete page already gives the total, so no COUNT query runs
+        mock_cosmos_client.query_items.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_list_playbooks_cursor_round_trip(self, auth_test_user, mock_cosmos_client):
+        """Test that continuation tokens are returned as cursors and accepted back."""
+        mock_cosmos_client.query_page.return_value = QueryPage(items=[{"id": "playbook-1"}], continuation_token="ct-1")
+        mock_cosmos_client.query_items.return_value = [5]
+
+        response = await playbooks_main(create_auth_request(method="GET", params={"limit": "1"}))
+
+        assert response.status_code == 200
+        pagination = json.loads(response.get_body())["pagination"]
+        assert pagination["has_next"] is True
+        next_cursor = pagination["next_cursor"]
+        assert next_cursor and "ct-1" not in next_cursor
+
+        mock_cosmos_client.query_page.return_value = QueryPage(items=[{"id": "playbook-2"}])
+        response = await playbooks_main(create_auth_request(method="GET", params={"limit": "1", "cursor": next_cursor}))
+
+        assert response.status_code == 200
+        assert mock_cosmos_client.query_page.call_args.kwargs["continuation_token"] == "ct-1"
+        assert "OFFSET" not in mock_cosmos_client.query_page.call_args.kwargs["query"]
+        pagination = json.loads(response.get_body())["pagination"]
+        assert pagination["has_next"] is False
+        assert pagination["has_prev"] is True
+        # The total counted for the first page is served from cache on the next one
+        assert pagination["total_count"] == 5
+        assert mock_cosmos_client.query_items.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_list_playbooks_estimated_total(self, auth_test_user, mock_cosmos_client):
+        """Test that estimateTotal skips the COUNT query."""
+        mock_cosmos_client.query_page.return_value = QueryPage(items=[{"id": "playbook-1"}], continuation_token="ct-1")
+
+        response = await playbooks_main(
+            create_auth_request(method="GET", params={"limit": "1", "estimateTotal": "true"})
+        )
+
+        assert response.status_code == 200
+        pagination = json.loads(response.get_body())["pagination"]
+        assert pagination["total_count"] == 2
+        assert pagination["total_is_estimate"] is True
+        mock_cosmos_client.query_items.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_create_playbook_invalidates_cached_total(self, auth_test_user, mock_cosmos_client):
+        """Test that creating a playbook drops the user's cached totals."""
+        mock_cosmos_client.query_page.return_value = QueryPage(items=[{"id": "playbook-1"}], continuation_token="ct-1")
+        mock_cosmos_client.query_items.return_value = [5]
+
+        mock_cosmos_client.create_item.return_value = {"id": "playbook-2", "name": "New Playbook"}
+        playbook_data = {
+            "name": "New Playbook",
+            "steps": [{"stepId": "step1", "type": "prompt", "promptText": "Hello"}],
+        }
+
+        await playbooks_main(create_auth_request(method="GET", params={"limit": "1"}))
+        await playbooks_main(create_auth_request(method="GET", params={"limit": "1"}))
+        assert mock_cosmos_client.query_items.call_count == 1
+
+        response = await playbooks_main(create_auth_request(method="POST", body=playbook_data))
+        assert response.status_code == 201
+        await playbooks_main(create_auth_request(method="GET", params={"limit": "1"}))
+
+        assert mock_cosmos_client.query_items.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_list_playbooks_invalid_cursor(self, auth_test_user, mock_cosmos_client):
+        """Test that a malformed cursor is rejected with 400."""
+        response = await playbooks_main(create_auth_request(method="GET", params={"cursor": "not-a-cursor"}))
+
+        assert response.status_code == 400
 
     @pytest.mark.asyncio
     async def test_run_playbook_success(self, auth_test_user, mock_cosmos_client):
@@ -29,6 +29,8 @@ from shared.models import (
     PromptTemplate,
     UpdatePromptRequest,
 )
+from shared.list_totals import invalidate_list_totals
+from shared.pagination import query_keyset_page
 from shared.real_time_cost import get_real_time_cost_manager
 
 # Updated imports for unified auth and validation
@@ -143,6 +145,7 @@ async def handle_get_prompts(req: func.HttpRequest, request_id: Optional[str] =
         skip = int(query_params.get("skip", 0))
         limit = int(query_params.get("limit", 50))
         skip, limit = validate_pagination_params(skip, limit)
+        cursor = query_params.get("cursor")  # Opaque cursor from a previous page's next_cursor
 
         # Validate search query
         search_query = validate_search_query(query_params.get("q", ""))
@@ -173,9 +176,10 @@ async def handle_get_prompts(req: func.HttpRequest, request_id: Optional[str] =
             query += " AND ARRAY_CONTAINS(c.tags, @tag)"
             parameters.append({"name": "@tag", "value": tags[0]})
 
-        query += f" ORDER BY c.updatedAt DESC OFFSET {skip} LIMIT {limit}"
-
-        prompts = await db_manager.query_items(container_name="Prompts", query=query, parameters=parameters)
+        # Seek on (updatedAt, id) so deep pages cost the same RUs as the first one
+        prompts, next_cursor = await query_keyset_page(
+            db_manager, "Prompts", query, parameters, user.id, limit, "c.updatedAt", cursor=cursor, offset=skip
+        )
 
         return func.HttpResponse(
             json.dumps(
@@ -184,6 +188,8 @@ async def handle_get_prompts(req: func.HttpRequest, request_id: Optional[str] =
                     "total": len(prompts),
                     "skip": skip,
                     "limit": limit,
+                    "next_cursor": next_cursor,
+                    "has_more": bool(next_cursor),
                     "user_id": user.id,
                 },
                 default=str,
@@ -238,6 +244,7 @@ async def handle_create_prompt(req: func.HttpRequest, request_id: Optional[str]
 
         # Save to database
         created_prompt = await db_manager.create_item(container_name="Prompts", item=prompt_data, partition_key=user.id)
+        invalidate_list_totals("Prompts", prompt_data["collectionId"])
 
         logging.info(f"Created prompt {prompt_id} for user {user.id}")
 
@@ -328,6 +335,9 @@ async def handle_update_prompt(req: func.HttpRequest) -> func.HttpResponse:
             item=existing_prompt,
             partition_key=user.id,
         )
+        if any(value is not None for value in (update_request.title, update_request.description, update_request.tags)):
+            # Collection prompt totals can be filtered by search text and tag
+            invalidate_list_totals("Prompts", existing_prompt.get("collectionId"))
 
         logging.info(f"Updated prompt {prompt_id} for user {user.id}")
 
@@ -375,6 +385,7 @@ async def handle_delete_prompt(req: func.HttpRequest) -> func.HttpResponse:
         success = await db_manager.delete_item(container_name="Prompts", item_id=prompt_id, partition_key=user.id)
 
         if success:
+            invalidate_list_totals("Prompts", existing_prompt.get("collectionId"))
             logging.info(f"Deleted prompt {prompt_id} for user {user.id}")
             return func.HttpResponse(
                 json.dumps({"message": "Prompt deleted successfully", "id": prompt_id}),
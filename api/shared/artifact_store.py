@@ -0,0 +1,265 @@
+"""
+Content-addressed storage for Forge artifact content.
+
+Artifact content (PRD documents, wireframes, playbooks, analysis reports) used
+to live inline in the project document, so every project read carried it and
+documents crept toward the 2 MB Cosmos item limit. Content above
+``FORGE_ARTIFACT_INLINE_MAX_BYTES`` is now written to an ``ArtifactStore`` and
+the artifact keeps a small manifest reference (``ForgeArtifact.content_ref``):
+
+    {"digest": "<sha256 of the content>", "size": 48213, "stored_size": 9120, "encoding": "gzip"}
+
+Blobs are keyed by the SHA-256 of the uncompressed content, so identical
+content is stored once and a blob never changes after it is written.
+``FORGE_ARTIFACT_STORE`` selects the backend:
+
+- ``blob`` (default): ``BlobArtifactStore`` on the ``FORGE_ARTIFACT_CONTAINER`` Azure Blob container,
+  using ``AZURE_STORAGE_CONNECTION_STRING`` or ``STORAGE_ACCOUNT_URL`` with a managed identity
+- ``local``: ``LocalArtifactStore`` under ``FORGE_ARTIFACT_STORE_PATH`` (dev, tests)
+
+A local store without ``FORGE_ARTIFACT_STORE_PATH`` lives in the temp directory,
+which does not outlive the worker, so content is kept inline rather than moved
+there.
+
+Blobs are not deleted with their project because other projects may reference
+the same content.
+"""
+
+import asyncio
+import gzip
+import hashlib
+import logging
+import os
+import tempfile
+from abc import ABC, abstractmethod
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from .models.forge_models import ForgeArtifact
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INLINE_MAX_BYTES = 1024
+DEFAULT_CONTAINER = "forge-artifacts"
+GZIP_LEVEL = 6
+
+
+class ArtifactStoreError(Exception):
+    """Artifact content could not be stored or read back intact."""
+
+
+class ArtifactNotFoundError(ArtifactStoreError):
+    """No blob exists for the referenced digest."""
+
+
+@dataclass
+class ArtifactRef:
+    """Manifest reference to externally stored artifact content."""
+
+    digest: str
+    size: int
+    stored_size: int
+    encoding: str = "gzip"
+
+    @property
+    def key(self) -> str:
+        return f"sha256/{self.digest[:2]}/{self.digest}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ArtifactRef":
+        return cls(
+            digest=data["digest"],
+            size=data["size"],
+            stored_size=data.get("stored_size", data["size"]),
+            encoding=data.get("encoding", "gzip"),
+        )
+
+
+class ArtifactStore(ABC):
+    """Immutable blobs addressed by content digest."""
+
+    name = "store"
+    # Whether stored blobs outlive this process; content is only externalized to durable stores
+    durable = True
+
+    @abstractmethod
+    async def _write(self, key: str, data: bytes) -> None:
+        """Store ``data`` under ``key``; writing an existing key is harmless."""
+
+    @abstractmethod
+    async def _read(self, key: str) -> bytes:
+        """Bytes stored under ``key``; raises ArtifactNotFoundError when missing."""
+
+    @abstractmethod
+    async def _exists(self, key: str) -> bool:
+        """Whether ``key`` has been written."""
+
+    async def put(self, content: str) -> ArtifactRef:
+        """Store ``content`` (once per distinct content) and return its reference."""
+        raw = content.encode("utf-8")
+        compressed = gzip.compress(raw, compresslevel=GZIP_LEVEL, mtime=0)
+        if len(compressed) < len(raw):
+            ref = ArtifactRef(hashlib.sha256(raw).hexdigest(), len(raw), len(compressed), "gzip")
+            data = compressed
+        else:
+            ref = ArtifactRef(hashlib.sha256(raw).hexdigest(), len(raw), len(raw), "identity")
+            data = raw
+
+        if not await self._exists(ref.key):
+            await self._write(ref.key, data)
+        return ref
+
+    async def get(self, ref: ArtifactRef) -> str:
+        """Content for ``ref``, verified against its digest."""
+        data = await self._read(ref.key)
+        raw = gzip.decompress(data) if ref.encoding == "gzip" else data
+        if hashlib.sha256(raw).hexdigest() != ref.digest:
+            raise ArtifactStoreError(f"Artifact content for {ref.digest} failed its digest check")
+        return raw.decode("utf-8")
+
+
+class LocalArtifactStore(ArtifactStore):
+    """Blobs as files under a local directory."""
+
+    name = "local"
+
+    def __init__(self, root: str, durable: bool = True):
+        self.root = Path(root)
+        self.durable = durable
+
+    def _path(self, key: str) -> Path:
+        return self.root / key
+
+    async def _write(self, key: str, data: bytes) -> None:
+        def _write_file() -> None:
+            path = self._path(key)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write then rename so readers never see a partial blob
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent)
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+
+        await asyncio.to_thread(_write_file)
+
+    async def _read(self, key: str) -> bytes:
+        try:
+            return await asyncio.to_thread(self._path(key).read_bytes)
+        except FileNotFoundError:
+            raise ArtifactNotFoundError(key) from None
+
+    async def _exists(self, key: str) -> bool:
+        return await asyncio.to_thread(self._path(key).exists)
+
+
+class BlobArtifactStore(ArtifactStore):
+    """Blobs in an Azure Blob Storage container (``azure.storage.blob.aio.ContainerClient``)."""
+
+    name = "blob"
+
+    def __init__(self, container_client):
+        self.container = container_client
+
+    async def _write(self, key: str, data: bytes) -> None:
+        from azure.core.exceptions import ResourceExistsError
+
+        try:
+            await self.container.upload_blob(key, data, overwrite=False)
+        except ResourceExistsError:
+            pass  # Same digest, same content
+
+    async def _read(self, key: str) -> bytes:
+        from azure.core.exceptions import ResourceNotFoundError
+
+        try:
+            downloader = await self.container.download_blob(key)
+            return await downloader.readall()
+        except ResourceNotFoundError:
+            raise ArtifactNotFoundError(key) from None
+
+    async def _exists(self, key: str) -> bool:
+        return await self.container.get_blob_client(key).exists()
+
+
+def inline_max_bytes() -> int:
+    """Largest artifact content, in UTF-8 bytes, kept inline in the project document."""
+    return int(os.getenv("FORGE_ARTIFACT_INLINE_MAX_BYTES", DEFAULT_INLINE_MAX_BYTES))
+
+
+async def externalize_artifact(artifact: ForgeArtifact, store: Optional[ArtifactStore] = None) -> bool:
+    """
+    Move large inline content into the store, leaving a manifest reference.
+
+    Returns True when the content was moved; content stays inline when the store is not durable.
+    """
+    if artifact.content_ref or len(artifact.content.encode("utf-8")) <= inline_max_bytes():
+        return False
+    store = store or get_artifact_store()
+    if not store.durable:
+        logger.warning(f"The {store.name} artifact store is not durable; keeping artifact {artifact.id} inline")
+        return False
+    ref = await store.put(artifact.content)
+    artifact.content_ref = ref.to_dict()
+    artifact.content = ""
+    return True
+
+
+async def load_artifact_content(artifact: ForgeArtifact, store: Optional[ArtifactStore] = None) -> str:
+    """The artifact's content, fetched from the store when it is externalized."""
+    if not artifact.content_ref:
+        return artifact.content
+    return await (store or get_artifact_store()).get(ArtifactRef.from_dict(artifact.content_ref))
+
+
+def artifact_content_size(artifact: ForgeArtifact) -> int:
+    """Content size in UTF-8 bytes without fetching externalized content."""
+    if artifact.content_ref:
+        return artifact.content_ref["size"]
+    return len(artifact.content.encode("utf-8"))
+
+
+_artifact_store: Optional[ArtifactStore] = None
+
+
+def get_artifact_store() -> ArtifactStore:
+    """Store selected by ``FORGE_ARTIFACT_STORE``."""
+    global _artifact_store
+    if _artifact_store is not None:
+        return _artifact_store
+
+    backend = os.getenv("FORGE_ARTIFACT_STORE", "blob").lower()
+    if backend == "blob":
+        from azure.storage.blob.aio import ContainerClient
+
+        container_name = os.getenv("FORGE_ARTIFACT_CONTAINER", DEFAULT_CONTAINER)
+        connection_string = os.getenv("AZURE_STORAGE_CONNECTION_STRING")
+        if connection_string:
+            container = ContainerClient.from_connection_string(connection_string, container_name)
+        else:
+            from azure.identity.aio import DefaultAzureCredential
+
+            account_url = os.getenv("STORAGE_ACCOUNT_URL")
+            if not account_url:
+                raise ValueError(
+                    "AZURE_STORAGE_CONNECTION_STRING or STORAGE_ACCOUNT_URL is required for blob artifacts; "
+                    "set FORGE_ARTIFACT_STORE=local for development"
+                )
+            container = ContainerClient(account_url, container_name, credential=DefaultAzureCredential())
+        _artifact_store = BlobArtifactStore(container)
+    else:
+        if backend != "local":
+            logger.warning(f"Unknown FORGE_ARTIFACT_STORE '{backend}', using the local artifact store")
+        root = os.getenv("FORGE_ARTIFACT_STORE_PATH")
+        if root:
+            _artifact_store = LocalArtifactStore(root)
+        else:
+            _artifact_store = LocalArtifactStore(os.path.join(tempfile.gettempdir(), "forge-artifacts"), durable=False)
+    return _artifact_store
@@ -0,0 +1,112 @@
+"""
+Tests for artifact_store.py - content-addressed artifact content storage
+"""
+
+import hashlib
+
+import pytest
+
+from shared.artifact_store import (
+    ArtifactNotFoundError,
+    ArtifactRef,
+    ArtifactStoreError,
+    BlobArtifactStore,
+    LocalArtifactStore,
+    externalize_artifact,
+    get_artifact_store,
+    load_artifact_content,
+)
+from shared.models.forge_models import ArtifactType, ForgeArtifact
+
+PRD = "## Requirements\n" + "The system shall let users prioritise tasks. " * 200
+
+
+def _artifact(content: str) -> ForgeArtifact:
+    return ForgeArtifact(id="a1", name="PRD", type=ArtifactType.DOCUMENT, content=content, description="")
+
+
+class TestLocalArtifactStore:
+    """Test suite for the filesystem store."""
+
+    @pytest.mark.asyncio
+    async def test_round_trip_is_compressed_and_deduplicated(self, tmp_path):
+        store = LocalArtifactStore(str(tmp_path))
+
+        first = await store.put(PRD)
+        second = await store.put(PRD)
+
+        assert first == second
+        assert first.digest == hashlib.sha256(PRD.encode("utf-8")).hexdigest()
+        assert first.encoding == "gzip"
+        assert first.stored_size < first.size
+        assert len(list(tmp_path.rglob(first.digest))) == 1
+        assert await store.get(first) == PRD
+
+    @pytest.mark.asyncio
+    async def test_incompressible_content_is_stored_as_is(self, tmp_path):
+        store = LocalArtifactStore(str(tmp_path))
+
+        ref = await store.put("ok")
+
+        assert ref.encoding == "identity"
+        assert await store.get(ArtifactRef.from_dict(ref.to_dict())) == "ok"
+
+    @pytest.mark.asyncio
+    async def test_missing_and_corrupt_blobs(self, tmp_path):
+        store = LocalArtifactStore(str(tmp_path))
+        ref = await store.put(PRD)
+
+        with pytest.raises(ArtifactNotFoundError):
+            await store.get(ArtifactRef(digest="0" * 64, size=1, stored_size=1))
+
+        (tmp_path / ref.key).write_bytes(b"tampered")
+        with pytest.raises(ArtifactStoreError):
+            await store.get(ArtifactRef(ref.digest, ref.size, 8, "identity"))
+
+
+class TestExternalizeArtifact:
+    """Test suite for moving artifact content out of the project document."""
+
+    @pytest.mark.asyncio
+    async def test_large_content_is_replaced_by_a_reference(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("FORGE_ARTIFACT_STORE", "local")
+        monkeypatch.setenv("FORGE_ARTIFACT_STORE_PATH", str(tmp_path))
+        artifact = _artifact(PRD)
+
+        assert await externalize_artifact(artifact) is True
+        assert artifact.content == ""
+        assert artifact.content_ref["size"] == len(PRD.encode("utf-8"))
+        assert await load_artifact_content(artifact) == PRD
+        assert isinstance(get_artifact_store(), LocalArtifactStore)
+
+        # Already externalized
+        assert await externalize_artifact(artifact) is False
+
+    @pytest.mark.asyncio
+    async def test_small_content_stays_inline(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("FORGE_ARTIFACT_STORE", "local")
+        monkeypatch.setenv("FORGE_ARTIFACT_STORE_PATH", str(tmp_path))
+        artifact = _artifact("Short note")
+
+        assert await externalize_artifact(artifact) is False
+        assert artifact.content_ref is None
+        assert await load_artifact_content(artifact) == "Short note"
+        assert not any(tmp_path.iterdir())
+
+    @pytest.mark.asyncio
+    async def test_content_stays_inline_without_a_durable_store(self, monkeypatch):
+        monkeypatch.setenv("FORGE_ARTIFACT_STORE", "local")
+        monkeypatch.delenv("FORGE_ARTIFACT_STORE_PATH", raising=False)
+        artifact = _artifact(PRD)
+
+        assert get_artifact_store().durable is False
+        assert await externalize_artifact(artifact) is False
+        assert artifact.content == PRD
+        assert artifact.content_ref is None
+
+    def test_blob_is_the_default_backend(self, monkeypatch):
+        monkeypatch.delenv("FORGE_ARTIFACT_STORE", raising=False)
+        monkeypatch.delenv("AZURE_STORAGE_CONNECTION_STRING", raising=False)
+        monkeypatch.setenv("STORAGE_ACCOUNT_URL", "https://sutrastore.blob.core.windows.net")
+
+        assert isinstance(get_artifact_store(), BlobArtifactStore)
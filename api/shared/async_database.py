@@ -1,14 +1,25 @@
 """
 Async Cosmos DB helper for Forge API endpoints.
 Provides a shared async CosmosClient to avoid duplicate client creation across forge modules.
+
+Clients are held in a process-wide pool keyed by connection string, so every
+``async with AsyncCosmosHelper()`` block reuses the same TLS session, account
+metadata and database/container proxies instead of building a fresh client.
 """
 
+import asyncio
 import logging
 import os
+import re
+import time
+from dataclasses import asdict, dataclass, field
 from types import TracebackType
-from typing import Any, Dict, List, Optional, Type
+from typing import Any, Dict, Iterable, List, Optional, Set, Type
 
+from azure.core import MatchConditions
+from azure.core.exceptions import ServiceRequestError, ServiceResponseError
 from azure.cosmos.aio import CosmosClient
+from azure.cosmos.exceptions import CosmosResourceNotFoundError
 
 logger = logging.getLogger(__name__)
 
@@ -17,28 +28,348 @@ FORGE_PROJECTS_CONTAINER = "ForgeProjects"
 FORGE_TEMPLATES_CONTAINER = "ForgeTemplates"
 FORGE_ANALYTICS_CONTAINER = "ForgeAnalytics"
 
+# How long a pooled client may go without a successful probe before it is re-checked
+DEFAULT_HEALTH_CHECK_INTERVAL_SECONDS = 300
+
+# Errors raised when the underlying transport is broken (as opposed to a Cosmos-level error)
+CONNECTION_ERRORS = (ServiceRequestError, ServiceResponseError, ConnectionError, asyncio.TimeoutError)
+
+# Cosmos DB accepts at most this many operations in one partial document update
+MAX_PATCH_OPERATIONS = 10
+
+_FIELD_NAME = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+def json_pointer(key: str) -> str:
+    """Escape a map key (e.g. "openai/gpt-4o") for use as one segment of a patch path."""
+    return key.replace("~", "~0").replace("/", "~1")
+
+
+def set_member_operation(document: Dict[str, Any], parent: str, key: str, value: Any) -> Dict[str, Any]:
+    """Patch operation setting ``document[parent][key]``, creating ``parent`` when the document lacks it."""
+    if isinstance(document.get(parent), dict):
+        return {"op": "set", "path": f"/{parent}/{json_pointer(key)}", "value": value}
+    return {"op": "set", "path": f"/{parent}", "value": {key: value}}
+
 
 def get_connection_string() -> str:
     """Get Cosmos DB connection string from environment."""
     return os.getenv("COSMOS_DB_CONNECTION_STRING", "")
 
 
+@dataclass
+class PoolMetrics:
+    """Counters describing how the Cosmos client pool is being used."""
+
+    clients_created: int = 0
+    clients_closed: int = 0
+    acquisitions: int = 0
+    reuses: int = 0
+    active_leases: int = 0
+    container_cache_hits: int = 0
+    container_cache_misses: int = 0
+    warm_ups: int = 0
+    warm_up_failures: int = 0
+    health_checks: int = 0
+    health_check_failures: int = 0
+    reconnects: int = 0
+
+    @property
+    def reuse_rate(self) -> float:
+        """Fraction of acquisitions served by an existing client."""
+        return self.reuses / self.acquisitions if self.acquisitions else 0.0
+
+    @property
+    def container_cache_hit_rate(self) -> float:
+        """Fraction of container lookups served from the proxy cache."""
+        lookups = self.container_cache_hits + self.container_cache_misses
+        return self.container_cache_hits / lookups if lookups else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["reuse_rate"] = round(self.reuse_rate, 4)
+        data["container_cache_hit_rate"] = round(self.container_cache_hit_rate, 4)
+        return data
+
+
+@dataclass
+class PooledCosmosClient:
+    """A pooled client together with its cached proxies and connection stats."""
+
+    client: CosmosClient
+    loop: asyncio.AbstractEventLoop
+    created_at: float = field(default_factory=time.monotonic)
+    last_health_check: float = field(default_factory=time.monotonic)
+    healthy: bool = True
+    warmed_up: bool = False
+    database: Any = None
+    containers: Dict[str, Any] = field(default_factory=dict)
+    operations: int = 0
+    errors: int = 0
+    leases: int = 0
+    retired: bool = False
+    warm_up_lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "age_seconds": round(time.monotonic() - self.created_at, 3),
+            "healthy": self.healthy,
+            "warmed_up": self.warmed_up,
+            "cached_containers": sorted(self.containers),
+            "operations": self.operations,
+            "errors": self.errors,
+            "leases": self.leases,
+        }
+
+
+class CosmosClientPool:
+    """
+    Process-wide registry of async Cosmos clients.
+
+    One client is kept per connection string and event loop. Clients are warmed
+    up lazily on first use, probed when they have not been verified for
+    ``health_check_interval`` seconds, and rebuilt after a connection failure.
+    A replaced client is retired rather than closed outright: it is closed once
+    the coroutines still holding leases on it have released them.
+    """
+
+    def __init__(self, health_check_interval: Optional[float] = None):
+        if health_check_interval is None:
+            health_check_interval = float(
+                os.getenv("COSMOS_POOL_HEALTH_CHECK_INTERVAL", DEFAULT_HEALTH_CHECK_INTERVAL_SECONDS)
+            )
+        self.health_check_interval = health_check_interval
+        self.metrics = PoolMetrics()
+        self._entries: Dict[str, PooledCosmosClient] = {}
+        self._retired: List[PooledCosmosClient] = []
+        self._closing: Set["asyncio.Task[None]"] = set()
+
+    async def acquire(self, connection_string: str) -> PooledCosmosClient:
+        """Lease a warmed-up, healthy client for the given connection string."""
+        entry = self._get_or_create(connection_string)
+        self.metrics.acquisitions += 1
+        # Lease before the first await so a concurrent reconnect cannot close it under us
+        self._lease(entry)
+        try:
+            await self._ensure_warm(entry)
+
+            if not entry.healthy or time.monotonic() - entry.last_health_check >= self.health_check_interval:
+                if not await self._health_check(entry):
+                    stale = entry
+                    entry = await self._reconnect(connection_string, stale)
+                    self._lease(entry)
+                    await self._return_lease(stale)
+                    await self._ensure_warm(entry)
+        except BaseException:
+            await self._return_lease(entry)
+            raise
+        return entry
+
+    def release(self, entry: PooledCosmosClient, exc: Optional[BaseException] = None) -> None:
+        """Return a leased client, flagging it for reconnect if the transport failed."""
+        if exc is not None and isinstance(exc, CONNECTION_ERRORS):
+            entry.errors += 1
+            entry.healthy = False
+            logger.warning(f"Cosmos connection error, client marked for reconnect: {exc}")
+        if self._unlease(entry):
+            self._schedule_close(entry)
+
+    def get_container(self, entry: PooledCosmosClient, container_name: str) -> Any:
+        """Return a cached container proxy for a pooled client."""
+        container = entry.containers.get(container_name)
+        if container is not None:
+            self.metrics.container_cache_hits += 1
+            return container
+
+        self.metrics.container_cache_misses += 1
+        if entry.database is None:
+            entry.database = entry.client.get_database_client(DATABASE_NAME)
+        container = entry.database.get_container_client(container_name)
+        entry.containers[container_name] = container
+        return container
+
+    async def warm_up(
+        self, connection_string: Optional[str] = None, container_names: Optional[List[str]] = None
+    ) -> PooledCosmosClient:
+        """Eagerly create a client and prime its container proxies (e.g. at worker start)."""
+        entry = await self.acquire(connection_string or get_connection_string())
+        try:
+            for name in container_names or [FORGE_PROJECTS_CONTAINER]:
+                self.get_container(entry, name)
+        finally:
+            self.release(entry)
+        return entry
+
+    async def close_all(self) -> None:
+        """Close every pooled and retired client owned by the running event loop."""
+        loop = asyncio.get_running_loop()
+        for key, entry in list(self._entries.items()):
+            if entry.loop is loop:
+                await self._close(entry)
+            self._entries.pop(key, None)
+        for entry in list(self._retired):
+            if entry.loop is loop:
+                self._retired.remove(entry)
+                await self._close(entry)
+        if self._closing:
+            await asyncio.gather(*self._closing, return_exceptions=True)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Pool-wide counters plus per-connection statistics."""
+        data = self.metrics.to_dict()
+        data["pooled_clients"] = len(self._entries)
+        data["retired_clients"] = len(self._retired)
+        data["connections"] = [entry.to_dict() for entry in self._entries.values()]
+        return data
+
+    def _get_or_create(self, connection_string: str) -> PooledCosmosClient:
+        loop = asyncio.get_running_loop()
+        entry = self._entries.get(connection_string)
+
+        # aiohttp sessions are bound to the loop that created them
+        if entry is not None and entry.loop is loop and not loop.is_closed():
+            self.metrics.reuses += 1
+            return entry
+        if entry is not None:
+            # The previous client belongs to another event loop
+            self._retire(entry)
+
+        entry = PooledCosmosClient(client=CosmosClient.from_connection_string(connection_string), loop=loop)
+        self._entries[connection_string] = entry
+        self.metrics.clients_created += 1
+        return entry
+
+    async def _ensure_warm(self, entry: PooledCosmosClient) -> None:
+        if entry.warmed_up:
+            return
+        async with entry.warm_up_lock:
+            if entry.warmed_up:
+                return
+            try:
+                # Opens the transport session and fetches account metadata once
+                await entry.client.__aenter__()
+                entry.warmed_up = True
+                entry.last_health_check = time.monotonic()
+                self.metrics.warm_ups += 1
+            except Exception as e:
+                self.metrics.warm_up_failures += 1
+                logger.warning(f"Cosmos client warm-up failed, will retry on next use: {e}")
+
+    async def _health_check(self, entry: PooledCosmosClient) -> bool:
+        self.metrics.health_checks += 1
+        try:
+            if entry.database is None:
+                entry.database = entry.client.get_database_client(DATABASE_NAME)
+            await entry.database.read()
+            entry.healthy = True
+            entry.last_health_check = time.monotonic()
+            return True
+        except Exception as e:
+            self.metrics.health_check_failures += 1
+            logger.warning(f"Cosmos client health check failed: {e}")
+            return False
+
+    def _lease(self, entry: PooledCosmosClient) -> None:
+        entry.leases += 1
+        self.metrics.active_leases += 1
+
+    def _unlease(self, entry: PooledCosmosClient) -> bool:
+        """Drop one lease; True when a retired client has just become idle and should be closed."""
+        entry.leases = max(0, entry.leases - 1)
+        self.metrics.active_leases = max(0, self.metrics.active_leases - 1)
+        if entry.retired and entry.leases == 0 and entry in self._retired:
+            self._retired.remove(entry)
+            return True
+        return False
+
+    async def _return_lease(self, entry: PooledCosmosClient) -> None:
+        if self._unlease(entry):
+            await self._close(entry)
+
+    async def _reconnect(self, connection_string: str, entry: PooledCosmosClient) -> PooledCosmosClient:
+        if self._entries.get(connection_string) not in (None, entry):
+            # Another coroutine already replaced this client
+            return self._get_or_create(connection_string)
+
+        self.metrics.reconnects += 1
+        # Swap the new client in first; the old one is closed when its leases drain
+        self._entries.pop(connection_string, None)
+        replacement = self._get_or_create(connection_string)
+        self._retire(entry)
+        return replacement
+
+    def _retire(self, entry: PooledCosmosClient) -> None:
+        """Stop handing out ``entry`` and close it once its last lease is released."""
+        entry.retired = True
+        if entry.leases == 0:
+            self._schedule_close(entry)
+        elif entry not in self._retired:
+            self._retired.append(entry)
+
+    def _schedule_close(self, entry: PooledCosmosClient) -> None:
+        if entry.loop.is_closed():
+            # The transport went away with its loop; there is nothing left to close
+            logger.debug("Dropping pooled Cosmos client whose event loop is closed")
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is entry.loop:
+            task = running.create_task(self._close(entry))
+            self._closing.add(task)
+            task.add_done_callback(self._closing.discard)
+        else:
+            # Runs on the client's own loop, which aiohttp requires
+            asyncio.run_coroutine_threadsafe(self._close(entry), entry.loop)
+
+    async def _close(self, entry: PooledCosmosClient) -> None:
+        try:
+            await entry.client.close()
+        except Exception as e:
+            logger.debug(f"Ignoring error while closing pooled Cosmos client: {e}")
+        self.metrics.clients_closed += 1
+
+
+# Global client pool - initialized lazily
+_cosmos_pool: Optional[CosmosClientPool] = None
+
+
+def get_cosmos_pool() -> CosmosClientPool:
+    """Get the global Cosmos client pool."""
+    global _cosmos_pool
+    if _cosmos_pool is None:
+        _cosmos_pool = CosmosClientPool()
+    return _cosmos_pool
+
+
+def get_pool_metrics() -> Dict[str, Any]:
+    """Get reuse and connection metrics for the global Cosmos client pool."""
+    return get_cosmos_pool().get_metrics()
+
+
 class AsyncCosmosHelper:
     """
     Async context manager for Cosmos DB operations.
 
+    The underlying client is leased from the process-wide pool and is not closed
+    on exit, so repeated ``async with`` blocks share one connection.
+
     Usage:
         async with AsyncCosmosHelper() as helper:
             container = await helper.get_container("ForgeProjects")
             item = await container.read_item(item_id, partition_key=partition_key)
     """
 
-    def __init__(self, connection_string: Optional[str] = None):
+    def __init__(self, connection_string: Optional[str] = None, pool: Optional[CosmosClientPool] = None):
         self._connection_string = connection_string or get_connection_string()
+        self._pool = pool or get_cosmos_pool()
+        self._entry: Optional[PooledCosmosClient] = None
         self._client: Optional[CosmosClient] = None
 
     async def __aenter__(self):
-        self._client = CosmosClient.from_connection_string(self._connection_string)
+        self._entry = await self._pool.acquire(self._connection_string)
+        self._client = self._entry.client
         return self
 
     async def __aexit__(
@@ -47,16 +378,18 @@ class AsyncCosmosHelper:
         exc_val: Optional[BaseException],
         exc_tb: Optional[TracebackType],
     ) -> bool:
-        if self._client:
-            await self._client.close()
+        if self._entry:
+            self._pool.release(self._entry, exc_val)
+        self._entry = None
+        self._client = None
         return False
 
     async def get_container(self, container_name: str = FORGE_PROJECTS_CONTAINER) -> Any:
         """Get a container client."""
-        if not self._client:
+        if not self._entry:
             raise RuntimeError("CosmosClient not initialized. Use 'async with' context manager.")
-        database = self._client.get_database_client(DATABASE_NAME)
-        return database.get_container_client(container_name)
+        self._entry.operations += 1
+        return self._pool.get_container(self._entry, container_name)
 
     async def upsert_item(
         self,
@@ -77,6 +410,62 @@ class AsyncCosmosHelper:
         container = await self.get_container(container_name)
         return await container.read_item(item_id, partition_key=partition_key)
 
+    async def read_item_fields(
+        self,
+        item_id: str,
+        partition_key: str,
+        fields: Iterable[str],
+        container_name: str = FORGE_PROJECTS_CONTAINER,
+    ) -> Dict[str, Any]:
+        """
+        Read only the named top-level fields of an item, plus ``id`` and ``_etag``.
+
+        Runs a single-partition projection query, so large fields that are not
+        requested are neither read nor transferred. Raises
+        CosmosResourceNotFoundError like ``read_item`` when the item is missing.
+        """
+        names = list(dict.fromkeys(["id", "_etag", *fields]))
+        invalid = [name for name in names if not _FIELD_NAME.match(name)]
+        if invalid:
+            raise ValueError(f"Invalid field names: {invalid}")
+
+        container = await self.get_container(container_name)
+        query = f"SELECT {', '.join(f'c.{name}' for name in names)} FROM c WHERE c.id = @id"
+        async for item in container.query_items(
+            query=query, parameters=[{"name": "@id", "value": item_id}], partition_key=partition_key
+        ):
+            return item
+        raise CosmosResourceNotFoundError(status_code=404, message=f"Item {item_id} not found")
+
+    async def patch_item(
+        self,
+        item_id: str,
+        partition_key: str,
+        operations: List[Dict[str, Any]],
+        etag: Optional[str] = None,
+        filter_predicate: Optional[str] = None,
+        container_name: str = FORGE_PROJECTS_CONTAINER,
+    ) -> Dict[str, Any]:
+        """
+        Apply partial document update operations to an item and return the updated item.
+
+        With ``etag`` the update only applies if the item is unchanged since it was
+        read; with ``filter_predicate`` (e.g. ``"FROM c WHERE c.status = 'draft'"``)
+        only if the predicate holds. Either failing raises CosmosAccessConditionFailedError.
+        """
+        if len(operations) > MAX_PATCH_OPERATIONS:
+            raise ValueError(f"A patch may contain at most {MAX_PATCH_OPERATIONS} operations, got {len(operations)}")
+        conditions: Dict[str, Any] = {}
+        if etag:
+            conditions.update(etag=etag, match_condition=MatchConditions.IfNotModified)
+        if filter_predicate:
+            conditions["filter_predicate"] = filter_predicate
+
+        container = await self.get_container(container_name)
+        return await container.patch_item(
+            item=item_id, partition_key=partition_key, patch_operations=operations, **conditions
+        )
+
     async def query_items(
         self,
         query: str,
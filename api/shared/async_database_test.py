@@ -0,0 +1,259 @@
+"""
+Tests for async_database.py - pooled async Cosmos client and AsyncCosmosHelper
+"""
+
+import asyncio
+import threading
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from azure.core import MatchConditions
+from azure.core.exceptions import ServiceRequestError
+from azure.cosmos.exceptions import CosmosResourceNotFoundError
+
+from shared.async_database import FORGE_ANALYTICS_CONTAINER, AsyncCosmosHelper, CosmosClientPool, json_pointer
+
+CONNECTION_STRING = "AccountEndpoint=https://localhost;AccountKey=dGVzdA==;"
+
+
+def _make_client():
+    """Create a mock async CosmosClient with database/container proxies."""
+    client = MagicMock()
+    client.__aenter__ = AsyncMock(return_value=client)
+    client.close = AsyncMock()
+    database = MagicMock()
+    database.read = AsyncMock(return_value={"id": "SutraDB"})
+    container = MagicMock()
+    container.upsert_item = AsyncMock(return_value={"id": "p1"})
+    container.read_item = AsyncMock(return_value={"id": "p1"})
+    container.patch_item = AsyncMock(return_value={"id": "p1", "name": "patched"})
+    client.get_database_client.return_value = database
+    database.get_container_client.return_value = container
+    return client
+
+
+@pytest.fixture
+def mock_cosmos():
+    """Patch CosmosClient.from_connection_string to hand out fresh mock clients."""
+    with patch("shared.async_database.CosmosClient.from_connection_string", side_effect=lambda _: _make_client()) as m:
+        yield m
+
+
+class TestCosmosClientPool:
+    """Test suite for CosmosClientPool."""
+
+    @pytest.mark.asyncio
+    async def test_client_reused_across_helpers(self, mock_cosmos):
+        pool = CosmosClientPool()
+
+        for _ in range(5):
+            async with AsyncCosmosHelper(CONNECTION_STRING, pool=pool) as db:
+                await db.upsert_item({"id": "p1"})
+
+        assert mock_cosmos.call_count == 1
+        metrics = pool.get_metrics()
+        assert metrics["clients_created"] == 1
+        assert metrics["acquisitions"] == 5
+        assert metrics["reuses"] == 4
+        assert metrics["reuse_rate"] == 0.8
+        assert metrics["active_leases"] == 0
+        assert metrics["connections"][0]["operations"] == 5
+
+    @pytest.mark.asyncio
+    async def test_client_not_closed_on_exit(self, mock_cosmos):
+        pool = CosmosClientPool()
+
+        async with AsyncCosmosHelper(CONNECTION_STRING, pool=pool) as db:
+            client = db._client
+
+        client.close.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_lazy_warm_up_runs_once(self, mock_cosmos):
+        pool = CosmosClientPool()
+
+        async with AsyncCosmosHelper(CONNECTION_STRING, pool=pool) as db:
+            client = db._client
+        async with AsyncCosmosHelper(CONNECTION_STRING, pool=pool):
+            pass
+
+        client.__aenter__.assert_awaited_once()
+        assert pool.metrics.warm_ups == 1
+
+    @pytest.mark.asyncio
+    async def test_container_proxies_cached(self, mock_cosmos):
+        pool = CosmosClientPool()
+
+        async with AsyncCosmosHelper(CONNECTION_STRING, pool=pool) as db:
+            first = await db.get_container()
+            second = await db.get_container()
+            await db.get_container(FORGE_ANALYTICS_CONTAINER)
+
+        assert first is second
+        assert pool.metrics.container_cache_hits == 1
+        assert pool.metrics.container_cache_misses == 2
+
+    @pytest.mark.asyncio
+    async def test_connection_error_triggers_reconnect(self, mock_cosmos):
+        pool = CosmosClientPool()
+
+        with pytest.raises(ServiceRequestError):
+            async with AsyncCosmosHelper(CONNECTION_STRING, pool=pool) as db:
+                stale_client = db._client
+                stale_client.get_database_client.return_value.read.side_effect = ServiceRequestError("down")
+                raise ServiceRequestError("connection reset")
+
+        async with AsyncCosmosHelper(CONNECTION_STRING, pool=pool) as db:
+            assert db._client is not stale_client
+
+        stale_client.close.assert_awaited_once()
+        assert pool.metrics.reconnects == 1
+        assert pool.metrics.health_check_failures == 1
+
+    @pytest.mark.asyncio
+    async def test_reconnect_waits_for_in_flight_leases(self, mock_cosmos):
+        pool = CosmosClientPool()
+
+        async with AsyncCosmosHelper(CONNECTION_STRING, pool=pool) as in_flight:
+            stale_client = in_flight._client
+            stale_client.get_database_client.return_value.read.side_effect = ServiceRequestError("down")
+            pool._entries[CONNECTION_STRING].healthy = False
+
+            async with AsyncCosmosHelper(CONNECTION_STRING, pool=pool) as db:
+                assert db._client is not stale_client
+
+            # The first block still holds a lease on the old client
+            stale_client.close.assert_not_called()
+            assert pool.get_metrics()["retired_clients"] == 1
+            await in_flight.upsert_item({"id": "p1"})
+
+        await asyncio.sleep(0)
+        stale_client.close.assert_awaited_once()
+        assert pool.get_metrics()["retired_clients"] == 0
+        assert pool.metrics.active_leases == 0
+
+    @pytest.mark.asyncio
+    async def test_idle_client_from_another_loop_is_closed(self, mock_cosmos):
+        pool = CosmosClientPool()
+        other_loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=other_loop.run_forever, daemon=True)
+        thread.start()
+        try:
+            old_client = asyncio.run_coroutine_threadsafe(pool.warm_up(CONNECTION_STRING), other_loop).result().client
+
+            async with AsyncCosmosHelper(CONNECTION_STRING, pool=pool) as db:
+                assert db._client is not old_client
+
+            await asyncio.sleep(0.05)
+            old_client.close.assert_awaited_once()
+        finally:
+            other_loop.call_soon_threadsafe(other_loop.stop)
+            thread.join()
+            other_loop.close()
+
+    @pytest.mark.asyncio
+    async def test_healthy_probe_keeps_client(self, mock_cosmos):
+        pool = CosmosClientPool(health_check_interval=0)
+
+        async with AsyncCosmosHelper(CONNECTION_STRING, pool=pool) as db:
+            client = db._client
+        async with AsyncCosmosHelper(CONNECTION_STRING, pool=pool) as db:
+            assert db._client is client
+
+        assert pool.metrics.health_checks == 2
+        assert pool.metrics.reconnects == 0
+
+    @pytest.mark.asyncio
+    async def test_cosmos_errors_do_not_mark_unhealthy(self, mock_cosmos):
+        pool = CosmosClientPool()
+
+        with pytest.raises(CosmosResourceNotFoundError):
+            async with AsyncCosmosHelper(CONNECTION_STRING, pool=pool) as db:
+                raise CosmosResourceNotFoundError(message="Not found")
+
+        assert pool.get_metrics()["connections"][0]["healthy"] is True
+
+    @pytest.mark.asyncio
+    async def test_warm_up_primes_containers(self, mock_cosmos):
+        pool = CosmosClientPool()
+
+        await pool.warm_up(CONNECTION_STRING, container_names=["ForgeProjects", FORGE_ANALYTICS_CONTAINER])
+
+        connection = pool.get_metrics()["connections"][0]
+        assert connection["warmed_up"] is True
+        assert connection["cached_containers"] == ["ForgeAnalytics", "ForgeProjects"]
+
+    @pytest.mark.asyncio
+    async def test_close_all(self, mock_cosmos):
+        pool = CosmosClientPool()
+
+        async with AsyncCosmosHelper(CONNECTION_STRING, pool=pool) as db:
+            client = db._client
+        await pool.close_all()
+
+        client.close.assert_awaited_once()
+        assert pool.get_metrics()["pooled_clients"] == 0
+
+    @pytest.mark.asyncio
+    async def test_get_container_requires_context(self):
+        helper = AsyncCosmosHelper(CONNECTION_STRING, pool=CosmosClientPool())
+
+        with pytest.raises(RuntimeError):
+            await helper.get_container()
+
+
+async def _items(*items):
+    for item in items:
+        yield item
+
+
+class TestPartialDocumentAccess:
+    """Test suite for projected reads and patch updates."""
+
+    @pytest.mark.asyncio
+    async def test_read_item_fields_projects_within_partition(self, mock_cosmos):
+        async with AsyncCosmosHelper(CONNECTION_STRING, pool=CosmosClientPool()) as db:
+            container = await db.get_container()
+            container.query_items = MagicMock(return_value=_items({"id": "p1", "_etag": "e1", "name": "P"}))
+
+            item = await db.read_item_fields("p1", partition_key="p1", fields=["name", "id"])
+
+        assert item == {"id": "p1", "_etag": "e1", "name": "P"}
+        kwargs = container.query_items.call_args.kwargs
+        assert kwargs["query"] == "SELECT c.id, c._etag, c.name FROM c WHERE c.id = @id"
+        assert kwargs["partition_key"] == "p1"
+
+    @pytest.mark.asyncio
+    async def test_read_item_fields_missing_item_and_bad_field(self, mock_cosmos):
+        async with AsyncCosmosHelper(CONNECTION_STRING, pool=CosmosClientPool()) as db:
+            container = await db.get_container()
+            container.query_items = MagicMock(return_value=_items())
+
+            with pytest.raises(CosmosResourceNotFoundError):
+                await db.read_item_fields("p1", partition_key="p1", fields=["name"])
+            with pytest.raises(ValueError):
+                await db.read_item_fields("p1", partition_key="p1", fields=["name FROM c; --"])
+
+    @pytest.mark.asyncio
+    async def test_patch_item_with_etag(self, mock_cosmos):
+        operations = [{"op": "set", "path": "/name", "value": "patched"}]
+
+        async with AsyncCosmosHelper(CONNECTION_STRING, pool=CosmosClientPool()) as db:
+            container = await db.get_container()
+            result = await db.patch_item("p1", partition_key="p1", operations=operations, etag="e1")
+
+            with pytest.raises(ValueError):
+                await db.patch_item("p1", partition_key="p1", operations=operations * 11)
+
+        assert result["name"] == "patched"
+        container.patch_item.assert_awaited_once_with(
+            item="p1",
+            partition_key="p1",
+            patch_operations=operations,
+            etag="e1",
+            match_condition=MatchConditions.IfNotModified,
+        )
+
+    def test_json_pointer_escapes_keys(self):
+        assert json_pointer("openai/gpt-4o") == "openai~1gpt-4o"
+        assert json_pointer("a~b") == "a~0b"
@@ -0,0 +1,617 @@
+"""
+Batch LLM jobs: one prompt template run over many variable rows and models.
+
+A job is submitted once (template, variable rows, models) instead of as N x M
+calls to ``llm_execute_api``. The worker that accepts it expands the job into
+one task per (row, model) and runs them on the user's own provider keys:
+
+- a job is only accepted when the user has a key for every model's provider
+  and the estimated cost of the whole job fits in their budget;
+- at most ``provider_concurrency`` tasks run per provider at a time;
+- failures are retried with full-jitter exponential backoff;
+- usage is reported to CostTracker like any other execution.
+
+The job document and its results live in the Executions container (partitioned
+by ``userId``; ``type`` is ``batch_job`` / ``batch_result``). Progress counters
+are flushed together with each batch of results, so a job can be resumed: tasks
+that already have a result document are skipped.
+
+Only one worker runs a job at a time. ``run`` claims the job document with an
+ETag-guarded replace that records ``ownerId`` and ``heartbeatAt``, and every
+progress flush refreshes the heartbeat. ``resume`` only takes a job over once
+the heartbeat is older than ``lease_seconds``; a worker whose lease was taken
+stops at its next flush. Results are read back in row
+order and served as JSON lines. The container has only the default index, so the
+query orders by ``rowIndex`` alone and results within a row are sorted by model
+here.
+"""
+
+import asyncio
+import logging
+import os
+import random
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+
+from azure.cosmos.exceptions import CosmosAccessConditionFailedError
+
+from .database import get_database_manager
+from .pricing import get_pricing_registry
+
+logger = logging.getLogger(__name__)
+
+EXECUTIONS_CONTAINER = "Executions"
+BATCH_JOB_TYPE = "batch_job"
+BATCH_RESULT_TYPE = "batch_result"
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATUSES = (COMPLETED, FAILED, CANCELLED)
+
+DEFAULT_PROVIDER_CONCURRENCY = 4
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_BACKOFF_SECONDS = 0.5
+MAX_BACKOFF_SECONDS = 30.0
+MAX_BATCH_ROWS = 1000
+MAX_BATCH_MODELS = 10
+# Results per write; transactional batches take at most 100 operations
+RESULT_FLUSH_SIZE = 50
+# A job whose owner has not flushed for this long can be resumed by another worker
+DEFAULT_LEASE_SECONDS = 600
+DEFAULT_ETAG_RETRIES = 3
+
+RESULTS_QUERY = "SELECT * FROM c WHERE c.type = @type AND c.batchJobId = @job_id ORDER BY c.rowIndex ASC"
+USER_KEYS_QUERY = "SELECT c.llmApiKeys FROM c WHERE c.id = @user_id"
+USERS_CONTAINER = "Users"
+# llmApiKeys entries that are not named after their provider
+USER_KEY_NAMES = {"google": "google_gemini"}
+RESULT_STATUS_QUERY = "SELECT c.id, c.status, c.cost FROM c WHERE c.type = @type AND c.batchJobId = @job_id"
+
+
+class BatchJobError(ValueError):
+    """Raised for an invalid batch job submission."""
+
+
+class BatchJobLeaseError(RuntimeError):
+    """Raised when another worker has taken over a running batch job."""
+
+
+def render_prompt(template: str, variables: Dict[str, Any]) -> str:
+    """Replace ``{{name}}`` placeholders with the matching variable values."""
+    prompt = template
+    for var_name, var_value in variables.items():
+        prompt = prompt.replace(f"{{{{{var_name}}}}}", str(var_value))
+    return prompt
+
+
+def backoff_delay(attempt: int, base: float = DEFAULT_BACKOFF_SECONDS, cap: float = MAX_BACKOFF_SECONDS) -> float:
+    """Full-jitter exponential backoff before retry number ``attempt`` (1-based)."""
+    return random.uniform(0, min(cap, base * (2 ** (attempt - 1))))
+
+
+@dataclass
+class BatchJob:
+    """A submitted batch job and its progress counters."""
+
+    id: str
+    userId: str
+    template: str
+    rows: List[Dict[str, Any]]
+    models: List[str]
+    temperature: float = 0.7
+    maxTokens: int = 1000
+    status: str = QUEUED
+    totalTasks: int = 0
+    completedTasks: int = 0
+    failedTasks: int = 0
+    totalCost: float = 0.0
+    createdAt: str = ""
+    updatedAt: str = ""
+    finishedAt: Optional[str] = None
+    error: Optional[str] = None
+    ownerId: Optional[str] = None
+    heartbeatAt: Optional[str] = None
+    type: str = BATCH_JOB_TYPE
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "BatchJob":
+        return cls(**{name: data[name] for name in cls.__dataclass_fields__ if name in data})
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    def summary(self) -> Dict[str, Any]:
+        """Job status without the template and rows, for API responses."""
+        data = self.to_dict()
+        data.pop("template")
+        data.pop("rows")
+        data["rowCount"] = len(self.rows)
+        data["progress"] = round((self.completedTasks + self.failedTasks) / self.totalTasks, 4) if self.totalTasks else 0.0
+        return data
+
+    def tasks(self) -> List[Tuple[int, str]]:
+        return [(row_index, model) for row_index in range(len(self.rows)) for model in self.models]
+
+
+def result_id(job_id: str, row_index: int, model: str) -> str:
+    return f"{job_id}_{row_index}_{model}"
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class BatchJobManager:
+    """Submits, runs and reports on batch LLM jobs."""
+
+    def __init__(
+        self,
+        llm_manager: Any = None,
+        db_manager: Any = None,
+        provider_concurrency: Optional[int] = None,
+        max_attempts: Optional[int] = None,
+        backoff_seconds: Optional[float] = None,
+        keyvault_manager: Any = None,
+        budget_manager: Any = None,
+        lease_seconds: Optional[float] = None,
+    ):
+        self._llm_manager = llm_manager
+        self._db_manager = db_manager
+        self._keyvault_manager = keyvault_manager
+        self._budget_manager = budget_manager
+        self.provider_concurrency = provider_concurrency or int(
+            os.getenv("LLM_BATCH_PROVIDER_CONCURRENCY", str(DEFAULT_PROVIDER_CONCURRENCY))
+        )
+        self.max_attempts = max_attempts or int(os.getenv("LLM_BATCH_MAX_ATTEMPTS", str(DEFAULT_MAX_ATTEMPTS)))
+        self.backoff_seconds = (
+            backoff_seconds
+            if backoff_seconds is not None
+            else float(os.getenv("LLM_BATCH_BACKOFF_SECONDS", str(DEFAULT_BACKOFF_SECONDS)))
+        )
+        self.lease_seconds = lease_seconds or float(os.getenv("LLM_BATCH_LEASE_SECONDS", str(DEFAULT_LEASE_SECONDS)))
+        # Identifies this worker in the ownerId of the jobs it runs
+        self.worker_id = f"worker_{uuid.uuid4().hex}"
+        # Jobs running in this worker, by id
+        self._running: Dict[str, asyncio.Task] = {}
+        # ETag of the last job document written by this worker, by job id
+        self._etags: Dict[str, Optional[str]] = {}
+
+    @property
+    def llm_manager(self):
+        if self._llm_manager is None:
+            from .llm_client import get_llm_manager
+
+            self._llm_manager = get_llm_manager()
+        return self._llm_manager
+
+    @property
+    def db_manager(self):
+        if self._db_manager is not None:
+            return self._db_manager
+        return get_database_manager()
+
+    @property
+    def keyvault_manager(self):
+        if self._keyvault_manager is None:
+            from .keyvault_manager import get_keyvault_manager
+
+            self._keyvault_manager = get_keyvault_manager()
+        return self._keyvault_manager
+
+    @property
+    def budget_manager(self):
+        if self._budget_manager is None:
+            from .budget import get_budget_manager
+
+            self._budget_manager = get_budget_manager()
+        return self._budget_manager
+
+    async def submit(
+        self,
+        user_id: str,
+        template: str,
+        rows: List[Dict[str, Any]],
+        models: List[str],
+        temperature: float = 0.7,
+        max_tokens: int = 1000,
+        start: bool = True,
+    ) -> BatchJob:
+        """
+        Validate and persist a job, then start running it in the background.
+
+        Raises BatchJobError when the input is invalid, a model's provider has no
+        key of the user's, or the estimated cost would exceed the user's budget.
+        """
+        if not template:
+            raise BatchJobError("template is required")
+        if not rows or not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+            raise BatchJobError("rows must be a non-empty list of variable objects")
+        if not models or not isinstance(models, list) or not all(isinstance(model, str) for model in models):
+            raise BatchJobError("models must be a non-empty list of model names")
+        if len(rows) > MAX_BATCH_ROWS:
+            raise BatchJobError(f"A batch job can have at most {MAX_BATCH_ROWS} rows")
+        if len(models) > MAX_BATCH_MODELS:
+            raise BatchJobError(f"A batch job can use at most {MAX_BATCH_MODELS} models")
+
+        now = _now()
+        job = BatchJob(
+            id=f"batch_{uuid.uuid4().hex}",
+            userId=user_id,
+            template=template,
+            rows=rows,
+            models=list(dict.fromkeys(models)),
+            temperature=temperature,
+            maxTokens=max_tokens,
+            createdAt=now,
+            updatedAt=now,
+        )
+        job.totalTasks = len(job.rows) * len(job.models)
+
+        providers = await self._user_providers(user_id, job.models)
+        estimated_cost = self.estimate_cost(job)
+        budget = await self.budget_manager.check_user_budget(user_id, additional_cost=estimated_cost)
+        if not budget.get("within_budget", False):
+            raise BatchJobError(
+                f"Estimated cost ${estimated_cost:.2f} exceeds the remaining budget "
+                f"(${budget.get('current_cost', 0):.2f} of ${budget.get('budget_limit', 0):.2f} used)"
+            )
+
+        await self.db_manager.create_item(EXECUTIONS_CONTAINER, job.to_dict(), partition_key=user_id)
+        logger.info(f"Batch job {job.id} submitted by {user_id}: {job.totalTasks} tasks")
+
+        if start:
+            self.start(job, providers)
+        return job
+
+    def start(self, job: BatchJob, providers: Optional[Dict[str, Any]] = None) -> asyncio.Task:
+        """Run ``job`` as a background task in this worker."""
+        task = asyncio.ensure_future(self.run(job, providers))
+        self._running[job.id] = task
+        task.add_done_callback(lambda _: self._running.pop(job.id, None))
+        return task
+
+    async def get_job(self, user_id: str, job_id: str) -> Optional[BatchJob]:
+        item = await self.db_manager.read_item(EXECUTIONS_CONTAINER, job_id, user_id)
+        if not item or item.get("type") != BATCH_JOB_TYPE or item.get("userId") != user_id:
+            return None
+        return BatchJob.from_dict(item)
+
+    async def cancel(self, user_id: str, job_id: str) -> Optional[BatchJob]:
+        """Stop a job; results written so far are kept."""
+        job = await self.get_job(user_id, job_id)
+        if job is None:
+            return None
+        task = self._running.get(job_id)
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            job = await self.get_job(user_id, job_id) or job
+        if job.status not in FINISHED_STATUSES:
+            job.status = CANCELLED
+            job.finishedAt = job.updatedAt = _now()
+            await self._save_job(job)
+        return job
+
+    async def resume(self, user_id: str, job_id: str) -> Optional[BatchJob]:
+        """Restart an unfinished job whose worker went away; finished tasks are skipped."""
+        job = await self.get_job(user_id, job_id)
+        if job is None or job.status in FINISHED_STATUSES or job_id in self._running:
+            return job
+        if job.ownerId and not self.lease_expired(job):
+            # Another worker is still heartbeating
+            return job
+        self.start(job)
+        return job
+
+    def lease_expired(self, job: BatchJob) -> bool:
+        """Whether the job has no owner or its owner's last heartbeat is older than the lease."""
+        if not job.ownerId or not job.heartbeatAt:
+            return True
+        age = datetime.now(timezone.utc) - datetime.fromisoformat(job.heartbeatAt)
+        return age.total_seconds() > self.lease_seconds
+
+    def estimate_cost(self, job: BatchJob) -> float:
+        """Upper-bound cost of every task: ~4 characters per prompt token and ``maxTokens`` of output."""
+        pricing = get_pricing_registry()
+        prompt_tokens = [len(render_prompt(job.template, row)) // 4 for row in job.rows]
+        total = 0.0
+        for model in job.models:
+            provider = self.llm_manager.resolve_provider_from_model(model)
+            for tokens in prompt_tokens:
+                total += pricing.cost(provider, model, tokens, job.maxTokens) or 0.0
+        return total
+
+    async def iter_results(self, user_id: str, job_id: str) -> AsyncIterator[Dict[str, Any]]:
+        """Result documents for a job in row order, then model order, without Cosmos system fields."""
+        parameters = [{"name": "@type", "value": BATCH_RESULT_TYPE}, {"name": "@job_id", "value": job_id}]
+        row: List[Dict[str, Any]] = []
+        async for item in self.db_manager.iter_query_items(
+            EXECUTIONS_CONTAINER, RESULTS_QUERY, parameters, partition_key=user_id
+        ):
+            if row and item.get("rowIndex") != row[0].get("rowIndex"):
+                for result in sorted(row, key=lambda r: r.get("model") or ""):
+                    yield result
+                row = []
+            row.append({key: value for key, value in item.items() if not key.startswith("_")})
+        for result in sorted(row, key=lambda r: r.get("model") or ""):
+            yield result
+
+    async def run(self, job: BatchJob, providers: Optional[Dict[str, Any]] = None) -> BatchJob:
+        """
+        Execute every unfinished task of ``job`` and persist results and progress.
+
+        ``providers`` are the user's provider copies from submission; a resumed job
+        resolves them again.
+        """
+        if not await self._claim(job):
+            logger.info(f"Batch job {job.id} is owned by another worker; not running it here")
+            return job
+        done = await self._load_finished(job)
+        pending = [(row, model) for row, model in job.tasks() if result_id(job.id, row, model) not in done]
+
+        semaphores: Dict[str, asyncio.Semaphore] = {}
+        buffer: List[Dict[str, Any]] = []
+        flush_lock = asyncio.Lock()
+        lease_lost = False
+
+        async def flush() -> None:
+            nonlocal lease_lost
+            async with flush_lock:
+                if not buffer:
+                    return
+                results = buffer[:]
+                del buffer[:]
+                await self.db_manager.upsert_items_batch(EXECUTIONS_CONTAINER, results, partition_key=job.userId)
+                if not await self._save_owned_job(job):
+                    lease_lost = True
+                    raise BatchJobLeaseError(f"Batch job {job.id} was taken over by another worker")
+
+        async def run_task(row_index: int, model: str) -> None:
+            provider = self.llm_manager.resolve_provider_from_model(model)
+            semaphore = semaphores.setdefault(provider, asyncio.Semaphore(self.provider_concurrency))
+            result = await self._execute_task(job, row_index, model, provider, providers[provider], semaphore)
+            if result["status"] == COMPLETED:
+                job.completedTasks += 1
+                job.totalCost += result.get("cost") or 0.0
+            else:
+                job.failedTasks += 1
+            buffer.append(result)
+            if len(buffer) >= RESULT_FLUSH_SIZE or self._heartbeat_due(job):
+                await flush()
+
+        try:
+            if providers is None:
+                providers = await self._user_providers(job.userId, job.models)
+            async with asyncio.TaskGroup() as group:
+                for row_index, model in pending:
+                    group.create_task(run_task(row_index, model))
+            await flush()
+            job.status = COMPLETED if job.completedTasks or not job.totalTasks else FAILED
+        except asyncio.CancelledError:
+            await asyncio.shield(flush())
+            job.status = CANCELLED
+            raise
+        except Exception as e:
+            if lease_lost:
+                # The new owner carries on from the results written so far
+                logger.warning(f"Batch job {job.id} was taken over by another worker; stopping here")
+                return job
+            logger.error(f"Batch job {job.id} failed: {e}")
+            job.status = FAILED
+            job.error = str(e)
+        finally:
+            if not lease_lost:
+                job.finishedAt = _now()
+                await asyncio.shield(self._save_owned_job(job))
+                logger.info(
+                    f"Batch job {job.id} {job.status}: {job.completedTasks} completed, {job.failedTasks} failed, "
+                    f"${job.totalCost:.4f}"
+                )
+            self._etags.pop(job.id, None)
+        return job
+
+    async def _execute_task(
+        self,
+        job: BatchJob,
+        row_index: int,
+        model: str,
+        provider: str,
+        llm_provider: Any,
+        semaphore: asyncio.Semaphore,
+    ) -> Dict[str, Any]:
+        variables = job.rows[row_index]
+        prompt = render_prompt(job.template, variables)
+        request_id = result_id(job.id, row_index, model)
+        result: Dict[str, Any] = {
+            "id": request_id,
+            "type": BATCH_RESULT_TYPE,
+            "userId": job.userId,
+            "batchJobId": job.id,
+            "rowIndex": row_index,
+            "model": model,
+            "provider": provider,
+            "variables": variables,
+        }
+
+        error = None
+        for attempt in range(1, self.max_attempts + 1):
+            started = time.monotonic()
+            try:
+                async with semaphore:
+                    response = await llm_provider.execute_prompt(
+                        prompt,
+                        {"user_id": job.userId, "batch_job_id": job.id},
+                        model=model,
+                        temperature=job.temperature,
+                        max_tokens=job.maxTokens,
+                    )
+            except ValueError as e:
+                # Unknown model: retrying cannot help
+                error = str(e)
+                break
+            except Exception as e:
+                error = str(e)
+                if attempt < self.max_attempts:
+                    delay = backoff_delay(attempt, self.backoff_seconds)
+                    logger.warning(f"Batch task {request_id} attempt {attempt} failed ({e}), retrying in {delay:.2f}s")
+                    await asyncio.sleep(delay)
+                continue
+
+            duration_ms = int((time.monotonic() - started) * 1000)
+            await self._track_usage(job, request_id, provider, model, response, duration_ms)
+            result.update(
+                status=COMPLETED,
+                attempts=attempt,
+                response=response.response,
+                usage=asdict(response.usage),
+                cost=response.cost,
+                durationMs=duration_ms,
+                finishReason=response.finish_reason,
+                completedAt=_now(),
+            )
+            return result
+
+        result.update(status=FAILED, attempts=attempt, error=error, completedAt=_now())
+        return result
+
+    async def _user_providers(self, user_id: str, models: List[str]) -> Dict[str, Any]:
+        """Copies of the providers ``models`` run on that use the user's own keys, by provider name."""
+        rows = await self.db_manager.query_items(
+            USERS_CONTAINER, USER_KEYS_QUERY, [{"name": "@user_id", "value": user_id}], partition_key=user_id
+        )
+        user_keys = (rows[0].get("llmApiKeys") if rows else None) or {}
+
+        providers: Dict[str, Any] = {}
+        for provider in dict.fromkeys(self.llm_manager.resolve_provider_from_model(model) for model in models):
+            key_name = USER_KEY_NAMES.get(provider, provider)
+            platform_provider = self.llm_manager.providers.get(provider)
+            api_key = None
+            if key_name in user_keys and platform_provider is not None:
+                api_key = await self.keyvault_manager.get_api_key(user_id, key_name)
+            if not api_key:
+                raise BatchJobError(f"No API key configured for {provider}; add one to run its models in a batch")
+            try:
+                providers[provider] = platform_provider.with_api_key(api_key)
+            except NotImplementedError as e:
+                raise BatchJobError(f"{provider} models cannot run in batch jobs: {e}")
+        return providers
+
+    async def _track_usage(
+        self, job: BatchJob, request_id: str, provider: str, model: str, response: Any, duration_ms: int
+    ) -> None:
+        cost_tracker = getattr(self.llm_manager, "cost_tracker", None)
+        if cost_tracker is None:
+            return
+        try:
+            await cost_tracker.track_llm_usage(
+                user_id=job.userId,
+                session_id=job.id,
+                provider=provider,
+                model=model,
+                prompt_tokens=response.usage.prompt_tokens,
+                completion_tokens=response.usage.completion_tokens,
+                execution_time_ms=duration_ms,
+                request_id=request_id,
+                metadata={"batch_job_id": job.id},
+            )
+        except Exception as e:
+            logger.error(f"Failed to track batch usage for {request_id}: {e}")
+
+    async def _load_finished(self, job: BatchJob) -> Set[str]:
+        """Ids of tasks that already have a result; resets the counters to match them."""
+        if not job.completedTasks and not job.failedTasks:
+            return set()
+        parameters = [{"name": "@type", "value": BATCH_RESULT_TYPE}, {"name": "@job_id", "value": job.id}]
+        rows = await self.db_manager.query_items(
+            EXECUTIONS_CONTAINER, RESULT_STATUS_QUERY, parameters, partition_key=job.userId
+        )
+        # Saved counters may include results that were still buffered when the worker stopped
+        completed = [row for row in rows if row.get("status") == COMPLETED]
+        job.completedTasks = len(completed)
+        job.failedTasks = len(rows) - len(completed)
+        job.totalCost = sum(row.get("cost") or 0.0 for row in completed)
+        return {row["id"] for row in rows}
+
+    async def _claim(self, job: BatchJob) -> bool:
+        """
+        Take the job's ownership lease with an ETag-guarded replace.
+
+        False when the job has finished or another worker holds a live lease, or
+        claimed it first.
+        """
+        item = await self.db_manager.read_item(EXECUTIONS_CONTAINER, job.id, job.userId)
+        if not item:
+            return False
+        current = BatchJob.from_dict({**job.to_dict(), **item})
+        if current.status in FINISHED_STATUSES:
+            return False
+        if current.ownerId not in (None, self.worker_id) and not self.lease_expired(current):
+            return False
+
+        job.ownerId = self.worker_id
+        job.status = RUNNING
+        job.heartbeatAt = job.updatedAt = _now()
+        try:
+            saved = await self.db_manager.replace_item(EXECUTIONS_CONTAINER, job.to_dict(), etag=item.get("_etag"))
+        except CosmosAccessConditionFailedError:
+            return False
+        self._etags[job.id] = saved.get("_etag")
+        logger.info(f"Batch job {job.id} claimed by {self.worker_id}")
+        return True
+
+    def _heartbeat_due(self, job: BatchJob) -> bool:
+        """Flush early when a third of the lease has passed since the last heartbeat."""
+        if not job.heartbeatAt:
+            return False
+        age = datetime.now(timezone.utc) - datetime.fromisoformat(job.heartbeatAt)
+        return age.total_seconds() > self.lease_seconds / 3
+
+    async def _save_owned_job(self, job: BatchJob) -> bool:
+        """
+        Persist progress of a job this worker runs and refresh its heartbeat.
+
+        The write is conditional on the last ETag this worker saw; after a conflict
+        it is retried only while the document still names this worker as owner.
+        Returns False once another worker has taken the job over.
+        """
+        job.heartbeatAt = job.updatedAt = _now()
+        for _ in range(DEFAULT_ETAG_RETRIES):
+            try:
+                saved = await self.db_manager.replace_item(EXECUTIONS_CONTAINER, job.to_dict(), etag=self._etags.get(job.id))
+            except CosmosAccessConditionFailedError:
+                item = await self.db_manager.read_item(EXECUTIONS_CONTAINER, job.id, job.userId)
+                if not item or item.get("ownerId") != self.worker_id:
+                    return False
+                self._etags[job.id] = item.get("_etag")
+                continue
+            except Exception as e:
+                logger.error(f"Failed to persist batch job {job.id}: {e}")
+                return True
+            self._etags[job.id] = saved.get("_etag")
+            return True
+        logger.error(f"Gave up persisting batch job {job.id} after {DEFAULT_ETAG_RETRIES} ETag conflicts")
+        return True
+
+    async def _save_job(self, job: BatchJob) -> None:
+        try:
+            await self.db_manager.update_item(EXECUTIONS_CONTAINER, job.to_dict(), partition_key=job.userId)
+        except Exception as e:
+            logger.error(f"Failed to persist batch job {job.id}: {e}")
+
+
+# Global batch job manager - initialized lazily
+_batch_job_manager: Optional[BatchJobManager] = None
+
+
+def get_batch_job_manager() -> BatchJobManager:
+    """Get the global batch job manager."""
+    global _batch_job_manager
+    if _batch_job_manager is None:
+        _batch_job_manager = BatchJobManager()
+    return _batch_job_manager
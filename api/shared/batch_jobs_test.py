@@ -0,0 +1,339 @@
+"""
+Tests for batch_jobs.py - batch LLM job execution
+"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+from azure.cosmos.exceptions import CosmosAccessConditionFailedError
+
+from shared.batch_jobs import (
+    BATCH_RESULT_TYPE,
+    CANCELLED,
+    COMPLETED,
+    FAILED,
+    RUNNING,
+    BatchJobError,
+    BatchJobManager,
+    backoff_delay,
+    render_prompt,
+    result_id,
+)
+from shared.llm_client import LLMManager
+from shared.llm_providers.base_provider import LLMResponse, TokenUsage
+from shared.pricing import get_pricing_registry
+
+
+class FakeProvider:
+    """A platform provider whose per-user copies report back to the FakeLLMManager."""
+
+    def __init__(self, manager, name, api_key="platform-key"):
+        self.manager = manager
+        self.name = name
+        self.api_key = api_key
+
+    def with_api_key(self, api_key):
+        if self.name == "google":
+            raise NotImplementedError("google does not support per-request API keys")
+        return FakeProvider(self.manager, self.name, api_key)
+
+    async def execute_prompt(self, prompt, context=None, model=None, **kwargs):
+        return await self.manager.execute(self, prompt, model)
+
+
+class FakeLLMManager:
+    """Stands in for LLMManager, recording calls and peak concurrency per provider."""
+
+    resolve_provider_from_model = staticmethod(LLMManager.resolve_provider_from_model)
+
+    def __init__(self, failures=None, delay=0.0):
+        self.failures = dict(failures or {})
+        self.delay = delay
+        self.calls = []
+        self.keys = set()
+        self.active = {}
+        self.peak = {}
+        self.providers = {name: FakeProvider(self, name) for name in ("openai", "anthropic", "google")}
+        self.cost_tracker = Mock(track_llm_usage=AsyncMock())
+
+    async def execute(self, provider, prompt, model):
+        provider_name = provider.name
+        self.calls.append((provider_name, model, prompt))
+        self.keys.add(provider.api_key)
+        self.active[provider_name] = self.active.get(provider_name, 0) + 1
+        self.peak[provider_name] = max(self.peak.get(provider_name, 0), self.active[provider_name])
+        try:
+            await asyncio.sleep(self.delay)
+            if self.failures.get(prompt, 0) > 0:
+                self.failures[prompt] -= 1
+                raise RuntimeError("provider overloaded")
+            return LLMResponse.create(provider_name, model, f"answer to {prompt}", TokenUsage(10, 5), cost=0.001)
+        finally:
+            self.active[provider_name] -= 1
+
+
+def make_db():
+    """Mock database that keeps job documents with an ETag that changes on every write."""
+    db = Mock()
+    db.documents = {}
+    db.upsert_items_batch = AsyncMock()
+    db.user_keys = {"openai": {"configured": True}, "anthropic": {"configured": True}}
+    db.results = []
+
+    def store(item):
+        previous = db.documents.get(item["id"], {})
+        db.documents[item["id"]] = {**item, "_etag": str(int(previous.get("_etag", "0")) + 1)}
+        return dict(db.documents[item["id"]])
+
+    async def create_item(container_name, item, partition_key=None):
+        return store(item)
+
+    async def update_item(container_name, item, partition_key):
+        return store(item)
+
+    async def replace_item(container_name, item, etag=None):
+        if etag and db.documents.get(item["id"], {}).get("_etag") != etag:
+            raise CosmosAccessConditionFailedError(message="Precondition failed")
+        return store(item)
+
+    async def read_item(container_name, item_id, partition_key):
+        item = db.documents.get(item_id)
+        return dict(item) if item else None
+
+    db.create_item = AsyncMock(side_effect=create_item)
+    db.update_item = AsyncMock(side_effect=update_item)
+    db.replace_item = AsyncMock(side_effect=replace_item)
+    db.read_item = AsyncMock(side_effect=read_item)
+
+    async def query_items(container_name, query, parameters=None, partition_key=None):
+        if container_name == "Users":
+            return [{"llmApiKeys": db.user_keys}]
+        return db.results
+
+    db.query_items = AsyncMock(side_effect=query_items)
+    return db
+
+
+def make_manager(llm=None, db=None, within_budget=True, **kwargs):
+    budget = Mock(check_user_budget=AsyncMock(return_value={"within_budget": within_budget, "budget_limit": 100.0}))
+    return BatchJobManager(
+        llm_manager=llm or FakeLLMManager(),
+        db_manager=db or make_db(),
+        keyvault_manager=Mock(get_api_key=AsyncMock(return_value="user-key")),
+        budget_manager=budget,
+        **kwargs,
+    )
+
+
+def written_results(db):
+    return [item for call in db.upsert_items_batch.call_args_list for item in call.args[1]]
+
+
+class TestBatchJobManager:
+    """Test suite for batch job submission and execution."""
+
+    def test_render_prompt_substitutes_variables(self):
+        assert render_prompt("Hi {{name}}, {{name}} is {{age}}", {"name": "Ada", "age": 36}) == "Hi Ada, Ada is 36"
+
+    def test_backoff_is_bounded(self):
+        assert all(0 <= backoff_delay(attempt, base=0.5, cap=2.0) <= 2.0 for attempt in range(1, 10))
+
+    @pytest.mark.asyncio
+    async def test_submit_validates_input(self):
+        manager = make_manager()
+
+        with pytest.raises(BatchJobError):
+            await manager.submit("user-1", "{{q}}", rows=[], models=["gpt-4o"], start=False)
+        with pytest.raises(BatchJobError):
+            await manager.submit("user-1", "{{q}}", rows=[{"q": "a"}], models=[], start=False)
+
+    @pytest.mark.asyncio
+    async def test_runs_every_row_and_model(self):
+        llm, db = FakeLLMManager(), make_db()
+        manager = make_manager(llm, db)
+        job = await manager.submit(
+            "user-1", "Q: {{q}}", rows=[{"q": "a"}, {"q": "b"}], models=["gpt-4o", "claude-3-haiku"], start=False
+        )
+
+        await manager.run(job)
+
+        assert job.status == COMPLETED
+        assert (job.totalTasks, job.completedTasks, job.failedTasks) == (4, 4, 0)
+        assert sorted((p, m, prompt) for p, m, prompt in llm.calls) == [
+            ("anthropic", "claude-3-haiku", "Q: a"),
+            ("anthropic", "claude-3-haiku", "Q: b"),
+            ("openai", "gpt-4o", "Q: a"),
+            ("openai", "gpt-4o", "Q: b"),
+        ]
+        results = written_results(db)
+        assert {r["id"] for r in results} == {result_id(job.id, row, m) for row in (0, 1) for m in job.models}
+        assert all(r["type"] == BATCH_RESULT_TYPE and r["userId"] == "user-1" for r in results)
+        assert llm.keys == {"user-key"}
+        assert llm.cost_tracker.track_llm_usage.await_count == 4
+
+    @pytest.mark.asyncio
+    async def test_submit_requires_user_keys(self):
+        db = make_db()
+        db.user_keys = {"openai": {"configured": True}}
+        manager = make_manager(db=db)
+
+        with pytest.raises(BatchJobError, match="anthropic"):
+            await manager.submit("user-1", "{{q}}", rows=[{"q": "a"}], models=["gpt-4o", "claude-3-haiku"], start=False)
+        with pytest.raises(BatchJobError, match="google"):
+            db.user_keys["google_gemini"] = {"configured": True}
+            await manager.submit("user-1", "{{q}}", rows=[{"q": "a"}], models=["gemini-1.5-pro"], start=False)
+        db.create_item.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_submit_checks_budget_for_whole_job(self):
+        manager = make_manager(within_budget=False)
+
+        with pytest.raises(BatchJobError, match="budget"):
+            await manager.submit("user-1", "{{q}}", rows=[{"q": "a"}] * 10, models=["gpt-4o"], max_tokens=500, start=False)
+
+        estimate = manager.budget_manager.check_user_budget.await_args.kwargs["additional_cost"]
+        assert estimate == pytest.approx(10 * get_pricing_registry().cost("openai", "gpt-4o", 0, 500))
+        manager.db_manager.create_item.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_results_sorted_by_row_then_model(self):
+        db = make_db()
+        rows = [{"rowIndex": 0, "model": "gpt-4o"}, {"rowIndex": 0, "model": "claude-3-haiku", "_etag": "x"}]
+        rows += [{"rowIndex": 1, "model": "gpt-4o"}, {"rowIndex": 1, "model": "claude-3-haiku"}]
+
+        async def iter_query_items(*args, **kwargs):
+            for row in rows:
+                yield row
+
+        db.iter_query_items = iter_query_items
+        manager = make_manager(db=db)
+
+        results = [result async for result in manager.iter_results("user-1", "batch_1")]
+
+        assert [(r["rowIndex"], r["model"]) for r in results] == [
+            (0, "claude-3-haiku"),
+            (0, "gpt-4o"),
+            (1, "claude-3-haiku"),
+            (1, "gpt-4o"),
+        ]
+        assert "_etag" not in results[0]
+
+    @pytest.mark.asyncio
+    async def test_limits_concurrency_per_provider(self):
+        llm = FakeLLMManager(delay=0.01)
+        manager = make_manager(llm, provider_concurrency=2)
+        job = await manager.submit("user-1", "{{q}}", rows=[{"q": i} for i in range(8)], models=["gpt-4o"], start=False)
+
+        await manager.run(job)
+
+        assert llm.peak["openai"] == 2
+
+    @pytest.mark.asyncio
+    async def test_retries_then_records_failure(self):
+        llm = FakeLLMManager(failures={"flaky": 1, "broken": 10})
+        manager = make_manager(llm, max_attempts=3, backoff_seconds=0)
+        job = await manager.submit(
+            "user-1", "{{q}}", rows=[{"q": "flaky"}, {"q": "broken"}], models=["gpt-4o"], start=False
+        )
+
+        await manager.run(job)
+
+        results = {r["rowIndex"]: r for r in written_results(manager.db_manager)}
+        assert results[0]["status"] == COMPLETED and results[0]["attempts"] == 2
+        assert results[1]["status"] == FAILED and results[1]["attempts"] == 3
+        assert (job.completedTasks, job.failedTasks) == (1, 1)
+
+    @pytest.mark.asyncio
+    async def test_resume_skips_finished_tasks(self):
+        llm, db = FakeLLMManager(), make_db()
+        manager = make_manager(llm, db)
+        job = await manager.submit("user-1", "{{q}}", rows=[{"q": "a"}, {"q": "b"}], models=["gpt-4o"], start=False)
+        job.completedTasks = 2  # saved counters may run ahead of the results written
+        db.results = [{"id": result_id(job.id, 0, "gpt-4o"), "status": COMPLETED, "cost": 0.001}]
+
+        await manager.run(job)
+
+        assert [prompt for _, _, prompt in llm.calls] == ["b"]
+        assert job.completedTasks == 2
+
+    @pytest.mark.asyncio
+    async def test_cancel_stops_running_job(self):
+        llm, db = FakeLLMManager(delay=10), make_db()
+        manager = make_manager(llm, db)
+        job = await manager.submit("user-1", "{{q}}", rows=[{"q": "a"}], models=["gpt-4o"])
+        db.read_item = AsyncMock(return_value=job.to_dict())
+        await asyncio.sleep(0)
+
+        cancelled = await manager.cancel("user-1", job.id)
+
+        assert cancelled.status == CANCELLED
+        assert job.id not in manager._running
+
+
+class TestBatchJobLease:
+    """Test suite for the job ownership lease that keeps one worker per job."""
+
+    @pytest.mark.asyncio
+    async def test_run_claims_job_and_refreshes_heartbeat(self):
+        db = make_db()
+        manager = make_manager(db=db)
+        job = await manager.submit("user-1", "{{q}}", rows=[{"q": "a"}], models=["gpt-4o"], start=False)
+
+        await manager.run(job)
+
+        saved = db.documents[job.id]
+        assert saved["ownerId"] == manager.worker_id
+        assert saved["status"] == COMPLETED
+        assert saved["heartbeatAt"] >= saved["createdAt"]
+        # Claim, result flush, final status: each conditional on the ETag written before it
+        assert [call.kwargs["etag"] for call in db.replace_item.await_args_list] == ["1", "2", "3"]
+
+    @pytest.mark.asyncio
+    async def test_second_worker_does_not_run_a_claimed_job(self):
+        llm, db = FakeLLMManager(), make_db()
+        owner, other = make_manager(llm, db), make_manager(llm, db)
+        job = await owner.submit("user-1", "{{q}}", rows=[{"q": "a"}], models=["gpt-4o"], start=False)
+        assert await owner._claim(job)
+
+        await other.run(await other.get_job("user-1", job.id))
+        resumed = await other.resume("user-1", job.id)
+
+        assert llm.calls == []
+        assert resumed.ownerId == owner.worker_id
+        assert job.id not in other._running
+
+    @pytest.mark.asyncio
+    async def test_resume_takes_over_when_heartbeat_is_stale(self):
+        llm, db = FakeLLMManager(), make_db()
+        owner, other = make_manager(llm, db, lease_seconds=60), make_manager(llm, db, lease_seconds=60)
+        job = await owner.submit("user-1", "{{q}}", rows=[{"q": "a"}], models=["gpt-4o"], start=False)
+        assert await owner._claim(job)
+        stale = (datetime.now(timezone.utc) - timedelta(seconds=120)).isoformat()
+        db.documents[job.id]["heartbeatAt"] = stale
+
+        await other.resume("user-1", job.id)
+        await asyncio.gather(*other._running.values())
+
+        assert [prompt for _, _, prompt in llm.calls] == ["a"]
+        assert db.documents[job.id]["ownerId"] == other.worker_id
+        assert db.documents[job.id]["status"] == COMPLETED
+
+    @pytest.mark.asyncio
+    async def test_worker_stops_when_its_lease_was_taken(self):
+        llm, db = FakeLLMManager(), make_db()
+        manager = make_manager(llm, db)
+        job = await manager.submit("user-1", "{{q}}", rows=[{"q": "a"}, {"q": "b"}], models=["gpt-4o"], start=False)
+
+        async def execute(provider, prompt, model):
+            # Another worker takes the job over while this one is still running
+            db.documents[job.id] = {**db.documents[job.id], "ownerId": "worker_other", "_etag": "99"}
+            return LLMResponse.create(provider.name, model, "answer", TokenUsage(10, 5), cost=0.001)
+
+        llm.execute = execute
+        await manager.run(job)
+
+        assert db.documents[job.id]["ownerId"] == "worker_other"
+        assert db.documents[job.id]["status"] == RUNNING
+        assert job.finishedAt is None
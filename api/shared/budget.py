@@ -7,8 +7,23 @@ from datetime import datetime, timedelta, timezone
 from enum import Enum
 from typing import Any, Dict, List, Optional, Tuple
 
-from .database import get_database_manager
+from .database import DEFAULT_PAGE_SIZE, get_database_manager
+from .write_behind import database_manager_writer, get_write_behind_buffer
 from .models import LLMProvider, UsageRecord
+from .pricing import MICROS_PER_DOLLAR, ModelPrice, get_pricing_registry
+
+# Usage analytics run as parameterized server-side aggregates over usage_tracking.
+# The Cosmos SDK cannot run GROUP BY across partitions, so a breakdown is one
+# DISTINCT query for the group values plus VALUE aggregates for each group.
+USAGE_WINDOW_FILTER = "c.date >= @start_date AND c.timestamp >= @start_time"
+USER_USAGE_FILTER = "c.user_id = @user_id AND " + USAGE_WINDOW_FILTER
+USAGE_GROUPS_QUERY = "SELECT DISTINCT VALUE c.{field} FROM c WHERE {filter}"
+USAGE_AGGREGATE_QUERY = "SELECT VALUE {aggregate} FROM c WHERE {filter} AND c.{field} = @group"
+USAGE_AGGREGATES = {"cost": "SUM(c.cost)", "tokens": "SUM(c.tokens_used)", "requests": "COUNT(1)"}
+USER_USAGE_RECORDS_QUERY = "SELECT * FROM c WHERE " + USER_USAGE_FILTER
+
+# Charged for models missing from the pricing registry ($0.001 / $0.002 per 1K tokens)
+DEFAULT_MODEL_PRICE = ModelPrice(input_picos=1_000_000, output_picos=2_000_000, context_window=4096)
 
 
 async def send_notification(notification_type: str, recipient: str, message: str, data: Dict[str, Any] = None) -> bool:
@@ -127,7 +142,7 @@ class EnhancedBudgetManager:
 
     def __init__(self, db_manager=None):
         self._db_manager = db_manager
-        self.model_pricing = self._load_model_pricing()
+        self.pricing = get_pricing_registry()
         self.prediction_cache = {}
         self._active_restrictions = {}
 
@@ -138,55 +153,10 @@ class EnhancedBudgetManager:
             return self._db_manager
         return get_database_manager()
 
-    def _load_model_pricing(self) -> Dict[str, Dict[str, float]]:
-        """Load current model pricing information."""
-        return {
-            "gpt-4": {
-                "input_cost_per_1k": 0.03,
-                "output_cost_per_1k": 0.06,
-                "context_window": 8192,
-            },
-            "gpt-4-turbo": {
-                "input_cost_per_1k": 0.01,
-                "output_cost_per_1k": 0.03,
-                "context_window": 128000,
-            },
-            "gpt-3.5-turbo": {
-                "input_cost_per_1k": 0.0015,
-                "output_cost_per_1k": 0.002,
-                "context_window": 16385,
-            },
-            "claude-3": {
-                "input_cost_per_1k": 0.015,
-                "output_cost_per_1k": 0.075,
-                "context_window": 200000,
-            },
-            "claude-3-opus": {
-                "input_cost_per_1k": 0.015,
-                "output_cost_per_1k": 0.075,
-                "context_window": 200000,
-            },
-            "claude-3-sonnet": {
-                "input_cost_per_1k": 0.003,
-                "output_cost_per_1k": 0.015,
-                "context_window": 200000,
-            },
-            "claude-3-haiku": {
-                "input_cost_per_1k": 0.00025,
-                "output_cost_per_1k": 0.00125,
-                "context_window": 200000,
-            },
-            "gemini-pro": {
-                "input_cost_per_1k": 0.0005,
-                "output_cost_per_1k": 0.0015,
-                "context_window": 32768,
-            },
-            "gemini-1.5-pro": {
-                "input_cost_per_1k": 0.0035,
-                "output_cost_per_1k": 0.0105,
-                "context_window": 1000000,
-            },
-        }
+    @property
+    def model_pricing(self) -> Dict[str, Dict[str, float]]:
+        """Current per-model pricing from the shared registry (reflects pricing updates)."""
+        return self.pricing.model_table()
 
     async def create_budget_config(self, config_data: Dict[str, Any]) -> BudgetConfig:
         """Create a new budget configuration."""
@@ -443,15 +413,15 @@ class EnhancedBudgetManager:
         input_tokens = execution_data.get("prompt_tokens", 0)
         output_tokens = execution_data.get("completion_tokens", 0)
 
-        if model not in self.model_pricing:
+        price = self.pricing.get_model(model)
+        if price is None:
             logging.warning(f"Unknown model {model}, using default pricing")
-            pricing = {"input_cost_per_1k": 0.001, "output_cost_per_1k": 0.002}
-        else:
-            pricing = self.model_pricing[model]
+            price = DEFAULT_MODEL_PRICE
 
-        input_cost = (input_tokens / 1000) * pricing["input_cost_per_1k"]
-        output_cost = (output_tokens / 1000) * pricing["output_cost_per_1k"]
-        total_cost = input_cost + output_cost
+        input_micros, output_micros, total_micros = self.pricing.price_micros(price, input_tokens, output_tokens)
+        input_cost = input_micros / MICROS_PER_DOLLAR
+        output_cost = output_micros / MICROS_PER_DOLLAR
+        total_cost = total_micros / MICROS_PER_DOLLAR
 
         return {
             "total_cost": round(total_cost, 6),
@@ -666,54 +636,123 @@ class BudgetManager(EnhancedBudgetManager):
                 metadata=metadata or {},
             )
 
-            # Store in database
-            await self.db_manager.create_item(container_name="usage_tracking", item=usage_record.__dict__)
+            # Store in database; with write-behind enabled the write is batched off the request path
+            item = usage_record.model_dump(mode="json")
+            buffer = get_write_behind_buffer("usage_records", database_manager_writer(self.db_manager))
+            partition_key = await self._usage_partition_key(item) if buffer is not None else None
+            if partition_key is not None:
+                await buffer.put("usage_tracking", partition_key, item)
+            else:
+                await self.db_manager.create_item(container_name="usage_tracking", item=item)
 
             return usage_record
         except Exception as e:
             logging.error(f"Failed to track usage: {str(e)}")
             raise
 
-    async def get_user_usage(self, user_id: str, days: int = 30) -> Dict[str, Any]:
-        """Get user usage summary."""
-        try:
-            start_date = datetime.now(timezone.utc) - timedelta(days=days)
+    async def _usage_partition_key(self, item: Dict[str, Any]) -> Optional[str]:
+        """The item's usage_tracking partition key value, read from the container definition; None if unknown."""
+        path = await self.db_manager.partition_key_path("usage_tracking")
+        if not path or path.count("/") != 1:
+            return None
+        value = item.get(path[1:])
+        return value if isinstance(value, str) else None
+
+    async def _query_usage(self, label: str, query: str, parameters: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Run a usage query to completion and log the RUs it cost."""
+        rows: List[Dict[str, Any]] = []
+        request_charge = 0.0
+        async for page in self.db_manager.iter_query_pages("usage_tracking", query, parameters):
+            rows.extend(page.items)
+            request_charge += page.request_charge
+        logging.info(f"Usage query {label}: {len(rows)} rows, {request_charge:.2f} RU")
+        return rows
+
+    async def _usage_breakdown(
+        self, field: str, filter_clause: str, parameters: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Usage totals per distinct value of ``field``: ``{field: value, "cost", "tokens", "requests"}`` rows."""
+        groups_query = USAGE_GROUPS_QUERY.format(field=field, filter=filter_clause)
+        groups = [group for group in await self._query_usage(f"{field}_values", groups_query, parameters) if group]
+
+        async def totals(group: str) -> Dict[str, Any]:
+            group_parameters = [*parameters, {"name": "@group", "value": group}]
+            names = list(USAGE_AGGREGATES)
+            results = await asyncio.gather(
+                *(
+                    self._query_usage(
+                        f"{field}_{name}",
+                        USAGE_AGGREGATE_QUERY.format(aggregate=USAGE_AGGREGATES[name], filter=filter_clause, field=field),
+                        group_parameters,
+                    )
+                    for name in names
+                )
+            )
+            return {field: group, **{name: values[0] if values else 0 for name, values in zip(names, results)}}
+
+        return list(await asyncio.gather(*(totals(group) for group in groups)))
+
+    @staticmethod
+    def _usage_window(days: int) -> List[Dict[str, Any]]:
+        # c.date narrows by day first; c.timestamp trims the first day to the exact window
+        start = datetime.now(timezone.utc) - timedelta(days=days)
+        return [
+            {"name": "@start_date", "value": start.strftime("%Y-%m-%d")},
+            {"name": "@start_time", "value": start.isoformat()},
+        ]
+
+    @staticmethod
+    def _usage_totals(row: Dict[str, Any]) -> Dict[str, Any]:
+        # SUM over documents without the field comes back undefined, i.e. missing
+        return {
+            "cost": row.get("cost") or 0,
+            "tokens": row.get("tokens") or 0,
+            "requests": row.get("requests") or 0,
+        }
 
-            query = f"""
-                SELECT * FROM c
-                WHERE c.user_id = '{user_id}'
-                AND c.timestamp >= '{start_date.isoformat()}'
-            """
+    async def get_user_usage(
+        self,
+        user_id: str,
+        days: int = 30,
+        include_records: bool = False,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        continuation_token: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Get user usage summary.
 
-            records = await self.db_manager.query_items(container_name="usage_tracking", query=query)
+        Totals are aggregated server-side per provider. Raw records are only
+        returned with ``include_records``, one page at a time; pass the returned
+        ``records_continuation_token`` back to get the next page.
+        """
+        try:
+            parameters = [{"name": "@user_id", "value": user_id}, *self._usage_window(days)]
+            rows = await self._usage_breakdown("provider", USER_USAGE_FILTER, parameters)
 
-            total_cost = sum(record.get("cost", 0) for record in records)
-            total_tokens = sum(record.get("tokens_used", 0) for record in records)
-            total_requests = len(records)
-
-            # Calculate provider breakdown
-            provider_breakdown = {}
-            for record in records:
-                provider = record.get("provider", "unknown")
-                if provider not in provider_breakdown:
-                    provider_breakdown[provider] = {
-                        "cost": 0,
-                        "tokens": 0,
-                        "requests": 0,
-                    }
-                provider_breakdown[provider]["cost"] += record.get("cost", 0)
-                provider_breakdown[provider]["tokens"] += record.get("tokens_used", 0)
-                provider_breakdown[provider]["requests"] += 1
+            provider_breakdown = {row.get("provider") or "unknown": self._usage_totals(row) for row in rows}
 
-            return {
+            result = {
                 "user_id": user_id,
-                "total_cost": total_cost,
-                "total_tokens": total_tokens,
-                "total_requests": total_requests,
+                "total_cost": sum(totals["cost"] for totals in provider_breakdown.values()),
+                "total_tokens": sum(totals["tokens"] for totals in provider_breakdown.values()),
+                "total_requests": sum(totals["requests"] for totals in provider_breakdown.values()),
                 "period_days": days,
                 "provider_breakdown": provider_breakdown,
-                "records": records,
             }
+
+            if include_records:
+                page = await self.db_manager.query_page(
+                    container_name="usage_tracking",
+                    query=USER_USAGE_RECORDS_QUERY,
+                    parameters=parameters,
+                    page_size=page_size,
+                    continuation_token=continuation_token,
+                )
+                logging.info(f"Usage query user_records: {len(page.items)} rows, {page.request_charge:.2f} RU")
+                result["records"] = page.items
+                result["records_continuation_token"] = page.continuation_token
+
+            return result
         except Exception as e:
             logging.error(f"Failed to get user usage: {str(e)}")
             return {
@@ -727,63 +766,23 @@ class BudgetManager(EnhancedBudgetManager):
     async def get_system_usage(self, days: int = 30) -> Dict[str, Any]:
         """Get system-wide usage summary."""
         try:
-            start_date = datetime.now(timezone.utc) - timedelta(days=days)
-
-            query = f"""
-                SELECT * FROM c
-                WHERE c.timestamp >= '{start_date.isoformat()}'
-            """
+            parameters = self._usage_window(days)
+            user_rows, provider_rows = await asyncio.gather(
+                self._usage_breakdown("user_id", USAGE_WINDOW_FILTER, parameters),
+                self._usage_breakdown("provider", USAGE_WINDOW_FILTER, parameters),
+            )
 
-            records = await self.db_manager.query_items(container_name="usage_tracking", query=query)
-
-            # Aggregate by user
-            user_usage = {}
-            provider_breakdown = {}
-
-            for record in records:
-                user_id = record.get("user_id", "unknown")
-                provider = record.get("provider", "unknown")
-                cost = record.get("cost", 0)
-                tokens = record.get("tokens_used", 0)
-
-                # User aggregation
-                if user_id not in user_usage:
-                    user_usage[user_id] = {"cost": 0, "tokens": 0, "requests": 0}
-                user_usage[user_id]["cost"] += cost
-                user_usage[user_id]["tokens"] += tokens
-                user_usage[user_id]["requests"] += 1
-
-                # Provider aggregation
-                if provider not in provider_breakdown:
-                    provider_breakdown[provider] = {
-                        "cost": 0,
-                        "tokens": 0,
-                        "requests": 0,
-                    }
-                provider_breakdown[provider]["cost"] += cost
-                provider_breakdown[provider]["tokens"] += tokens
-                provider_breakdown[provider]["requests"] += 1
+            provider_breakdown = {row.get("provider") or "unknown": self._usage_totals(row) for row in provider_rows}
 
             # Sort top users by cost
-            top_users = [
-                {
-                    "user_id": uid,
-                    "cost": data["cost"],
-                    "tokens": data["tokens"],
-                    "requests": data["requests"],
-                }
-                for uid, data in user_usage.items()
-            ]
+            top_users = [{"user_id": row.get("user_id") or "unknown", **self._usage_totals(row)} for row in user_rows]
             top_users.sort(key=lambda x: x["cost"], reverse=True)
 
-            total_cost = sum(record.get("cost", 0) for record in records)
-            total_tokens = sum(record.get("tokens_used", 0) for record in records)
-
             return {
-                "total_cost": total_cost,
-                "total_tokens": total_tokens,
-                "total_requests": len(records),
-                "unique_users": len(user_usage),
+                "total_cost": sum(user["cost"] for user in top_users),
+                "total_tokens": sum(user["tokens"] for user in top_users),
+                "total_requests": sum(user["requests"] for user in top_users),
+                "unique_users": len(top_users),
                 "provider_breakdown": provider_breakdown,
                 "top_users": top_users[:10],
                 "period_days": days,
@@ -871,15 +870,15 @@ class BudgetManager(EnhancedBudgetManager):
                 monthly_limit = budget_config.budget_amount
 
             # Get provider usage for last 30 days
-            start_date = datetime.now(timezone.utc) - timedelta(days=30)
-
-            query = f"""
-                SELECT * FROM c
-                WHERE c.provider = '{provider_key}'
-                AND c.timestamp >= '{start_date.isoformat()}'
+            query = """
+                SELECT c.cost FROM c
+                WHERE c.provider = @provider AND c.date >= @start_date AND c.timestamp >= @start_time
             """
+            parameters = [{"name": "@provider", "value": provider_key}, *self._usage_window(30)]
 
-            records = await self.db_manager.query_items(container_name="usage_tracking", query=query)
+            records = await self.db_manager.query_items(
+                container_name="usage_tracking", query=query, parameters=parameters
+            )
 
             current_cost = sum(record.get("cost", 0) for record in records)
             projected_cost = current_cost + additional_cost
@@ -1015,20 +1014,24 @@ class BudgetManager(EnhancedBudgetManager):
             start_of_day = target_date.replace(hour=0, minute=0, second=0, microsecond=0)
             end_of_day = start_of_day + timedelta(days=1)
 
-            query_conditions = [
-                f"c.timestamp >= '{start_of_day.isoformat()}'",
-                f"c.timestamp < '{end_of_day.isoformat()}'",
+            query_conditions = ["c.timestamp >= @start_time", "c.timestamp < @end_time"]
+            parameters = [
+                {"name": "@start_time", "value": start_of_day.isoformat()},
+                {"name": "@end_time", "value": end_of_day.isoformat()},
             ]
 
             if user_id:
-                query_conditions.append(f"c.user_id = '{user_id}'")
+                query_conditions.append("c.user_id = @user_id")
+                parameters.append({"name": "@user_id", "value": user_id})
 
             query = f"""
                 SELECT * FROM c
                 WHERE {' AND '.join(query_conditions)}
             """
 
-            records = await self.db_manager.query_items(container_name="usage_tracking", query=query)
+            records = await self.db_manager.query_items(
+                container_name="usage_tracking", query=query, parameters=parameters
+            )
 
             total_cost = sum(record.get("cost", 0) for record in records)
             total_tokens = sum(record.get("tokens_used", 0) for record in records)
@@ -1074,16 +1077,11 @@ class BudgetManager(EnhancedBudgetManager):
     async def predict_monthly_costs(self, user_id: str) -> Dict[str, Any]:
         """Predict monthly costs based on historical data."""
         try:
-            # Get last 7 days of historical data
-            start_date = datetime.now(timezone.utc) - timedelta(days=7)
-            query = f"""
-                SELECT * FROM c
-                WHERE c.user_id = '{user_id}' AND c.timestamp >= '{start_date.isoformat()}'
-            """
-
-            historical_records = await self.db_manager.query_items(container_name="usage_tracking", query=query)
+            # Daily cost totals for the last 7 days
+            parameters = [{"name": "@user_id", "value": user_id}, *self._usage_window(7)]
+            rows = await self._usage_breakdown("date", USER_USAGE_FILTER, parameters)
 
-            if not historical_records:
+            if not rows:
                 return {
                     "user_id": user_id,
                     "predicted_monthly_cost": 0,
@@ -1093,12 +1091,7 @@ class BudgetManager(EnhancedBudgetManager):
                     "trend": "stable",
                 }
 
-            # Calculate daily costs
-            daily_costs = {}
-            for record in historical_records:
-                date = record.get("date") or datetime.fromisoformat(record.get("timestamp", "")).strftime("%Y-%m-%d")
-                cost = record.get("cost", 0)
-                daily_costs[date] = daily_costs.get(date, 0) + cost
+            daily_costs = {row.get("date") or "unknown": self._usage_totals(row)["cost"] for row in rows}
 
             # Calculate trend
             dates = sorted(daily_costs.keys())
@@ -1289,20 +1282,14 @@ class BudgetManager(EnhancedBudgetManager):
     async def detect_cost_anomalies(self, user_id: str, days: int = 30) -> Dict[str, Any]:
         """Detect cost anomalies for a user."""
         try:
-            usage_data = await self.get_user_usage(user_id, days)
-            records = usage_data.get("records", [])
+            parameters = [{"name": "@user_id", "value": user_id}, *self._usage_window(days)]
+            rows = await self._usage_breakdown("date", USER_USAGE_FILTER, parameters)
 
-            if len(records) < 7:
+            if sum(self._usage_totals(row)["requests"] for row in rows) < 7:
                 return {"anomalies_detected": False, "reason": "insufficient_data"}
 
             # Simple anomaly detection based on daily costs
-            daily_costs = {}
-            for record in records:
-                timestamp = record.get("timestamp", "")
-                date = timestamp.split("T")[0] if timestamp else "unknown"
-                if date not in daily_costs:
-                    daily_costs[date] = 0
-                daily_costs[date] += record.get("cost", 0)
+            daily_costs = {row.get("date") or "unknown": self._usage_totals(row)["cost"] for row in rows}
 
             costs = list(daily_costs.values())
             avg_cost = sum(costs) / len(costs)
@@ -1360,28 +1347,18 @@ class BudgetManager(EnhancedBudgetManager):
     async def get_cost_optimization_suggestions(self, user_id: str) -> Dict[str, Any]:
         """Get cost optimization suggestions for a user."""
         try:
-            # Get raw usage records from database
-            start_date = datetime.now(timezone.utc) - timedelta(days=30)
-            query = f"""
-                SELECT * FROM c
-                WHERE c.user_id = '{user_id}' AND c.timestamp >= '{start_date.isoformat()}'
-            """
-
-            records = await self.db_manager.query_items(container_name="usage_tracking", query=query)
+            # Per-model usage over the last 30 days
+            parameters = [{"name": "@user_id", "value": user_id}, *self._usage_window(30)]
+            rows = await self._usage_breakdown("model", USER_USAGE_FILTER, parameters)
 
             suggestions = []
             total_potential_savings = 0
 
             # Analyze model usage
             model_usage = {}
-            for record in records:
-                model = record.get("model", "unknown")
-                cost = record.get("cost", 0)
-
-                if model not in model_usage:
-                    model_usage[model] = {"count": 0, "cost": 0}
-                model_usage[model]["count"] += 1
-                model_usage[model]["cost"] += cost
+            for row in rows:
+                totals = self._usage_totals(row)
+                model_usage[row.get("model") or "unknown"] = {"count": totals["requests"], "cost": totals["cost"]}
 
             # Suggest cheaper alternatives for expensive models
             for model, usage in model_usage.items():
@@ -15,6 +15,7 @@ from typing import Any, Dict, List, Optional, Tuple
 from azure.cosmos.aio import CosmosClient
 from azure.cosmos.exceptions import CosmosResourceNotFoundError
 
+from .cost_rollups import DAY, MONTH
 from .cost_tracker import CostSummary, CostTracker
 from .cost_tracking_middleware import BudgetValidationError
 
@@ -29,6 +30,10 @@ class BudgetPeriod(Enum):
     YEARLY = "yearly"
 
 
+# Budget periods that line up with CostTracker's day/month spend rollups
+ROLLUP_BUDGET_PERIODS = {BudgetPeriod.DAILY: DAY, BudgetPeriod.MONTHLY: MONTH}
+
+
 class BudgetAction(Enum):
     """Actions to take when budget limits are reached."""
 
@@ -435,10 +440,13 @@ class BudgetManager:
             # Calculate period boundaries
             period_start, period_end = self._get_period_boundaries(budget.period)
 
-            # Get spending for this period
-            cost_summary = await self.cost_tracker.get_cost_summary(
-                user_id=user_id, start_date=period_start, end_date=period_end
-            )
+            # Get spending for this period (daily/monthly budgets read the materialized rollups)
+            if budget.period in ROLLUP_BUDGET_PERIODS:
+                cost_summary = await self.cost_tracker.get_current_spend(user_id, ROLLUP_BUDGET_PERIODS[budget.period])
+            else:
+                cost_summary = await self.cost_tracker.get_cost_summary(
+                    user_id=user_id, start_date=period_start, end_date=period_end
+                )
 
             # Calculate usage metrics
             total_spent = cost_summary.total_cost
@@ -3,15 +3,40 @@ Tests for budget.py module - Budget tracking and limits
 """
 
 import os
+import re
 from datetime import datetime, timedelta, timezone
 from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
 
-from api.shared.budget import BudgetManager, get_budget_manager
+from api.shared.budget import USAGE_AGGREGATES, BudgetManager, get_budget_manager
+from api.shared.database import QueryPage
 from api.shared.models import LLMProvider, UsageRecord
 
 
+def mock_query_pages(rows_by_group):
+    """iter_query_pages stand-in answering the DISTINCT and per-group VALUE aggregate queries from rows per field."""
+    aggregates = {f"SELECT VALUE {aggregate} ": name for name, aggregate in USAGE_AGGREGATES.items()}
+
+    def _iter_query_pages(container_name, query, parameters=None, **kwargs):
+        assert "GROUP BY" not in query
+
+        async def _pages():
+            field = re.search(r"c\.(\w+)(?: FROM c| = @group)", query).group(1)
+            rows = rows_by_group.get(field, [])
+            if query.startswith("SELECT DISTINCT VALUE"):
+                items = [row[field] for row in rows]
+            else:
+                group = next(p["value"] for p in parameters if p["name"] == "@group")
+                name = next(name for prefix, name in aggregates.items() if query.startswith(prefix))
+                items = [row.get(name, 0) for row in rows if row[field] == group]
+            yield QueryPage(items=items, request_charge=2.5)
+
+        return _pages()
+
+    return Mock(side_effect=_iter_query_pages)
+
+
 class TestBudgetManager:
     """Test suite for BudgetManager class."""
 
@@ -50,6 +75,32 @@ class TestBudgetManager:
 
         mock_db_manager.create_item.assert_called_once()
 
+    @pytest.mark.asyncio
+    @patch("api.shared.budget.get_write_behind_buffer")
+    @patch("api.shared.budget.get_database_manager")
+    async def test_track_usage_write_behind_uses_container_partition_key(self, mock_get_db_manager, mock_get_buffer):
+        """Write-behind batches by the container's real partition key and writes directly when it is unknown."""
+        mock_db_manager = Mock()
+        mock_db_manager.create_item = AsyncMock()
+        mock_db_manager.partition_key_path = AsyncMock(return_value="/user_id")
+        mock_get_db_manager.return_value = mock_db_manager
+        buffer = Mock(put=AsyncMock())
+        mock_get_buffer.return_value = buffer
+        budget_manager = BudgetManager()
+        usage = dict(provider=LLMProvider.OPENAI, operation="completion", cost=0.05, tokens_used=100, execution_time_ms=5)
+
+        await budget_manager.track_usage(user_id="user-123", **usage)
+
+        container_name, partition_key, item = buffer.put.await_args.args
+        assert (container_name, partition_key, item["user_id"]) == ("usage_tracking", "user-123", "user-123")
+        mock_db_manager.create_item.assert_not_called()
+
+        mock_db_manager.partition_key_path = AsyncMock(return_value=None)
+        await budget_manager.track_usage(user_id="user-123", **usage)
+
+        assert buffer.put.await_count == 1
+        mock_db_manager.create_item.assert_called_once()
+
     @pytest.mark.asyncio
     @patch("api.shared.budget.get_database_manager")
     async def test_track_usage_with_metadata(self, mock_get_db_manager):
@@ -98,31 +149,17 @@ class TestBudgetManager:
     async def test_get_user_usage_success(self, mock_get_db_manager):
         """Test successful user usage retrieval."""
         mock_db_manager = Mock()
-        mock_usage_records = [
+        mock_db_manager.iter_query_pages = mock_query_pages(
             {
-                "user_id": "user-123",
-                "provider": "openai",
-                "operation": "completion",
-                "cost": 0.05,
-                "tokens_used": 100,
-                "timestamp": "2024-01-15T10:00:00Z",
-                "date": "2024-01-15",
-            },
-            {
-                "user_id": "user-123",
-                "provider": "anthropic",
-                "operation": "completion",
-                "cost": 0.03,
-                "tokens_used": 75,
-                "timestamp": "2024-01-15T11:00:00Z",
-                "date": "2024-01-15",
-            },
-        ]
-        mock_db_manager.query_items = AsyncMock(return_value=mock_usage_records)
+                "provider": [
+                    {"provider": "openai", "cost": 0.05, "tokens": 100, "requests": 1},
+                    {"provider": "anthropic", "cost": 0.03, "tokens": 75, "requests": 1},
+                ]
+            }
+        )
         mock_get_db_manager.return_value = mock_db_manager
 
         budget_manager = BudgetManager()
-        budget_manager._get_daily_usage = AsyncMock(return_value={"2024-01-15": {"cost": 0.08, "tokens": 175, "requests": 2}})
 
         result = await budget_manager.get_user_usage("user-123", days=30)
 
@@ -134,35 +171,51 @@ class TestBudgetManager:
         assert "anthropic" in result["provider_breakdown"]
         assert result["provider_breakdown"]["openai"]["cost"] == 0.05
         assert result["provider_breakdown"]["anthropic"]["cost"] == 0.03
+        assert "records" not in result
+
+        # Parameterized, with the partition key range in the filter
+        (_, query, parameters), _ = mock_db_manager.iter_query_pages.call_args
+        parameters = {p["name"]: p["value"] for p in parameters}
+        assert "user-123" not in query
+        assert "c.date >= @start_date" in query
+        assert parameters["@user_id"] == "user-123"
+
+    @pytest.mark.asyncio
+    @patch("api.shared.budget.get_database_manager")
+    async def test_get_user_usage_records_are_paginated(self, mock_get_db_manager):
+        """Test that raw records are opt-in and returned one page at a time."""
+        mock_db_manager = Mock()
+        mock_db_manager.iter_query_pages = mock_query_pages({"provider": []})
+        mock_db_manager.query_page = AsyncMock(return_value=QueryPage(items=[{"id": "usage-1"}], continuation_token="ct-1"))
+        mock_get_db_manager.return_value = mock_db_manager
+
+        budget_manager = BudgetManager()
+
+        result = await budget_manager.get_user_usage("user-123", include_records=True, page_size=1, continuation_token="ct-0")
+
+        assert result["records"] == [{"id": "usage-1"}]
+        assert result["records_continuation_token"] == "ct-1"
+        _, kwargs = mock_db_manager.query_page.call_args
+        assert kwargs["page_size"] == 1
+        assert kwargs["continuation_token"] == "ct-0"
 
     @pytest.mark.asyncio
     @patch("api.shared.budget.get_database_manager")
     async def test_get_system_usage_success(self, mock_get_db_manager):
         """Test successful system usage retrieval."""
         mock_db_manager = Mock()
-        mock_usage_records = [
+        mock_db_manager.iter_query_pages = mock_query_pages(
             {
-                "user_id": "user-123",
-                "provider": "openai",
-                "operation": "completion",
-                "cost": 0.05,
-                "tokens_used": 100,
-                "timestamp": "2024-01-15T10:00:00Z",
-            },
-            {
-                "user_id": "user-456",
-                "provider": "openai",
-                "operation": "completion",
-                "cost": 0.03,
-                "tokens_used": 75,
-                "timestamp": "2024-01-15T11:00:00Z",
-            },
-        ]
-        mock_db_manager.query_items = AsyncMock(return_value=mock_usage_records)
+                "user_id": [
+                    {"user_id": "user-456", "cost": 0.03, "tokens": 75, "requests": 1},
+                    {"user_id": "user-123", "cost": 0.05, "tokens": 100, "requests": 1},
+                ],
+                "provider": [{"provider": "openai", "cost": 0.08, "tokens": 175, "requests": 2}],
+            }
+        )
         mock_get_db_manager.return_value = mock_db_manager
 
         budget_manager = BudgetManager()
-        budget_manager._get_daily_usage = AsyncMock(return_value={"2024-01-15": {"cost": 0.08, "tokens": 175, "requests": 2}})
 
         result = await budget_manager.get_system_usage(days=30)
 
@@ -172,6 +225,7 @@ class TestBudgetManager:
         assert result["unique_users"] == 2
         assert "openai" in result["provider_breakdown"]
         assert len(result["top_users"]) == 2
+        assert result["top_users"][0]["user_id"] == "user-123"
 
     @pytest.mark.asyncio
     @patch("api.shared.budget.get_database_manager")
@@ -368,11 +422,10 @@ class TestBudgetManagerEdgeCases:
     async def test_get_user_usage_empty_records(self, mock_get_db_manager):
         """Test user usage with no records."""
         mock_db_manager = Mock()
-        mock_db_manager.query_items = AsyncMock(return_value=[])
+        mock_db_manager.iter_query_pages = mock_query_pages({})
         mock_get_db_manager.return_value = mock_db_manager
 
         budget_manager = BudgetManager()
-        budget_manager._get_daily_usage = AsyncMock(return_value={})
 
         result = await budget_manager.get_user_usage("user-123", days=30)
 
@@ -404,7 +457,7 @@ class TestBudgetManagerEdgeCases:
     async def test_get_system_usage_error(self, mock_get_db_manager):
         """Test system usage error handling."""
         mock_db_manager = Mock()
-        mock_db_manager.query_items = AsyncMock(side_effect=Exception("Query error"))
+        mock_db_manager.iter_query_pages = Mock(side_effect=Exception("Query error"))
         mock_get_db_manager.return_value = mock_db_manager
 
         budget_manager = BudgetManager()
@@ -469,21 +522,14 @@ class TestCostManagementFeatures:
 
         budget_manager = BudgetManager()
 
-        # Mock historical data for the last 7 days
-        historical_usage = []
+        # Daily cost totals for the last 7 days
+        daily_rows = []
         base_date = datetime.now(timezone.utc) - timedelta(days=7)
         for i in range(7):
             date = base_date + timedelta(days=i)
-            historical_usage.append(
-                {
-                    "user_id": "user-123",
-                    "cost": 5.0 + (i * 0.5),  # Increasing trend
-                    "date": date.strftime("%Y-%m-%d"),
-                    "timestamp": date.isoformat(),
-                }
-            )
+            daily_rows.append({"date": date.strftime("%Y-%m-%d"), "cost": 5.0 + (i * 0.5), "requests": 1})  # Increasing trend
 
-        mock_db_manager.query_items = AsyncMock(return_value=historical_usage)
+        mock_db_manager.iter_query_pages = mock_query_pages({"date": daily_rows})
 
         result = await budget_manager.predict_monthly_costs("user-123")
 
@@ -616,7 +662,16 @@ class TestCostManagementFeatures:
                 ]
             )
 
-        mock_db_manager.query_items = AsyncMock(return_value=usage_data)
+        user_rows = [
+            {
+                "user_id": user_id,
+                "cost": sum(r["cost"] for r in usage_data if r["user_id"] == user_id),
+                "tokens": 400 * 30,
+                "requests": 30,
+            }
+            for user_id in ("user-1", "user-2", "user-3")
+        ]
+        mock_db_manager.iter_query_pages = mock_query_pages({"user_id": user_rows})
 
         budget_manager = BudgetManager()
         result = await budget_manager.get_cost_analytics_data(days=30)
@@ -664,7 +719,9 @@ class TestCostManagementFeatures:
         )
 
         all_usage = normal_usage + anomaly_usage
-        mock_db_manager.query_items = AsyncMock(return_value=all_usage)
+        mock_db_manager.iter_query_pages = mock_query_pages(
+            {"date": [{"date": r["date"], "cost": r["cost"], "requests": 1} for r in all_usage]}
+        )
 
         budget_manager = BudgetManager()
         result = await budget_manager.detect_cost_anomalies("user-123", days=30)
@@ -721,29 +778,12 @@ class TestCostManagementFeatures:
         mock_db_manager = Mock()
         mock_get_db_manager.return_value = mock_db_manager
 
-        # Mock usage data showing expensive model usage
-        usage_data = [
-            {
-                "user_id": "user-123",
-                "provider": "openai",
-                "cost": 2.0,
-                "model": "gpt-4",
-                "operation": "completion",
-                "tokens_used": 500,
-                "date": "2024-01-15",
-            },
-            {
-                "user_id": "user-123",
-                "provider": "openai",
-                "cost": 0.5,
-                "model": "gpt-3.5-turbo",
-                "operation": "completion",
-                "tokens_used": 500,
-                "date": "2024-01-15",
-            },
+        # Per-model usage showing expensive model usage
+        model_rows = [
+            {"model": "gpt-4", "cost": 2.0, "tokens": 500, "requests": 1},
+            {"model": "gpt-3.5-turbo", "cost": 0.5, "tokens": 500, "requests": 1},
         ]
-
-        mock_db_manager.query_items = AsyncMock(return_value=usage_data)
+        mock_db_manager.iter_query_pages = mock_query_pages({"model": model_rows})
 
         budget_manager = BudgetManager()
         result = await budget_manager.get_cost_optimization_suggestions("user-123")
@@ -752,6 +792,9 @@ class TestCostManagementFeatures:
         assert len(result["suggestions"]) > 0
         assert "potential_savings" in result
         assert result["potential_savings"] > 0
+        (_, query, parameters), _ = mock_db_manager.iter_query_pages.call_args
+        assert "'" not in query
+        assert {"name": "@user_id", "value": "user-123"} in parameters
 
     @pytest.mark.asyncio
     @patch("api.shared.budget.get_database_manager")
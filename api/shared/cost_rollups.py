@@ -0,0 +1,367 @@
+"""
+Materialized per-user spend rollups for CostTracker.
+
+Every tracked CostEntry increments two running-total documents in the
+CostSummaries container - one for the UTC day and one for the UTC month - so
+budget checks are a single point read instead of a scan over the month's raw
+entries. Amounts are kept as integer micro-dollars so concurrent increments
+never accumulate floating point drift.
+
+Updates use Cosmos patch ``incr`` operations, which the service applies
+atomically. When patch is unavailable (``COST_ROLLUP_USE_PATCH=false``, or an
+emulator that rejects it) updates fall back to read-modify-replace guarded by
+the document ETag. Raw CostEntries remain the source of truth: ``reconcile``
+rebuilds rollups from them.
+
+Entries can reach CostEntries some time after their rollup increment (the
+write-behind buffer batches them), so reconciliation only rebuilds days that
+ended at least ``COST_ROLLUP_SETTLE_SECONDS`` ago; that window must be longer
+than the buffer's maximum flush delay. Days still inside it are trusted as they
+are and counted into the month total from their own rollup documents.
+"""
+
+import copy
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from azure.core import MatchConditions
+from azure.cosmos.exceptions import (
+    CosmosAccessConditionFailedError,
+    CosmosHttpResponseError,
+    CosmosResourceExistsError,
+    CosmosResourceNotFoundError,
+)
+
+logger = logging.getLogger(__name__)
+
+DAY = "day"
+MONTH = "month"
+ROLLUP_PERIODS = (DAY, MONTH)
+
+MICROS_PER_DOLLAR = 1_000_000
+DEFAULT_ETAG_RETRIES = 5
+DEFAULT_SETTLE_SECONDS = 3600
+
+
+def to_micros(amount: Any) -> int:
+    """Convert a dollar amount to integer micro-dollars."""
+    return int((Decimal(str(amount)) * MICROS_PER_DOLLAR).to_integral_value())
+
+
+def from_micros(micros: int) -> Decimal:
+    return Decimal(micros) / MICROS_PER_DOLLAR
+
+
+def period_key(period: str, timestamp: datetime) -> str:
+    """Rollup key for the UTC day (YYYY-MM-DD) or month (YYYY-MM) containing timestamp."""
+    timestamp = timestamp.astimezone(timezone.utc)
+    return timestamp.strftime("%Y-%m-%d" if period == DAY else "%Y-%m")
+
+
+def period_bounds(period: str, key: str) -> Tuple[datetime, datetime]:
+    """Start (inclusive) and end (exclusive) of a rollup period."""
+    if period == DAY:
+        start = datetime.strptime(key, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+        return start, start + timedelta(days=1)
+    start = datetime.strptime(key, "%Y-%m").replace(tzinfo=timezone.utc)
+    end = start.replace(year=start.year + 1, month=1) if start.month == 12 else start.replace(month=start.month + 1)
+    return start, end
+
+
+def rollup_id(user_id: str, period: str, key: str) -> str:
+    return f"rollup_{period}_{key}_{user_id}"
+
+
+def _pointer(key: str) -> str:
+    # JSON pointer escaping for map keys such as "openai/gpt-4o"
+    return key.replace("~", "~0").replace("/", "~1")
+
+
+def _entry_delta(entry: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "cost_micros": to_micros(entry["total_cost"]),
+        "tokens": int(entry.get("total_tokens", 0)),
+        "provider": entry["provider"],
+        "model": f"{entry['provider']}/{entry['model']}",
+    }
+
+
+def _new_rollup(user_id: str, period: str, key: str) -> Dict[str, Any]:
+    return {
+        "id": rollup_id(user_id, period, key),
+        "userId": user_id,
+        "user_id": user_id,
+        "type": "cost_rollup",
+        "period": period,
+        "period_key": key,
+        "cost_micros": 0,
+        "requests": 0,
+        "tokens": 0,
+        "cost_by_provider_micros": {},
+        "cost_by_model_micros": {},
+    }
+
+
+def _merge_rollup(doc: Dict[str, Any], other: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Add another rollup's totals (e.g. a day's) into doc."""
+    if not other:
+        return doc
+    for field in ("cost_micros", "requests", "tokens"):
+        doc[field] += other.get(field, 0)
+    for field in ("cost_by_provider_micros", "cost_by_model_micros"):
+        for name, micros in other.get(field, {}).items():
+            doc[field][name] = doc[field].get(name, 0) + micros
+    return doc
+
+
+def _add_to_rollup(doc: Dict[str, Any], delta: Dict[str, Any]) -> Dict[str, Any]:
+    doc["cost_micros"] += delta["cost_micros"]
+    doc["requests"] += 1
+    doc["tokens"] += delta["tokens"]
+    by_provider = doc["cost_by_provider_micros"]
+    by_provider[delta["provider"]] = by_provider.get(delta["provider"], 0) + delta["cost_micros"]
+    by_model = doc["cost_by_model_micros"]
+    by_model[delta["model"]] = by_model.get(delta["model"], 0) + delta["cost_micros"]
+    return doc
+
+
+class CostRollupStore:
+    """Day and month running totals per user, kept in the CostSummaries container."""
+
+    def __init__(
+        self,
+        cosmos_client: Any,
+        database_name: str,
+        container_name: str = "CostSummaries",
+        entries_container_name: str = "CostEntries",
+        use_patch: Optional[bool] = None,
+        max_etag_retries: int = DEFAULT_ETAG_RETRIES,
+        settle_seconds: Optional[float] = None,
+    ):
+        self.cosmos_client = cosmos_client
+        self.database_name = database_name
+        self.container_name = container_name
+        self.entries_container_name = entries_container_name
+        if use_patch is None:
+            use_patch = os.getenv("COST_ROLLUP_USE_PATCH", "true").lower() != "false"
+        self.use_patch = use_patch
+        self.max_etag_retries = max_etag_retries
+        self.settle_seconds = float(
+            settle_seconds if settle_seconds is not None else os.getenv("COST_ROLLUP_SETTLE_SECONDS", DEFAULT_SETTLE_SECONDS)
+        )
+
+    def _container(self, name: str) -> Any:
+        return self.cosmos_client.get_database_client(self.database_name).get_container_client(name)
+
+    async def apply_entry(self, entry: Dict[str, Any]) -> None:
+        """Add one stored cost entry to the user's day and month rollups."""
+        timestamp = entry["timestamp"]
+        if isinstance(timestamp, str):
+            timestamp = datetime.fromisoformat(timestamp)
+        delta = _entry_delta(entry)
+        container = self._container(self.container_name)
+
+        for period in ROLLUP_PERIODS:
+            key = period_key(period, timestamp)
+            if self.use_patch:
+                try:
+                    await self._apply_patch(container, entry["user_id"], period, key, delta)
+                    continue
+                except CosmosHttpResponseError as e:
+                    # A missing document is handled in _apply_patch; anything else but "patch unsupported" is real
+                    if isinstance(e, CosmosResourceNotFoundError) or e.status_code not in (400, 405, 501):
+                        raise
+                    logger.warning(f"Cosmos patch unavailable ({e.status_code}), using ETag updates for cost rollups")
+                    self.use_patch = False
+            await self._apply_etag(container, entry["user_id"], period, key, delta)
+
+    async def _apply_patch(self, container: Any, user_id: str, period: str, key: str, delta: Dict[str, Any]) -> None:
+        operations = [
+            {"op": "incr", "path": "/cost_micros", "value": delta["cost_micros"]},
+            {"op": "incr", "path": "/requests", "value": 1},
+            {"op": "incr", "path": "/tokens", "value": delta["tokens"]},
+            {"op": "incr", "path": f"/cost_by_provider_micros/{_pointer(delta['provider'])}", "value": delta["cost_micros"]},
+            {"op": "incr", "path": f"/cost_by_model_micros/{_pointer(delta['model'])}", "value": delta["cost_micros"]},
+            {"op": "set", "path": "/updated_at", "value": datetime.now(timezone.utc).isoformat()},
+        ]
+        doc_id = rollup_id(user_id, period, key)
+        try:
+            await container.patch_item(item=doc_id, partition_key=user_id, patch_operations=operations)
+            return
+        except CosmosResourceNotFoundError:
+            pass
+
+        # First entry of the period for this user
+        doc = _add_to_rollup(_new_rollup(user_id, period, key), delta)
+        doc["updated_at"] = datetime.now(timezone.utc).isoformat()
+        try:
+            await container.create_item(doc)
+        except CosmosResourceExistsError:
+            # Lost the race to create it; the winner's document is there now
+            await container.patch_item(item=doc_id, partition_key=user_id, patch_operations=operations)
+
+    async def _apply_etag(self, container: Any, user_id: str, period: str, key: str, delta: Dict[str, Any]) -> None:
+        doc_id = rollup_id(user_id, period, key)
+        for _ in range(self.max_etag_retries):
+            try:
+                doc = await container.read_item(item=doc_id, partition_key=user_id)
+            except CosmosResourceNotFoundError:
+                doc = _add_to_rollup(_new_rollup(user_id, period, key), delta)
+                doc["updated_at"] = datetime.now(timezone.utc).isoformat()
+                try:
+                    await container.create_item(doc)
+                    return
+                except CosmosResourceExistsError:
+                    continue
+
+            etag = doc.get("_etag")
+            doc = _add_to_rollup(doc, delta)
+            doc["updated_at"] = datetime.now(timezone.utc).isoformat()
+            try:
+                await container.replace_item(
+                    item=doc_id, body=doc, etag=etag, match_condition=MatchConditions.IfNotModified
+                )
+                return
+            except CosmosAccessConditionFailedError:
+                # Another writer got there first; re-read and retry
+                continue
+
+        raise RuntimeError(f"Gave up updating cost rollup {doc_id} after {self.max_etag_retries} ETag conflicts")
+
+    async def get_rollup(self, user_id: str, period: str, key: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Point-read a rollup document (current period by default); None if the user has no spend in it."""
+        key = key or period_key(period, datetime.now(timezone.utc))
+        try:
+            return await self._container(self.container_name).read_item(
+                item=rollup_id(user_id, period, key), partition_key=user_id
+            )
+        except CosmosResourceNotFoundError:
+            return None
+
+    async def reconcile(
+        self, user_ids: Optional[Iterable[str]] = None, month: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Rebuild a month's rollups (and its settled day rollups) from raw CostEntries.
+
+        Defaults to the current month and every user with settled entries in it.
+        Returns how many rollups were written and how many had drifted from the
+        raw data.
+        """
+        month = month or period_key(MONTH, datetime.now(timezone.utc))
+        start, end = period_bounds(MONTH, month)
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=self.settle_seconds)
+        settled_until = min(end, max(start, period_bounds(DAY, period_key(DAY, cutoff))[0]))
+        entries_container = self._container(self.entries_container_name)
+
+        if user_ids is None:
+            query = "SELECT DISTINCT VALUE c.user_id FROM c WHERE c.timestamp >= @start AND c.timestamp < @end"
+            parameters = [{"name": "@start", "value": start.isoformat()}, {"name": "@end", "value": settled_until.isoformat()}]
+            user_ids = [user_id async for user_id in entries_container.query_items(query=query, parameters=parameters)]
+
+        report = {"month": month, "users": 0, "rollups_written": 0, "drift_corrected": 0}
+        for user_id in user_ids:
+            query = (
+                "SELECT c.provider, c.model, c.total_cost, c.total_tokens, c.timestamp FROM c "
+                "WHERE c.user_id = @user_id AND c.timestamp >= @start AND c.timestamp < @end"
+            )
+            parameters = [
+                {"name": "@user_id", "value": user_id},
+                {"name": "@start", "value": start.isoformat()},
+                {"name": "@end", "value": settled_until.isoformat()},
+            ]
+            entries = [item async for item in entries_container.query_items(query=query, parameters=parameters)]
+            written, drifted = await self._rebuild_user(user_id, month, entries, settled_until)
+            report["users"] += 1
+            report["rollups_written"] += written
+            report["drift_corrected"] += drifted
+
+        logger.info(f"Cost rollup reconciliation: {report}")
+        return report
+
+    async def _rebuild_user(
+        self, user_id: str, month: str, entries: List[Dict[str, Any]], settled_until: datetime
+    ) -> Tuple[int, int]:
+        settled_month = _new_rollup(user_id, MONTH, month)
+        settled_days: Dict[str, Dict[str, Any]] = {}
+        for entry in entries:
+            day = entry["timestamp"][:10]
+            delta = _entry_delta(entry)
+            _add_to_rollup(settled_month, delta)
+            _add_to_rollup(settled_days.setdefault(day, _new_rollup(user_id, DAY, day)), delta)
+
+        # Days not yet settled keep their live totals; the month adds them from their rollups
+        _, end = period_bounds(MONTH, month)
+        open_days = []
+        day_start = settled_until
+        while day_start < min(end, datetime.now(timezone.utc)):
+            open_days.append(period_key(DAY, day_start))
+            day_start += timedelta(days=1)
+
+        async def month_rollup() -> Dict[str, Any]:
+            doc = copy.deepcopy(settled_month)
+            for day in open_days:
+                _merge_rollup(doc, await self.get_rollup(user_id, DAY, day))
+            return doc
+
+        async def day_rollup(day: str) -> Dict[str, Any]:
+            return copy.deepcopy(settled_days[day])
+
+        drifted = 0
+        for day in settled_days:
+            drifted += await self._replace_rollup(user_id, DAY, day, lambda day=day: day_rollup(day))
+        drifted += await self._replace_rollup(user_id, MONTH, month, month_rollup)
+        return len(settled_days) + 1, drifted
+
+    async def _replace_rollup(
+        self, user_id: str, period: str, key: str, build: Callable[[], Awaitable[Dict[str, Any]]]
+    ) -> int:
+        """
+        Overwrite one rollup with a rebuilt document, guarded by its ETag.
+
+        Returns 1 if the stored totals differed from the rebuilt ones. A
+        concurrent increment changes the ETag, so the document is re-read and
+        rebuilt rather than losing that increment.
+        """
+        container = self._container(self.container_name)
+        doc_id = rollup_id(user_id, period, key)
+        for _ in range(self.max_etag_retries):
+            # Read before building: an increment landing in between fails the ETag check below
+            current = await self.get_rollup(user_id, period, key)
+            doc = await build()
+            now = datetime.now(timezone.utc).isoformat()
+            doc["updated_at"] = now
+            doc["reconciled_at"] = now
+            drifted = int(
+                current is None
+                or current.get("cost_micros") != doc["cost_micros"]
+                or current.get("requests") != doc["requests"]
+            )
+            try:
+                if current is None:
+                    await container.create_item(doc)
+                else:
+                    await container.replace_item(
+                        item=doc_id, body=doc, etag=current.get("_etag"), match_condition=MatchConditions.IfNotModified
+                    )
+                return drifted
+            except (CosmosResourceExistsError, CosmosAccessConditionFailedError):
+                # An increment got there first; rebuild on top of it
+                continue
+
+        raise RuntimeError(f"Gave up reconciling cost rollup {doc_id} after {self.max_etag_retries} ETag conflicts")
+
+
+def rollup_totals(doc: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Decimal totals from a rollup document (zeros when there is none)."""
+    doc = doc or {}
+    return {
+        "total_cost": from_micros(doc.get("cost_micros", 0)),
+        "total_requests": doc.get("requests", 0),
+        "total_tokens": doc.get("tokens", 0),
+        "cost_by_provider": {k: from_micros(v) for k, v in doc.get("cost_by_provider_micros", {}).items()},
+        "cost_by_model": {k: from_micros(v) for k, v in doc.get("cost_by_model_micros", {}).items()},
+    }
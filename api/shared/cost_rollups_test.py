@@ -0,0 +1,253 @@
+"""
+Tests for cost_rollups.py - materialized per-user spend rollups
+"""
+
+import copy
+import itertools
+from datetime import datetime, timezone
+from decimal import Decimal
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from azure.cosmos.exceptions import (
+    CosmosAccessConditionFailedError,
+    CosmosHttpResponseError,
+    CosmosResourceExistsError,
+    CosmosResourceNotFoundError,
+)
+
+from shared.cost_rollups import DAY, MONTH, CostRollupStore, period_bounds, period_key, rollup_id, rollup_totals
+from shared.cost_tracker import CostTracker
+
+_etags = itertools.count(1)
+
+
+class FakeContainer:
+    """In-memory container with the patch/ETag semantics the rollups rely on."""
+
+    def __init__(self, supports_patch=True):
+        self.items = {}
+        self.supports_patch = supports_patch
+        self.patch_calls = 0
+        self.replace_conflicts = 0
+
+    def _store(self, body):
+        body = copy.deepcopy(body)
+        body["_etag"] = str(next(_etags))
+        self.items[body["id"]] = body
+        return body
+
+    async def create_item(self, body):
+        if body["id"] in self.items:
+            raise CosmosResourceExistsError(message="exists")
+        return self._store(body)
+
+    async def upsert_item(self, body):
+        return self._store(body)
+
+    async def read_item(self, item, partition_key):
+        if item not in self.items:
+            raise CosmosResourceNotFoundError(message="not found")
+        return copy.deepcopy(self.items[item])
+
+    async def replace_item(self, item, body, etag=None, match_condition=None):
+        if self.replace_conflicts:
+            self.replace_conflicts -= 1
+            self.items[item]["_etag"] = str(next(_etags))
+        if etag is not None and self.items[item]["_etag"] != etag:
+            raise CosmosAccessConditionFailedError(message="precondition failed")
+        return self._store(body)
+
+    async def patch_item(self, item, partition_key, patch_operations):
+        self.patch_calls += 1
+        if not self.supports_patch:
+            raise CosmosHttpResponseError(status_code=400, message="patch not supported")
+        if item not in self.items:
+            raise CosmosResourceNotFoundError(message="not found")
+        doc = self.items[item]
+        for op in patch_operations:
+            *parents, leaf = [p.replace("~1", "/").replace("~0", "~") for p in op["path"].strip("/").split("/")]
+            target = doc
+            for part in parents:
+                target = target[part]
+            if op["op"] == "incr":
+                target[leaf] = target.get(leaf, 0) + op["value"]
+            else:
+                target[leaf] = op["value"]
+        doc["_etag"] = str(next(_etags))
+        return copy.deepcopy(doc)
+
+    async def query_items(self, query, parameters=None):
+        params = {p["name"]: p["value"] for p in parameters or []}
+        matches = [
+            item
+            for item in self.items.values()
+            if params["@start"] <= item["timestamp"] < params["@end"]
+            and ("@user_id" not in params or item["user_id"] == params["@user_id"])
+        ]
+        if "DISTINCT VALUE" in query:
+            for user_id in sorted({item["user_id"] for item in matches}):
+                yield user_id
+        else:
+            for item in matches:
+                yield item
+
+
+class FakeCosmosClient:
+    def __init__(self, supports_patch=True):
+        self.containers = {}
+        self.supports_patch = supports_patch
+
+    def get_database_client(self, name):
+        return self
+
+    def get_container_client(self, name):
+        return self.containers.setdefault(name, FakeContainer(self.supports_patch))
+
+
+def _entry(user_id="user-1", cost="0.015", timestamp=None, provider="openai", model="gpt-4o", entry_id=None):
+    timestamp = timestamp or datetime.now(timezone.utc)
+    return {
+        "id": entry_id or f"cost_{next(_etags)}",
+        "user_id": user_id,
+        "provider": provider,
+        "model": model,
+        "total_cost": cost,
+        "total_tokens": 100,
+        "timestamp": timestamp.isoformat(),
+    }
+
+
+class TestPeriods:
+    """Test suite for rollup period helpers."""
+
+    def test_period_keys_and_bounds(self):
+        ts = datetime(2026, 12, 31, 23, 59, tzinfo=timezone.utc)
+
+        assert period_key(DAY, ts) == "2026-12-31"
+        assert period_key(MONTH, ts) == "2026-12"
+        assert period_bounds(MONTH, "2026-12") == (
+            datetime(2026, 12, 1, tzinfo=timezone.utc),
+            datetime(2027, 1, 1, tzinfo=timezone.utc),
+        )
+        assert period_bounds(DAY, "2026-12-31")[1] == datetime(2027, 1, 1, tzinfo=timezone.utc)
+
+
+class TestCostRollupStore:
+    """Test suite for CostRollupStore updates and reconciliation."""
+
+    @pytest.mark.asyncio
+    async def test_patch_increments_day_and_month(self):
+        client = FakeCosmosClient()
+        store = CostRollupStore(client, "SutraDB", use_patch=True)
+
+        await store.apply_entry(_entry(cost="0.1"))
+        await store.apply_entry(_entry(cost="0.2", provider="anthropic", model="claude-3-haiku-20240307"))
+
+        for period in (DAY, MONTH):
+            totals = rollup_totals(await store.get_rollup("user-1", period))
+            assert totals["total_cost"] == Decimal("0.3")
+            assert totals["total_requests"] == 2
+            assert totals["total_tokens"] == 200
+            assert totals["cost_by_model"]["anthropic/claude-3-haiku-20240307"] == Decimal("0.2")
+        # First entry creates the documents, the second patches them
+        assert client.get_container_client("CostSummaries").patch_calls == 4
+
+    @pytest.mark.asyncio
+    async def test_etag_updates_retry_on_conflict(self):
+        client = FakeCosmosClient()
+        store = CostRollupStore(client, "SutraDB", use_patch=False)
+        await store.apply_entry(_entry(cost="0.1"))
+        client.get_container_client("CostSummaries").replace_conflicts = 1
+
+        await store.apply_entry(_entry(cost="0.1"))
+
+        totals = rollup_totals(await store.get_rollup("user-1", MONTH))
+        assert totals["total_cost"] == Decimal("0.2")
+        assert totals["total_requests"] == 2
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_etag_when_patch_is_rejected(self):
+        client = FakeCosmosClient(supports_patch=False)
+        store = CostRollupStore(client, "SutraDB", use_patch=True)
+        await store.apply_entry(_entry(cost="0.1"))
+
+        await store.apply_entry(_entry(cost="0.1"))
+
+        assert store.use_patch is False
+        assert rollup_totals(await store.get_rollup("user-1", DAY))["total_requests"] == 2
+
+    @pytest.mark.asyncio
+    async def test_reconcile_rebuilds_from_raw_entries(self):
+        client = FakeCosmosClient()
+        store = CostRollupStore(client, "SutraDB")
+        entries = client.get_container_client("CostEntries")
+        for day, user_id in [(3, "user-1"), (3, "user-1"), (4, "user-1"), (4, "user-2")]:
+            entry = _entry(user_id=user_id, cost="0.5", timestamp=datetime(2026, 10, day, 12, tzinfo=timezone.utc))
+            entries.items[entry["id"]] = entry
+        # user-1's month rollup missed one increment
+        await store.apply_entry(entries.items[next(iter(entries.items))])
+
+        report = await store.reconcile(month="2026-10")
+
+        assert report == {"month": "2026-10", "users": 2, "rollups_written": 5, "drift_corrected": 5}
+        month = rollup_totals(await store.get_rollup("user-1", MONTH, "2026-10"))
+        assert month["total_cost"] == Decimal("1.5")
+        assert rollup_totals(await store.get_rollup("user-1", DAY, "2026-10-03"))["total_requests"] == 2
+        assert client.get_container_client("CostSummaries").items[rollup_id("user-2", MONTH, "2026-10")]["userId"] == "user-2"
+
+    @pytest.mark.asyncio
+    async def test_reconcile_keeps_unsettled_increments(self):
+        class FrozenDatetime(datetime):
+            @classmethod
+            def now(cls, tz=None):
+                return datetime(2026, 10, 16, 12, tzinfo=timezone.utc)
+
+        client = FakeCosmosClient()
+        store = CostRollupStore(client, "SutraDB", settle_seconds=3600)
+        summaries = client.get_container_client("CostSummaries")
+        settled = _entry(cost="0.5", timestamp=datetime(2026, 10, 15, 9, tzinfo=timezone.utc))
+        client.get_container_client("CostEntries").items[settled["id"]] = settled
+        # Today's entry is still in the write-behind buffer: rolled up but not yet in CostEntries
+        await store.apply_entry(_entry(cost="0.25", timestamp=datetime(2026, 10, 16, 11, 30, tzinfo=timezone.utc)))
+        today = copy.deepcopy(summaries.items[rollup_id("user-1", DAY, "2026-10-16")])
+        # A live increment lands on the month rollup while it is being rebuilt
+        summaries.replace_conflicts = 1
+
+        with patch("shared.cost_rollups.datetime", FrozenDatetime):
+            report = await store.reconcile(month="2026-10")
+
+        assert report == {"month": "2026-10", "users": 1, "rollups_written": 2, "drift_corrected": 2}
+        month = rollup_totals(await store.get_rollup("user-1", MONTH, "2026-10"))
+        assert month["total_cost"] == Decimal("0.75")
+        assert month["total_requests"] == 2
+        assert summaries.items[rollup_id("user-1", DAY, "2026-10-16")] == today
+        assert rollup_totals(await store.get_rollup("user-1", DAY, "2026-10-15"))["total_cost"] == Decimal("0.5")
+
+
+class TestCostTrackerRollups:
+    """Test suite for CostTracker reading spend from rollups."""
+
+    @pytest.mark.asyncio
+    async def test_budget_check_reads_rollup_instead_of_scanning(self):
+        tracker = CostTracker(FakeCosmosClient(), "SutraDB")
+
+        with patch.object(tracker, "get_cost_summary", AsyncMock()) as scan:
+            await tracker.track_llm_usage("user-1", "s1", "openai", "gpt-4o", 1000, 1000, 10, "req-1")
+            await tracker.track_llm_usage("user-1", "s1", "openai", "gpt-4o", 1000, 1000, 10, "req-2")
+            summary = await tracker.get_current_spend("user-1")
+
+        scan.assert_not_called()
+        assert summary.total_requests == 2
+        assert summary.total_cost == Decimal("0.04")
+        assert summary.cost_by_provider == {"openai": Decimal("0.04")}
+
+    @pytest.mark.asyncio
+    async def test_unreadable_rollup_falls_back_to_scan(self):
+        tracker = CostTracker(FakeCosmosClient(), "SutraDB")
+        tracker.rollups.get_rollup = AsyncMock(side_effect=CosmosHttpResponseError(status_code=503, message="busy"))
+
+        with patch.object(tracker, "get_cost_summary", AsyncMock(return_value="scanned")) as scan:
+            assert await tracker.get_current_spend("user-1", DAY) == "scanned"
+
+        scan.assert_awaited_once()
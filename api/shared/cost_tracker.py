@@ -8,13 +8,17 @@ import json
 import logging
 from dataclasses import asdict, dataclass
 from datetime import datetime, timedelta, timezone
-from decimal import ROUND_HALF_UP, Decimal
+from decimal import Decimal
 from enum import Enum
 from typing import Any, Dict, List, Optional, Tuple
 
 from azure.cosmos.aio import CosmosClient
 from azure.cosmos.exceptions import CosmosResourceNotFoundError
 
+from .cost_rollups import MONTH, CostRollupStore, period_bounds, period_key, rollup_totals
+from .pricing import get_pricing_registry
+from .write_behind import cosmos_batch_writer, get_write_behind_buffer
+
 
 class CostAlertLevel(Enum):
     """Alert levels for cost thresholds."""
@@ -98,25 +102,16 @@ class CostTracker:
         self.cost_alerts_container = "CostAlerts"
         self.budget_settings_container = "BudgetSettings"
 
-        # Current API pricing (per 1K tokens) - Updated as of 2024
-        self.pricing_models = {
-            "openai": {
-                "gpt-4": {"input": Decimal("0.03"), "output": Decimal("0.06")},
-                "gpt-4-turbo": {"input": Decimal("0.01"), "output": Decimal("0.03")},
-                "gpt-4o": {"input": Decimal("0.005"), "output": Decimal("0.015")},
-                "gpt-3.5-turbo": {"input": Decimal("0.0015"), "output": Decimal("0.002")},
-            },
-            "anthropic": {
-                "claude-3-5-sonnet-20241022": {"input": Decimal("0.003"), "output": Decimal("0.015")},
-                "claude-3-haiku-20240307": {"input": Decimal("0.00025"), "output": Decimal("0.00125")},
-                "claude-3-opus-20240229": {"input": Decimal("0.015"), "output": Decimal("0.075")},
-            },
-            "google": {
-                "gemini-1.5-pro": {"input": Decimal("0.00125"), "output": Decimal("0.005")},
-                "gemini-1.5-flash": {"input": Decimal("0.000075"), "output": Decimal("0.0003")},
-                "gemini-pro": {"input": Decimal("0.0005"), "output": Decimal("0.0015")},
-            },
-        }
+        # Materialized day/month spend per user, read by budget checks
+        self.rollups = CostRollupStore(
+            cosmos_client, database_name, self.cost_summaries_container, self.cost_entries_container
+        )
+
+        # Shared per-model prices; also used by providers, budgets and real-time cost
+        self.pricing = get_pricing_registry()
+
+        # Response cache hits/misses per "provider/model"
+        self.cache_metrics: Dict[str, Dict[str, Any]] = {}
 
         # Alert thresholds (configurable per user/organization)
         self.default_thresholds = {
@@ -182,6 +177,9 @@ class CostTracker:
             # Store in database
             await self._store_cost_entry(cost_entry)
 
+            # Update running totals before the alert check reads them
+            await self._update_rollups(cost_entry)
+
             # Check for budget alerts
             await self._check_budget_alerts(user_id, total_cost)
 
@@ -198,22 +196,14 @@ class CostTracker:
     ) -> Tuple[Decimal, Decimal, Decimal]:
         """Calculate costs based on provider pricing."""
         try:
-            pricing = self.pricing_models.get(provider, {}).get(model)
-            if not pricing:
+            micros = self.pricing.cost_micros(provider, model, prompt_tokens, completion_tokens)
+            if micros is None:
                 self.logger.warning(f"No pricing found for {provider}/{model}")
                 return Decimal("0"), Decimal("0"), Decimal("0")
 
-            # Calculate costs per 1K tokens
-            input_cost = (Decimal(prompt_tokens) / 1000) * pricing["input"]
-            output_cost = (Decimal(completion_tokens) / 1000) * pricing["output"]
-            total_cost = input_cost + output_cost
-
-            # Round to 6 decimal places
-            input_cost = input_cost.quantize(Decimal("0.000001"), rounding=ROUND_HALF_UP)
-            output_cost = output_cost.quantize(Decimal("0.000001"), rounding=ROUND_HALF_UP)
-            total_cost = total_cost.quantize(Decimal("0.000001"), rounding=ROUND_HALF_UP)
-
-            return input_cost, output_cost, total_cost
+            # Integer micro-dollars, already rounded half-up to 6 decimal places
+            input_cost, output_cost, total_cost = micros
+            return Decimal(input_cost).scaleb(-6), Decimal(output_cost).scaleb(-6), Decimal(total_cost).scaleb(-6)
 
         except Exception as e:
             self.logger.error(f"Error calculating cost: {str(e)}")
@@ -222,23 +212,66 @@ class CostTracker:
     async def _store_cost_entry(self, cost_entry: CostEntry) -> None:
         """Store cost entry in database."""
         try:
-            container = self.cosmos_client.get_database_client(self.database_name).get_container_client(
-                self.cost_entries_container
-            )
-
             # Convert to dictionary for storage
             entry_dict = asdict(cost_entry)
             entry_dict["timestamp"] = cost_entry.timestamp.isoformat()
             entry_dict["input_cost"] = float(cost_entry.input_cost)
             entry_dict["output_cost"] = float(cost_entry.output_cost)
             entry_dict["total_cost"] = float(cost_entry.total_cost)
+            entry_dict["userId"] = cost_entry.user_id
 
+            # With write-behind enabled the entry is batched per user off the request path
+            buffer = get_write_behind_buffer(
+                "cost_entries", cosmos_batch_writer(self.cosmos_client, self.database_name)
+            )
+            if buffer is not None:
+                await buffer.put(self.cost_entries_container, cost_entry.user_id, entry_dict)
+                return
+
+            container = self.cosmos_client.get_database_client(self.database_name).get_container_client(
+                self.cost_entries_container
+            )
             await container.create_item(entry_dict)
 
         except Exception as e:
             self.logger.error(f"Error storing cost entry: {str(e)}")
             raise
 
+    async def _update_rollups(self, cost_entry: CostEntry) -> None:
+        """Add an entry to the user's spend rollups; reconciliation repairs any missed update."""
+        try:
+            await self.rollups.apply_entry(asdict(cost_entry))
+        except Exception as e:
+            self.logger.error(f"Error updating cost rollups for {cost_entry.user_id}: {str(e)}")
+
+    async def get_current_spend(self, user_id: str, period: str = MONTH) -> CostSummary:
+        """
+        Get a user's spend for the current UTC day or month.
+
+        Reads the materialized rollup (one point read) and falls back to
+        scanning raw entries if the rollup cannot be read.
+        """
+        now = datetime.now(timezone.utc)
+        start_date, end_date = period_bounds(period, period_key(period, now))
+        try:
+            totals = rollup_totals(await self.rollups.get_rollup(user_id, period))
+        except Exception as e:
+            self.logger.warning(f"Cost rollup unavailable for {user_id}, scanning entries: {str(e)}")
+            return await self.get_cost_summary(user_id=user_id, start_date=start_date, end_date=now)
+
+        requests = totals["total_requests"]
+        return CostSummary(
+            **totals,
+            average_cost_per_request=totals["total_cost"] / requests if requests else Decimal("0"),
+            average_tokens_per_request=totals["total_tokens"] / requests if requests else 0.0,
+            period_start=start_date,
+            period_end=end_date,
+        )
+
+    async def reconcile_rollups(self, user_ids: Optional[List[str]] = None, month: Optional[str] = None) -> Dict[str, Any]:
+        """Rebuild spend rollups from raw cost entries (current month by default)."""
+        return await self.rollups.reconcile(user_ids=user_ids, month=month)
+
     async def get_cost_summary(
         self,
         user_id: Optional[str] = None,
@@ -344,9 +377,9 @@ class CostTracker:
     async def _check_budget_alerts(self, user_id: str, new_cost: Decimal) -> None:
         """Check if cost thresholds are exceeded and create alerts."""
         try:
-            # Get current month's spending
-            start_of_month = datetime.now(timezone.utc).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-            summary = await self.get_cost_summary(user_id=user_id, start_date=start_of_month)
+            # Get current month's spending from the rollup
+            summary = await self.get_current_spend(user_id, MONTH)
+            start_of_month = summary.period_start
 
             current_spending = summary.total_cost
 
@@ -454,13 +487,39 @@ class CostTracker:
             self.logger.error(f"Error getting recent alerts: {str(e)}")
             return []
 
+    def record_cache_event(self, provider: str, model: str, hit: bool, saved_cost: float = 0.0) -> None:
+        """Record a response-cache lookup for a provider/model."""
+        stats = self.cache_metrics.setdefault(f"{provider}/{model}", {"hits": 0, "misses": 0, "saved_cost": 0.0})
+        if hit:
+            stats["hits"] += 1
+            stats["saved_cost"] += saved_cost
+        else:
+            stats["misses"] += 1
+
+    def get_cache_metrics(self) -> Dict[str, Any]:
+        """Response-cache hit/miss counts and dollars saved, overall and per provider/model."""
+        hits = sum(s["hits"] for s in self.cache_metrics.values())
+        misses = sum(s["misses"] for s in self.cache_metrics.values())
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 4) if hits + misses else 0.0,
+            "saved_cost": round(sum(s["saved_cost"] for s in self.cache_metrics.values()), 6),
+            "by_model": {
+                key: {**stats, "saved_cost": round(stats["saved_cost"], 6)} for key, stats in self.cache_metrics.items()
+            },
+        }
+
+    @property
+    def pricing_models(self) -> Dict[str, Dict[str, Dict[str, Decimal]]]:
+        """Per-1K prices by provider and model, as held by the shared pricing registry."""
+        return self.pricing.provider_table()
+
     async def update_pricing_model(self, provider: str, model: str, input_price: Decimal, output_price: Decimal) -> None:
         """Update pricing for a specific model."""
         try:
-            if provider not in self.pricing_models:
-                self.pricing_models[provider] = {}
-
-            self.pricing_models[provider][model] = {"input": input_price, "output": output_price}
+            # Hot-reloads the shared registry, so estimates and charges everywhere pick it up
+            self.pricing.update(provider, model, input_price, output_price)
 
             self.logger.info(f"Updated pricing for {provider}/{model}")
 
@@ -499,6 +558,7 @@ class CostTracker:
                 },
                 "daily_breakdown": daily_costs,
                 "efficiency_metrics": efficiency_metrics,
+                "response_cache": self.get_cache_metrics(),
                 "period": {"start": start_date.isoformat(), "end": end_date.isoformat(), "days": days},
             }
 
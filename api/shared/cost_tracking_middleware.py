@@ -215,9 +215,7 @@ class CostTrackingMiddleware:
         """
         try:
             # Get current month's spending
-            start_of_month = datetime.now(timezone.utc).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-
-            summary = await self.cost_tracker.get_cost_summary(user_id=user_id, start_date=start_of_month)
+            summary = await self.cost_tracker.get_current_spend(user_id)
 
             # Estimate cost for this request
             input_cost, output_cost, estimated_cost = self.cost_tracker._calculate_cost(
@@ -303,9 +301,7 @@ class CostTrackingMiddleware:
         """Get real-time usage statistics for a user."""
         try:
             # Get current month's summary
-            start_of_month = datetime.now(timezone.utc).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-
-            summary = await self.cost_tracker.get_cost_summary(user_id=user_id, start_date=start_of_month)
+            summary = await self.cost_tracker.get_current_spend(user_id)
 
             # Get recent alerts
             alerts = await self.cost_tracker.get_recent_alerts(user_id=user_id, limit=10)
@@ -332,7 +328,7 @@ class CostTrackingMiddleware:
                     for alert in alerts
                 ],
                 "analytics": analytics,
-                "period": {"start": start_of_month.isoformat(), "end": datetime.now(timezone.utc).isoformat()},
+                "period": {"start": summary.period_start.isoformat(), "end": datetime.now(timezone.utc).isoformat()},
             }
 
         except Exception as e:
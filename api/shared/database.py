@@ -1,13 +1,65 @@
+import asyncio
+import functools
 import json
 import logging
 import os
-from typing import Any, Dict, Optional, Union
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Union
 
+from azure.core import MatchConditions
 from azure.core.exceptions import AzureError
 from azure.cosmos import CosmosClient, exceptions
 from azure.cosmos.container import ContainerProxy
 from azure.cosmos.database import DatabaseProxy
 
+# The Cosmos SDK used here is synchronous, so every call is offloaded to a bounded
+# thread pool to keep the Functions event loop responsive.
+DEFAULT_MAX_WORKERS = 16
+DEFAULT_CONTAINER_CONCURRENCY = 8
+DEFAULT_PAGE_SIZE = 100
+
+MOCK_QUERY_RESULTS = [
+    {"id": "mock-query-result-1", "name": "Mock Query Result 1", "_mock": True},
+    {"id": "mock-query-result-2", "name": "Mock Query Result 2", "_mock": True},
+]
+
+
+@dataclass
+class QueryPage:
+    """One page of query results plus the Cosmos continuation token for the next page."""
+
+    items: List[Dict[str, Any]] = field(default_factory=list)
+    continuation_token: Optional[str] = None
+    # Request units Cosmos charged for this page (x-ms-request-charge)
+    request_charge: float = 0.0
+
+    @property
+    def has_more(self) -> bool:
+        return bool(self.continuation_token)
+
+
+class _RequestChargeRecorder:
+    """``response_hook`` adding up the RU charge of the requests made for one pager."""
+
+    def __init__(self):
+        self._charge = 0.0
+
+    def __call__(self, headers: Optional[Dict[str, Any]], _result: Any) -> None:
+        try:
+            self._charge += float((headers or {}).get("x-ms-request-charge", 0) or 0)
+        except (AttributeError, TypeError, ValueError):
+            pass
+
+    def reset(self) -> None:
+        self._charge = 0.0
+
+    def take(self) -> float:
+        """Charge recorded since the last call."""
+        charge, self._charge = self._charge, 0.0
+        return charge
+
 
 class DatabaseManager:
     """Manages Cosmos DB connections and operations for the Sutra application."""
@@ -16,6 +68,15 @@ class DatabaseManager:
         self._client: Optional[CosmosClient] = None
         self._database: Optional[DatabaseProxy] = None
         self._containers: Dict[str, ContainerProxy] = {}
+        self._partition_key_paths: Dict[str, str] = {}
+        self._client_lock = threading.Lock()
+
+        # Bounded executor and per-container concurrency limits for SDK calls
+        self._max_workers = int(os.getenv("COSMOS_DB_MAX_WORKERS", DEFAULT_MAX_WORKERS))
+        self._container_concurrency = int(os.getenv("COSMOS_DB_CONTAINER_CONCURRENCY", DEFAULT_CONTAINER_CONCURRENCY))
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._container_limits: Dict[str, asyncio.Semaphore] = {}
+        self._limits_loop: Optional[asyncio.AbstractEventLoop] = None
 
         # Check if we're in development mode or testing
         env = os.getenv("ENVIRONMENT", "").lower()
@@ -40,9 +101,36 @@ class DatabaseManager:
                 # Return None to trigger mock behavior
                 if not self._connection_string:
                     return None
-            self._client = CosmosClient.from_connection_string(self._connection_string)
+            # Client creation fetches account metadata; worker threads may race here
+            with self._client_lock:
+                if self._client is None:
+                    self._client = CosmosClient.from_connection_string(self._connection_string)
         return self._client
 
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """Get or create the bounded thread pool used for Cosmos SDK calls."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix="cosmos-db")
+        return self._executor
+
+    def _get_container_limit(self, container_name: str) -> asyncio.Semaphore:
+        """Get the concurrency limiter for a container on the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._limits_loop is not loop:
+            # Semaphores are bound to the loop they are first awaited on
+            self._container_limits = {}
+            self._limits_loop = loop
+        if container_name not in self._container_limits:
+            self._container_limits[container_name] = asyncio.Semaphore(self._container_concurrency)
+        return self._container_limits[container_name]
+
+    async def _run_in_executor(self, container_name: str, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run a blocking SDK call off the event loop, bounded per container."""
+        async with self._get_container_limit(container_name):
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, functools.partial(func, *args, **kwargs))
+
     @property
     def database(self) -> DatabaseProxy:
         """Get or create database proxy."""
@@ -64,6 +152,18 @@ class DatabaseManager:
                 return None
         return self._containers.get(container_name)
 
+    async def partition_key_path(self, container_name: str) -> Optional[str]:
+        """The container's partition key path (e.g. ``/userId``), read once from its definition."""
+        if self._development_mode:
+            return None
+        if container_name not in self._partition_key_paths:
+
+            def _read() -> str:
+                return self.get_container(container_name).read()["partitionKey"]["paths"][0]
+
+            self._partition_key_paths[container_name] = await self._run_in_executor(container_name, _read)
+        return self._partition_key_paths[container_name]
+
     async def create_item(self, container_name: str, item: Dict[str, Any], partition_key: str = None) -> Dict[str, Any]:
         """Create a new item in the specified container."""
         if self._development_mode:
@@ -72,8 +172,6 @@ class DatabaseManager:
             return {**item, "id": item.get("id", "mock-id"), "_mock": True}
 
         try:
-            container = self.get_container(container_name)
-
             # Ensure partition key is set in the item if provided
             if partition_key:
                 if "userId" in item and partition_key != item["userId"]:
@@ -83,8 +181,11 @@ class DatabaseManager:
                 elif "type" in item and partition_key != item["type"]:
                     item["type"] = partition_key
 
-            result = container.create_item(body=item, partition_key=partition_key)
-            return result
+            def _create() -> Dict[str, Any]:
+                container = self.get_container(container_name)
+                return container.create_item(body=item, partition_key=partition_key)
+
+            return await self._run_in_executor(container_name, _create)
 
         except exceptions.CosmosResourceExistsError:
             logging.warning(f"Item already exists in {container_name}")
@@ -101,9 +202,11 @@ class DatabaseManager:
             return {"id": item_id, "name": "Mock Item", "_mock": True}
 
         try:
-            container = self.get_container(container_name)
-            result = container.read_item(item=item_id, partition_key=partition_key)
-            return result
+            def _read() -> Dict[str, Any]:
+                container = self.get_container(container_name)
+                return container.read_item(item=item_id, partition_key=partition_key)
+
+            return await self._run_in_executor(container_name, _read)
 
         except exceptions.CosmosResourceNotFoundError:
             return None
@@ -119,8 +222,6 @@ class DatabaseManager:
             return {**item, "_mock": True}
 
         try:
-            container = self.get_container(container_name)
-
             # Ensure the partition key is correct in the item
             if "userId" in item and partition_key != item["userId"]:
                 item["userId"] = partition_key
@@ -129,13 +230,63 @@ class DatabaseManager:
             elif "type" in item and partition_key != item["type"]:
                 item["type"] = partition_key
 
-            result = container.upsert_item(body=item, partition_key=partition_key)
-            return result
+            def _upsert() -> Dict[str, Any]:
+                container = self.get_container(container_name)
+                return container.upsert_item(body=item, partition_key=partition_key)
+
+            return await self._run_in_executor(container_name, _upsert)
 
         except exceptions.CosmosHttpResponseError as e:
             logging.error(f"Error updating item in {container_name}: {e}")
             raise
 
+    async def replace_item(self, container_name: str, item: Dict[str, Any], etag: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Replace an existing item (its partition key is read from the body). With ``etag``
+        the replace only applies if the item is unchanged since it was read; otherwise
+        CosmosAccessConditionFailedError is raised.
+        """
+        if self._development_mode:
+            logging.info(f"DEV MODE: Replacing item in {container_name}")
+            return {**item, "_mock": True}
+
+        try:
+            conditions: Dict[str, Any] = {}
+            if etag:
+                conditions.update(etag=etag, match_condition=MatchConditions.IfNotModified)
+
+            def _replace() -> Dict[str, Any]:
+                container = self.get_container(container_name)
+                return container.replace_item(item=item["id"], body=item, **conditions)
+
+            return await self._run_in_executor(container_name, _replace)
+
+        except exceptions.CosmosAccessConditionFailedError:
+            raise
+        except exceptions.CosmosHttpResponseError as e:
+            logging.error(f"Error replacing item in {container_name}: {e}")
+            raise
+
+    async def upsert_items_batch(
+        self, container_name: str, items: List[Dict[str, Any]], partition_key: str
+    ) -> List[Dict[str, Any]]:
+        """Upsert up to 100 items sharing a partition key as one transactional batch."""
+        if self._development_mode:
+            logging.info(f"DEV MODE: Batch upserting {len(items)} items in {container_name}")
+            return [{**item, "_mock": True} for item in items]
+
+        try:
+            def _batch() -> List[Dict[str, Any]]:
+                container = self.get_container(container_name)
+                operations = [("upsert", (item,)) for item in items]
+                return container.execute_item_batch(batch_operations=operations, partition_key=partition_key)
+
+            return await self._run_in_executor(container_name, _batch)
+
+        except exceptions.CosmosHttpResponseError as e:
+            logging.error(f"Error batch upserting items in {container_name}: {e}")
+            raise
+
     async def delete_item(self, container_name: str, item_id: str, partition_key: str) -> None:
         """Delete an item from the specified container."""
         if self._development_mode:
@@ -144,8 +295,11 @@ class DatabaseManager:
             return
 
         try:
-            container = self.get_container(container_name)
-            container.delete_item(item=item_id, partition_key=partition_key)
+            def _delete() -> None:
+                container = self.get_container(container_name)
+                container.delete_item(item=item_id, partition_key=partition_key)
+
+            await self._run_in_executor(container_name, _delete)
             return True
 
         except exceptions.CosmosResourceNotFoundError:
@@ -165,29 +319,19 @@ class DatabaseManager:
         if self._development_mode:
             # Return mock query results for development
             logging.info(f"DEV MODE: Querying items from {container_name} with query: {query}")
-            return [
-                {
-                    "id": "mock-query-result-1",
-                    "name": "Mock Query Result 1",
-                    "_mock": True,
-                },
-                {
-                    "id": "mock-query-result-2",
-                    "name": "Mock Query Result 2",
-                    "_mock": True,
-                },
-            ]
+            return [dict(item) for item in MOCK_QUERY_RESULTS]
 
         try:
-            container = self.get_container(container_name)
-
             query_options = {}
             if partition_key:
                 query_options["partition_key"] = partition_key
 
-            items = list(container.query_items(query=query, parameters=parameters, **query_options))
+            def _query() -> list:
+                # Paging through the result set happens on the worker thread as well
+                container = self.get_container(container_name)
+                return list(container.query_items(query=query, parameters=parameters, **query_options))
 
-            return items
+            return await self._run_in_executor(container_name, _query)
 
         except exceptions.CosmosHttpResponseError as e:
             logging.error(f"Error querying items from {container_name}: {e}")
@@ -209,19 +353,131 @@ class DatabaseManager:
             ]
 
         try:
-            container = self.get_container(container_name)
-
-            query_options = {"max_item_count": max_item_count}
+            query_options = {"max_item_count": min(max_item_count, DEFAULT_PAGE_SIZE)}
             if partition_key:
                 query_options["partition_key"] = partition_key
 
-            items = list(container.read_all_items(**query_options))
+            def _open_pager(response_hook):
+                container = self.get_container(container_name)
+                return container.read_all_items(response_hook=response_hook, **query_options).by_page()
+
+            # max_item_count caps the total, so stop paging once it is reached
+            items: list = []
+            async for page in self._iter_pages(container_name, _open_pager, max_items=max_item_count):
+                items.extend(page.items)
             return items
 
         except exceptions.CosmosHttpResponseError as e:
             logging.error(f"Error listing items from {container_name}: {e}")
             raise
 
+    async def iter_query_pages(
+        self,
+        container_name: str,
+        query: str,
+        parameters: Optional[list] = None,
+        partition_key: Optional[str] = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        continuation_token: Optional[str] = None,
+        max_items: Optional[int] = None,
+    ) -> AsyncIterator[QueryPage]:
+        """
+        Stream query results one page at a time.
+
+        Each page is fetched on demand and carries the continuation token for the
+        next one, so callers can stop early or hand the token back to a client as
+        a cursor. A page truncated by ``max_items`` carries no token.
+        """
+        if self._development_mode:
+            logging.info(f"DEV MODE: Paging items from {container_name} with query: {query}")
+            yield QueryPage(items=[dict(item) for item in MOCK_QUERY_RESULTS][:max_items])
+            return
+
+        query_options: Dict[str, Any] = {"max_item_count": page_size}
+        if partition_key:
+            query_options["partition_key"] = partition_key
+
+        def _open_pager(response_hook):
+            container = self.get_container(container_name)
+            pager = container.query_items(query=query, parameters=parameters, response_hook=response_hook, **query_options)
+            return pager.by_page(continuation_token)
+
+        try:
+            async for page in self._iter_pages(container_name, _open_pager, max_items=max_items):
+                yield page
+        except exceptions.CosmosHttpResponseError as e:
+            logging.error(f"Error paging items from {container_name}: {e}")
+            raise
+
+    async def iter_query_items(
+        self,
+        container_name: str,
+        query: str,
+        parameters: Optional[list] = None,
+        partition_key: Optional[str] = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        max_items: Optional[int] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Stream query results item by item without materializing the full result set."""
+        async for page in self.iter_query_pages(
+            container_name, query, parameters, partition_key, page_size=page_size, max_items=max_items
+        ):
+            for item in page.items:
+                yield item
+
+    async def query_page(
+        self,
+        container_name: str,
+        query: str,
+        parameters: Optional[list] = None,
+        partition_key: Optional[str] = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        continuation_token: Optional[str] = None,
+    ) -> QueryPage:
+        """Fetch a single page of results for cursor-based pagination."""
+        async for page in self.iter_query_pages(
+            container_name,
+            query,
+            parameters,
+            partition_key,
+            page_size=page_size,
+            continuation_token=continuation_token,
+            max_items=page_size,
+        ):
+            return page
+        return QueryPage()
+
+    async def _iter_pages(
+        self, container_name: str, open_pager: Callable[[Any], Any], max_items: Optional[int] = None
+    ) -> AsyncIterator[QueryPage]:
+        """Drive a blocking SDK page iterator from the executor, one page per hop."""
+        charges = _RequestChargeRecorder()
+        pager = await self._run_in_executor(container_name, lambda: open_pager(charges))
+        # The SDK also calls the hook once on creation with the client-wide last
+        # response headers, which may belong to another thread's request
+        charges.reset()
+        remaining = max_items
+
+        def _next_page():
+            try:
+                page = next(pager)
+            except StopIteration:
+                return None
+            return list(page), pager.continuation_token, charges.take()
+
+        while remaining is None or remaining > 0:
+            result = await self._run_in_executor(container_name, _next_page)
+            if result is None:
+                return
+            items, token, charge = result
+            if remaining is not None:
+                if len(items) > remaining:
+                    items, token = items[:remaining], None
+                remaining -= len(items)
+            yield QueryPage(items=items, continuation_token=token, request_charge=charge)
+            if not token:
+                return
+
     # =============================================================================
     # USER MANAGEMENT METHODS
     # =============================================================================
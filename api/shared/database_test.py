@@ -3,9 +3,10 @@ Tests for database.py module - Database connection and operations
 """
 
 import os
-from unittest.mock import MagicMock, Mock, patch
+from unittest.mock import ANY, MagicMock, Mock, patch
 
 import pytest
+from azure.core import MatchConditions
 from azure.cosmos import CosmosClient, exceptions
 from azure.cosmos.container import ContainerProxy
 from azure.cosmos.database import DatabaseProxy
@@ -166,6 +167,21 @@ class TestDatabaseManager:
             container = db_manager.get_container("test_container")
             assert container is None
 
+    @pytest.mark.asyncio
+    @patch("api.shared.database.CosmosClient.from_connection_string")
+    async def test_partition_key_path_is_read_once(self, mock_cosmos_client):
+        """Test that partition_key_path reads the container definition once."""
+        mock_container = Mock(spec=ContainerProxy)
+        mock_container.read.return_value = {"id": "usage_tracking", "partitionKey": {"paths": ["/user_id"], "kind": "Hash"}}
+        mock_cosmos_client.return_value.get_database_client.return_value.get_container_client.return_value = mock_container
+
+        with patch.dict(os.environ, {"COSMOS_DB_CONNECTION_STRING": "test_connection_string", "ENVIRONMENT": "production"}):
+            db_manager = DatabaseManager()
+
+            assert await db_manager.partition_key_path("usage_tracking") == "/user_id"
+            assert await db_manager.partition_key_path("usage_tracking") == "/user_id"
+            mock_container.read.assert_called_once()
+
     @pytest.mark.asyncio
     async def test_create_item_development_mode(self):
         """Test create_item in development mode."""
@@ -369,6 +385,27 @@ class TestDatabaseManagerProductionOperations:
 
             assert result is None
 
+    @pytest.mark.asyncio
+    @patch("api.shared.database.CosmosClient.from_connection_string")
+    async def test_replace_item_with_etag(self, mock_cosmos_client):
+        """Test that replace_item is conditional on the ETag and surfaces a conflict."""
+        mock_container = Mock(spec=ContainerProxy)
+        mock_container.replace_item.return_value = {"id": "test_id", "_etag": "2"}
+        mock_cosmos_client.return_value.get_database_client.return_value.get_container_client.return_value = mock_container
+
+        with patch.dict(os.environ, {"COSMOS_DB_CONNECTION_STRING": "test_connection_string", "ENVIRONMENT": "production"}):
+            db_manager = DatabaseManager()
+            item = {"id": "test_id", "userId": "user-1"}
+
+            assert await db_manager.replace_item("test_container", item, etag="1") == {"id": "test_id", "_etag": "2"}
+            mock_container.replace_item.assert_called_once_with(
+                item="test_id", body=item, etag="1", match_condition=MatchConditions.IfNotModified
+            )
+
+            mock_container.replace_item.side_effect = exceptions.CosmosAccessConditionFailedError(message="Precondition")
+            with pytest.raises(exceptions.CosmosAccessConditionFailedError):
+                await db_manager.replace_item("test_container", item, etag="1")
+
     @pytest.mark.asyncio
     @patch("api.shared.database.CosmosClient.from_connection_string")
     async def test_delete_item_success(self, mock_cosmos_client):
@@ -457,3 +494,239 @@ class TestGlobalFunctions:
             client = get_cosmos_client()
             assert client == mock_client_instance
             mock_cosmos_client.from_connection_string.assert_called_once()
+
+
+class TestDatabaseManagerExecutorOffload:
+    """Test suite for offloading blocking SDK calls from the event loop."""
+
+    @pytest.mark.asyncio
+    @patch("api.shared.database.CosmosClient.from_connection_string")
+    async def test_query_items_runs_off_event_loop(self, mock_cosmos_client):
+        """Test that query_items pages through results on a worker thread."""
+        import threading
+
+        mock_client = Mock(spec=CosmosClient)
+        mock_database = Mock(spec=DatabaseProxy)
+        mock_container = Mock(spec=ContainerProxy)
+        mock_client.get_database_client.return_value = mock_database
+        mock_database.get_container_client.return_value = mock_container
+        mock_cosmos_client.return_value = mock_client
+
+        loop_thread = threading.current_thread()
+        seen_threads = []
+
+        def fake_query(**kwargs):
+            seen_threads.append(threading.current_thread())
+            yield {"id": "item-1"}
+            yield {"id": "item-2"}
+
+        mock_container.query_items.side_effect = fake_query
+
+        with patch.dict(
+            os.environ,
+            {"COSMOS_DB_CONNECTION_STRING": "test_connection_string", "ENVIRONMENT": "production"},
+        ):
+            db_manager = DatabaseManager()
+            result = await db_manager.query_items("test_container", "SELECT * FROM c", partition_key="user-1")
+
+        assert result == [{"id": "item-1"}, {"id": "item-2"}]
+        assert seen_threads and seen_threads[0] is not loop_thread
+        mock_container.query_items.assert_called_once_with(
+            query="SELECT * FROM c", parameters=None, partition_key="user-1"
+        )
+
+    @pytest.mark.asyncio
+    @patch("api.shared.database.CosmosClient.from_connection_string")
+    async def test_per_container_concurrency_limit(self, mock_cosmos_client):
+        """Test that concurrent calls against one container are bounded."""
+        import asyncio
+        import threading
+        import time
+
+        mock_client = Mock(spec=CosmosClient)
+        mock_database = Mock(spec=DatabaseProxy)
+        mock_container = Mock(spec=ContainerProxy)
+        mock_client.get_database_client.return_value = mock_database
+        mock_database.get_container_client.return_value = mock_container
+        mock_cosmos_client.return_value = mock_client
+
+        lock = threading.Lock()
+        state = {"active": 0, "peak": 0}
+
+        def slow_read(**kwargs):
+            with lock:
+                state["active"] += 1
+                state["peak"] = max(state["peak"], state["active"])
+            time.sleep(0.01)
+            with lock:
+                state["active"] -= 1
+            return {"id": kwargs["item"]}
+
+        mock_container.read_item.side_effect = slow_read
+
+        with patch.dict(
+            os.environ,
+            {
+                "COSMOS_DB_CONNECTION_STRING": "test_connection_string",
+                "ENVIRONMENT": "production",
+                "COSMOS_DB_CONTAINER_CONCURRENCY": "2",
+            },
+        ):
+            db_manager = DatabaseManager()
+            results = await asyncio.gather(
+                *(db_manager.read_item("test_container", f"id-{i}", "pk") for i in range(8))
+            )
+
+        assert [r["id"] for r in results] == [f"id-{i}" for i in range(8)]
+        assert state["peak"] <= 2
+
+    @pytest.mark.asyncio
+    @patch("api.shared.database.CosmosClient.from_connection_string")
+    async def test_executor_errors_propagate(self, mock_cosmos_client):
+        """Test that SDK errors raised on the worker thread reach the caller."""
+        mock_client = Mock(spec=CosmosClient)
+        mock_database = Mock(spec=DatabaseProxy)
+        mock_container = Mock(spec=ContainerProxy)
+        mock_client.get_database_client.return_value = mock_database
+        mock_database.get_container_client.return_value = mock_container
+        mock_cosmos_client.return_value = mock_client
+
+        mock_container.upsert_item.side_effect = exceptions.CosmosHttpResponseError(message="Throttled")
+
+        with patch.dict(
+            os.environ,
+            {"COSMOS_DB_CONNECTION_STRING": "test_connection_string", "ENVIRONMENT": "production"},
+        ):
+            db_manager = DatabaseManager()
+            with pytest.raises(exceptions.CosmosHttpResponseError):
+                await db_manager.update_item("test_container", {"id": "x", "userId": "u"}, "u")
+
+
+class _FakePager:
+    """Minimal stand-in for the SDK page iterator returned by ItemPaged.by_page()."""
+
+    def __init__(self, pages, charges=(), container=None):
+        self._pages = list(pages)
+        self._charges = list(charges)
+        self._container = container
+        self._index = 0
+        self.continuation_token = None
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._index >= len(self._pages):
+            raise StopIteration
+        page = self._pages[self._index]
+        if self._charges:
+            # The SDK reports each backend response to the hook passed to query_items
+            hook = self._container.query_items.call_args.kwargs["response_hook"]
+            hook({"x-ms-request-charge": str(self._charges[self._index])}, page)
+        self._index += 1
+        self.continuation_token = f"token-{self._index}" if self._index < len(self._pages) else None
+        return iter(page)
+
+
+class TestDatabaseManagerPagination:
+    """Test suite for continuation-token pagination."""
+
+    def _manager_with_container(self, mock_cosmos_client):
+        mock_client = Mock(spec=CosmosClient)
+        mock_database = Mock(spec=DatabaseProxy)
+        mock_container = Mock(spec=ContainerProxy)
+        mock_client.get_database_client.return_value = mock_database
+        mock_database.get_container_client.return_value = mock_container
+        mock_cosmos_client.return_value = mock_client
+        with patch.dict(
+            os.environ,
+            {"COSMOS_DB_CONNECTION_STRING": "test_connection_string", "ENVIRONMENT": "production"},
+        ):
+            return DatabaseManager(), mock_container
+
+    @pytest.mark.asyncio
+    @patch("api.shared.database.CosmosClient.from_connection_string")
+    async def test_iter_query_pages_streams_pages(self, mock_cosmos_client):
+        """Test that pages are yielded lazily with their continuation tokens."""
+        db_manager, container = self._manager_with_container(mock_cosmos_client)
+        pager = _FakePager([[{"id": "1"}, {"id": "2"}], [{"id": "3"}]])
+        container.query_items.return_value.by_page.return_value = pager
+
+        pages = [
+            page
+            async for page in db_manager.iter_query_pages("Prompts", "SELECT * FROM c", partition_key="u1", page_size=2)
+        ]
+
+        assert [len(page.items) for page in pages] == [2, 1]
+        assert pages[0].continuation_token == "token-1"
+        assert pages[0].has_more is True
+        assert pages[1].has_more is False
+        container.query_items.assert_called_once_with(
+            query="SELECT * FROM c", parameters=None, response_hook=ANY, max_item_count=2, partition_key="u1"
+        )
+
+    @pytest.mark.asyncio
+    @patch("api.shared.database.CosmosClient.from_connection_string")
+    async def test_request_charge_is_recorded_per_page(self, mock_cosmos_client):
+        """Test that each page carries its own RU charge from the response hook."""
+        db_manager, container = self._manager_with_container(mock_cosmos_client)
+        container.query_items.return_value.by_page.return_value = _FakePager(
+            [[{"id": "1"}], [{"id": "2"}]], charges=[2.5, 4.0], container=container
+        )
+
+        pages = [page async for page in db_manager.iter_query_pages("Prompts", "SELECT * FROM c")]
+
+        assert [page.request_charge for page in pages] == [2.5, 4.0]
+
+    @pytest.mark.asyncio
+    @patch("api.shared.database.CosmosClient.from_connection_string")
+    async def test_query_page_resumes_from_token(self, mock_cosmos_client):
+        """Test that query_page fetches one page starting at the given token."""
+        db_manager, container = self._manager_with_container(mock_cosmos_client)
+        pager = _FakePager([[{"id": "3"}], [{"id": "4"}]])
+        container.query_items.return_value.by_page.return_value = pager
+
+        page = await db_manager.query_page("Prompts", "SELECT * FROM c", page_size=1, continuation_token="token-2")
+
+        assert page.items == [{"id": "3"}]
+        assert page.continuation_token == "token-1"
+        container.query_items.return_value.by_page.assert_called_once_with("token-2")
+        # The second page is never requested
+        assert pager._index == 1
+
+    @pytest.mark.asyncio
+    @patch("api.shared.database.CosmosClient.from_connection_string")
+    async def test_iter_query_items_respects_max_items(self, mock_cosmos_client):
+        """Test that streaming stops once max_items have been produced."""
+        db_manager, container = self._manager_with_container(mock_cosmos_client)
+        pager = _FakePager([[{"id": "1"}, {"id": "2"}], [{"id": "3"}, {"id": "4"}], [{"id": "5"}]])
+        container.query_items.return_value.by_page.return_value = pager
+
+        items = [item async for item in db_manager.iter_query_items("Prompts", "SELECT * FROM c", max_items=3)]
+
+        assert [item["id"] for item in items] == ["1", "2", "3"]
+        assert pager._index == 2
+
+    @pytest.mark.asyncio
+    @patch("api.shared.database.CosmosClient.from_connection_string")
+    async def test_list_items_caps_total(self, mock_cosmos_client):
+        """Test that list_items treats max_item_count as a total cap."""
+        db_manager, container = self._manager_with_container(mock_cosmos_client)
+        pager = _FakePager([[{"id": str(i)} for i in range(3)], [{"id": str(i)} for i in range(3, 6)]])
+        container.read_all_items.return_value.by_page.return_value = pager
+
+        items = await db_manager.list_items("Prompts", max_item_count=4)
+
+        assert len(items) == 4
+        container.read_all_items.assert_called_once_with(response_hook=ANY, max_item_count=4)
+
+    @pytest.mark.asyncio
+    async def test_query_page_development_mode(self):
+        """Test query_page in development mode."""
+        with patch.dict(os.environ, {"ENVIRONMENT": "test"}, clear=True):
+            db_manager = DatabaseManager()
+
+            page = await db_manager.query_page("Prompts", "SELECT * FROM c")
+
+            assert len(page.items) == 2
+            assert page.continuation_token is None
@@ -0,0 +1,130 @@
+"""
+Brace-balanced JSON object extraction from LLM output.
+
+Models wrap their JSON in prose and code fences, so the payload has to be cut
+out of the surrounding text. A greedy ``\\{.*\\}`` match spans from the first
+brace to the last one in the whole response, which breaks as soon as the prose
+contains a brace and re-scans the full text on every call.
+
+``JSONObjectScanner`` tracks brace depth and string/escape state, so it finds
+the end of each top-level object in one pass, and accepts text in chunks so a
+streamed response can be parsed as it arrives. ``extract_json_object`` is the
+one-shot helper for a complete response.
+"""
+
+import json
+import re
+from typing import Any, Dict, List, Optional
+
+# Characters that change scanner state outside and inside a JSON string
+_STRUCTURAL = re.compile(r'[{}"]')
+_IN_STRING = re.compile(r'["\\]')
+
+_decoder = json.JSONDecoder()
+
+
+class JSONObjectScanner:
+    """Incrementally finds top-level JSON objects in text fed chunk by chunk.
+
+    Balanced candidates that are not valid JSON (e.g. ``{placeholder}`` in
+    prose) are skipped whole, so nested objects are never returned on their own.
+    """
+
+    def __init__(self):
+        self._parts: List[str] = []
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self.invalid_candidates = 0
+
+    @property
+    def in_object(self) -> bool:
+        """True while an object has been opened but not yet closed."""
+        return self._depth > 0
+
+    def feed(self, chunk: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Scan ``chunk`` and return the objects completed by it, in order.
+
+        Stops after ``limit`` objects; any text after the last returned object
+        in this chunk is discarded.
+        """
+        found: List[Dict[str, Any]] = []
+        pos, end = 0, len(chunk)
+
+        while pos < end and (limit is None or len(found) < limit):
+            if self._depth == 0:
+                start = chunk.find("{", pos)
+                if start < 0:
+                    break
+                self._depth, pos = 1, start + 1
+            else:
+                start = 0  # continuing an object opened in an earlier chunk
+
+            pos = self._scan(chunk, pos, end)
+            if self._depth > 0:
+                self._parts.append(chunk[start:])
+                break
+
+            self._parts.append(chunk[start:pos])
+            candidate = "".join(self._parts)
+            self._parts = []
+            parsed = _loads_object(candidate)
+            if parsed is None:
+                self.invalid_candidates += 1
+            else:
+                found.append(parsed)
+
+        return found
+
+    def _scan(self, chunk: str, pos: int, end: int) -> int:
+        """Advance through ``chunk`` until the current object closes; returns the index after it."""
+        while pos < end:
+            if self._escape:
+                self._escape = False
+                pos += 1
+                continue
+            match = (_IN_STRING if self._in_string else _STRUCTURAL).search(chunk, pos)
+            if match is None:
+                return end
+            char, pos = match.group(), match.end()
+            if self._in_string:
+                if char == "\\":
+                    self._escape = True
+                else:
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char == "{":
+                self._depth += 1
+            else:
+                self._depth -= 1
+                if self._depth == 0:
+                    return pos
+        return end
+
+
+def _loads_object(text: str) -> Optional[Dict[str, Any]]:
+    try:
+        parsed = json.loads(text)
+    except ValueError:
+        return None
+    return parsed if isinstance(parsed, dict) else None
+
+
+def extract_json_object(text: str) -> Optional[Dict[str, Any]]:
+    """The first valid top-level JSON object in ``text``, or None.
+
+    Tries a single C-level ``raw_decode`` at the first brace, which covers the
+    usual "prose, then one JSON object" shape, and falls back to scanning.
+    """
+    start = text.find("{")
+    if start < 0:
+        return None
+    try:
+        parsed, _ = _decoder.raw_decode(text, start)
+        if isinstance(parsed, dict):
+            return parsed
+    except ValueError:
+        pass
+    found = JSONObjectScanner().feed(text[start:], limit=1)
+    return found[0] if found else None
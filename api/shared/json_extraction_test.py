@@ -0,0 +1,48 @@
+"""
+Tests for json_extraction.py - brace-balanced JSON extraction from LLM output
+"""
+
+import json
+
+from shared.json_extraction import JSONObjectScanner, extract_json_object
+
+
+class TestExtractJsonObject:
+    """Test suite for one-shot extraction."""
+
+    def test_object_wrapped_in_prose_and_fence(self):
+        text = 'Here is my analysis:\n```json\n{"pattern": "Microservices", "scores": {"a": 1}}\n```\nThanks {again}.'
+
+        assert extract_json_object(text) == {"pattern": "Microservices", "scores": {"a": 1}}
+
+    def test_skips_invalid_candidate_without_returning_nested_object(self):
+        text = 'Fill in {placeholder} then: {"outer": {"inner": 1}, "note": "braces } in \\"strings\\" {"}'
+
+        assert extract_json_object(text) == {"outer": {"inner": 1}, "note": 'braces } in "strings" {'}
+
+    def test_invalid_whole_object_is_not_replaced_by_a_nested_one(self):
+        assert extract_json_object('{"a": {"b": 1},}') is None
+        assert extract_json_object("no json here") is None
+
+
+class TestJSONObjectScanner:
+    """Test suite for incremental scanning."""
+
+    def test_objects_split_across_chunks(self):
+        payload = json.dumps({"text": 'quote \\" and {brace}', "items": [{"x": 1}, {"y": 2}]})
+        stream = f"intro {payload} middle {{\"second\": true}} tail"
+        scanner = JSONObjectScanner()
+
+        found = []
+        for i in range(0, len(stream), 3):
+            found.extend(scanner.feed(stream[i : i + 3]))
+
+        assert found == [json.loads(payload), {"second": True}]
+        assert not scanner.in_object
+
+    def test_escape_at_chunk_boundary(self):
+        scanner = JSONObjectScanner()
+
+        assert scanner.feed('{"a": "x\\') == []
+        assert scanner.in_object
+        assert scanner.feed('"}"}') == [{"a": 'x"}'}]
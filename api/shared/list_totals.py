@@ -0,0 +1,168 @@
+"""
+Total-count layer for paginated list endpoints.
+
+List endpoints used to run their page query followed by a second
+``SELECT VALUE COUNT(1)`` with the same filters. This module keeps one list page
+to a single round-trip where possible:
+
+- totals are cached per container, per scope (user or collection) and per filter
+  set, and invalidated when items in that scope are created, deleted or have a
+  filtered field (name, description, tags, ...) edited;
+- a first page that is not full already tells us the exact total;
+- callers can opt into an estimated total that never runs COUNT.
+
+The cache is process-local with a TTL, so totals changed by another instance
+converge within ``LIST_TOTAL_CACHE_TTL`` seconds.
+"""
+
+import json
+import os
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+from cachetools import TTLCache
+
+DEFAULT_TTL_SECONDS = 300
+DEFAULT_MAX_ENTRIES = 10000
+
+
+@dataclass
+class ListTotal:
+    """A list total and whether it is exact."""
+
+    count: int
+    estimated: bool = False
+    cached: bool = False
+
+
+class ListTotalCache:
+    """TTL cache of list totals keyed by container, scope and filters."""
+
+    def __init__(self, ttl_seconds: Optional[float] = None, max_entries: int = DEFAULT_MAX_ENTRIES):
+        if ttl_seconds is None:
+            ttl_seconds = float(os.getenv("LIST_TOTAL_CACHE_TTL", DEFAULT_TTL_SECONDS))
+        self._totals: TTLCache = TTLCache(maxsize=max_entries, ttl=ttl_seconds)
+        # Scope generations let one invalidation drop every filter variant at once.
+        # They expire with the same TTL: once a scope's generation is gone, every
+        # total cached under an older generation has expired too. Values come from
+        # one counter and are never reused, so a scope never returns to a
+        # generation that still has entries.
+        self._generations: TTLCache = TTLCache(maxsize=max_entries, ttl=ttl_seconds)
+        self._last_generation = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, container_name: str, scope: str, filters: Optional[Dict[str, Any]]) -> Tuple[str, str, int, str]:
+        generation = self._generations.get((container_name, scope), 0)
+        filter_key = json.dumps(filters or {}, sort_keys=True, default=str)
+        return container_name, scope, generation, filter_key
+
+    def get(self, container_name: str, scope: str, filters: Optional[Dict[str, Any]] = None) -> Optional[int]:
+        with self._lock:
+            total = self._totals.get(self._key(container_name, scope, filters))
+            if total is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return total
+
+    def set(self, container_name: str, scope: str, filters: Optional[Dict[str, Any]], total: int) -> None:
+        with self._lock:
+            self._totals[self._key(container_name, scope, filters)] = total
+
+    def invalidate(self, container_name: str, scope: Optional[str]) -> None:
+        """Drop every cached total for a scope, e.g. after a create, delete or rename."""
+        if not scope:
+            return
+        with self._lock:
+            self._last_generation += 1
+            self._generations[(container_name, scope)] = self._last_generation
+
+    def clear(self) -> None:
+        with self._lock:
+            self._totals.clear()
+            self._generations.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._totals),
+            "scopes": len(self._generations),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+async def resolve_list_total(
+    db_manager: Any,
+    container_name: str,
+    scope: str,
+    filters: Optional[Dict[str, Any]],
+    count_query: str,
+    count_params: list,
+    page_size: int,
+    has_more: bool,
+    offset: Optional[int] = 0,
+    estimate: bool = False,
+    partition_key: Optional[str] = None,
+) -> ListTotal:
+    """
+    Work out the total for a list page, running COUNT only when unavoidable.
+
+    ``page_size`` is the number of items actually returned and ``has_more``
+    whether another page exists. ``offset`` is the number of items before this
+    page, or None when it is unknown (cursor pages).
+    """
+    cache = get_list_total_cache()
+
+    # A final page whose position is known fixes the exact total
+    if not has_more and offset is not None and (page_size or not offset):
+        total = offset + page_size
+        cache.set(container_name, scope, filters, total)
+        return ListTotal(count=total)
+
+    seen = (offset or 0) + page_size
+    cached = cache.get(container_name, scope, filters)
+    if cached is not None:
+        return ListTotal(count=max(cached, seen), cached=True)
+
+    if estimate:
+        # Lower bound: everything seen so far plus at least one more item
+        return ListTotal(count=seen + (1 if has_more else 0), estimated=True)
+
+    count_result = await db_manager.query_items(
+        container_name=container_name, query=count_query, parameters=count_params, partition_key=partition_key
+    )
+
+    # Handle development mode where we get mock data
+    if count_result and isinstance(count_result[0], dict) and "_mock" in count_result[0]:
+        total = 2  # Mock count for development
+    else:
+        total = count_result[0] if count_result else 0
+    if not isinstance(total, int):
+        total = 0
+
+    cache.set(container_name, scope, filters, total)
+    return ListTotal(count=total)
+
+
+def invalidate_list_totals(container_name: str, scope: Optional[str]) -> None:
+    """Invalidate cached totals for a scope after items are created, deleted or have filtered fields edited."""
+    get_list_total_cache().invalidate(container_name, scope)
+
+
+# Global total cache - initialized lazily
+_list_total_cache: Optional[ListTotalCache] = None
+
+
+def get_list_total_cache() -> ListTotalCache:
+    """Get the global list total cache."""
+    global _list_total_cache
+    if _list_total_cache is None:
+        _list_total_cache = ListTotalCache()
+    return _list_total_cache
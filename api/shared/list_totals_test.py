@@ -0,0 +1,128 @@
+"""
+Tests for list_totals.py - cached and estimated list totals
+"""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from shared.list_totals import ListTotalCache, get_list_total_cache, invalidate_list_totals, resolve_list_total
+
+COUNT_QUERY = "SELECT VALUE COUNT(1) FROM c WHERE c.userId = @user_id"
+COUNT_PARAMS = [{"name": "@user_id", "value": "user-1"}]
+
+
+@pytest.fixture
+def db_manager():
+    manager = MagicMock()
+    manager.query_items = AsyncMock(return_value=[42])
+    return manager
+
+
+async def _resolve(db_manager, **kwargs):
+    options = {"page_size": 20, "has_more": True, "offset": 0, "filters": {"type": "private"}}
+    options.update(kwargs)
+    filters = options.pop("filters")
+    return await resolve_list_total(db_manager, "Collections", "user-1", filters, COUNT_QUERY, COUNT_PARAMS, **options)
+
+
+class TestListTotalCache:
+    """Test suite for ListTotalCache."""
+
+    def test_keyed_by_filters(self):
+        cache = ListTotalCache()
+        cache.set("Collections", "user-1", {"type": "private", "search": ""}, 7)
+
+        assert cache.get("Collections", "user-1", {"search": "", "type": "private"}) == 7
+        assert cache.get("Collections", "user-1", {"type": "shared_team"}) is None
+        assert cache.get("Collections", "user-2", {"type": "private", "search": ""}) is None
+
+    def test_invalidate_drops_all_filters_for_scope(self):
+        cache = ListTotalCache()
+        cache.set("Collections", "user-1", {}, 7)
+        cache.set("Collections", "user-1", {"type": "private"}, 3)
+        cache.set("Collections", "user-2", {}, 9)
+
+        cache.invalidate("Collections", "user-1")
+
+        assert cache.get("Collections", "user-1", {}) is None
+        assert cache.get("Collections", "user-1", {"type": "private"}) is None
+        assert cache.get("Collections", "user-2", {}) == 9
+
+    def test_entries_expire(self):
+        cache = ListTotalCache(ttl_seconds=0)
+        cache.set("Collections", "user-1", {}, 7)
+
+        assert cache.get("Collections", "user-1", {}) is None
+
+    def test_stats(self):
+        cache = ListTotalCache()
+        cache.set("Collections", "user-1", {}, 7)
+        cache.get("Collections", "user-1", {})
+        cache.get("Collections", "user-2", {})
+
+        assert cache.get_stats() == {"entries": 1, "scopes": 0, "hits": 1, "misses": 1, "hit_rate": 0.5}
+
+    def test_scope_generations_are_bounded(self):
+        cache = ListTotalCache(max_entries=2)
+        for i in range(5):
+            cache.invalidate("Collections", f"user-{i}")
+        cache.set("Collections", "user-4", {}, 7)
+
+        cache.invalidate("Collections", "user-4")
+
+        assert cache.get_stats()["scopes"] == 2
+        assert cache.get("Collections", "user-4", {}) is None
+
+
+class TestResolveListTotal:
+    """Test suite for resolve_list_total."""
+
+    @pytest.mark.asyncio
+    async def test_counts_once_then_serves_from_cache(self, db_manager):
+        first = await _resolve(db_manager)
+        second = await _resolve(db_manager, offset=None)
+
+        assert first.count == 42 and not first.cached
+        assert second.count == 42 and second.cached
+        db_manager.query_items.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_last_page_gives_exact_total_without_count(self, db_manager):
+        total = await _resolve(db_manager, page_size=5, has_more=False, offset=40)
+
+        assert total.count == 45
+        assert not total.estimated
+        db_manager.query_items.assert_not_called()
+        assert get_list_total_cache().get("Collections", "user-1", {"type": "private"}) == 45
+
+    @pytest.mark.asyncio
+    async def test_empty_page_past_the_end_still_counts(self, db_manager):
+        total = await _resolve(db_manager, page_size=0, has_more=False, offset=100)
+
+        assert total.count == 42
+        db_manager.query_items.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_estimate_skips_count(self, db_manager):
+        total = await _resolve(db_manager, offset=20, estimate=True)
+
+        assert total.count == 41
+        assert total.estimated
+        db_manager.query_items.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_invalidation_forces_recount(self, db_manager):
+        await _resolve(db_manager)
+        invalidate_list_totals("Collections", "user-1")
+        await _resolve(db_manager)
+
+        assert db_manager.query_items.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_development_mock_count(self, db_manager):
+        db_manager.query_items.return_value = [{"_mock": True, "count": 2}]
+
+        total = await _resolve(db_manager)
+
+        assert total.count == 2
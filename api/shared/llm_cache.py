@@ -0,0 +1,339 @@
+"""
+Response cache in front of LLM providers.
+
+Responses are keyed on (provider, model, temperature, max_tokens, the context
+fields that change the request - system prompt and response format - and the
+normalized prompt hash) and stored in up to three tiers:
+
+1. an in-process LRU with TTL (always on);
+2. an optional local disk tier (``LLM_CACHE_DIR``) that survives worker restarts;
+3. an optional near-duplicate lookup for low-temperature calls, matching prompts
+   whose word shingles overlap above ``near_duplicate_threshold``.
+
+Only calls at or below ``LLM_CACHE_MAX_TEMPERATURE`` (default 0, i.e.
+deterministic calls) are cached; sampling at a higher temperature is expected to
+return a fresh answer each time. Callers that re-send the same template and
+want the stored answer back at any temperature opt in with ``{"cache": True}``
+in the call context (the Forge stage templates do); ``{"cache": False}`` opts out.
+
+A hit costs nothing: the returned response has ``cost=0.0`` and carries the
+amount it saved in ``metadata["saved_cost"]``. Hit, miss and saved-dollar
+counters are kept here and forwarded to CostTracker when one is attached.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+from cachetools import TTLCache
+
+from .llm_providers.base_provider import LLMResponse, TokenUsage
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL_SECONDS = 3600
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_MAX_TEMPERATURE = 0.0
+DEFAULT_NEAR_DUPLICATE_THRESHOLD = 0.92
+DEFAULT_NEAR_DUPLICATE_MAX_TEMPERATURE = 0.2
+# Near-duplicate candidates kept per (provider, model, temperature, max_tokens, context) bucket
+NEAR_DUPLICATE_BUCKET_SIZE = 256
+# Context fields the providers send to the model, so they are part of the key
+CACHE_KEY_CONTEXT_FIELDS = ("system_prompt", "response_format")
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Collapse whitespace so formatting-only differences share a cache entry."""
+    return _WHITESPACE.sub(" ", prompt).strip()
+
+
+def context_digest(context: Optional[Dict[str, Any]] = None) -> str:
+    """Short hash of the context fields that change what the provider sends."""
+    fields = {name: (context or {}).get(name) for name in CACHE_KEY_CONTEXT_FIELDS}
+    if not any(value is not None for value in fields.values()):
+        return "-"
+    return hashlib.sha256(json.dumps(fields, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:16]
+
+
+def make_cache_key(
+    provider: str,
+    model: str,
+    temperature: float,
+    prompt: str,
+    max_tokens: Optional[int] = None,
+    context: Optional[Dict[str, Any]] = None,
+) -> str:
+    """Stable key for a provider call."""
+    prompt_hash = hashlib.sha256(normalize_prompt(prompt).encode("utf-8")).hexdigest()
+    return f"{provider.lower()}:{model}:{float(temperature):.3f}:{max_tokens or 0}:{context_digest(context)}:{prompt_hash}"
+
+
+def _shingles(prompt: str, size: int = 3) -> FrozenSet[str]:
+    words = normalize_prompt(prompt).lower().split(" ")
+    if len(words) <= size:
+        return frozenset([" ".join(words)])
+    return frozenset(" ".join(words[i : i + size]) for i in range(len(words) - size + 1))
+
+
+def _jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+@dataclass
+class CacheMetrics:
+    """Counters for the response cache."""
+
+    hits: int = 0
+    misses: int = 0
+    memory_hits: int = 0
+    disk_hits: int = 0
+    near_duplicate_hits: int = 0
+    stores: int = 0
+    saved_cost: float = 0.0
+    saved_tokens: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["saved_cost"] = round(self.saved_cost, 6)
+        data["hit_rate"] = round(self.hit_rate, 4)
+        return data
+
+
+class LLMResponseCache:
+    """Tiered cache of LLMResponse objects."""
+
+    def __init__(
+        self,
+        ttl_seconds: Optional[float] = None,
+        max_entries: Optional[int] = None,
+        disk_dir: Optional[str] = None,
+        near_duplicate_threshold: Optional[float] = None,
+        near_duplicate_max_temperature: float = DEFAULT_NEAR_DUPLICATE_MAX_TEMPERATURE,
+        max_temperature: Optional[float] = None,
+    ):
+        self.ttl_seconds = float(ttl_seconds if ttl_seconds is not None else os.getenv("LLM_CACHE_TTL", DEFAULT_TTL_SECONDS))
+        max_entries = int(max_entries if max_entries is not None else os.getenv("LLM_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES))
+        self._memory: TTLCache = TTLCache(maxsize=max_entries, ttl=self.ttl_seconds)
+        self._lock = threading.Lock()
+        self.max_temperature = float(
+            max_temperature if max_temperature is not None else os.getenv("LLM_CACHE_MAX_TEMPERATURE", DEFAULT_MAX_TEMPERATURE)
+        )
+
+        disk_dir = disk_dir if disk_dir is not None else os.getenv("LLM_CACHE_DIR")
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+
+        # Near-duplicate reuse is opt-in; None disables it
+        if near_duplicate_threshold is None and os.getenv("LLM_CACHE_NEAR_DUPLICATES", "false").lower() == "true":
+            near_duplicate_threshold = float(
+                os.getenv("LLM_CACHE_NEAR_DUPLICATE_THRESHOLD", DEFAULT_NEAR_DUPLICATE_THRESHOLD)
+            )
+        self.near_duplicate_threshold = near_duplicate_threshold
+        self.near_duplicate_max_temperature = near_duplicate_max_temperature
+        self._near_index: Dict[Tuple[str, str, float, int, str], List[Tuple[FrozenSet[str], str]]] = {}
+
+        self.metrics = CacheMetrics()
+        self.cost_tracker: Any = None
+
+    def caches(self, temperature: float, context: Optional[Dict[str, Any]] = None) -> bool:
+        """Whether this call is served from and stored in the cache: deterministic, or opted in."""
+        cache = (context or {}).get("cache")
+        if cache is not None:
+            return bool(cache)
+        return float(temperature) <= self.max_temperature
+
+    def get(
+        self,
+        provider: str,
+        model: str,
+        temperature: float,
+        prompt: str,
+        max_tokens: Optional[int] = None,
+        context: Optional[Dict[str, Any]] = None,
+    ) -> Optional[LLMResponse]:
+        """Return a cached response for an equivalent call, or None."""
+        if not self.caches(temperature, context):
+            return None
+        key = make_cache_key(provider, model, temperature, prompt, max_tokens, context)
+
+        with self._lock:
+            payload = self._memory.get(key)
+        tier = "memory"
+
+        if payload is None and self.disk_dir is not None:
+            payload = self._read_disk(key)
+            tier = "disk"
+            if payload is not None:
+                with self._lock:
+                    self._memory[key] = payload
+
+        if payload is None and self._near_duplicates_enabled(temperature):
+            payload = self._find_near_duplicate(provider, model, temperature, prompt, max_tokens, context)
+            tier = "near_duplicate"
+
+        if payload is None:
+            self.metrics.misses += 1
+            self._report(provider, model, hit=False)
+            return None
+
+        response = self._to_response(payload, tier)
+        saved_cost = response.metadata["saved_cost"]
+        self.metrics.hits += 1
+        setattr(self.metrics, f"{tier}_hits", getattr(self.metrics, f"{tier}_hits") + 1)
+        self.metrics.saved_cost += saved_cost
+        self.metrics.saved_tokens += response.usage.total_tokens
+        self._report(provider, model, hit=True, saved_cost=saved_cost)
+        return response
+
+    def set(
+        self,
+        provider: str,
+        model: str,
+        temperature: float,
+        prompt: str,
+        response: LLMResponse,
+        max_tokens: Optional[int] = None,
+        context: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Store a completed response in every enabled tier."""
+        if not self.caches(temperature, context):
+            return
+        key = make_cache_key(provider, model, temperature, prompt, max_tokens, context)
+        payload = {**asdict(response), "expires_at": time.time() + self.ttl_seconds}
+
+        with self._lock:
+            self._memory[key] = payload
+            if self._near_duplicates_enabled(temperature):
+                bucket = self._near_index.setdefault(self._bucket(provider, model, temperature, max_tokens, context), [])
+                bucket.append((_shingles(prompt), key))
+                del bucket[:-NEAR_DUPLICATE_BUCKET_SIZE]
+        self.metrics.stores += 1
+
+        if self.disk_dir is not None:
+            self._write_disk(key, payload)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._near_index.clear()
+        self.metrics = CacheMetrics()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.metrics.to_dict(),
+            "entries": len(self._memory),
+            "disk_tier": str(self.disk_dir) if self.disk_dir else None,
+            "max_temperature": self.max_temperature,
+            "near_duplicate_threshold": self.near_duplicate_threshold,
+        }
+
+    @staticmethod
+    def _bucket(
+        provider: str, model: str, temperature: float, max_tokens: Optional[int], context: Optional[Dict[str, Any]]
+    ) -> Tuple[str, str, float, int, str]:
+        return provider.lower(), model, float(temperature), max_tokens or 0, context_digest(context)
+
+    def _near_duplicates_enabled(self, temperature: float) -> bool:
+        return self.near_duplicate_threshold is not None and temperature <= self.near_duplicate_max_temperature
+
+    def _find_near_duplicate(
+        self,
+        provider: str,
+        model: str,
+        temperature: float,
+        prompt: str,
+        max_tokens: Optional[int],
+        context: Optional[Dict[str, Any]],
+    ) -> Optional[Dict[str, Any]]:
+        shingles = _shingles(prompt)
+        best_key, best_score = None, 0.0
+        with self._lock:
+            # Buckets include max_tokens and the context digest so answers are only reused for the same request shape
+            bucket = self._near_index.get(self._bucket(provider, model, temperature, max_tokens, context), [])
+            for candidate, key in bucket:
+                score = _jaccard(shingles, candidate)
+                if score > best_score:
+                    best_key, best_score = key, score
+            if best_key is None or best_score < self.near_duplicate_threshold:
+                return None
+            return self._memory.get(best_key)
+
+    def _disk_path(self, key: str) -> Path:
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return self.disk_dir / digest[:2] / f"{digest}.json"
+
+    def _read_disk(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self._disk_path(key)
+        try:
+            payload = json.loads(path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable LLM cache entry {path}: {e}")
+            return None
+
+        if payload.get("expires_at", 0) < time.time():
+            path.unlink(missing_ok=True)
+            return None
+        return payload
+
+    def _write_disk(self, key: str, payload: Dict[str, Any]) -> None:
+        path = self._disk_path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(".tmp")
+            tmp_path.write_text(json.dumps(payload, default=str), encoding="utf-8")
+            tmp_path.replace(path)
+        except OSError as e:
+            logger.warning(f"Could not write LLM cache entry {path}: {e}")
+
+    @staticmethod
+    def _to_response(payload: Dict[str, Any], tier: str) -> LLMResponse:
+        fields = {k: v for k, v in payload.items() if k != "expires_at"}
+        fields["usage"] = TokenUsage(**fields["usage"])
+        # The upstream call was paid for once; serving it again is free
+        fields["metadata"] = {
+            **fields.get("metadata", {}),
+            "cached": True,
+            "cache_tier": tier,
+            "saved_cost": fields["cost"],
+        }
+        fields["cost"] = 0.0
+        return LLMResponse(**fields)
+
+    def _report(self, provider: str, model: str, hit: bool, saved_cost: float = 0.0) -> None:
+        if self.cost_tracker is None:
+            return
+        try:
+            self.cost_tracker.record_cache_event(provider, model, hit=hit, saved_cost=saved_cost)
+        except Exception as e:
+            logger.debug(f"Could not report cache metrics: {e}")
+
+
+# Global response cache - initialized lazily
+_response_cache: Optional[LLMResponseCache] = None
+
+
+def get_response_cache() -> Optional[LLMResponseCache]:
+    """Get the global response cache, or None when LLM_CACHE_ENABLED=false."""
+    global _response_cache
+    if os.getenv("LLM_CACHE_ENABLED", "true").lower() == "false":
+        return None
+    if _response_cache is None:
+        _response_cache = LLMResponseCache()
+    return _response_cache
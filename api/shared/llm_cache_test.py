@@ -0,0 +1,235 @@
+"""
+Tests for llm_cache.py - tiered LLM response cache and its cost metrics
+"""
+
+import time
+from typing import Any, Dict
+from unittest.mock import Mock, patch
+
+import pytest
+
+from shared.cost_tracker import CostTracker
+from shared.llm_cache import LLMResponseCache, get_response_cache, make_cache_key, normalize_prompt
+from shared.llm_providers.base_provider import BaseLLMProvider, LLMResponse, ModelInfo, TokenUsage
+
+
+def _response(text: str = "cached answer", cost: float = 0.02) -> LLMResponse:
+    return LLMResponse.create(
+        provider="openai",
+        model="gpt-4o",
+        response=text,
+        usage=TokenUsage(prompt_tokens=10, completion_tokens=20),
+        cost=cost,
+    )
+
+
+class CountingProvider(BaseLLMProvider):
+    """Provider that counts upstream calls instead of calling an API."""
+
+    def __init__(self):
+        super().__init__("OpenAI")
+        self.calls = 0
+        self.enabled = True
+        self.models = self._get_available_models()
+        self.default_model = "gpt-4o"
+        self._initialized = True
+
+    @property
+    def provider_name(self) -> str:
+        return "openai"
+
+    def _get_available_models(self) -> Dict[str, ModelInfo]:
+        return {
+            "gpt-4o": ModelInfo(
+                name="gpt-4o", display_name="GPT-4o", max_tokens=4096, cost_per_input_token=0.005, cost_per_output_token=0.015
+            )
+        }
+
+    async def _execute_request(self, prompt: str, model: str, context: Dict[str, Any], stream: bool = False):
+        self.calls += 1
+        return _response(f"answer {self.calls}")
+
+
+class TestCacheKey:
+    """Test suite for cache key construction."""
+
+    def test_whitespace_only_differences_share_a_key(self):
+        assert normalize_prompt("  Hello\n\tworld  ") == "Hello world"
+        expected = make_cache_key("openai", "gpt-4o", 0.7, "Hello world")
+        assert make_cache_key("OpenAI", "gpt-4o", 0.7, "Hello  world") == expected
+
+    def test_parameters_are_part_of_the_key(self):
+        base = make_cache_key("openai", "gpt-4o", 0.7, "hi", 100)
+        assert base != make_cache_key("openai", "gpt-4o", 0.2, "hi", 100)
+        assert base != make_cache_key("openai", "gpt-4", 0.7, "hi", 100)
+        assert base != make_cache_key("anthropic", "gpt-4o", 0.7, "hi", 100)
+        assert base != make_cache_key("openai", "gpt-4o", 0.7, "hi", 200)
+
+    def test_system_prompt_and_response_format_are_part_of_the_key(self):
+        base = make_cache_key("openai", "gpt-4o", 0.0, "hi", 100, {"system_prompt": "You are an architect."})
+        assert base == make_cache_key("openai", "gpt-4o", 0.0, "hi", 100, {"system_prompt": "You are an architect.", "cache": True})
+        assert base != make_cache_key("openai", "gpt-4o", 0.0, "hi", 100, {"system_prompt": "You are a poet."})
+        assert base != make_cache_key("openai", "gpt-4o", 0.0, "hi", 100)
+        assert make_cache_key("openai", "gpt-4o", 0.0, "hi", 100, {"response_format": "json"}) != make_cache_key(
+            "openai", "gpt-4o", 0.0, "hi", 100
+        )
+
+
+class TestLLMResponseCache:
+    """Test suite for LLMResponseCache."""
+
+    def test_memory_hit_marks_response_and_counts_savings(self):
+        cache = LLMResponseCache(ttl_seconds=60, max_entries=10)
+        assert cache.get("openai", "gpt-4o", 0.0, "hi") is None
+
+        cache.set("openai", "gpt-4o", 0.0, "hi", _response())
+        hit = cache.get("openai", "gpt-4o", 0.0, " hi ")
+
+        assert hit.response == "cached answer"
+        assert hit.metadata["cached"] is True
+        assert hit.metadata["cache_tier"] == "memory"
+        # A hit is free; what it saved is reported alongside
+        assert hit.cost == 0.0
+        assert hit.metadata["saved_cost"] == 0.02
+        stats = cache.get_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["saved_cost"] == 0.02
+        assert stats["saved_tokens"] == 30
+
+    def test_only_deterministic_calls_are_cached_by_default(self):
+        cache = LLMResponseCache(ttl_seconds=60)
+        cache.set("openai", "gpt-4o", 0.7, "hi", _response())
+
+        assert cache.get("openai", "gpt-4o", 0.7, "hi") is None
+        assert cache.get_stats()["stores"] == 0
+        assert cache.get_stats()["misses"] == 0
+
+        with patch.dict("os.environ", {"LLM_CACHE_MAX_TEMPERATURE": "1.0"}):
+            sampled = LLMResponseCache(ttl_seconds=60)
+        sampled.set("openai", "gpt-4o", 0.7, "hi", _response())
+        assert sampled.get("openai", "gpt-4o", 0.7, "hi").response == "cached answer"
+
+    def test_context_can_opt_in_above_max_temperature(self):
+        cache = LLMResponseCache(ttl_seconds=60)
+        cache.set("openai", "gpt-4o", 0.5, "hi", _response(), context={"cache": True})
+
+        assert cache.get("openai", "gpt-4o", 0.5, "hi", context={"cache": True}).response == "cached answer"
+        assert cache.get("openai", "gpt-4o", 0.5, "hi") is None
+        assert not cache.caches(0.0, {"cache": False})
+
+    def test_entries_expire_after_ttl(self):
+        cache = LLMResponseCache(ttl_seconds=60, max_entries=10)
+        cache.set("openai", "gpt-4o", 0.0, "hi", _response())
+
+        with patch("cachetools.TTLCache.timer", return_value=time.monotonic() + 120):
+            assert cache.get("openai", "gpt-4o", 0.0, "hi") is None
+
+    def test_disk_tier_survives_a_new_process(self, tmp_path):
+        LLMResponseCache(ttl_seconds=60, disk_dir=str(tmp_path)).set("openai", "gpt-4o", 0.0, "hi", _response())
+
+        fresh = LLMResponseCache(ttl_seconds=60, disk_dir=str(tmp_path))
+        hit = fresh.get("openai", "gpt-4o", 0.0, "hi")
+
+        assert hit.metadata["cache_tier"] == "disk"
+        assert fresh.get("openai", "gpt-4o", 0.0, "hi").metadata["cache_tier"] == "memory"
+
+    def test_expired_disk_entries_are_ignored(self, tmp_path):
+        LLMResponseCache(ttl_seconds=-1, disk_dir=str(tmp_path)).set("openai", "gpt-4o", 0.0, "hi", _response())
+
+        assert LLMResponseCache(ttl_seconds=60, disk_dir=str(tmp_path)).get("openai", "gpt-4o", 0.0, "hi") is None
+
+    def test_near_duplicates_only_for_low_temperature(self):
+        cache = LLMResponseCache(ttl_seconds=60, near_duplicate_threshold=0.6, max_temperature=1.0)
+        prompt = "Summarize the quarterly report for the sales team in three bullet points please"
+        similar = "Summarize the quarterly report for the sales team in three bullet points"
+        cache.set("openai", "gpt-4o", 0.0, prompt, _response())
+        cache.set("openai", "gpt-4o", 0.9, prompt, _response())
+
+        assert cache.get("openai", "gpt-4o", 0.0, similar).metadata["cache_tier"] == "near_duplicate"
+        assert cache.get("openai", "gpt-4o", 0.9, similar) is None
+        assert cache.get("openai", "gpt-4o", 0.0, "Write a poem about the sea") is None
+        assert cache.get("openai", "gpt-4o", 0.0, similar, context={"system_prompt": "Answer in French."}) is None
+
+    def test_near_duplicates_disabled_by_default(self):
+        cache = LLMResponseCache(ttl_seconds=60)
+        cache.set("openai", "gpt-4o", 0.0, "one two three four five", _response())
+
+        assert cache.get("openai", "gpt-4o", 0.0, "one two three four five six") is None
+
+    def test_reports_to_cost_tracker(self):
+        tracker = CostTracker(Mock(), "SutraDB")
+        cache = LLMResponseCache(ttl_seconds=60)
+        cache.cost_tracker = tracker
+        cache.get("openai", "gpt-4o", 0.0, "hi")
+        cache.set("openai", "gpt-4o", 0.0, "hi", _response(cost=0.5))
+        cache.get("openai", "gpt-4o", 0.0, "hi")
+
+        metrics = tracker.get_cache_metrics()
+        assert metrics["hits"] == 1
+        assert metrics["misses"] == 1
+        assert metrics["hit_rate"] == 0.5
+        assert metrics["by_model"]["openai/gpt-4o"]["saved_cost"] == 0.5
+
+    def test_get_response_cache_can_be_disabled(self):
+        with patch.dict("os.environ", {"LLM_CACHE_ENABLED": "false"}):
+            assert get_response_cache() is None
+        assert get_response_cache() is get_response_cache()
+
+
+class TestProviderCaching:
+    """Test suite for the cache in BaseLLMProvider.execute_prompt."""
+
+    @pytest.mark.asyncio
+    async def test_repeated_prompt_skips_upstream_call(self):
+        provider = CountingProvider()
+        provider.response_cache = LLMResponseCache(ttl_seconds=60)
+
+        first = await provider.execute_prompt("hi", temperature=0.0)
+        second = await provider.execute_prompt("hi", temperature=0.0)
+
+        assert provider.calls == 1
+        assert second.response == first.response
+        assert second.metadata["cached"] is True
+        assert second.cost == 0.0
+        assert second.metadata["saved_cost"] == pytest.approx(first.cost)
+        # Cached answers don't count against the provider budget again
+        assert provider.current_usage == pytest.approx(first.cost)
+
+    @pytest.mark.asyncio
+    async def test_cache_opt_out_and_parameter_changes(self):
+        provider = CountingProvider()
+        provider.response_cache = LLMResponseCache(ttl_seconds=60)
+
+        await provider.execute_prompt("hi", temperature=0.0)
+        await provider.execute_prompt("hi", context={"cache": False}, temperature=0.0)
+        await provider.execute_prompt("hi", temperature=0.5)
+        await provider.execute_prompt("hi", temperature=0.0, max_tokens=50)
+
+        assert provider.calls == 4
+
+    @pytest.mark.asyncio
+    async def test_opted_in_template_call_is_cached_above_max_temperature(self):
+        provider = CountingProvider()
+        provider.response_cache = LLMResponseCache(ttl_seconds=60)
+
+        await provider.execute_prompt("hi", context={"cache": True}, temperature=0.5)
+        second = await provider.execute_prompt("hi", context={"cache": True}, temperature=0.5)
+
+        assert provider.calls == 1
+        assert second.metadata["cached"] is True
+
+    @pytest.mark.asyncio
+    async def test_different_system_prompts_do_not_share_an_answer(self):
+        provider = CountingProvider()
+        provider.response_cache = LLMResponseCache(ttl_seconds=60)
+
+        first = await provider.execute_prompt("hi", context={"system_prompt": "You are an architect."}, temperature=0.0)
+        second = await provider.execute_prompt("hi", context={"system_prompt": "You are a poet."}, temperature=0.0)
+        json_mode = await provider.execute_prompt(
+            "hi", context={"system_prompt": "You are an architect.", "response_format": "json"}, temperature=0.0
+        )
+
+        assert provider.calls == 3
+        assert second.response != first.response
+        assert not json_mode.metadata.get("cached")
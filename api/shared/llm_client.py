@@ -1,7 +1,11 @@
 """Enhanced LLM Client for Sutra Multi-LLM Prompt Studio with Real API Integration and Cost Tracking."""
 
+import asyncio
+import contextlib
 import logging
 import os
+import threading
+import time
 from datetime import datetime, timezone
 from typing import Any, AsyncGenerator, Dict, List, Optional, Union
 
@@ -12,6 +16,8 @@ from azure.keyvault.secrets import SecretClient
 from .budget_manager import BudgetManager, BudgetValidationError, get_budget_manager
 from .cost_tracker import CostTracker
 from .cost_tracking_middleware import CostTrackingMiddleware, get_cost_tracking_middleware
+from .llm_cache import LLMResponseCache, get_response_cache
+from .llm_router import DEFAULT_TIER, LLMRouter, NoRouteError, RouteCandidate
 from .llm_providers import (
     AnthropicProvider,
     BaseLLMProvider,
@@ -22,6 +28,12 @@ from .llm_providers import (
     TokenUsage,
 )
 
+# Seconds to wait after a failed initialization before Key Vault is tried again
+DEFAULT_INIT_RETRY_SECONDS = 30
+
+# Reference point for cold-start timings (module import ~ worker start)
+_PROCESS_STARTED = time.monotonic()
+
 
 class LLMManager:
     """Enhanced LLM Manager with real provider integrations and cost tracking."""
@@ -36,6 +48,14 @@ class LLMManager:
         self._initialized = False
         self.logger = logging.getLogger("sutra.llm_manager")
 
+        # One-time initialization state; the lock is bound to the loop that created it
+        self._init_lock: Optional[asyncio.Lock] = None
+        self._init_lock_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._last_failed_init: Optional[float] = None
+        self._init_attempts = 0
+        self.init_retry_seconds = float(os.getenv("LLM_INIT_RETRY_SECONDS", DEFAULT_INIT_RETRY_SECONDS))
+        self.init_report: Dict[str, Any] = {}
+
         # Cost tracking components
         self.cost_tracker: Optional[CostTracker] = None
         self.cost_middleware: Optional[CostTrackingMiddleware] = None
@@ -43,16 +63,31 @@ class LLMManager:
         # Budget management
         self.budget_manager: Optional[BudgetManager] = None
 
+        # Response cache shared by all providers (None when LLM_CACHE_ENABLED=false)
+        self.response_cache: Optional[LLMResponseCache] = get_response_cache()
+        if self.response_cache is not None:
+            for provider in self.providers.values():
+                provider.response_cache = self.response_cache
+
         if cosmos_client:
-            self.cost_tracker = CostTracker(cosmos_client, database_name)
-            self.cost_middleware = CostTrackingMiddleware(self.cost_tracker)
-            # Set global middleware instance
-            get_cost_tracking_middleware(self.cost_tracker)
+            self.attach_cosmos(cosmos_client, database_name)
+
+        # Picks provider/model per request from live latency, health, budget and price
+        self.router = LLMRouter(self.providers)
+
+    def attach_cosmos(self, cosmos_client: CosmosClient, database_name: str = "SutraDB") -> None:
+        """Enable cost tracking and budget enforcement backed by ``cosmos_client``."""
+        self.cost_tracker = CostTracker(cosmos_client, database_name)
+        self.cost_middleware = CostTrackingMiddleware(self.cost_tracker)
+        # Set global middleware instance
+        get_cost_tracking_middleware(self.cost_tracker)
 
-            if self.cost_tracker:
-                self.budget_manager = BudgetManager(cosmos_client, database_name, self.cost_tracker)
-                # Set global budget manager instance
-                get_budget_manager(cosmos_client, database_name, self.cost_tracker)
+        self.budget_manager = BudgetManager(cosmos_client, database_name, self.cost_tracker)
+        # Set global budget manager instance
+        get_budget_manager(cosmos_client, database_name, self.cost_tracker)
+
+        if self.response_cache is not None:
+            self.response_cache.cost_tracker = self.cost_tracker
 
     @property
     def kv_client(self) -> SecretClient:
@@ -67,16 +102,49 @@ class LLMManager:
 
         return self._kv_client
 
-    async def initialize(self) -> bool:
-        """Initialize all providers."""
+    def _get_init_lock(self) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        if self._init_lock is None or self._init_lock_loop is not loop:
+            self._init_lock = asyncio.Lock()
+            self._init_lock_loop = loop
+        return self._init_lock
+
+    async def initialize(self, trigger: str = "on_demand") -> bool:
+        """Initialize all providers once; concurrent callers share the same attempt."""
         if self._initialized:
             return True
 
+        async with self._get_init_lock():
+            if self._initialized:
+                return True
+
+            # Don't hammer Key Vault on every request while it is unavailable
+            if (
+                self._last_failed_init is not None
+                and time.monotonic() - self._last_failed_init < self.init_retry_seconds
+            ):
+                return False
+
+            return await self._initialize_providers(trigger)
+
+    async def _initialize_providers(self, trigger: str) -> bool:
+        self._init_attempts += 1
+        started = time.monotonic()
+        report: Dict[str, Any] = {
+            "trigger": trigger,
+            "attempt": self._init_attempts,
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "since_process_start_ms": round((started - _PROCESS_STARTED) * 1000, 1),
+            "providers": {},
+        }
+
         try:
             kv_client = self.kv_client
+            report["key_vault_client_ms"] = round((time.monotonic() - started) * 1000, 1)
 
             initialization_results = {}
             for name, provider in self.providers.items():
+                provider_started = time.monotonic()
                 try:
                     result = await provider.initialize(kv_client)
                     initialization_results[name] = result
@@ -87,6 +155,10 @@ class LLMManager:
                 except Exception as e:
                     self.logger.error(f"Error initializing {name} provider: {e}")
                     initialization_results[name] = False
+                report["providers"][name] = {
+                    "initialized": bool(initialization_results[name]),
+                    "duration_ms": round((time.monotonic() - provider_started) * 1000, 1),
+                }
 
             # Consider it successful if at least one provider initialized
             self._initialized = any(initialization_results.values())
@@ -96,11 +168,24 @@ class LLMManager:
             else:
                 self.logger.error("Failed to initialize any LLM providers")
 
-            return self._initialized
-
         except Exception as e:
             self.logger.error(f"Failed to initialize LLM Manager: {e}")
-            return False
+            report["error"] = str(e)
+            self._initialized = False
+
+        report["initialized"] = self._initialized
+        report["duration_ms"] = round((time.monotonic() - started) * 1000, 1)
+        self.init_report = report
+        self._last_failed_init = None if self._initialized else time.monotonic()
+        self.logger.info(
+            f"LLM Manager cold start ({trigger}): {report['duration_ms']}ms, "
+            f"{report['since_process_start_ms']}ms after worker start"
+        )
+        return self._initialized
+
+    def get_init_report(self) -> Dict[str, Any]:
+        """Cold-start timings of the most recent initialization attempt."""
+        return {"initialized": self._initialized, "attempts": self._init_attempts, **self.init_report}
 
     async def get_available_providers(self) -> List[str]:
         """Get list of enabled and available providers."""
@@ -174,63 +259,234 @@ class LLMManager:
         # Execute the prompt
         return await provider.execute_prompt(prompt=prompt, context=context or {}, model=model, stream=stream, **kwargs)
 
+    async def route(
+        self,
+        prompt: str = "",
+        tier: Optional[str] = None,
+        model: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        deadline: Optional[float] = None,
+        max_cost: Optional[float] = None,
+        prefer: str = "latency",
+        provider: Optional[str] = None,
+    ) -> RouteCandidate:
+        """Pick the best provider/model for a request; raises NoRouteError when none is eligible."""
+        if not await self.initialize():
+            raise RuntimeError("LLM Manager not initialized")
+        return await self.router.route(
+            prompt,
+            tier=tier,
+            model=model,
+            max_tokens=max_tokens,
+            deadline=deadline,
+            max_cost=max_cost,
+            prefer=prefer,
+            provider=provider,
+        )
+
+    async def execute_routed(
+        self,
+        prompt: str,
+        tier: Optional[str] = None,
+        model: Optional[str] = None,
+        context: Dict[str, Any] = None,
+        deadline: Optional[float] = None,
+        max_cost: Optional[float] = None,
+        prefer: str = "latency",
+        max_attempts: int = 3,
+        provider: Optional[str] = None,
+        **kwargs,
+    ) -> LLMResponse:
+        """
+        Execute a prompt on the best-ranked model for ``tier`` (or ``model`` and its
+        equivalents), failing over down the ranking when a call errors. With
+        ``provider`` only that provider's models are candidates.
+
+        ``deadline`` bounds the whole call in seconds and also skips models whose
+        p95 latency exceeds it. The chosen route and any failed attempts are
+        recorded in ``response.metadata["routing"]``.
+        """
+        if not await self.initialize():
+            raise RuntimeError("LLM Manager not initialized")
+
+        candidates = await self.router.candidates(
+            prompt,
+            tier=tier,
+            model=model,
+            max_tokens=kwargs.get("max_tokens"),
+            deadline=deadline,
+            max_cost=max_cost,
+            prefer=prefer,
+            provider=provider,
+        )
+        if not candidates:
+            on_provider = f" on {provider}" if provider else ""
+            raise NoRouteError(f"No provider model available for {model or tier or DEFAULT_TIER}{on_provider}")
+
+        started = time.monotonic()
+        failures: List[Dict[str, Any]] = []
+        for candidate in candidates[:max_attempts]:
+            remaining = deadline - (time.monotonic() - started) if deadline is not None else None
+            if remaining is not None and remaining <= 0:
+                break
+            call = self._execute_collected(candidate.provider, prompt, context, candidate.model, **kwargs)
+            try:
+                response = await (asyncio.wait_for(call, remaining) if remaining is not None else call)
+            except ValueError:
+                raise
+            except Exception as e:
+                error = f"timed out after {remaining:.1f}s" if isinstance(e, asyncio.TimeoutError) else str(e)
+                failures.append({"provider": candidate.provider, "model": candidate.model, "error": error})
+                self.logger.warning(f"Routed call to {candidate.provider}/{candidate.model} failed, failing over: {error}")
+                continue
+
+            response.metadata["routing"] = {**candidate.to_dict(), "failovers": failures}
+            return response
+
+        attempted = ", ".join(f"{f['provider']}/{f['model']}: {f['error']}" for f in failures) or "deadline exceeded"
+        raise RuntimeError(f"All routed providers failed ({attempted})")
+
+    async def _execute_collected(
+        self,
+        provider_name: str,
+        prompt: str,
+        context: Optional[Dict[str, Any]],
+        model: Optional[str],
+        **kwargs,
+    ) -> LLMResponse:
+        """Execute a prompt and drain streaming output into a single LLMResponse."""
+        result = await self.execute_prompt(provider_name, prompt, context, model=model, **kwargs)
+        if isinstance(result, LLMResponse):
+            return result
+
+        # Handle streaming responses by collecting them
+        collected = ""
+        async for chunk in result:
+            collected += chunk
+        usage = TokenUsage(
+            prompt_tokens=len(prompt.split()),
+            completion_tokens=len(collected.split()),
+        )
+        return LLMResponse.create(
+            provider=provider_name,
+            model=model or "unknown",
+            response=collected,
+            usage=usage,
+            cost=0.0,  # Streaming cost tracking would need to be implemented separately
+        )
+
+    async def iter_multi_llm(
+        self,
+        prompt: str,
+        provider_names: List[str],
+        context: Dict[str, Any] = None,
+        model_preferences: Dict[str, str] = None,
+        deadline: Optional[float] = None,
+        provider_timeouts: Optional[Dict[str, float]] = None,
+        **kwargs,
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        """
+        Run a prompt on several providers concurrently and yield each outcome as it completes.
+
+        Outcomes are ``{"provider", "response"}`` on success or ``{"provider", "error",
+        "timestamp"}`` on failure (with ``"timed_out": True`` for timeouts). ``deadline``
+        bounds the whole call in seconds; ``provider_timeouts`` bounds individual
+        providers. Providers still running when the deadline passes, or when the
+        consumer stops iterating, are cancelled.
+        """
+        loop = asyncio.get_running_loop()
+        deadline_at = loop.time() + deadline if deadline is not None else None
+        provider_timeouts = provider_timeouts or {}
+
+        tasks: Dict[asyncio.Future, str] = {}
+        for provider_name in provider_names:
+            model = (model_preferences or {}).get(provider_name)
+            call = self._execute_collected(provider_name, prompt, context, model, **kwargs)
+            if provider_name in provider_timeouts:
+                call = asyncio.wait_for(call, provider_timeouts[provider_name])
+            tasks[asyncio.ensure_future(call)] = provider_name
+
+        def error_outcome(provider_name: str, error: str, timed_out: bool = False) -> Dict[str, Any]:
+            outcome = {"provider": provider_name, "error": error, "timestamp": datetime.now(timezone.utc).isoformat()}
+            if timed_out:
+                outcome["timed_out"] = True
+            return outcome
+
+        pending = set(tasks)
+        try:
+            while pending:
+                remaining = deadline_at - loop.time() if deadline_at is not None else None
+                if remaining is not None and remaining <= 0:
+                    break
+                done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+                for task in sorted(done, key=lambda t: provider_names.index(tasks[t])):
+                    provider_name = tasks[task]
+                    try:
+                        yield {"provider": provider_name, "response": task.result()}
+                    except asyncio.TimeoutError:
+                        timeout = provider_timeouts.get(provider_name)
+                        yield error_outcome(provider_name, f"Provider timed out after {timeout}s", timed_out=True)
+                    except Exception as e:
+                        yield error_outcome(provider_name, str(e))
+
+            for task in sorted(pending, key=lambda t: provider_names.index(tasks[t])):
+                yield error_outcome(tasks[task], f"Deadline of {deadline}s exceeded", timed_out=True)
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
     async def execute_multi_llm(
         self,
         prompt: str,
         provider_names: List[str] = None,
         context: Dict[str, Any] = None,
         model_preferences: Dict[str, str] = None,
+        deadline: Optional[float] = None,
+        provider_timeouts: Optional[Dict[str, float]] = None,
+        first_n: Optional[int] = None,
         **kwargs,
     ) -> Dict[str, Any]:
-        """Execute a prompt across multiple LLM providers."""
+        """
+        Execute a prompt across multiple LLM providers concurrently.
+
+        Latency is that of the slowest provider (or ``deadline``) rather than the sum.
+        With ``first_n`` the call returns as soon as that many providers succeed and
+        the rest are cancelled and listed in ``cancelled_providers``.
+        """
         if provider_names is None:
             provider_names = await self.get_available_providers()
 
         if not provider_names:
             raise RuntimeError("No available providers for multi-LLM execution")
 
-        results = []
+        started = time.monotonic()
+        responses: Dict[str, LLMResponse] = {}
         errors = []
 
-        for provider_name in provider_names:
-            try:
-                model = None
-                if model_preferences and provider_name in model_preferences:
-                    model = model_preferences[provider_name]
-
-                result = await self.execute_prompt(provider_name, prompt, context, model=model, **kwargs)
-
-                if isinstance(result, LLMResponse):
-                    results.append(result)
+        async with contextlib.aclosing(
+            self.iter_multi_llm(
+                prompt,
+                provider_names,
+                context,
+                model_preferences,
+                deadline=deadline,
+                provider_timeouts=provider_timeouts,
+                **kwargs,
+            )
+        ) as outcomes:
+            async for outcome in outcomes:
+                if "response" in outcome:
+                    responses[outcome["provider"]] = outcome["response"]
+                    if first_n and len(responses) >= first_n:
+                        break
                 else:
-                    # Handle streaming responses by collecting them
-                    collected = ""
-                    async for chunk in result:
-                        collected += chunk
-                    # Create a mock response for streaming
-                    from .llm_providers.base_provider import TokenUsage
-
-                    usage = TokenUsage(
-                        prompt_tokens=len(prompt.split()),
-                        completion_tokens=len(collected.split()),
-                    )
-                    mock_response = LLMResponse.create(
-                        provider=provider_name,
-                        model=model or "unknown",
-                        response=collected,
-                        usage=usage,
-                        cost=0.0,  # Streaming cost tracking would need to be implemented separately
-                    )
-                    results.append(mock_response)
+                    errors.append(outcome)
+                    self.logger.warning(f"Provider {outcome['provider']} failed: {outcome['error']}")
 
-            except Exception as e:
-                error_info = {
-                    "provider": provider_name,
-                    "error": str(e),
-                    "timestamp": datetime.now(timezone.utc).isoformat(),
-                }
-                errors.append(error_info)
-                self.logger.warning(f"Provider {provider_name} failed: {e}")
+        finished = set(responses) | {error["provider"] for error in errors}
+        results = [responses[name] for name in provider_names if name in responses]
 
         return {
             "results": results,
@@ -238,6 +494,8 @@ class LLMManager:
             "total_providers": len(provider_names),
             "successful_providers": len(results),
             "failed_providers": len(errors),
+            "cancelled_providers": [name for name in provider_names if name not in finished],
+            "elapsed_ms": round((time.monotonic() - started) * 1000, 1),
             "timestamp": datetime.now(timezone.utc).isoformat(),
         }
 
@@ -378,8 +636,14 @@ class LLMManager:
             "providers": health_results,
             "timestamp": datetime.now(timezone.utc).isoformat(),
             "manager_initialized": self._initialized,
+            "initialization": self.get_init_report(),
+            "response_cache": self.get_cache_stats(),
         }
 
+    def get_cache_stats(self) -> Optional[Dict[str, Any]]:
+        """Response cache hit/miss and saved-cost counters (None when caching is disabled)."""
+        return self.response_cache.get_stats() if self.response_cache else None
+
     def get_provider(self, provider_name: str) -> BaseLLMProvider:
         """Get a specific provider instance."""
         if provider_name not in self.providers:
@@ -411,26 +675,8 @@ class LLMManager:
         return model_info
 
     def _get_cheaper_models(self, provider_name: str, current_model: str) -> List[str]:
-        """Get list of cheaper models for a provider."""
-        # Model cost rankings (from most expensive to cheapest)
-        model_rankings = {
-            "openai": ["gpt-4", "gpt-4-turbo", "gpt-4o", "gpt-3.5-turbo"],
-            "anthropic": ["claude-3-opus-20240229", "claude-3-5-sonnet-20241022", "claude-3-haiku-20240307"],
-            "google": ["gemini-1.5-pro", "gemini-pro", "gemini-1.5-flash"],
-        }
-
-        if provider_name not in model_rankings:
-            return []
-
-        ranking = model_rankings[provider_name]
-
-        try:
-            current_index = ranking.index(current_model)
-            # Return models that are cheaper (later in the list)
-            return ranking[current_index + 1 :]
-        except ValueError:
-            # Model not found in ranking, return all models as potential alternatives
-            return ranking[1:] if len(ranking) > 1 else []
+        """Get list of cheaper models for a provider, from the shared pricing registry."""
+        return self.router.cheaper_models(provider_name, current_model)
 
     async def get_budget_status(self, user_id: str) -> Optional[Dict[str, Any]]:
         """Get current budget status for a user."""
@@ -481,16 +727,56 @@ class LLMManager:
 
 # Global instance for singleton pattern
 _llm_manager_instance: Optional[LLMManager] = None
+_llm_manager_lock = threading.Lock()
+
+
+def _default_cosmos_client() -> Optional[CosmosClient]:
+    """Async client for cost tracking from COSMOS_DB_CONNECTION_STRING; None in test mode or when unset."""
+    if os.getenv("ENVIRONMENT", "").lower() == "test":
+        return None
+    connection_string = os.getenv("COSMOS_DB_CONNECTION_STRING")
+    if not connection_string:
+        logging.getLogger("sutra.llm_manager").warning(
+            "COSMOS_DB_CONNECTION_STRING is not set; LLM cost tracking and budget checks are disabled"
+        )
+        return None
+    # Connects lazily on first use
+    return CosmosClient.from_connection_string(connection_string)
 
 
 def get_llm_manager(cosmos_client: Optional[CosmosClient] = None, database_name: str = "SutraDB") -> LLMManager:
-    """Get or create the global LLM manager instance."""
+    """
+    Get or create the global LLM manager instance.
+
+    Without an explicit ``cosmos_client`` the manager builds one from the
+    environment, so cost tracking and budgets are on wherever Cosmos is configured.
+    """
     global _llm_manager_instance
     if _llm_manager_instance is None:
-        _llm_manager_instance = LLMManager(cosmos_client, database_name)
+        with _llm_manager_lock:
+            if _llm_manager_instance is None:
+                _llm_manager_instance = LLMManager(cosmos_client or _default_cosmos_client(), database_name)
+    elif cosmos_client is not None and _llm_manager_instance.cost_tracker is None:
+        with _llm_manager_lock:
+            if _llm_manager_instance.cost_tracker is None:
+                _llm_manager_instance.attach_cosmos(cosmos_client, database_name)
     return _llm_manager_instance
 
 
+async def warm_up_llm_manager() -> Dict[str, Any]:
+    """Eagerly initialize the shared LLM manager, e.g. when a Functions instance starts."""
+    manager = get_llm_manager()
+    await manager.initialize(trigger="warm_up")
+    return manager.get_init_report()
+
+
+def get_llm_init_report() -> Optional[Dict[str, Any]]:
+    """Cold-start report for the shared manager, or None if it has not been created yet."""
+    if _llm_manager_instance is None:
+        return None
+    return _llm_manager_instance.get_init_report()
+
+
 def get_llm_client(provider_name: str) -> BaseLLMProvider:
     """Get a specific LLM provider client."""
     manager = get_llm_manager()
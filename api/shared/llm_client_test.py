@@ -2,10 +2,11 @@
 Tests for llm_client.py module - LLM provider integrations and management
 """
 
+import asyncio
 import json
 import os
 from datetime import datetime, timezone
-from unittest.mock import AsyncMock, Mock, patch
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
 
 import pytest
 
@@ -19,7 +20,9 @@ from api.shared.llm_client import (
     OpenAIProvider,
     TokenUsage,
     get_llm_client,
+    get_llm_init_report,
     get_llm_manager,
+    warm_up_llm_manager,
 )
 
 
@@ -197,6 +200,27 @@ class TestOpenAIProvider:
             await provider.execute_prompt("Hello, world!", {})
 
 
+    def test_with_api_key_scopes_the_client_to_the_key(self):
+        """Test a user-key copy gets its own client and leaves the platform provider untouched."""
+        provider = OpenAIProvider()
+        provider.api_key = "sk-platform"
+        provider.budget_limit = 100.0
+
+        scoped = provider.with_api_key("sk-user")
+
+        assert scoped.client.api_key == "sk-user"
+        assert scoped._initialized and scoped.enabled
+        assert scoped.budget_limit == 0.0
+        assert scoped.response_cache is None
+        assert provider.api_key == "sk-platform"
+        assert provider.client is None
+
+    def test_with_api_key_unsupported_provider(self):
+        """Test providers with process-wide key configuration refuse per-request keys."""
+        with pytest.raises(NotImplementedError):
+            GoogleProvider().with_api_key("user-key")
+
+
 class TestAnthropicProvider:
     """Test suite for AnthropicProvider."""
 
@@ -457,6 +481,81 @@ class TestLLMManager:
         assert result["failed_providers"] == 1
         assert result["errors"][0]["provider"] == "anthropic"
 
+    @staticmethod
+    def _delayed_execute(delays: dict):
+        """Fake execute_prompt whose latency per provider is injected."""
+
+        async def execute_prompt(provider_name, prompt, context=None, model=None, **kwargs):
+            await asyncio.sleep(delays[provider_name])
+            return LLMResponse.create(
+                provider=provider_name,
+                model=model or "test-model",
+                response=f"{provider_name} response",
+                usage=TokenUsage(prompt_tokens=1, completion_tokens=1),
+                cost=0.0,
+            )
+
+        return execute_prompt
+
+    @pytest.mark.asyncio
+    async def test_execute_multi_llm_runs_concurrently(self):
+        """Test that multi-LLM latency is the max, not the sum, of provider latencies."""
+        manager = LLMManager()
+        manager.execute_prompt = self._delayed_execute({"openai": 0.1, "anthropic": 0.1, "google": 0.1})
+
+        result = await manager.execute_multi_llm("Hello!", ["openai", "anthropic", "google"])
+
+        assert [r.provider for r in result["results"]] == ["openai", "anthropic", "google"]
+        assert result["elapsed_ms"] < 250
+
+    @pytest.mark.asyncio
+    async def test_execute_multi_llm_provider_timeout(self):
+        """Test that a slow provider times out without failing the others."""
+        manager = LLMManager()
+        manager.execute_prompt = self._delayed_execute({"openai": 0.01, "anthropic": 5})
+
+        result = await manager.execute_multi_llm("Hello!", ["openai", "anthropic"], provider_timeouts={"anthropic": 0.05})
+
+        assert result["successful_providers"] == 1
+        assert result["errors"][0]["provider"] == "anthropic"
+        assert result["errors"][0]["timed_out"] is True
+        assert result["elapsed_ms"] < 1000
+
+    @pytest.mark.asyncio
+    async def test_execute_multi_llm_deadline_returns_partial_results(self):
+        """Test that the call-level deadline returns what has completed and cancels the rest."""
+        manager = LLMManager()
+        manager.execute_prompt = self._delayed_execute({"openai": 0.01, "anthropic": 5, "google": 5})
+
+        result = await manager.execute_multi_llm("Hello!", ["openai", "anthropic", "google"], deadline=0.1)
+
+        assert [r.provider for r in result["results"]] == ["openai"]
+        assert [e["provider"] for e in result["errors"]] == ["anthropic", "google"]
+        assert all(e["timed_out"] for e in result["errors"])
+        assert result["elapsed_ms"] < 1000
+
+    @pytest.mark.asyncio
+    async def test_execute_multi_llm_first_n(self):
+        """Test returning after the first N successful providers."""
+        manager = LLMManager()
+        manager.execute_prompt = self._delayed_execute({"openai": 5, "anthropic": 0.01, "google": 0.02})
+
+        result = await manager.execute_multi_llm("Hello!", ["openai", "anthropic", "google"], first_n=2)
+
+        assert [r.provider for r in result["results"]] == ["anthropic", "google"]
+        assert result["cancelled_providers"] == ["openai"]
+        assert result["elapsed_ms"] < 1000
+
+    @pytest.mark.asyncio
+    async def test_iter_multi_llm_yields_in_completion_order(self):
+        """Test that partial results are yielded as providers finish."""
+        manager = LLMManager()
+        manager.execute_prompt = self._delayed_execute({"openai": 0.05, "anthropic": 0.01})
+
+        providers = [outcome["provider"] async for outcome in manager.iter_multi_llm("Hello!", ["openai", "anthropic"])]
+
+        assert providers == ["anthropic", "openai"]
+
     @pytest.mark.asyncio
     async def test_get_provider_status(self):
         """Test getting provider status."""
@@ -481,6 +580,47 @@ class TestLLMManager:
         assert status["openai"]["available"] is True
 
 
+    @pytest.mark.asyncio
+    async def test_concurrent_initialize_runs_once(self):
+        """Test that concurrent callers share a single provider initialization."""
+        manager = LLMManager()
+        manager._kv_client = Mock()
+
+        async def slow_initialize(kv_client):
+            await asyncio.sleep(0.01)
+            return True
+
+        for provider in manager.providers.values():
+            provider.initialize = AsyncMock(side_effect=slow_initialize)
+
+        results = await asyncio.gather(*(manager.initialize() for _ in range(10)))
+
+        assert all(results)
+        for provider in manager.providers.values():
+            provider.initialize.assert_awaited_once()
+
+        report = manager.get_init_report()
+        assert report["initialized"] is True
+        assert report["attempts"] == 1
+        assert set(report["providers"]) == {"openai", "anthropic", "google"}
+        assert report["duration_ms"] >= 0
+
+    @pytest.mark.asyncio
+    @patch.dict(os.environ, {}, clear=True)
+    async def test_failed_initialize_backs_off(self):
+        """Test that a failed initialization is not retried on every call."""
+        manager = LLMManager()
+
+        assert await manager.initialize() is False
+        assert await manager.initialize() is False
+        assert manager.get_init_report()["attempts"] == 1
+        assert "KEY_VAULT_URI" in manager.get_init_report()["error"]
+
+        manager.init_retry_seconds = 0
+        assert await manager.initialize() is False
+        assert manager.get_init_report()["attempts"] == 2
+
+
 class TestLLMManagerEdgeCases:
     """Test edge cases and error conditions for LLMManager."""
 
@@ -523,6 +663,47 @@ class TestGlobalFunctions:
         # Should return the same instance
         assert manager1 is manager2
 
+    @pytest.mark.asyncio
+    async def test_warm_up_llm_manager(self):
+        """Test eager warm-up initializes the shared manager and reports timings."""
+        with patch("api.shared.llm_client._llm_manager_instance", None):
+            assert get_llm_init_report() is None
+
+            manager = get_llm_manager()
+            manager._kv_client = Mock()
+            for provider in manager.providers.values():
+                provider.initialize = AsyncMock(return_value=True)
+
+            report = await warm_up_llm_manager()
+
+            assert report["initialized"] is True
+            assert report["trigger"] == "warm_up"
+            assert get_llm_init_report()["attempts"] == 1
+
+    def test_get_llm_manager_builds_cost_tracking_from_environment(self):
+        """Test the shared manager gets a Cosmos client from the environment outside test mode."""
+        cosmos_client = MagicMock()
+        env = {"ENVIRONMENT": "production", "COSMOS_DB_CONNECTION_STRING": "AccountEndpoint=https://x;AccountKey=eA==;"}
+        with patch("api.shared.llm_client._llm_manager_instance", None), patch.dict(os.environ, env), patch(
+            "api.shared.llm_client.CosmosClient.from_connection_string", return_value=cosmos_client
+        ) as from_connection_string:
+            manager = get_llm_manager()
+
+            assert manager.cost_tracker is not None
+            assert manager.cost_tracker.cosmos_client is cosmos_client
+            assert manager.budget_manager is not None
+            from_connection_string.assert_called_once_with(env["COSMOS_DB_CONNECTION_STRING"])
+
+    def test_get_llm_manager_attaches_late_cosmos_client(self):
+        """Test a client passed after the singleton was created still enables cost tracking."""
+        with patch("api.shared.llm_client._llm_manager_instance", None):
+            manager = get_llm_manager()
+            assert manager.cost_tracker is None
+
+            cosmos_client = MagicMock()
+            assert get_llm_manager(cosmos_client) is manager
+            assert manager.cost_tracker.cosmos_client is cosmos_client
+
     def test_get_llm_client(self):
         """Test getting LLM client for specific provider."""
         client = get_llm_client("openai")
@@ -4,6 +4,7 @@ from .anthropic_provider import AnthropicProvider
 from .base_provider import BaseLLMProvider, LLMResponse, TokenUsage
 from .google_provider import GoogleProvider
 from .openai_provider import OpenAIProvider
+from .resilience import ProviderError, ProviderUnavailableError
 
 # Alias for backward compatibility
 LLMProvider = BaseLLMProvider
@@ -16,4 +17,6 @@ __all__ = [
     "GoogleProvider",
     "LLMResponse",
     "TokenUsage",
+    "ProviderError",
+    "ProviderUnavailableError",
 ]
@@ -9,6 +9,7 @@ import anthropic
 from anthropic import AsyncAnthropic
 
 from .base_provider import BaseLLMProvider, LLMResponse, ModelCapability, ModelInfo, TokenUsage
+from .resilience import ProviderError, parse_retry_after
 
 
 class AnthropicProvider(BaseLLMProvider):
@@ -73,6 +74,9 @@ class AnthropicProvider(BaseLLMProvider):
             ),
         }
 
+    def _configure_client(self) -> None:
+        self.client = AsyncAnthropic(api_key=self.api_key)
+
     async def initialize(self, kv_client) -> bool:
         """Initialize Anthropic provider with API client."""
         if not await super().initialize(kv_client):
@@ -80,7 +84,7 @@ class AnthropicProvider(BaseLLMProvider):
 
         try:
             # Initialize Anthropic client
-            self.client = AsyncAnthropic(api_key=self.api_key)
+            self._configure_client()
 
             # Set default model
             if not self.default_model:
@@ -95,16 +99,6 @@ class AnthropicProvider(BaseLLMProvider):
             self.logger.error(f"Failed to initialize Anthropic client: {e}")
             return False
 
-    def _calculate_cost(self, usage: TokenUsage, model: str) -> float:
-        """Calculate cost based on token usage and model pricing."""
-        if model not in self.models:
-            return 0.0
-
-        model_info = self.models[model]
-        input_cost = (usage.prompt_tokens / 1000) * model_info.cost_per_input_token
-        output_cost = (usage.completion_tokens / 1000) * model_info.cost_per_output_token
-        return input_cost + output_cost
-
     async def _execute_request(
         self, prompt: str, model: str, context: Dict[str, Any], stream: bool = False
     ) -> Union[LLMResponse, AsyncGenerator[str, None]]:
@@ -136,7 +130,17 @@ class AnthropicProvider(BaseLLMProvider):
 
         except anthropic.RateLimitError as e:
             self.logger.warning(f"Anthropic rate limit exceeded: {e}")
-            raise RuntimeError(f"Rate limit exceeded. Please try again later.")
+            raise ProviderError(
+                "Rate limit exceeded. Please try again later.", 429, parse_retry_after(e.response.headers)
+            )
+
+        except anthropic.APIStatusError as e:
+            self.logger.error(f"Anthropic API error: {e}")
+            raise ProviderError(f"Anthropic API error: {str(e)}", e.status_code, parse_retry_after(e.response.headers))
+
+        except (anthropic.APITimeoutError, anthropic.APIConnectionError) as e:
+            self.logger.error(f"Anthropic API unreachable: {e}")
+            raise ProviderError(f"Anthropic API error: {str(e)}", transient=True)
 
         except anthropic.APIError as e:
             self.logger.error(f"Anthropic API error: {e}")
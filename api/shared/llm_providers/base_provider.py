@@ -1,6 +1,7 @@
 """Base LLM Provider for Sutra Multi-LLM Prompt Studio."""
 
 import asyncio
+import copy
 import logging
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
@@ -10,6 +11,9 @@ from typing import Any, AsyncGenerator, Dict, List, Optional, Union
 
 from azure.keyvault.secrets import SecretClient
 
+from ..pricing import MICROS_PER_DOLLAR, PricingRegistry, get_pricing_registry
+from .resilience import ConcurrencyConfig, ModelGuard, ProviderError, worst_circuit_state
+
 
 class ModelCapability(Enum):
     """Capabilities that a model can support."""
@@ -95,9 +99,14 @@ class BaseLLMProvider(ABC):
         self.api_key: Optional[str] = None
         self.budget_limit: float = 0.0
         self.current_usage: float = 0.0
+        # Optional LLMResponseCache, attached by LLMManager
+        self.response_cache: Any = None
         self.priority: int = 1  # 1 = highest priority
         self.models: Dict[str, ModelInfo] = {}
         self.default_model: Optional[str] = None
+        # Per-model concurrency limiter and circuit breaker, created on first use
+        self.concurrency_config = ConcurrencyConfig.from_env()
+        self._guards: Dict[str, ModelGuard] = {}
         self._initialized = False
         self.logger = logging.getLogger(f"sutra.llm.{name.lower()}")
 
@@ -164,6 +173,29 @@ class BaseLLMProvider(ABC):
             self.logger.error(f"Failed to initialize {self.name} provider: {e}")
             return False
 
+    def _configure_client(self) -> None:
+        """Build the SDK client for ``self.api_key``; providers that cannot scope a key per request raise."""
+        raise NotImplementedError(f"{self.name} does not support per-request API keys")
+
+    def with_api_key(self, api_key: str) -> "BaseLLMProvider":
+        """
+        Copy of this provider that calls the API with ``api_key``, e.g. a user's own key.
+
+        The copy shares the per-model guards but not the platform key, budget or
+        response cache.
+        """
+        scoped = copy.copy(self)
+        scoped.api_key = api_key
+        scoped.budget_limit = 0.0
+        scoped.current_usage = 0.0
+        scoped.response_cache = None
+        scoped._configure_client()
+        scoped.models = self.models or self._get_available_models()
+        scoped.default_model = self.default_model or next(iter(scoped.models), None)
+        scoped.enabled = True
+        scoped._initialized = True
+        return scoped
+
     async def check_budget(self, estimated_cost: float = 0.0) -> bool:
         """Check if the provider is within budget limits."""
         if self.budget_limit <= 0:
@@ -180,15 +212,29 @@ class BaseLLMProvider(ABC):
         if not model or model not in self.models:
             return 0.0
 
-        model_info = self.models[model]
-
         # Rough token estimation (1 token ≈ 4 characters for English text)
         input_tokens = len(prompt) // 4
-        output_tokens = max_tokens or (model_info.max_tokens // 4)
+        output_tokens = max_tokens or (self.models[model].max_tokens // 4)
+
+        return self._price_tokens(model, input_tokens, output_tokens)
+
+    def _calculate_cost(self, usage: TokenUsage, model: str) -> float:
+        """Calculate cost based on token usage and model pricing."""
+        if model not in self.models:
+            return 0.0
+
+        return self._price_tokens(model, usage.prompt_tokens, usage.completion_tokens)
+
+    def _price_tokens(self, model: str, input_tokens: int, output_tokens: int) -> float:
+        # The shared registry keeps estimates in line with what CostTracker charges;
+        # ModelInfo prices only cover models it does not list
+        price = get_pricing_registry().get(self.name, model)
+        if price is not None:
+            return PricingRegistry.price_micros(price, input_tokens, output_tokens)[2] / MICROS_PER_DOLLAR
 
+        model_info = self.models[model]
         input_cost = (input_tokens / 1000) * model_info.cost_per_input_token
         output_cost = (output_tokens / 1000) * model_info.cost_per_output_token
-
         return input_cost + output_cost
 
     async def execute_prompt(
@@ -214,6 +260,20 @@ class BaseLLMProvider(ABC):
         if not model or model not in self.models:
             raise ValueError(f"Invalid model {model} for {self.name}")
 
+        # Serve repeated non-streaming calls from the response cache: deterministic calls by default,
+        # any call whose context has {"cache": True}; {"cache": False} opts out
+        use_cache = (
+            self.response_cache is not None
+            and not stream
+            and not (context or {}).get("test")
+            and self.response_cache.caches(temperature, context)
+        )
+        if use_cache:
+            cached = self.response_cache.get(self.name.lower(), model, temperature, prompt, max_tokens, context)
+            if cached is not None:
+                self.logger.info(f"Served {model} request from response cache, saved ${cached.metadata['saved_cost']:.4f}")
+                return cached
+
         # Estimate cost and check budget
         estimated_cost = self.estimate_cost(prompt, model, max_tokens)
         if not await self.check_budget(estimated_cost):
@@ -228,21 +288,43 @@ class BaseLLMProvider(ABC):
             "provider": self.name,
         }
 
+        guard = self._get_guard(model)
         try:
-            # Execute the request
-            result = await self._execute_request(prompt, model, execution_context, stream)
+            # Execute the request under the model's concurrency limit and circuit breaker
+            if stream:
+                result = guard.stream(lambda: self._execute_request(prompt, model, execution_context, stream))
+            else:
+                result = await guard.call(lambda: self._execute_request(prompt, model, execution_context, stream))
 
             # Track usage for non-streaming responses
             if isinstance(result, LLMResponse):
                 self.current_usage += result.cost
                 self.logger.info(f"Executed {model} request, cost: ${result.cost:.4f}, total usage: ${self.current_usage:.4f}")
+                if use_cache:
+                    self.response_cache.set(self.name.lower(), model, temperature, prompt, result, max_tokens, context)
 
             return result
 
+        except ProviderError as e:
+            self.logger.error(f"{self.name} execution failed: {e}")
+            raise ProviderError(
+                f"{self.name} provider execution failed: {str(e)}", e.status_code, e.retry_after, e.transient
+            ) from e
+
         except Exception as e:
             self.logger.error(f"{self.name} execution failed: {e}")
             raise RuntimeError(f"{self.name} provider execution failed: {str(e)}")
 
+    def _get_guard(self, model: str) -> ModelGuard:
+        guard = self._guards.get(model)
+        if guard is None:
+            guard = self._guards[model] = ModelGuard(f"{self.name}/{model}", self.concurrency_config)
+        return guard
+
+    def get_model_health(self, model: str) -> Optional[ModelGuard]:
+        """Latency, error-rate and circuit state for ``model``, or None before its first call."""
+        return self._guards.get(model)
+
     def get_models(self) -> Dict[str, ModelInfo]:
         """Get available models for this provider."""
         return self.models.copy()
@@ -260,6 +342,8 @@ class BaseLLMProvider(ABC):
             "budget_percentage": (self.current_usage / self.budget_limit * 100) if self.budget_limit > 0 else 0,
             "priority": self.priority,
             "available": self.enabled and self._initialized,
+            "circuit_state": worst_circuit_state(self._guards),
+            "concurrency": {name: guard.get_status() for name, guard in self._guards.items()},
             "models": {
                 name: {
                     "display_name": info.display_name,
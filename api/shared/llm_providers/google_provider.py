@@ -9,6 +9,7 @@ import google.generativeai as genai
 from google.generativeai.types import GenerationConfig, HarmBlockThreshold, HarmCategory
 
 from .base_provider import BaseLLMProvider, LLMResponse, ModelCapability, ModelInfo, TokenUsage
+from .resilience import ProviderError
 
 
 class GoogleProvider(BaseLLMProvider):
@@ -98,16 +99,6 @@ class GoogleProvider(BaseLLMProvider):
             self.logger.error(f"Failed to configure Google AI: {e}")
             return False
 
-    def _calculate_cost(self, usage: TokenUsage, model: str) -> float:
-        """Calculate cost based on token usage and model pricing."""
-        if model not in self.models:
-            return 0.0
-
-        model_info = self.models[model]
-        input_cost = (usage.prompt_tokens / 1000) * model_info.cost_per_input_token
-        output_cost = (usage.completion_tokens / 1000) * model_info.cost_per_output_token
-        return input_cost + output_cost
-
     def _get_safety_settings(self) -> Dict[HarmCategory, HarmBlockThreshold]:
         """Get safety settings for Google AI."""
         return {
@@ -151,6 +142,9 @@ class GoogleProvider(BaseLLMProvider):
             else:
                 return await self._handle_standard_response(model_instance, prompt, generation_config, safety_settings, model)
 
+        except ProviderError:
+            raise
+
         except Exception as e:
             self.logger.error(f"Unexpected error in Google AI request: {e}")
             raise RuntimeError(f"Google AI request failed: {str(e)}")
@@ -212,7 +206,13 @@ class GoogleProvider(BaseLLMProvider):
 
         except Exception as e:
             self.logger.error(f"Error in Google AI standard response: {e}")
-            raise RuntimeError(f"Google AI response failed: {str(e)}")
+            # google.api_core errors carry the HTTP status (429 ResourceExhausted, 503 ServiceUnavailable, ...)
+            status_code = getattr(e, "code", None)
+            raise ProviderError(
+                f"Google AI response failed: {str(e)}",
+                status_code if isinstance(status_code, int) else None,
+                transient=isinstance(e, (asyncio.TimeoutError, ConnectionError)),
+            )
 
     async def _handle_streaming_response(
         self, model_instance, prompt: str, generation_config: GenerationConfig, safety_settings: Dict, model: str
@@ -9,6 +9,7 @@ import openai
 from openai import AsyncOpenAI
 
 from .base_provider import BaseLLMProvider, LLMResponse, ModelCapability, ModelInfo, TokenUsage
+from .resilience import ProviderError, parse_retry_after
 
 
 class OpenAIProvider(BaseLLMProvider):
@@ -80,7 +81,7 @@ class OpenAIProvider(BaseLLMProvider):
                 name="gpt-3.5-turbo",
                 display_name="GPT-3.5 Turbo",
                 max_tokens=4096,
-                cost_per_input_token=0.001,  # $0.001 per 1K tokens
+                cost_per_input_token=0.0015,  # $0.0015 per 1K tokens
                 cost_per_output_token=0.002,  # $0.002 per 1K tokens
                 capabilities=[
                     ModelCapability.TEXT_GENERATION,
@@ -94,6 +95,9 @@ class OpenAIProvider(BaseLLMProvider):
             ),
         }
 
+    def _configure_client(self) -> None:
+        self.client = AsyncOpenAI(api_key=self.api_key, organization=self.organization)
+
     async def initialize(self, kv_client) -> bool:
         """Initialize OpenAI provider with API client."""
         if not await super().initialize(kv_client):
@@ -101,7 +105,7 @@ class OpenAIProvider(BaseLLMProvider):
 
         try:
             # Initialize OpenAI client
-            self.client = AsyncOpenAI(api_key=self.api_key, organization=self.organization)
+            self._configure_client()
 
             # Set default model
             if not self.default_model:
@@ -116,16 +120,6 @@ class OpenAIProvider(BaseLLMProvider):
             self.logger.error(f"Failed to initialize OpenAI client: {e}")
             return False
 
-    def _calculate_cost(self, usage: TokenUsage, model: str) -> float:
-        """Calculate cost based on token usage and model pricing."""
-        if model not in self.models:
-            return 0.0
-
-        model_info = self.models[model]
-        input_cost = (usage.prompt_tokens / 1000) * model_info.cost_per_input_token
-        output_cost = (usage.completion_tokens / 1000) * model_info.cost_per_output_token
-        return input_cost + output_cost
-
     async def _execute_request(
         self, prompt: str, model: str, context: Dict[str, Any], stream: bool = False
     ) -> Union[LLMResponse, AsyncGenerator[str, None]]:
@@ -161,7 +155,17 @@ class OpenAIProvider(BaseLLMProvider):
 
         except openai.RateLimitError as e:
             self.logger.warning(f"OpenAI rate limit exceeded: {e}")
-            raise RuntimeError(f"Rate limit exceeded. Please try again later.")
+            raise ProviderError(
+                "Rate limit exceeded. Please try again later.", 429, parse_retry_after(e.response.headers)
+            )
+
+        except openai.APIStatusError as e:
+            self.logger.error(f"OpenAI API error: {e}")
+            raise ProviderError(f"OpenAI API error: {str(e)}", e.status_code, parse_retry_after(e.response.headers))
+
+        except (openai.APITimeoutError, openai.APIConnectionError) as e:
+            self.logger.error(f"OpenAI API unreachable: {e}")
+            raise ProviderError(f"OpenAI API error: {str(e)}", transient=True)
 
         except openai.APIError as e:
             self.logger.error(f"OpenAI API error: {e}")
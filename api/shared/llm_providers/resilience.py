@@ -0,0 +1,402 @@
+"""
+Adaptive concurrency limiting and circuit breaking for LLM provider calls.
+
+Every provider/model pair gets a ``ModelGuard`` that wraps the upstream call:
+
+- ``AdaptiveConcurrencyLimiter`` caps in-flight requests with an AIMD limit. The
+  limit grows by roughly one per round trip while latency stays near its
+  baseline, shrinks gently when latency inflates and is cut sharply on
+  429/5xx/timeouts. Requests over the limit queue for a bounded time.
+- ``CircuitBreaker`` opens after consecutive overload failures (or immediately
+  for the duration of a ``retry-after`` header), fails fast while open and lets
+  a single probe through once the reset timeout passes (half-open).
+- Overload failures are retried with full-jitter backoff, or after the
+  ``retry-after`` delay when the provider sent one that is short enough to wait.
+
+Limits are per worker process and start from ``LLM_CONCURRENCY_*`` settings.
+"""
+
+import asyncio
+import email.utils
+import logging
+import os
+import random
+import time
+from collections import deque
+from dataclasses import dataclass, fields
+from typing import Any, AsyncGenerator, Awaitable, Callable, Deque, Dict, Mapping, Optional, Tuple, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Status codes that mean "back off", as opposed to a bad request
+OVERLOAD_STATUS_CODES = frozenset({408, 409, 429})
+
+# Smoothing factor for the latency baseline; small so a slow burst does not become the new normal
+BASELINE_ALPHA = 0.05
+
+# Recent calls kept per model for latency percentiles and error rate
+HEALTH_WINDOW = 100
+
+
+class ProviderError(RuntimeError):
+    """Upstream provider failure, with the HTTP status and ``retry-after`` delay when known."""
+
+    def __init__(
+        self,
+        message: str,
+        status_code: Optional[int] = None,
+        retry_after: Optional[float] = None,
+        transient: bool = False,
+    ):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+        self.transient = transient
+
+    @property
+    def overloaded(self) -> bool:
+        """True when the provider is rate limiting, failing or unreachable rather than rejecting the request."""
+        if self.transient:
+            return True
+        return self.status_code is not None and (self.status_code in OVERLOAD_STATUS_CODES or self.status_code >= 500)
+
+
+class ProviderUnavailableError(ProviderError):
+    """Raised without calling the provider: its circuit is open or no concurrency slot freed up in time."""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message, status_code=503, retry_after=retry_after)
+
+
+def parse_retry_after(headers: Optional[Mapping[str, str]]) -> Optional[float]:
+    """Seconds to wait from ``retry-after-ms`` / ``retry-after`` (delta-seconds or HTTP date) headers."""
+    if not headers:
+        return None
+    value = headers.get("retry-after-ms")
+    if value is not None:
+        try:
+            return max(0.0, float(value) / 1000)
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+def is_overload(error: BaseException) -> bool:
+    """Whether ``error`` should slow callers down (limit cut, breaker failure, retry)."""
+    if isinstance(error, ProviderError):
+        return error.overloaded
+    return isinstance(error, (asyncio.TimeoutError, ConnectionError))
+
+
+@dataclass
+class ConcurrencyConfig:
+    """Tuning for a ModelGuard; defaults are overridden by ``LLM_CONCURRENCY_*`` settings."""
+
+    initial_limit: int = 8
+    min_limit: int = 1
+    max_limit: int = 64
+    # Multiplier applied to the limit on an overload failure
+    backoff_ratio: float = 0.5
+    # Multiplier applied when a response is slower than latency_tolerance x baseline
+    latency_backoff_ratio: float = 0.9
+    latency_tolerance: float = 2.0
+    queue_timeout: float = 30.0
+    failure_threshold: int = 5
+    reset_timeout: float = 15.0
+    max_reset_timeout: float = 300.0
+    max_retries: int = 2
+    retry_backoff: float = 0.5
+    # Longest retry-after a request waits out itself; longer ones fail fast
+    max_retry_after: float = 10.0
+
+    @classmethod
+    def from_env(cls) -> "ConcurrencyConfig":
+        values = {}
+        for config_field in fields(cls):
+            raw = os.getenv(f"LLM_CONCURRENCY_{config_field.name.upper()}")
+            if raw is not None:
+                values[config_field.name] = type(config_field.default)(raw)
+        return cls(**values)
+
+
+class AdaptiveConcurrencyLimiter:
+    """AIMD limit on in-flight requests with a FIFO wait queue."""
+
+    def __init__(self, config: ConcurrencyConfig):
+        self.config = config
+        self.limit = float(config.initial_limit)
+        self.in_flight = 0
+        self.baseline_latency: Optional[float] = None
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def _capacity(self) -> int:
+        return max(self.config.min_limit, int(self.limit))
+
+    async def acquire(self, timeout: Optional[float] = None) -> None:
+        """Take a slot, waiting up to ``timeout`` seconds behind earlier callers."""
+        if self.in_flight < self._capacity() and not self._waiters:
+            self.in_flight += 1
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as we gave up; pass it on
+                self.release()
+            else:
+                waiter.cancel()
+                self._waiters.remove(waiter)
+            if isinstance(e, asyncio.TimeoutError):
+                raise ProviderUnavailableError(
+                    f"No concurrency slot within {timeout}s ({self.in_flight} in flight, limit {self._capacity()})"
+                )
+            raise
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        while self._waiters and self.in_flight < self._capacity():
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+    def on_success(self, latency: float) -> None:
+        """Grow the limit while latency holds; shrink it when latency inflates past the baseline."""
+        baseline = self.baseline_latency
+        if baseline is None:
+            self.baseline_latency = latency
+        elif latency > baseline * self.config.latency_tolerance:
+            self.limit = max(self.config.min_limit, self.limit * self.config.latency_backoff_ratio)
+        else:
+            self.baseline_latency = baseline + BASELINE_ALPHA * (latency - baseline)
+            # Only grow when the limit is actually what holds requests back
+            if self.in_flight + self.queued >= self._capacity():
+                self.limit = min(self.config.max_limit, self.limit + 1 / self.limit)
+        self._wake()
+
+    def on_overload(self) -> None:
+        self.limit = max(self.config.min_limit, self.limit * self.config.backoff_ratio)
+
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker counting consecutive overload failures."""
+
+    def __init__(self, config: ConcurrencyConfig, clock: Callable[[], float] = time.monotonic):
+        self.config = config
+        self.clock = clock
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        # Consecutive trips without a success in between; each doubles the reset timeout
+        self.trips = 0
+        self._probe_in_flight = False
+
+    def retry_in(self) -> float:
+        return max(0.0, self.open_until - self.clock())
+
+    def before_call(self) -> None:
+        """Raise ProviderUnavailableError unless a call may go through now."""
+        if self.state == OPEN:
+            if self.clock() < self.open_until:
+                raise ProviderUnavailableError(f"circuit open, retry in {self.retry_in():.1f}s", self.retry_in())
+            self.state = HALF_OPEN
+        if self.state == HALF_OPEN:
+            if self._probe_in_flight:
+                raise ProviderUnavailableError("circuit half-open, probe in flight", self.config.reset_timeout)
+            self._probe_in_flight = True
+
+    def on_success(self) -> None:
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.trips = 0
+        self._probe_in_flight = False
+
+    def on_failure(self, retry_after: Optional[float] = None) -> None:
+        self.consecutive_failures += 1
+        self._probe_in_flight = False
+        if self.state == HALF_OPEN or self.consecutive_failures >= self.config.failure_threshold:
+            timeout = min(self.config.max_reset_timeout, self.config.reset_timeout * (2**self.trips))
+            self.trips += 1
+            self._open(max(timeout, retry_after or 0.0))
+        elif retry_after:
+            # The provider said when to come back; nothing goes out before then
+            self._open(retry_after)
+
+    def on_abandoned(self) -> None:
+        """The call ended without telling us anything (cancelled); free the probe slot."""
+        self._probe_in_flight = False
+
+    def _open(self, seconds: float) -> None:
+        self.state = OPEN
+        self.open_until = max(self.open_until, self.clock() + seconds)
+
+
+def _backoff_delay(attempt: int, base: float) -> float:
+    return random.uniform(0, base * (2 ** (attempt - 1)))
+
+
+class ModelGuard:
+    """Concurrency limit, circuit breaker and retries for one provider model."""
+
+    def __init__(self, name: str, config: Optional[ConcurrencyConfig] = None, clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.config = config or ConcurrencyConfig.from_env()
+        self.clock = clock
+        self.limiter = AdaptiveConcurrencyLimiter(self.config)
+        self.breaker = CircuitBreaker(self.config, clock)
+        self.successes = 0
+        self.overloads = 0
+        self.rejections = 0
+        self.retries = 0
+        # Rolling window of recent latencies (seconds) and outcomes (True = overload failure)
+        self.latencies: Deque[float] = deque(maxlen=HEALTH_WINDOW)
+        self.outcomes: Deque[bool] = deque(maxlen=HEALTH_WINDOW)
+
+    def latency_percentile(self, percentile: float) -> Optional[float]:
+        """Nearest-rank percentile of recent successful call latencies, in seconds."""
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(percentile / 100 * len(ordered)))]
+
+    def error_rate(self) -> float:
+        """Share of recent calls that failed with an overload error."""
+        return sum(self.outcomes) / len(self.outcomes) if self.outcomes else 0.0
+
+    async def call(self, request: Callable[[], Awaitable[T]]) -> T:
+        """Run ``request`` under the guard, retrying overload failures."""
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                return await self._attempt(request)
+            except ProviderUnavailableError:
+                raise
+            except Exception as e:
+                if not is_overload(e) or attempt > self.config.max_retries:
+                    raise
+                retry_after = getattr(e, "retry_after", None)
+                if retry_after is not None and retry_after > self.config.max_retry_after:
+                    raise
+                delay = retry_after if retry_after is not None else _backoff_delay(attempt, self.config.retry_backoff)
+                self.retries += 1
+                logger.warning(f"{self.name} overloaded ({e}), retry {attempt} in {delay:.2f}s")
+                await asyncio.sleep(delay)
+
+    async def _attempt(self, request: Callable[[], Awaitable[T]]) -> T:
+        await self._admit()
+        started = self.clock()
+        try:
+            result = await request()
+        except BaseException as e:
+            self._record_error(e)
+            raise
+        else:
+            latency = self.clock() - started
+            self.successes += 1
+            self.latencies.append(latency)
+            self.outcomes.append(False)
+            self.breaker.on_success()
+            self.limiter.on_success(latency)
+        finally:
+            self.limiter.release()
+        return result
+
+    async def stream(self, request: Callable[[], Awaitable[AsyncGenerator[str, None]]]) -> AsyncGenerator[str, None]:
+        """Hold a slot for the life of a streaming response; no retries once output may have been sent."""
+        await self._admit()
+        try:
+            generator = await request()
+            async for chunk in generator:
+                yield chunk
+        except BaseException as e:
+            self._record_error(e)
+            raise
+        else:
+            self.successes += 1
+            self.outcomes.append(False)
+            self.breaker.on_success()
+        finally:
+            self.limiter.release()
+
+    async def _admit(self) -> None:
+        try:
+            self.breaker.before_call()
+        except ProviderUnavailableError:
+            self.rejections += 1
+            raise
+        try:
+            await self.limiter.acquire(self.config.queue_timeout)
+        except BaseException:
+            self.breaker.on_abandoned()
+            self.rejections += 1
+            raise
+
+    def _record_error(self, error: BaseException) -> None:
+        if isinstance(error, (asyncio.CancelledError, GeneratorExit)):
+            self.breaker.on_abandoned()
+        elif is_overload(error):
+            self.overloads += 1
+            self.outcomes.append(True)
+            self.limiter.on_overload()
+            self.breaker.on_failure(getattr(error, "retry_after", None))
+        else:
+            # The provider answered (e.g. a 400), so it is up
+            self.breaker.on_success()
+
+    def get_status(self) -> Dict[str, Any]:
+        p50, p95 = self.latency_percentile(50), self.latency_percentile(95)
+        return {
+            "concurrency_limit": self.limiter._capacity(),
+            "in_flight": self.limiter.in_flight,
+            "queued": self.limiter.queued,
+            "baseline_latency_ms": (
+                round(self.limiter.baseline_latency * 1000, 1) if self.limiter.baseline_latency is not None else None
+            ),
+            "latency_p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+            "latency_p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+            "error_rate": round(self.error_rate(), 4),
+            "circuit_state": self.breaker.state,
+            "circuit_retry_in": round(self.breaker.retry_in(), 1) if self.breaker.state != CLOSED else 0.0,
+            "consecutive_failures": self.breaker.consecutive_failures,
+            "successes": self.successes,
+            "overloads": self.overloads,
+            "rejections": self.rejections,
+            "retries": self.retries,
+        }
+
+
+def worst_circuit_state(guards: Dict[str, ModelGuard]) -> str:
+    """Summary state across a provider's models: open > half_open > closed."""
+    states: Tuple[str, ...] = tuple(guard.breaker.state for guard in guards.values())
+    for state in (OPEN, HALF_OPEN):
+        if state in states:
+            return state
+    return CLOSED
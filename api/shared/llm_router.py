@@ -0,0 +1,219 @@
+"""
+Latency- and cost-aware model routing for LLMManager.
+
+Callers ask for a capability tier ("fast", "capable", "premium") or a specific
+model; the router ranks every equivalent model on an enabled provider by:
+
+- rolling p50/p95 latency and overload error rate (from each model's ModelGuard);
+- circuit state: open circuits are skipped, half-open ones are penalised;
+- the provider's remaining budget (``check_budget``) and the request's ``max_cost``;
+- the request's ``deadline``: models whose p95 exceeds it are skipped.
+
+Scores are relative to the best candidate: ``latency / best_latency`` (scaled up
+by the error rate) plus ``cost_weight * log2(cost / best_cost)``; with the
+default "latency" preference a model costing 4x as much wins only when it is
+more than 1.5x faster. Models without latency samples are scored at
+``LLM_ROUTER_LATENCY_PRIOR_MS``. An explicitly requested model stays first when
+it is eligible; the rest of the ranked list is the failover order used by
+``LLMManager.execute_routed``.
+"""
+
+import math
+import os
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .llm_providers.base_provider import BaseLLMProvider
+from .llm_providers.resilience import CLOSED, HALF_OPEN, OPEN
+from .pricing import get_pricing_registry
+
+# Interchangeable models, best first within each tier
+MODEL_TIERS: Dict[str, List[str]] = {
+    "premium": ["claude-3-opus-20240229", "gpt-4"],
+    "capable": ["gpt-4o", "claude-3-5-sonnet-20241022", "gemini-1.5-pro", "gpt-4-1106-preview"],
+    "fast": ["claude-3-haiku-20240307", "gemini-1.5-flash", "gpt-3.5-turbo", "gemini-pro"],
+}
+DEFAULT_TIER = "capable"
+
+# Short names used by the UI and older callers
+MODEL_ALIASES = {"gemini-flash": "gemini-1.5-flash"}
+
+# cost_weight per preference; higher means a price difference outweighs more latency
+PREFERENCES = {"latency": 0.25, "balanced": 1.0, "cost": 4.0}
+
+DEFAULT_LATENCY_PRIOR_MS = 3000.0
+# Score multiplier per unit of error rate, and flat penalty for a half-open circuit
+ERROR_PENALTY = 4.0
+HALF_OPEN_PENALTY = 1.0
+
+
+class NoRouteError(RuntimeError):
+    """No enabled provider model satisfies the request's tier, budget, cost and deadline."""
+
+
+@dataclass
+class RouteCandidate:
+    """A routable provider/model and the inputs its score was computed from."""
+
+    provider: str
+    model: str
+    tier: Optional[str]
+    estimated_cost: float
+    p50_ms: Optional[float]
+    p95_ms: Optional[float]
+    error_rate: float
+    circuit_state: str
+    score: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def tier_of(model: str) -> Optional[str]:
+    for tier, models in MODEL_TIERS.items():
+        if model in models:
+            return tier
+    return None
+
+
+def resolve_model_name(provider: BaseLLMProvider, model: str) -> Optional[str]:
+    """The provider's model for ``model``, accepting undated aliases like ``claude-3-5-sonnet``."""
+    model = MODEL_ALIASES.get(model, model)
+    if model in provider.models:
+        return model
+    matches = [name for name in provider.models if name.startswith(f"{model}-")]
+    return matches[0] if len(matches) == 1 else None
+
+
+class LLMRouter:
+    """Ranks provider models for a request from live health, budget and price."""
+
+    def __init__(self, providers: Dict[str, BaseLLMProvider], latency_prior_ms: Optional[float] = None):
+        self.providers = providers
+        self.latency_prior_ms = latency_prior_ms or float(
+            os.getenv("LLM_ROUTER_LATENCY_PRIOR_MS", str(DEFAULT_LATENCY_PRIOR_MS))
+        )
+
+    def find_model(self, model: str) -> Optional[Tuple[str, str]]:
+        """(provider, model) for a model name or alias on any provider."""
+        for provider_name, provider in self.providers.items():
+            resolved = resolve_model_name(provider, model)
+            if resolved is not None:
+                return provider_name, resolved
+        return None
+
+    def _pool(self, tier: Optional[str], model: Optional[str]) -> Tuple[Optional[str], List[str]]:
+        """Tier and candidate model names: the requested model first, then its equivalents."""
+        if model:
+            found = self.find_model(model)
+            resolved = found[1] if found else model
+            tier = tier_of(resolved)
+            equivalents = [name for name in MODEL_TIERS.get(tier, []) if name != resolved]
+            return tier, [resolved] + equivalents
+        tier = tier or DEFAULT_TIER
+        if tier not in MODEL_TIERS:
+            raise ValueError(f"Unknown model tier: {tier}")
+        return tier, list(MODEL_TIERS[tier])
+
+    async def candidates(
+        self,
+        prompt: str = "",
+        tier: Optional[str] = None,
+        model: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        deadline: Optional[float] = None,
+        max_cost: Optional[float] = None,
+        prefer: str = "latency",
+        exclude: Iterable[Tuple[str, str]] = (),
+        provider: Optional[str] = None,
+    ) -> List[RouteCandidate]:
+        """Eligible (provider, model) pairs for the request, best first; only ``provider``'s models when given."""
+        if prefer not in PREFERENCES:
+            raise ValueError(f"Unknown routing preference: {prefer}")
+        tier, pool = self._pool(tier, model)
+        requested = pool[0] if model else None
+        excluded = set(exclude)
+
+        candidates: List[RouteCandidate] = []
+        for name in pool:
+            found = self.find_model(name)
+            if found is None or found in excluded:
+                continue
+            provider_name, resolved = found
+            if provider is not None and provider_name != provider.lower():
+                continue
+            llm_provider = self.providers[provider_name]
+            if not (llm_provider.enabled and llm_provider._initialized):
+                continue
+
+            health = llm_provider.get_model_health(resolved)
+            circuit_state = health.breaker.state if health else CLOSED
+            if circuit_state == OPEN and health.breaker.retry_in() > 0:
+                continue
+            p50 = health.latency_percentile(50) if health else None
+            p95 = health.latency_percentile(95) if health else None
+            if deadline is not None and p95 is not None and p95 > deadline:
+                continue
+
+            estimated_cost = llm_provider.estimate_cost(prompt, resolved, max_tokens)
+            if max_cost is not None and estimated_cost > max_cost:
+                continue
+            if not await llm_provider.check_budget(estimated_cost):
+                continue
+
+            candidates.append(
+                RouteCandidate(
+                    provider=provider_name,
+                    model=resolved,
+                    tier=tier,
+                    estimated_cost=estimated_cost,
+                    p50_ms=round(p50 * 1000, 1) if p50 is not None else None,
+                    p95_ms=round(p95 * 1000, 1) if p95 is not None else None,
+                    error_rate=health.error_rate() if health else 0.0,
+                    circuit_state=circuit_state,
+                )
+            )
+
+        self._score(candidates, PREFERENCES[prefer])
+        # Stable sort keeps tier order on ties
+        candidates.sort(key=lambda candidate: (candidate.model != requested, candidate.score))
+        return candidates
+
+    def _score(self, candidates: List[RouteCandidate], cost_weight: float) -> None:
+        if not candidates:
+            return
+        latencies = [c.p50_ms if c.p50_ms is not None else self.latency_prior_ms for c in candidates]
+        best_latency = max(min(latencies), 1.0)
+        best_cost = min(c.estimated_cost for c in candidates)
+        for candidate, latency in zip(candidates, latencies):
+            score = (latency / best_latency) * (1 + ERROR_PENALTY * candidate.error_rate)
+            if best_cost > 0:
+                score += cost_weight * math.log2(candidate.estimated_cost / best_cost)
+            if candidate.circuit_state == HALF_OPEN:
+                score += HALF_OPEN_PENALTY
+            candidate.score = round(score, 4)
+
+    async def route(self, prompt: str = "", **kwargs) -> RouteCandidate:
+        """The best candidate for the request; raises NoRouteError when none is eligible."""
+        candidates = await self.candidates(prompt, **kwargs)
+        if not candidates:
+            raise NoRouteError(f"No provider model available for {kwargs.get('model') or kwargs.get('tier') or DEFAULT_TIER}")
+        return candidates[0]
+
+    def cheaper_models(self, provider_name: str, current_model: str) -> List[str]:
+        """The provider's models priced below ``current_model`` (blended input+output), cheapest last."""
+        provider = self.providers.get(provider_name)
+        if provider is None:
+            return []
+        pricing = get_pricing_registry()
+
+        def blended(model: str) -> Optional[int]:
+            price = pricing.get(provider_name, model)
+            return price.input_picos + price.output_picos if price else None
+
+        current = blended(resolve_model_name(provider, current_model) or current_model)
+        priced = [(model, blended(model)) for model in provider.models]
+        priced = [(model, price) for model, price in priced if price is not None]
+        if current is None:
+            return [model for model, _ in sorted(priced, key=lambda item: -item[1])]
+        return [model for model, price in sorted(priced, key=lambda item: -item[1]) if price < current]
@@ -0,0 +1,162 @@
+"""
+Tests for llm_router.py - latency- and cost-aware provider routing
+"""
+
+from typing import Any, Dict, List
+from unittest.mock import AsyncMock
+
+import pytest
+
+from shared.llm_client import LLMManager
+from shared.llm_providers.base_provider import BaseLLMProvider, LLMResponse, ModelInfo, TokenUsage
+from shared.llm_providers.resilience import ProviderError
+from shared.llm_router import LLMRouter, NoRouteError
+
+
+class FakeProvider(BaseLLMProvider):
+    """Provider with fixed models whose calls succeed unless told to fail."""
+
+    def __init__(self, name: str, models: List[str], failing=()):
+        super().__init__(name)
+        self.enabled = True
+        self._initialized = True
+        self.model_names = models
+        self.models = self._get_available_models()
+        self.default_model = models[0]
+        self.failing = set(failing)
+        self.calls = []
+
+    @property
+    def provider_name(self) -> str:
+        return self.name
+
+    def _get_available_models(self) -> Dict[str, ModelInfo]:
+        return {
+            name: ModelInfo(name=name, display_name=name, max_tokens=4096, cost_per_input_token=0.0, cost_per_output_token=0.0)
+            for name in self.model_names
+        }
+
+    async def _execute_request(self, prompt: str, model: str, context: Dict[str, Any], stream: bool = False):
+        self.calls.append(model)
+        if model in self.failing:
+            raise ProviderError("overloaded", 503)
+        return LLMResponse.create(self.name, model, "ok", TokenUsage(10, 5), cost=0.001)
+
+
+def make_providers(**failing) -> Dict[str, FakeProvider]:
+    return {
+        "openai": FakeProvider("OpenAI", ["gpt-4", "gpt-4o", "gpt-3.5-turbo"], failing.get("openai", ())),
+        "anthropic": FakeProvider(
+            "Anthropic", ["claude-3-5-sonnet-20241022", "claude-3-haiku-20240307"], failing.get("anthropic", ())
+        ),
+        "google": FakeProvider("Google", ["gemini-1.5-pro", "gemini-1.5-flash"], failing.get("google", ())),
+    }
+
+
+def observe(provider: BaseLLMProvider, model: str, latencies, errors: int = 0) -> None:
+    guard = provider._get_guard(model)
+    guard.latencies.extend(latencies)
+    guard.outcomes.extend([False] * len(latencies) + [True] * errors)
+
+
+class TestLLMRouter:
+    """Test suite for candidate ranking."""
+
+    @pytest.mark.asyncio
+    async def test_fastest_healthy_model_in_tier_wins(self):
+        providers = make_providers()
+        observe(providers["openai"], "gpt-4o", [2.0] * 20)
+        observe(providers["anthropic"], "claude-3-5-sonnet-20241022", [0.8] * 20)
+        observe(providers["google"], "gemini-1.5-pro", [0.5] * 10, errors=10)
+        router = LLMRouter(providers)
+
+        candidates = await router.candidates("hello", tier="capable")
+
+        assert [c.model for c in candidates][:2] == ["claude-3-5-sonnet-20241022", "gemini-1.5-pro"]
+        assert candidates[0].p50_ms == 800.0
+        assert candidates[1].error_rate == 0.5
+
+    @pytest.mark.asyncio
+    async def test_open_circuit_budget_and_deadline_filter_candidates(self):
+        providers = make_providers()
+        providers["openai"]._get_guard("gpt-4o").breaker._open(30)
+        providers["anthropic"].check_budget = AsyncMock(return_value=False)
+        observe(providers["google"], "gemini-1.5-pro", [5.0] * 20)
+        router = LLMRouter(providers)
+
+        assert await router.candidates("hello", tier="capable", deadline=3.0) == []
+        assert [c.model for c in await router.candidates("hello", tier="capable")] == ["gemini-1.5-pro"]
+
+    @pytest.mark.asyncio
+    async def test_max_cost_prefers_cheaper_models(self):
+        router = LLMRouter(make_providers())
+
+        candidates = await router.candidates("hello", tier="capable", max_tokens=1000, max_cost=0.01, prefer="cost")
+
+        assert [c.model for c in candidates] == ["gemini-1.5-pro"]
+        assert candidates[0].estimated_cost <= 0.01
+
+    @pytest.mark.asyncio
+    async def test_requested_model_stays_first_and_aliases_resolve(self):
+        providers = make_providers()
+        observe(providers["google"], "gemini-1.5-pro", [0.1] * 20)
+        router = LLMRouter(providers)
+
+        candidates = await router.candidates("hello", model="claude-3-5-sonnet")
+
+        assert candidates[0].model == "claude-3-5-sonnet-20241022"
+        assert candidates[1].model == "gemini-1.5-pro"
+        with pytest.raises(NoRouteError):
+            await router.route("hello", model="no-such-model")
+
+    @pytest.mark.asyncio
+    async def test_provider_restricts_candidates(self):
+        providers = make_providers()
+        observe(providers["google"], "gemini-1.5-pro", [0.1] * 20)
+        router = LLMRouter(providers)
+
+        candidates = await router.candidates("hello", tier="capable", provider="Anthropic")
+
+        assert [(c.provider, c.model) for c in candidates] == [("anthropic", "claude-3-5-sonnet-20241022")]
+
+    def test_cheaper_models_come_from_pricing(self):
+        router = LLMRouter(make_providers())
+
+        assert router.cheaper_models("openai", "gpt-4") == ["gpt-4o", "gpt-3.5-turbo"]
+        assert router.cheaper_models("openai", "gpt-3.5-turbo") == []
+
+
+class TestExecuteRouted:
+    """Test suite for LLMManager.execute_routed failover."""
+
+    @pytest.mark.asyncio
+    async def test_fails_over_to_equivalent_model(self):
+        manager = LLMManager()
+        manager.initialize = AsyncMock(return_value=True)
+        providers = make_providers(openai=["gpt-4o"])
+        providers["openai"].concurrency_config.max_retries = 0
+        manager.providers = providers
+        manager.router = LLMRouter(providers)
+
+        response = await manager.execute_routed("hello", model="gpt-4o")
+
+        assert providers["openai"].calls == ["gpt-4o"]
+        assert response.model == "gemini-1.5-pro"
+        routing = response.metadata["routing"]
+        assert routing["provider"] == "google"
+        assert routing["failovers"][0]["model"] == "gpt-4o"
+
+    @pytest.mark.asyncio
+    async def test_requested_provider_is_not_failed_over(self):
+        manager = LLMManager()
+        manager.initialize = AsyncMock(return_value=True)
+        providers = make_providers(openai=["gpt-4o"])
+        providers["openai"].concurrency_config.max_retries = 0
+        manager.providers = providers
+        manager.router = LLMRouter(providers)
+
+        with pytest.raises(RuntimeError, match="openai/gpt-4o"):
+            await manager.execute_routed("hello", tier="capable", provider="openai")
+
+        assert providers["google"].calls == []
+        assert providers["anthropic"].calls == []
@@ -0,0 +1,222 @@
+"""
+Multiplexed provider streams for prompt execution endpoints.
+
+Provider streams (``BaseLLMProvider.execute_prompt(stream=True)``) are merged into
+one ordered sequence of events as chunks arrive. Token usage and time to first
+token are accumulated per provider, and usage is reported to CostTracker once
+each stream finishes.
+
+This app uses the v1 Python programming model (a function.json per endpoint).
+The host sends an HTTP response only after the function returns, so events
+cannot be written to the client as they arrive. ``create_event_log_response``
+therefore returns the complete event log as one JSON document marked
+``"streamed": false``. It is not presented as Server-Sent Events or JSON lines.
+Streaming to the client needs the v2 programming model with HTTP streams.
+
+Event sequence per request::
+
+    start (per provider) -> token* -> done | error (per provider) -> end
+"""
+
+import asyncio
+import json
+import logging
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, AsyncGenerator, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Union
+
+import azure.functions as func
+
+from .llm_providers import LLMResponse
+
+logger = logging.getLogger(__name__)
+
+# Opens one provider stream; may also resolve to a complete (non-streaming) response
+StreamFactory = Callable[[], Awaitable[Union[AsyncIterator[str], LLMResponse]]]
+
+
+@dataclass
+class StreamEvent:
+    """One event in a multiplexed provider stream."""
+
+    event: str
+    provider: Optional[str] = None
+    data: Dict[str, Any] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"event": self.event, "provider": self.provider, **self.data}
+
+
+@dataclass
+class ProviderStreamStats:
+    """Timing and token accounting for one provider stream."""
+
+    provider: str
+    model: Optional[str] = None
+    prompt_tokens: int = 0
+    chunks: List[str] = field(default_factory=list)
+    started_at: float = field(default_factory=time.perf_counter)
+    first_token_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    error: Optional[str] = None
+
+    @property
+    def text(self) -> str:
+        return "".join(self.chunks)
+
+    @property
+    def completion_tokens(self) -> int:
+        # Streams don't report usage; estimate the same way as execute_multi_llm
+        return len(self.text.split())
+
+    @property
+    def time_to_first_token_ms(self) -> Optional[int]:
+        if self.first_token_at is None:
+            return None
+        return int((self.first_token_at - self.started_at) * 1000)
+
+    @property
+    def duration_ms(self) -> int:
+        end = self.finished_at if self.finished_at is not None else time.perf_counter()
+        return int((end - self.started_at) * 1000)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "model": self.model,
+            "promptTokens": self.prompt_tokens,
+            "completionTokens": self.completion_tokens,
+            "chunks": len(self.chunks),
+            "timeToFirstTokenMs": self.time_to_first_token_ms,
+            "durationMs": self.duration_ms,
+            "status": "failed" if self.error else "completed",
+        }
+
+
+def wants_event_log(req: func.HttpRequest, body: Optional[Dict[str, Any]] = None) -> bool:
+    """Whether the client asked for the per-provider event log (``"stream": true`` or ``?stream=true``)."""
+    requested = (body or {}).get("stream", req.params.get("stream"))
+    return requested in (True, "true", "1")
+
+
+async def multiplex_streams(
+    factories: Dict[str, StreamFactory],
+    prompt: str,
+    models: Optional[Dict[str, Optional[str]]] = None,
+    on_complete: Optional[Callable[[Dict[str, ProviderStreamStats]], Awaitable[None]]] = None,
+) -> AsyncGenerator[StreamEvent, None]:
+    """
+    Run several provider streams concurrently and yield their chunks as they arrive.
+
+    ``on_complete`` receives the per-provider stats after every stream has ended
+    (used for cost tracking) and runs before the final ``end`` event.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+    stats = {
+        provider: ProviderStreamStats(
+            provider=provider, model=(models or {}).get(provider), prompt_tokens=len(prompt.split())
+        )
+        for provider in factories
+    }
+    finished = object()
+
+    async def pump(provider: str, factory: StreamFactory) -> None:
+        provider_stats = stats[provider]
+        try:
+            await queue.put(StreamEvent("start", provider, {"model": provider_stats.model}))
+            result = await factory()
+            if isinstance(result, LLMResponse):
+                # Provider without streaming support: forward the whole completion as one chunk
+                provider_stats.model = result.model or provider_stats.model
+                chunks: AsyncIterator[str] = _single_chunk(result.response)
+            else:
+                chunks = result
+            async for chunk in chunks:
+                if not chunk:
+                    continue
+                if provider_stats.first_token_at is None:
+                    provider_stats.first_token_at = time.perf_counter()
+                provider_stats.chunks.append(chunk)
+                await queue.put(StreamEvent("token", provider, {"text": chunk}))
+            provider_stats.finished_at = time.perf_counter()
+            await queue.put(StreamEvent("done", provider, provider_stats.to_dict()))
+        except Exception as e:
+            provider_stats.finished_at = time.perf_counter()
+            provider_stats.error = str(e)
+            logger.warning(f"Stream from {provider} failed: {e}")
+            await queue.put(StreamEvent("error", provider, {"error": str(e), **provider_stats.to_dict()}))
+        finally:
+            await queue.put(finished)
+
+    tasks = [asyncio.create_task(pump(provider, factory)) for provider, factory in factories.items()]
+    try:
+        remaining = len(tasks)
+        while remaining:
+            event = await queue.get()
+            if event is finished:
+                remaining -= 1
+                continue
+            yield event
+
+        if on_complete:
+            try:
+                await on_complete(stats)
+            except Exception as e:
+                logger.error(f"Stream completion hook failed: {e}")
+
+        yield StreamEvent("end", data={"providers": {provider: s.to_dict() for provider, s in stats.items()}})
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def _single_chunk(text: str) -> AsyncGenerator[str, None]:
+    yield text
+
+
+async def iter_text_chunks(text: str, chunk_words: int = 4) -> AsyncGenerator[str, None]:
+    """Stream pre-computed text a few words at a time (used for canned responses)."""
+    words = text.split(" ")
+    for i in range(0, len(words), chunk_words):
+        chunk = " ".join(words[i : i + chunk_words])
+        yield chunk if i + chunk_words >= len(words) else chunk + " "
+        await asyncio.sleep(0)
+
+
+async def record_stream_usage(
+    cost_tracker: Any,
+    user_id: str,
+    stats: Dict[str, ProviderStreamStats],
+    request_id: Optional[str] = None,
+    session_id: Optional[str] = None,
+) -> None:
+    """Report token usage of finished streams to CostTracker (no-op without a tracker)."""
+    if cost_tracker is None:
+        logger.debug("No cost tracker configured, skipping stream usage tracking")
+        return
+
+    request_id = request_id or str(uuid.uuid4())
+    for provider, provider_stats in stats.items():
+        if provider_stats.error or not provider_stats.chunks:
+            continue
+        try:
+            await cost_tracker.track_llm_usage(
+                user_id=user_id,
+                session_id=session_id or request_id,
+                provider=provider,
+                model=provider_stats.model or "unknown",
+                prompt_tokens=provider_stats.prompt_tokens,
+                completion_tokens=provider_stats.completion_tokens,
+                execution_time_ms=provider_stats.duration_ms,
+                request_id=request_id,
+                metadata={"streamed": True, "time_to_first_token_ms": provider_stats.time_to_first_token_ms},
+            )
+        except Exception as e:
+            logger.error(f"Failed to track streamed usage for {provider}: {e}")
+
+
+async def create_event_log_response(events: AsyncIterator[StreamEvent], status_code: int = 200) -> func.HttpResponse:
+    """Collect stream events, in arrival order, into one JSON response (see the module docstring)."""
+    payload = {"streamed": False, "events": [event.to_dict() async for event in events]}
+    return func.HttpResponse(json.dumps(payload, default=str), status_code=status_code, mimetype="application/json")
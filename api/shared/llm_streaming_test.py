@@ -0,0 +1,152 @@
+"""
+Tests for llm_streaming.py - multiplexed provider streams and stream cost tracking
+"""
+
+import asyncio
+import json
+from unittest.mock import AsyncMock, Mock
+
+import azure.functions as func
+import pytest
+
+from shared.llm_providers import LLMResponse, TokenUsage
+from shared.llm_streaming import (
+    StreamEvent,
+    create_event_log_response,
+    iter_text_chunks,
+    multiplex_streams,
+    record_stream_usage,
+    wants_event_log,
+)
+
+
+def _stream(chunks, delay=0.0, fail_after=None):
+    async def factory():
+        async def generate():
+            for i, chunk in enumerate(chunks):
+                if fail_after is not None and i == fail_after:
+                    raise RuntimeError("connection reset")
+                await asyncio.sleep(delay)
+                yield chunk
+
+        return generate()
+
+    return factory
+
+
+async def _collect(events):
+    return [event async for event in events]
+
+
+class TestMultiplexStreams:
+    """Test suite for multiplex_streams."""
+
+    @pytest.mark.asyncio
+    async def test_interleaves_providers_as_chunks_arrive(self):
+        factories = {"openai": _stream(["a1 ", "a2"], delay=0.03), "anthropic": _stream(["b1 ", "b2"], delay=0.01)}
+
+        events = await _collect(multiplex_streams(factories, "hello world"))
+
+        tokens = [(e.provider, e.data["text"]) for e in events if e.event == "token"]
+        assert tokens[0] == ("anthropic", "b1 ")
+        assert [t for p, t in tokens if p == "openai"] == ["a1 ", "a2"]
+        assert events[-1].event == "end"
+        summary = events[-1].data["providers"]
+        assert summary["openai"]["completionTokens"] == 2
+        assert summary["openai"]["promptTokens"] == 2
+        assert summary["anthropic"]["timeToFirstTokenMs"] is not None
+
+    @pytest.mark.asyncio
+    async def test_provider_error_does_not_stop_other_streams(self):
+        factories = {"openai": _stream(["a1 ", "a2"], fail_after=1), "anthropic": _stream(["b1 ", "b2"])}
+
+        events = await _collect(multiplex_streams(factories, "hi"))
+
+        errors = [e for e in events if e.event == "error"]
+        assert [e.provider for e in errors] == ["openai"]
+        assert "connection reset" in errors[0].data["error"]
+        assert [e.provider for e in events if e.event == "done"] == ["anthropic"]
+
+    @pytest.mark.asyncio
+    async def test_non_streaming_response_forwarded_as_one_chunk(self):
+        async def factory():
+            return LLMResponse.create(
+                provider="google", model="gemini-pro", response="full text", usage=TokenUsage(), cost=0.0
+            )
+
+        events = await _collect(multiplex_streams({"google": factory}, "hi"))
+
+        assert [e.data["text"] for e in events if e.event == "token"] == ["full text"]
+        assert events[-1].data["providers"]["google"]["model"] == "gemini-pro"
+
+    @pytest.mark.asyncio
+    async def test_on_complete_receives_stats_before_end(self):
+        seen = []
+
+        async def on_complete(stats):
+            seen.append({p: s.completion_tokens for p, s in stats.items()})
+
+        events = multiplex_streams({"openai": _stream(["one two ", "three"])}, "hi", on_complete=on_complete)
+        await _collect(events)
+
+        assert seen == [{"openai": 3}]
+
+
+class TestRecordStreamUsage:
+    """Test suite for record_stream_usage."""
+
+    @pytest.mark.asyncio
+    async def test_tracks_completed_streams_only(self):
+        tracker = Mock()
+        tracker.track_llm_usage = AsyncMock()
+        stats = {}
+
+        async def on_complete(collected):
+            stats.update(collected)
+
+        factories = {"openai": _stream(["one two"]), "anthropic": _stream(["x"], fail_after=0)}
+        await _collect(multiplex_streams(factories, "a b c", models={"openai": "gpt-4o"}, on_complete=on_complete))
+        await record_stream_usage(tracker, "user-1", stats, request_id="req-1")
+
+        tracker.track_llm_usage.assert_awaited_once()
+        kwargs = tracker.track_llm_usage.call_args.kwargs
+        assert kwargs["provider"] == "openai"
+        assert kwargs["model"] == "gpt-4o"
+        assert kwargs["prompt_tokens"] == 3
+        assert kwargs["completion_tokens"] == 2
+        assert kwargs["metadata"]["streamed"] is True
+
+    @pytest.mark.asyncio
+    async def test_without_tracker_is_noop(self):
+        await record_stream_usage(None, "user-1", {})
+
+
+class TestEventLogResponse:
+    """Test suite for the buffered event log response and request negotiation."""
+
+    def test_event_to_dict(self):
+        event = StreamEvent("token", "openai", {"text": "hi"})
+
+        assert event.to_dict() == {"event": "token", "provider": "openai", "text": "hi"}
+
+    def test_wants_event_log(self):
+        def request(params=None):
+            return func.HttpRequest(method="POST", url="http://localhost/api/llm/execute", body=b"", params=params or {})
+
+        assert wants_event_log(request(), {"stream": True}) is True
+        assert wants_event_log(request({"stream": "true"}), {}) is True
+        assert wants_event_log(request(), {"stream": False}) is False
+        assert wants_event_log(request(), {}) is False
+
+    @pytest.mark.asyncio
+    async def test_create_event_log_response(self):
+        events = multiplex_streams({"openai": lambda: asyncio.sleep(0, iter_text_chunks("a b c d e", 2))}, "hi")
+
+        response = await create_event_log_response(events)
+
+        body = json.loads(response.get_body())
+        # The v1 host buffers the body, so it is not labelled as a stream
+        assert response.mimetype == "application/json"
+        assert body["streamed"] is False
+        assert "".join(e["text"] for e in body["events"] if e["event"] == "token") == "a b c d e"
+        assert body["events"][-1]["providers"]["openai"]["timeToFirstTokenMs"] is not None
@@ -7,28 +7,46 @@ import json
 import logging
 import os
 import time
-from collections import defaultdict, deque
+from collections import OrderedDict
 from functools import wraps
 from typing import Any, Dict, Optional, Tuple
 
 import azure.functions as func
 
+from .rate_limit_store import RateLimitStore, SharedRateLimitClient, get_rate_limit_store
+from .rate_limiter import SlidingWindowCounter
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
 class RateLimiter:
-    """Simple in-memory rate limiter for small team deployment."""
+    """Per-IP rate limiter; in memory by default, cluster-wide when given a shared store."""
 
-    def __init__(self):
-        # Store request timestamps by client IP
-        self.clients: Dict[str, deque] = defaultdict(lambda: deque())
+    def __init__(self, store: Optional[RateLimitStore] = None):
+        # Constant-size window counters by client IP, least recently seen first
+        self.clients: "OrderedDict[str, SlidingWindowCounter]" = OrderedDict()
         # Configuration from environment variables
         self.max_requests = int(os.getenv("SUTRA_MAX_REQUESTS_PER_MINUTE", "100"))
         self.time_window = 60  # 1 minute window
         self.cleanup_interval = 300  # Clean up old entries every 5 minutes
         self.last_cleanup = time.time()
+        # Counters shared across instances (see rate_limit_store); None keeps limits per instance
+        self.shared = SharedRateLimitClient(store) if store is not None else None
+
+    async def check(self, client_ip: str) -> Tuple[bool, Dict[str, Any]]:
+        """Check a request against the shared store when one is configured, else in memory."""
+        if self.shared is None:
+            return self.is_allowed(client_ip)
+
+        status = await self.shared.hit(f"ip:{client_ip}", self.max_requests, self.time_window, sliding=True)
+        return status.allowed, {
+            "limit": self.max_requests,
+            "remaining": status.remaining,
+            "reset_time": int(status.reset_at),
+            "retry_after": self.time_window if not status.allowed else None,
+        }
 
     def is_allowed(self, client_ip: str) -> Tuple[bool, Dict[str, Any]]:
         """
@@ -46,20 +64,15 @@ class RateLimiter:
         if current_time - self.last_cleanup > self.cleanup_interval:
             self._cleanup_old_entries(current_time)
 
-        # Get client's request history
-        client_requests = self.clients[client_ip]
-
-        # Remove requests outside the time window
-        while client_requests and current_time - client_requests[0] > self.time_window:
-            client_requests.popleft()
+        # Get client's request counter
+        counter = self.clients.get(client_ip)
+        if counter is None:
+            counter = self.clients[client_ip] = SlidingWindowCounter(self.time_window, self.max_requests)
+        else:
+            self.clients.move_to_end(client_ip)
 
         # Check if client has exceeded rate limit
-        current_count = len(client_requests)
-        is_allowed = current_count < self.max_requests
-
-        if is_allowed:
-            # Add current request timestamp
-            client_requests.append(current_time)
+        is_allowed, current_count = counter.check(current_time)
 
         # Prepare rate limit info
         rate_limit_info = {
@@ -72,28 +85,23 @@ class RateLimiter:
         return is_allowed, rate_limit_info
 
     def _cleanup_old_entries(self, current_time: float):
-        """Remove old client entries to prevent memory growth."""
-        clients_to_remove = []
-
-        for client_ip, requests in self.clients.items():
-            # Remove old requests
-            while requests and current_time - requests[0] > self.time_window * 2:
-                requests.popleft()
-
-            # Mark empty clients for removal
-            if not requests:
-                clients_to_remove.append(client_ip)
-
-        # Remove empty client entries
-        for client_ip in clients_to_remove:
+        """Remove idle client entries to prevent memory growth."""
+        clients_removed = 0
+
+        # Clients are kept in least-recently-seen order, so stop at the first active one
+        while self.clients:
+            client_ip, counter = next(iter(self.clients.items()))
+            if not counter.is_idle(current_time):
+                break
             del self.clients[client_ip]
+            clients_removed += 1
 
         self.last_cleanup = current_time
-        logger.info(f"Rate limiter cleanup: removed {len(clients_to_remove)} inactive clients")
+        logger.info(f"Rate limiter cleanup: removed {clients_removed} inactive clients")
 
 
 # Global rate limiter instance
-rate_limiter = RateLimiter()
+rate_limiter = RateLimiter(store=get_rate_limit_store())
 
 
 def get_client_ip(req: func.HttpRequest) -> str:
@@ -218,7 +226,7 @@ def rate_limit_middleware(f):
             client_ip = get_client_ip(req)
 
             # Check rate limit
-            is_allowed, rate_info = rate_limiter.is_allowed(client_ip)
+            is_allowed, rate_info = await rate_limiter.check(client_ip)
 
             # Prepare response headers with dynamic CORS origin
             headers = security_headers()
@@ -369,10 +377,39 @@ def create_health_response() -> func.HttpResponse:
                 "active_clients": len(rate_limiter.clients),
                 "max_requests_per_minute": rate_limiter.max_requests,
             }
+            if isinstance(rate_limiter.shared, SharedRateLimitClient):
+                health_data["rate_limiter"]["shared"] = rate_limiter.shared.get_stats()
         except Exception as e:
             logger.warning(f"Rate limiter status unavailable: {e}")
             health_data["rate_limiter"] = {"status": "unavailable"}
 
+        # Cosmos client pool reuse metrics (imported lazily to keep middleware import light)
+        try:
+            from .async_database import get_pool_metrics
+
+            health_data["cosmos_pool"] = get_pool_metrics()
+        except Exception as e:
+            logger.warning(f"Cosmos pool metrics unavailable: {e}")
+            health_data["cosmos_pool"] = {"status": "unavailable"}
+
+        # LLM manager cold-start timings (null until the shared manager has been created)
+        try:
+            from .llm_client import get_llm_init_report
+
+            health_data["llm_manager"] = get_llm_init_report()
+        except Exception as e:
+            logger.warning(f"LLM manager status unavailable: {e}")
+            health_data["llm_manager"] = {"status": "unavailable"}
+
+        # Telemetry write-behind queue depth and flush latency
+        try:
+            from .write_behind import get_write_behind_metrics
+
+            health_data["write_behind"] = get_write_behind_metrics()
+        except Exception as e:
+            logger.warning(f"Write-behind metrics unavailable: {e}")
+            health_data["write_behind"] = {"status": "unavailable"}
+
         return func.HttpResponse(
             json.dumps(health_data),
             status_code=200,
@@ -6,7 +6,7 @@ import asyncio
 import json
 import os
 import time
-from unittest.mock import MagicMock, Mock, patch
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
 
 import azure.functions as func
 import pytest
@@ -285,7 +285,8 @@ class TestRateLimitMiddleware:
         """Test rate limit middleware when rate limit is exceeded."""
         # Create a rate limiter with low limit for testing
         with patch("api.shared.middleware.rate_limiter") as mock_limiter:
-            mock_limiter.is_allowed.return_value = (
+            mock_limiter.check = AsyncMock()
+            mock_limiter.check.return_value = (
                 False,
                 {
                     "limit": 10,
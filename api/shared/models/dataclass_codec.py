@@ -0,0 +1,263 @@
+"""
+Schema-compiled JSON codecs for dataclass models.
+
+``dataclasses.asdict`` deep-copies the whole object graph, and the models then
+walked the copy a second time to turn enums, datetimes and Decimals into JSON
+values. A ``DataclassCodec`` reads a dataclass's type hints once and generates
+an encoder and a decoder for it, with the converter for every field chosen up
+front:
+
+- ``Enum`` -> ``.value``, ``datetime`` -> ISO 8601 string, ``Decimal`` -> float
+- nested dataclasses, ``List[...]``, ``Dict[..., ...]`` and ``Optional[...]``
+  use the compiled converter of their element type
+- plain ``str``/``int``/``float``/``bool`` fields are copied with no call at all
+- ``Any`` values are walked generically by ``encode_value``
+
+Decoding is lenient the way the hand-written ``from_dict`` methods were: nested
+values that are not dicts are kept as they are, and datetime strings that do not
+parse stay strings. ``Decimal`` fields are not converted back (they come back
+as floats, as before).
+
+``dumps`` writes JSON bytes with orjson when it is installed, which encodes
+dataclasses, enums and datetimes natively, and with the standard library
+otherwise.
+"""
+
+import json
+import typing
+from dataclasses import fields, is_dataclass
+from datetime import datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Callable, Dict, Optional, Tuple, Type
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+_PLAIN_TYPES = (str, int, float, bool, type(None))
+
+
+def encode_value(obj: Any) -> Any:
+    """JSON-safe copy of an arbitrary value (dicts, lists, enums, datetimes, Decimals, dataclasses)."""
+    if isinstance(obj, dict):
+        return {k: encode_value(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [encode_value(v) for v in obj]
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if is_dataclass(obj) and not isinstance(obj, type):
+        return codec_for(type(obj)).encode(obj)
+    return obj
+
+
+def parse_datetime(value: Any) -> Any:
+    """``datetime`` from an ISO 8601 string (``Z`` suffix allowed); anything else is returned unchanged."""
+    if not isinstance(value, str):
+        return value
+    try:
+        return datetime.fromisoformat(value[:-1] + "+00:00" if value.endswith("Z") else value)
+    except ValueError:
+        return value
+
+
+def _optional_args(tp: Any) -> Optional[Any]:
+    """``X`` for ``Optional[X]``, else None."""
+    if typing.get_origin(tp) is typing.Union:
+        args = typing.get_args(tp)
+        if len(args) == 2 and type(None) in args:
+            return args[0] if args[1] is type(None) else args[1]
+    return None
+
+
+def _container_args(tp: Any) -> Tuple[Optional[type], Tuple[Any, ...]]:
+    """(list or dict, type arguments) for ``List[...]``/``Dict[...]`` hints, else (None, ())."""
+    origin = typing.get_origin(tp)
+    if origin in (list, dict):
+        return origin, typing.get_args(tp) or ((Any,) if origin is list else (Any, Any))
+    return None, ()
+
+
+class _Compiler:
+    """Generates the source of one codec; converters are named values in ``namespace``."""
+
+    def __init__(self, namespace: Dict[str, Any]):
+        self.namespace = namespace
+        self.depth = 0
+
+    def _name(self, prefix: str, value: Any) -> str:
+        name = f"{prefix}{len(self.namespace)}"
+        self.namespace[name] = value
+        return name
+
+    def encode_expr(self, tp: Any, v: str) -> Optional[str]:
+        """Expression converting ``v`` to its JSON form, or None when ``v`` is used as is."""
+        inner_type = _optional_args(tp)
+        if inner_type is not None:
+            inner = self.encode_expr(inner_type, v)
+            return None if inner is None else f"(None if {v} is None else {inner})"
+
+        origin, args = _container_args(tp)
+        if origin is not None:
+            self.depth += 1
+            item = f"i{self.depth}"
+            inner = self.encode_expr(args[-1], item)
+            self.depth -= 1
+            if origin is list:
+                body = f"list({v})" if inner is None else f"[{inner} for {item} in {v}]"
+            else:
+                key = f"k{self.depth + 1}"
+                body = f"dict({v})" if inner is None else f"{{{key}: {inner} for {key}, {item} in {v}.items()}}"
+            return f"({body} if {v}.__class__ is {origin.__name__} else encode_value({v}))"
+
+        if isinstance(tp, type):
+            if tp in _PLAIN_TYPES:
+                return None
+            if issubclass(tp, Enum):
+                return f"({v}.value if {v}.__class__ is {self._name('E', tp)} else encode_value({v}))"
+            if tp is datetime:
+                return f"({v}.isoformat() if {v}.__class__ is datetime else encode_value({v}))"
+            if tp is Decimal:
+                return f"(float({v}) if {v}.__class__ is Decimal else encode_value({v}))"
+            if is_dataclass(tp):
+                codec = self._name("c", codec_for(tp))
+                return f"({codec}.encode({v}) if {v}.__class__ is {codec}.cls else encode_value({v}))"
+        return f"encode_value({v})"
+
+    def decode_expr(self, tp: Any, v: str) -> Optional[str]:
+        """Expression converting JSON value ``v`` back to ``tp``, or None when ``v`` is kept as is."""
+        inner_type = _optional_args(tp)
+        if inner_type is not None:
+            inner = self.decode_expr(inner_type, v)
+            return None if inner is None else f"(None if {v} is None else {inner})"
+
+        origin, args = _container_args(tp)
+        if origin is not None:
+            self.depth += 1
+            item = f"i{self.depth}"
+            inner = self.decode_expr(args[-1], item)
+            self.depth -= 1
+            if inner is None:
+                return None
+            if origin is list:
+                body = f"[{inner} for {item} in {v}]"
+            else:
+                body = f"{{k{self.depth + 1}: {inner} for k{self.depth + 1}, {item} in {v}.items()}}"
+            return f"({body} if {v}.__class__ is {origin.__name__} else {v})"
+
+        if isinstance(tp, type):
+            if issubclass(tp, Enum):
+                # Value lookup first; the Enum call handles members and raises for unknown values
+                members = self._name("m", {member.value: member for member in tp})
+                return f"({members}.get({v}) or {self._name('E', tp)}({v}))"
+            if tp is datetime:
+                return f"(parse_datetime({v}) if {v}.__class__ is str else {v})"
+            if is_dataclass(tp):
+                codec = self._name("c", codec_for(tp))
+                return f"({codec}.decode({v}) if {v}.__class__ is dict else {v})"
+        return None
+
+
+class DataclassCodec:
+    """Encoder and decoder generated from one dataclass's type hints."""
+
+    def __init__(self, cls: Type[Any]):
+        self.cls = cls
+        self.encode: Callable[[Any], Dict[str, Any]] = self._not_compiled
+        self.decode: Callable[[Dict[str, Any]], Any] = self._not_compiled
+
+    def _not_compiled(self, _value: Any) -> Any:
+        raise RuntimeError(f"Codec for {self.cls.__name__} used before it was compiled")
+
+    def compile(self) -> None:
+        hints = typing.get_type_hints(self.cls)
+        names = [f.name for f in fields(self.cls)]
+        namespace: Dict[str, Any] = {
+            "cls": self.cls,
+            "new": object.__new__,
+            "field_names": frozenset(names),
+            "encode_value": encode_value,
+            "parse_datetime": parse_datetime,
+            "datetime": datetime,
+            "Decimal": Decimal,
+        }
+        compiler = _Compiler(namespace)
+
+        encode_lines = ["def encode(obj):", "    d = obj.__dict__"]
+        items = []
+        decode_lines = ["def decode(data):", "    data = dict(data)"]
+        for index, name in enumerate(names):
+            tp = hints.get(name, Any)
+            expr = compiler.encode_expr(tp, f"v{index}")
+            if expr is None:
+                items.append(f"{name!r}: d[{name!r}]")
+            else:
+                encode_lines.append(f"    v{index} = d[{name!r}]")
+                items.append(f"{name!r}: {expr}")
+
+            expr = compiler.decode_expr(tp, "v")
+            if expr is not None:
+                decode_lines += [
+                    f"    if {name!r} in data:",
+                    f"        v = data[{name!r}]",
+                    f"        data[{name!r}] = {expr}",
+                ]
+        encode_lines.append("    return {" + ", ".join(items) + "}")
+
+        if self.cls.__dataclass_params__.frozen or "__slots__" in vars(self.cls):
+            decode_lines.append("    return cls(**data)")
+        else:
+            # Stored documents carry every field, so the dataclass __init__ (defaults,
+            # unknown-field errors) only runs for partial or unexpected input
+            decode_lines += [
+                "    if data.keys() != field_names:",
+                "        return cls(**data)",
+                "    obj = new(cls)",
+                "    obj.__dict__.update(data)",
+            ]
+            if hasattr(self.cls, "__post_init__"):
+                decode_lines.append("    obj.__post_init__()")
+            decode_lines.append("    return obj")
+
+        source = "\n".join(encode_lines + decode_lines)
+        exec(compile(source, f"<codec {self.cls.__qualname__}>", "exec"), namespace)
+        self.encode = namespace["encode"]
+        self.decode = namespace["decode"]
+
+
+_codecs: Dict[type, DataclassCodec] = {}
+
+
+def codec_for(cls: Type[Any]) -> DataclassCodec:
+    """The compiled codec for ``cls``, built on first use."""
+    codec = _codecs.get(cls)
+    if codec is None:
+        codec = _codecs[cls] = DataclassCodec(cls)
+        # Registered first so nested and self-referencing types find it while compiling
+        codec.compile()
+    return codec
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (Enum, datetime)) or (is_dataclass(obj) and not isinstance(obj, type)):
+        return encode_value(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(obj: Any) -> bytes:
+    """Compact JSON bytes for ``obj``, which may contain dataclasses, enums, datetimes and Decimals."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, default=_default, separators=(",", ":")).encode("utf-8")
+
+
+def loads(data: Any) -> Any:
+    """Parse JSON bytes or text."""
+    return orjson.loads(data) if orjson is not None else json.loads(data)
@@ -0,0 +1,130 @@
+"""
+Tests for dataclass_codec.py - schema-compiled ForgeProject (de)serialization
+"""
+
+import json
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+
+import shared.models.dataclass_codec as dataclass_codec
+from shared.models.dataclass_codec import codec_for, dumps
+from shared.models.forge_models import (
+    ArtifactType,
+    ForgeArtifact,
+    ForgeProject,
+    ForgeStage,
+    ImplementationTask,
+    ProjectMilestone,
+    ProjectPriority,
+    ProjectStatus,
+    TaskStatus,
+    ValidationCriteria,
+    ValidationStatus,
+)
+
+NOW = datetime(2026, 3, 1, 9, 30, 15, 123456, tzinfo=timezone.utc)
+
+
+def _project() -> ForgeProject:
+    project = ForgeProject(
+        id="forge_1",
+        name="Tasks",
+        description="Prioritise work",
+        owner_id="user-1",
+        status=ProjectStatus.ACTIVE,
+        created_at=NOW,
+        updated_at=NOW,
+        tags=["b2b"],
+        custom_fields={"segment": "smb", "reviewed_at": NOW, "score": Decimal("7.5")},
+    )
+    project.prd_generation_data.validation_criteria = [
+        ValidationCriteria(
+            id="vc-1", name="Demand", description="", weight=0.5, status=ValidationStatus.PASSED, validated_at=NOW
+        )
+    ]
+    project.ux_requirements_data.milestones = [
+        ProjectMilestone(id="m-1", name="Beta", description="", due_date=NOW + timedelta(days=30))
+    ]
+    project.technical_analysis_data.tasks = [
+        ImplementationTask(id="t-1", name="API", description="", priority=ProjectPriority.HIGH, due_date=NOW)
+    ]
+    project.add_artifact(
+        ForgeStage.IDEA_REFINEMENT,
+        ForgeArtifact(id="a-1", name="Brief", type=ArtifactType.DOCUMENT, content="...", description="", created_at=NOW),
+    )
+    project.stage_completed_at["idea_refinement"] = NOW
+    return project
+
+
+class TestForgeProjectCodec:
+    """Test suite for the compiled ForgeProject codec."""
+
+    def test_to_dict_converts_nested_values(self):
+        data = _project().to_dict()
+
+        assert data["status"] == "active"
+        assert data["created_at"] == NOW.isoformat()
+        assert data["custom_fields"] == {"segment": "smb", "reviewed_at": NOW.isoformat(), "score": 7.5}
+        assert data["prd_generation_data"]["validation_criteria"][0]["status"] == "passed"
+        assert data["technical_analysis_data"]["tasks"][0]["priority"] == "high"
+        assert data["artifacts"]["idea_refinement"][0]["type"] == "document"
+        assert data["stage_completed_at"] == {"idea_refinement": NOW.isoformat()}
+        json.dumps(data)
+
+    def test_to_dict_returns_independent_containers(self):
+        project = _project()
+
+        data = project.to_dict()
+        data["tags"].append("changed")
+        data["artifacts"]["idea_refinement"].clear()
+
+        assert project.tags == ["b2b"]
+        assert len(project.artifacts["idea_refinement"]) == 1
+
+    def test_json_round_trip(self):
+        project = _project()
+        project.custom_fields = {"segment": "smb"}
+
+        encoded = project.to_json()
+
+        assert isinstance(encoded, bytes)
+        assert json.loads(encoded) == project.to_dict()
+        assert ForgeProject.from_json(encoded) == project
+        assert ForgeProject.from_dict(project.to_dict()) == project
+
+    def test_from_dict_is_lenient_like_before(self):
+        data = _project().to_dict()
+        data["updated_at"] = "not a date"
+        data["created_at"] = "2026-03-01T09:30:15Z"
+        data["artifacts"]["ux_requirements"] = ["legacy-entry"]
+        del data["tags"]
+
+        project = ForgeProject.from_dict(data)
+
+        assert project.updated_at == "not a date"
+        assert project.created_at == datetime(2026, 3, 1, 9, 30, 15, tzinfo=timezone.utc)
+        assert project.artifacts["ux_requirements"] == ["legacy-entry"]
+        assert project.tags == []
+        assert project.ux_requirements_data.milestones[0].status is TaskStatus.TODO
+        assert data["status"] == "active"  # the input is not modified
+
+        with pytest.raises(TypeError):
+            ForgeProject.from_dict({**_project().to_dict(), "_etag": "x"})
+        with pytest.raises(ValueError):
+            ForgeProject.from_dict({**_project().to_dict(), "status": "unknown"})
+
+    def test_dumps_without_orjson(self, monkeypatch):
+        project = _project()
+        payload = {"project": project, "cost": Decimal("1.25")}
+        expected = json.loads(dumps(payload))
+
+        monkeypatch.setattr(dataclass_codec, "orjson", None)
+
+        assert json.loads(dumps(payload)) == expected
+        assert expected["project"] == project.to_dict()
+        assert expected["cost"] == 1.25
+
+    def test_codec_is_compiled_once_per_type(self):
+        assert codec_for(ForgeProject) is codec_for(ForgeProject)
@@ -12,6 +12,8 @@ from decimal import Decimal
 from enum import Enum
 from typing import Any, Dict, List, Optional, Union
 
+from .dataclass_codec import codec_for, dumps, loads
+
 
 class ForgeStage(Enum):
     """Forge workflow stages."""
@@ -107,6 +109,8 @@ class ForgeArtifact:
     updated_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
     created_by: str = ""
     version: int = 1
+    # Manifest reference to content held in the artifact store; content is "" while set
+    content_ref: Optional[Dict[str, Any]] = None
 
 
 @dataclass
@@ -392,173 +396,21 @@ class ForgeProject:
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for database storage."""
-        data = asdict(self)
-
-        def _serialize(obj):
-            """Recursively convert enums, datetimes, and Decimals for JSON safety."""
-            if isinstance(obj, Enum):
-                return obj.value
-            if isinstance(obj, datetime):
-                return obj.isoformat()
-            if isinstance(obj, Decimal):
-                return float(obj)
-            if isinstance(obj, dict):
-                return {k: _serialize(v) for k, v in obj.items()}
-            if isinstance(obj, list):
-                return [_serialize(v) for v in obj]
-            return obj
-
-        return _serialize(data)
+        return codec_for(ForgeProject).encode(self)
+
+    def to_json(self) -> bytes:
+        """Serialize straight to JSON bytes."""
+        return dumps(self)
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "ForgeProject":
         """Create instance from dictionary."""
-        # Convert ISO strings back to datetime objects
-        for field_name, field_value in data.items():
-            if field_name.endswith("_at") and isinstance(field_value, str):
-                try:
-                    data[field_name] = datetime.fromisoformat(field_value.replace("Z", "+00:00"))
-                except ValueError:
-                    pass
-
-        # Convert enum strings back to enums
-        if "current_stage" in data:
-            data["current_stage"] = ForgeStage(data["current_stage"])
-        if "status" in data:
-            data["status"] = ProjectStatus(data["status"])
-        if "priority" in data:
-            data["priority"] = ProjectPriority(data["priority"])
-
-        # Handle nested dataclass objects
-        if "idea_refinement_data" in data and isinstance(data["idea_refinement_data"], dict):
-            data["idea_refinement_data"] = IdeaRefinementData(**data["idea_refinement_data"])
-        if "prd_generation_data" in data and isinstance(data["prd_generation_data"], dict):
-            # Handle nested ValidationCriteria objects
-            validation_dict = data["prd_generation_data"].copy()
-            if "validation_criteria" in validation_dict:
-                criteria_list = []
-                for criteria_dict in validation_dict["validation_criteria"]:
-                    if isinstance(criteria_dict, dict):
-                        # Convert enum strings back to enums
-                        if "status" in criteria_dict:
-                            criteria_dict["status"] = ValidationStatus(criteria_dict["status"])
-                        criteria_list.append(ValidationCriteria(**criteria_dict))
-                    else:
-                        criteria_list.append(criteria_dict)
-                validation_dict["validation_criteria"] = criteria_list
-
-            # Convert enum strings back to enums
-            if "validation_status" in validation_dict:
-                validation_dict["validation_status"] = ValidationStatus(validation_dict["validation_status"])
-
-            data["prd_generation_data"] = PRDGenerationData(**validation_dict)
-
-        if "ux_requirements_data" in data and isinstance(data["ux_requirements_data"], dict):
-            planning_dict = data["ux_requirements_data"].copy()
-            # Handle nested objects
-            if "resource_requirements" in planning_dict:
-                resources = []
-                for resource_dict in planning_dict["resource_requirements"]:
-                    if isinstance(resource_dict, dict):
-                        resources.append(ProjectResource(**resource_dict))
-                    else:
-                        resources.append(resource_dict)
-                planning_dict["resource_requirements"] = resources
-
-            if "milestones" in planning_dict:
-                milestones = []
-                for milestone_dict in planning_dict["milestones"]:
-                    if isinstance(milestone_dict, dict):
-                        # Convert datetime strings back to datetime objects
-                        if "due_date" in milestone_dict and isinstance(milestone_dict["due_date"], str):
-                            milestone_dict["due_date"] = datetime.fromisoformat(
-                                milestone_dict["due_date"].replace("Z", "+00:00")
-                            )
-                        if "actual_completion_date" in milestone_dict and isinstance(
-                            milestone_dict["actual_completion_date"], str
-                        ):
-                            milestone_dict["actual_completion_date"] = datetime.fromisoformat(
-                                milestone_dict["actual_completion_date"].replace("Z", "+00:00")
-                            )
-                        # Convert enum strings back to enums
-                        if "status" in milestone_dict:
-                            milestone_dict["status"] = TaskStatus(milestone_dict["status"])
-                        milestones.append(ProjectMilestone(**milestone_dict))
-                    else:
-                        milestones.append(milestone_dict)
-                planning_dict["milestones"] = milestones
-
-            data["ux_requirements_data"] = UXRequirementsData(**planning_dict)
-
-        if "technical_analysis_data" in data and isinstance(data["technical_analysis_data"], dict):
-            impl_dict = data["technical_analysis_data"].copy()
-            # Handle nested task objects
-            if "tasks" in impl_dict:
-                tasks = []
-                for task_dict in impl_dict["tasks"]:
-                    if isinstance(task_dict, dict):
-                        # Convert datetime strings back to datetime objects
-                        for date_field in ["start_date", "due_date", "completion_date"]:
-                            if date_field in task_dict and isinstance(task_dict[date_field], str):
-                                task_dict[date_field] = datetime.fromisoformat(task_dict[date_field].replace("Z", "+00:00"))
-                        # Convert enum strings back to enums
-                        if "status" in task_dict:
-                            task_dict["status"] = TaskStatus(task_dict["status"])
-                        if "priority" in task_dict:
-                            task_dict["priority"] = ProjectPriority(task_dict["priority"])
-                        tasks.append(ImplementationTask(**task_dict))
-                    else:
-                        tasks.append(task_dict)
-                impl_dict["tasks"] = tasks
-
-            data["technical_analysis_data"] = TechnicalAnalysisData(**impl_dict)
-
-        if "implementation_playbook_data" in data and isinstance(data["implementation_playbook_data"], dict):
-            deploy_dict = data["implementation_playbook_data"].copy()
-            # Handle nested environment objects
-            if "environments" in deploy_dict:
-                environments = []
-                for env_dict in deploy_dict["environments"]:
-                    if isinstance(env_dict, dict):
-                        # Convert datetime strings back to datetime objects
-                        if "deployed_at" in env_dict and isinstance(env_dict["deployed_at"], str):
-                            env_dict["deployed_at"] = datetime.fromisoformat(env_dict["deployed_at"].replace("Z", "+00:00"))
-                        # Convert enum strings back to enums
-                        if "status" in env_dict:
-                            env_dict["status"] = DeploymentStatus(env_dict["status"])
-                        environments.append(DeploymentEnvironment(**env_dict))
-                    else:
-                        environments.append(env_dict)
-                deploy_dict["environments"] = environments
-
-            data["implementation_playbook_data"] = ImplementationPlaybookData(**deploy_dict)
-
-        # Handle artifacts dictionary
-        if "artifacts" in data and isinstance(data["artifacts"], dict):
-            artifacts_dict = {}
-            for stage_name, artifacts_list in data["artifacts"].items():
-                artifact_objects = []
-                for artifact_dict in artifacts_list:
-                    if isinstance(artifact_dict, dict):
-                        # Convert datetime strings back to datetime objects
-                        for date_field in ["created_at", "updated_at"]:
-                            if date_field in artifact_dict and isinstance(artifact_dict[date_field], str):
-                                try:
-                                    artifact_dict[date_field] = datetime.fromisoformat(
-                                        artifact_dict[date_field].replace("Z", "+00:00")
-                                    )
-                                except ValueError:
-                                    pass
-                        # Convert enum strings back to enums
-                        if "type" in artifact_dict and isinstance(artifact_dict["type"], str):
-                            artifact_dict["type"] = ArtifactType(artifact_dict["type"])
-                        artifact_objects.append(ForgeArtifact(**artifact_dict))
-                    else:
-                        artifact_objects.append(artifact_dict)
-                artifacts_dict[stage_name] = artifact_objects
-            data["artifacts"] = artifacts_dict
-
-        return cls(**data)
+        return codec_for(cls).decode(data)
+
+    @classmethod
+    def from_json(cls, data: Union[bytes, str]) -> "ForgeProject":
+        """Create instance from JSON bytes or text."""
+        return cls.from_dict(loads(data))
 
 
 @dataclass
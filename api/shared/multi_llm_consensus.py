@@ -8,11 +8,13 @@ import asyncio
 import json
 import logging
 import statistics
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from enum import Enum
 from typing import Any, Dict, List, Optional, Tuple
 
+from .json_extraction import extract_json_object
+
 logger = logging.getLogger(__name__)
 
 
@@ -48,6 +50,66 @@ class LLMResponse:
     recommendations: List[str]
     risk_assessment: Dict[str, Any]
     timestamp: str
+    parsed: Optional["ParsedTechnicalResponse"] = field(default=None, repr=False, compare=False)
+
+
+def _dict_field(data: Dict[str, Any], key: str) -> Dict[str, Any]:
+    value = data.get(key)
+    return value if isinstance(value, dict) else {}
+
+
+@dataclass
+class ParsedTechnicalResponse:
+    """Structured technical analysis, parsed once from an LLM response's content"""
+
+    architecture_recommendation: Dict[str, Any]
+    technology_stack: Dict[str, Dict[str, Any]]
+    feasibility_assessment: Dict[str, Any]
+    risk_assessment: Dict[str, Any]
+    technical_scores: Dict[str, float]
+    recommendations: List[str]
+    confidence: float
+    raw: Dict[str, Any]
+
+    @classmethod
+    def from_content(cls, response_content: str) -> "ParsedTechnicalResponse":
+        """Extract the first JSON object in the content, falling back to neutral defaults"""
+        data = extract_json_object(response_content)
+        if data is None:
+            if "{" in response_content:
+                logger.warning("Error parsing technical response: no valid JSON object found")
+                data = {
+                    "feasibilityAssessment": {"overall_score": 5.0},
+                    "riskAssessment": {"overall_risk_level": 5.0},
+                    "confidence": 0.0,
+                    "parsingError": "No valid JSON object found",
+                }
+            else:
+                data = {
+                    "feasibilityAssessment": {"overall_score": 5.0, "timeline_weeks": 12, "team_size": 3},
+                    "riskAssessment": {"overall_risk_level": 5.0},
+                    "confidence": 0.5,
+                    "parsingNotes": "Response parsing required manual review",
+                }
+            data = {
+                "architectureRecommendation": {},
+                "technologyStack": {},
+                "technicalScores": {},
+                "recommendations": [],
+                **data,
+            }
+
+        recommendations = data.get("recommendations")
+        return cls(
+            architecture_recommendation=_dict_field(data, "architectureRecommendation"),
+            technology_stack=_dict_field(data, "technologyStack"),
+            feasibility_assessment=_dict_field(data, "feasibilityAssessment"),
+            risk_assessment=_dict_field(data, "riskAssessment"),
+            technical_scores=_dict_field(data, "technicalScores"),
+            recommendations=recommendations if isinstance(recommendations, list) else [],
+            confidence=data.get("confidence", 0.7),
+            raw=data,
+        )
 
 
 @dataclass
@@ -77,6 +139,11 @@ class TechnicalEvaluation:
     consensus_metadata: ConsensusResult
     implementation_roadmap: Dict[str, Any]
     quality_score: float
+    pending_models: List[str] = field(default_factory=list)  # Cancelled by early consensus; result is provisional
+
+    @property
+    def is_provisional(self) -> bool:
+        return bool(self.pending_models)
 
 
 class MultiLLMConsensusEngine:
@@ -93,9 +160,15 @@ class MultiLLMConsensusEngine:
         }
         self.consensus_threshold = 0.6  # 60% agreement minimum
         self.strong_consensus_threshold = 0.8  # 80% for strong agreement
+        self.early_consensus_min_weight = 1.8  # Combined model weight needed before stopping early
+        self.default_model_weight = 0.85
 
     async def evaluate_technical_architecture(
-        self, project_context: Dict[str, Any], selected_models: List[str], llm_client: Any
+        self,
+        project_context: Dict[str, Any],
+        selected_models: List[str],
+        llm_client: Any,
+        early_consensus: bool = False,
     ) -> TechnicalEvaluation:
         """
         Perform multi-LLM technical architecture evaluation with consensus scoring
@@ -104,16 +177,26 @@ class MultiLLMConsensusEngine:
             project_context: Complete project context from all previous stages
             selected_models: List of LLM models to use for evaluation
             llm_client: LLM client for API calls
+            early_consensus: Update consensus as each model finishes and cancel the rest once
+                agreement reaches strong_consensus_threshold with enough model weight
 
         Returns:
-            TechnicalEvaluation with consensus results and recommendations
+            TechnicalEvaluation with consensus results and recommendations; provisional
+            (with pending_models set) when early consensus cancelled outstanding models
         """
 
         # Generate technical evaluation prompts for each LLM
         evaluation_prompt = self._create_technical_evaluation_prompt(project_context)
 
         # Execute parallel LLM calls
-        llm_responses = await self._execute_parallel_analysis(evaluation_prompt, selected_models, llm_client)
+        pending_models: List[str] = []
+        consensus_updates: List[Dict[str, Any]] = []
+        if early_consensus:
+            llm_responses, pending_models, consensus_updates = await self._execute_incremental_analysis(
+                evaluation_prompt, selected_models, llm_client
+            )
+        else:
+            llm_responses = await self._execute_parallel_analysis(evaluation_prompt, selected_models, llm_client)
 
         # Calculate consensus on architecture recommendations
         architecture_consensus = self._calculate_architecture_consensus(llm_responses)
@@ -129,6 +212,14 @@ class MultiLLMConsensusEngine:
         final_consensus = self._generate_final_consensus(
             architecture_consensus, stack_consensus, feasibility_consensus, risk_consensus
         )
+        if early_consensus:
+            final_consensus.processing_metadata.update(
+                {
+                    "early_stopped": bool(pending_models),
+                    "pending_models": pending_models,
+                    "consensus_updates": consensus_updates,
+                }
+            )
 
         # Create implementation roadmap
         roadmap = self._generate_implementation_roadmap(final_consensus, project_context)
@@ -144,54 +235,14 @@ class MultiLLMConsensusEngine:
             consensus_metadata=final_consensus,
             implementation_roadmap=roadmap,
             quality_score=quality_score,
+            pending_models=pending_models,
         )
 
     async def _execute_parallel_analysis(self, prompt: str, models: List[str], llm_client: Any) -> List[LLMResponse]:
         """Execute technical analysis across multiple LLMs in parallel"""
 
-        async def analyze_with_model(model: str) -> LLMResponse:
-            start_time = datetime.now()
-
-            try:
-                response = await llm_client.execute_prompt(
-                    prompt=prompt, model=model, temperature=0.2, max_tokens=4000  # Lower temperature for technical analysis
-                )
-
-                processing_time = (datetime.now() - start_time).total_seconds()
-
-                # Parse technical response
-                parsed_response = self._parse_technical_response(response.get("content", ""))
-
-                return LLMResponse(
-                    model=model,
-                    response_content=response.get("content", ""),
-                    confidence_score=parsed_response.get("confidence", 0.7),
-                    processing_time=processing_time,
-                    cost=response.get("cost", 0.0),
-                    tokens_used=response.get("usage", {}).get("total_tokens", 0),
-                    technical_scores=parsed_response.get("technicalScores", {}),
-                    recommendations=parsed_response.get("recommendations", []),
-                    risk_assessment=parsed_response.get("riskAssessment", {}),
-                    timestamp=datetime.now(timezone.utc).isoformat(),
-                )
-
-            except Exception as e:
-                logger.error(f"Error analyzing with {model}: {str(e)}")
-                return LLMResponse(
-                    model=model,
-                    response_content=f"Error: {str(e)}",
-                    confidence_score=0.0,
-                    processing_time=0.0,
-                    cost=0.0,
-                    tokens_used=0,
-                    technical_scores={},
-                    recommendations=[],
-                    risk_assessment={},
-                    timestamp=datetime.now(timezone.utc).isoformat(),
-                )
-
         # Execute all models in parallel
-        tasks = [analyze_with_model(model) for model in models]
+        tasks = [self._analyze_with_model(prompt, model, llm_client) for model in models]
         responses = await asyncio.gather(*tasks, return_exceptions=True)
 
         # Filter out exceptions and return valid responses
@@ -199,6 +250,118 @@ class MultiLLMConsensusEngine:
 
         return valid_responses
 
+    async def _execute_incremental_analysis(
+        self, prompt: str, models: List[str], llm_client: Any
+    ) -> Tuple[List[LLMResponse], List[str], List[Dict[str, Any]]]:
+        """
+        Execute technical analysis in parallel, recomputing consensus as each model finishes
+
+        Returns the responses received, the models cancelled after early consensus was
+        reached, and one agreement snapshot per completed model.
+        """
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        tasks = {asyncio.create_task(self._analyze_with_model(prompt, model, llm_client)): model for model in models}
+        pending = set(tasks)
+        responses: List[LLMResponse] = []
+        updates: List[Dict[str, Any]] = []
+
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                responses.extend(task.result() for task in done if not task.cancelled() and task.exception() is None)
+
+                consensus = self._calculate_early_consensus(responses)
+                updates.append(
+                    {
+                        "models_completed": len(responses),
+                        "agreement_score": consensus.agreement_score if consensus else None,
+                        "elapsed_seconds": round(loop.time() - started, 3),
+                    }
+                )
+                if pending and consensus and consensus.agreement_score >= self.strong_consensus_threshold:
+                    logger.info(
+                        f"Early consensus ({consensus.agreement_score:.1%}) after {len(responses)} of {len(models)} models"
+                    )
+                    break
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+        pending_models = [model for task, model in tasks.items() if task in pending]
+        return responses, pending_models, updates
+
+    def _model_weight(self, model: str) -> float:
+        """Configured weight for a model, matching dated names like claude-3-5-sonnet-20241022"""
+        if model in self.llm_weights:
+            return self.llm_weights[model]
+        for name, weight in self.llm_weights.items():
+            if model.startswith(f"{name}-"):
+                return weight
+        return self.default_model_weight
+
+    def _calculate_early_consensus(self, responses: List[LLMResponse]) -> Optional[ConsensusResult]:
+        """Overall consensus over the usable responses so far, or None until they carry enough weight"""
+        usable = [r for r in responses if r.confidence_score > 0]
+        if sum(self._model_weight(r.model) for r in usable) < self.early_consensus_min_weight:
+            return None
+        return self._generate_final_consensus(
+            self._calculate_architecture_consensus(usable),
+            self._calculate_technology_stack_consensus(usable),
+            self._calculate_feasibility_consensus(usable),
+            self._calculate_risk_consensus(usable),
+        )
+
+    async def _analyze_with_model(self, prompt: str, model: str, llm_client: Any) -> LLMResponse:
+        """Run the technical analysis prompt on one model; failures become zero-confidence responses"""
+        start_time = datetime.now()
+
+        try:
+            response = await llm_client.execute_prompt(
+                prompt=prompt,
+                model=model,
+                temperature=0.2,  # Lower temperature for technical analysis
+                max_tokens=4000,
+                context={"cache": True},  # Same template per model, so repeat evaluations reuse the answer
+            )
+
+            processing_time = (datetime.now() - start_time).total_seconds()
+
+            # Parse technical response once; the calculators reuse it
+            content = response.get("content", "")
+            parsed = ParsedTechnicalResponse.from_content(content)
+
+            return LLMResponse(
+                model=model,
+                response_content=content,
+                confidence_score=parsed.confidence,
+                processing_time=processing_time,
+                cost=response.get("cost", 0.0),
+                tokens_used=response.get("usage", {}).get("total_tokens", 0),
+                technical_scores=parsed.technical_scores,
+                recommendations=parsed.recommendations,
+                risk_assessment=parsed.risk_assessment,
+                timestamp=datetime.now(timezone.utc).isoformat(),
+                parsed=parsed,
+            )
+
+        except Exception as e:
+            logger.error(f"Error analyzing with {model}: {str(e)}")
+            return LLMResponse(
+                model=model,
+                response_content=f"Error: {str(e)}",
+                confidence_score=0.0,
+                processing_time=0.0,
+                cost=0.0,
+                tokens_used=0,
+                technical_scores={},
+                recommendations=[],
+                risk_assessment={},
+                timestamp=datetime.now(timezone.utc).isoformat(),
+            )
+
     def _calculate_architecture_consensus(self, responses: List[LLMResponse]) -> ConsensusResult:
         """Calculate consensus on architecture recommendations with enhanced weighted scoring"""
 
@@ -896,42 +1059,15 @@ Base your analysis on the complete project context and ensure recommendations al
 
         return prompt.strip()
 
-    def _parse_technical_response(self, response_content: str) -> Dict[str, Any]:
-        """Parse and validate LLM technical response"""
-        try:
-            import re
-
-            json_match = re.search(r"\{.*\}", response_content, re.DOTALL)
-            if json_match:
-                return json.loads(json_match.group())
-            else:
-                return {
-                    "architectureRecommendation": {},
-                    "technologyStack": {},
-                    "feasibilityAssessment": {"overall_score": 5.0, "timeline_weeks": 12, "team_size": 3},
-                    "riskAssessment": {"overall_risk_level": 5.0},
-                    "technicalScores": {},
-                    "recommendations": [],
-                    "confidence": 0.5,
-                    "parsingNotes": "Response parsing required manual review",
-                }
-        except Exception as e:
-            logger.warning(f"Error parsing technical response: {str(e)}")
-            return {
-                "architectureRecommendation": {},
-                "technologyStack": {},
-                "feasibilityAssessment": {"overall_score": 5.0},
-                "riskAssessment": {"overall_risk_level": 5.0},
-                "technicalScores": {},
-                "recommendations": [],
-                "confidence": 0.0,
-                "parsingError": str(e),
-            }
+    def _parsed(self, response: LLMResponse) -> ParsedTechnicalResponse:
+        """Structured view of a response, parsed on first use and cached on the response"""
+        if response.parsed is None:
+            response.parsed = ParsedTechnicalResponse.from_content(response.response_content)
+        return response.parsed
 
     def _extract_architecture_patterns(self, response: LLMResponse) -> List[str]:
         """Extract architecture patterns from LLM response"""
-        parsed = self._parse_technical_response(response.response_content)
-        arch_rec = parsed.get("architectureRecommendation", {})
+        arch_rec = self._parsed(response).architecture_recommendation
 
         patterns = []
         if arch_rec.get("pattern"):
@@ -944,18 +1080,15 @@ Base your analysis on the complete project context and ensure recommendations al
 
     def _extract_technology_recommendations(self, response: LLMResponse) -> Dict[str, Dict[str, Any]]:
         """Extract technology recommendations from LLM response"""
-        parsed = self._parse_technical_response(response.response_content)
-        return parsed.get("technologyStack", {})
+        return self._parsed(response).technology_stack
 
     def _extract_feasibility_assessment(self, response: LLMResponse) -> Dict[str, Any]:
         """Extract feasibility assessment from LLM response"""
-        parsed = self._parse_technical_response(response.response_content)
-        return parsed.get("feasibilityAssessment", {})
+        return self._parsed(response).feasibility_assessment
 
     def _extract_risk_assessment(self, response: LLMResponse) -> Dict[str, Any]:
         """Extract risk assessment from LLM response"""
-        parsed = self._parse_technical_response(response.response_content)
-        return parsed.get("riskAssessment", {})
+        return self._parsed(response).risk_assessment
 
     def _resolve_architecture_conflicts(
         self, pattern_counts: Dict[str, int], responses: List[LLMResponse], consensus_level: ConsensusLevel
@@ -973,8 +1106,7 @@ Base your analysis on the complete project context and ensure recommendations al
         # Get rationale from responses that recommended this pattern
         rationales = []
         for response in responses:
-            parsed = self._parse_technical_response(response.response_content)
-            arch_rec = parsed.get("architectureRecommendation", {})
+            arch_rec = self._parsed(response).architecture_recommendation
             if arch_rec.get("pattern") == pattern:
                 rationales.append(arch_rec.get("rationale", ""))
 
@@ -1040,8 +1172,7 @@ Base your analysis on the complete project context and ensure recommendations al
         maintainability_scores = []
 
         for response in responses:
-            parsed = self._parse_technical_response(response.response_content)
-            arch_rec = parsed.get("architectureRecommendation", {})
+            arch_rec = self._parsed(response).architecture_recommendation
 
             if arch_rec.get("pattern") == pattern_name:
                 # Collect rationale
@@ -1397,8 +1528,7 @@ Base your analysis on the complete project context and ensure recommendations al
         all_challenges = []
 
         for response in responses:
-            parsed = self._parse_technical_response(response.response_content)
-            feasibility = parsed.get("feasibilityAssessment", {})
+            feasibility = self._parsed(response).feasibility_assessment
             challenges = feasibility.get("technical_challenges", [])
             all_challenges.extend(challenges)
 
@@ -1418,8 +1548,7 @@ Base your analysis on the complete project context and ensure recommendations al
         all_factors = []
 
         for response in responses:
-            parsed = self._parse_technical_response(response.response_content)
-            feasibility = parsed.get("feasibilityAssessment", {})
+            feasibility = self._parsed(response).feasibility_assessment
             factors = feasibility.get("success_factors", [])
             all_factors.extend(factors)
 
@@ -1438,8 +1567,7 @@ Base your analysis on the complete project context and ensure recommendations al
         all_strategies = []
 
         for response in responses:
-            parsed = self._parse_technical_response(response.response_content)
-            risk_assessment = parsed.get("riskAssessment", {})
+            risk_assessment = self._parsed(response).risk_assessment
 
             # Extract mitigation strategies from each risk category
             categories = risk_assessment.get("categories", {})
@@ -1456,8 +1584,7 @@ Base your analysis on the complete project context and ensure recommendations al
         mitigations = []
 
         for response in responses:
-            parsed = self._parse_technical_response(response.response_content)
-            risk_assessment = parsed.get("riskAssessment", {})
+            risk_assessment = self._parsed(response).risk_assessment
             categories = risk_assessment.get("categories", {})
 
             if category in categories and isinstance(categories[category], dict):
@@ -1499,8 +1626,7 @@ Base your analysis on the complete project context and ensure recommendations al
         all_monitoring = []
 
         for response in responses:
-            parsed = self._parse_technical_response(response.response_content)
-            risk_assessment = parsed.get("riskAssessment", {})
+            risk_assessment = self._parsed(response).risk_assessment
             monitoring = risk_assessment.get("monitoring_requirements", [])
             all_monitoring.extend(monitoring)
 
@@ -1527,7 +1653,7 @@ Base your analysis on the complete project context and ensure recommendations al
 
 
 async def evaluate_technical_architecture(
-    project_context: Dict[str, Any], selected_models: List[str], llm_client: Any
+    project_context: Dict[str, Any], selected_models: List[str], llm_client: Any, early_consensus: bool = False
 ) -> TechnicalEvaluation:
     """
     Convenience function for technical architecture evaluation
@@ -1536,9 +1662,10 @@ async def evaluate_technical_architecture(
         project_context: Complete project context from all previous stages
         selected_models: List of LLM models to use for evaluation
         llm_client: LLM client for API calls
+        early_consensus: Stop once strong consensus is reached (see MultiLLMConsensusEngine)
 
     Returns:
         TechnicalEvaluation with consensus results and recommendations
     """
     engine = MultiLLMConsensusEngine()
-    return await engine.evaluate_technical_architecture(project_context, selected_models, llm_client)
+    return await engine.evaluate_technical_architecture(project_context, selected_models, llm_client, early_consensus)
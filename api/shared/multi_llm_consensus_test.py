@@ -0,0 +1,129 @@
+"""
+Tests for multi_llm_consensus.py - parse-once technical responses and early consensus
+"""
+
+import asyncio
+import json
+from typing import Any, Dict
+from unittest.mock import patch
+
+import pytest
+
+from shared.json_extraction import extract_json_object
+from shared.multi_llm_consensus import MultiLLMConsensusEngine, ParsedTechnicalResponse
+
+
+def analysis(pattern: str, overall_score: float) -> Dict[str, Any]:
+    return {
+        "architectureRecommendation": {"pattern": pattern, "rationale": f"{pattern} fits", "alternativePatterns": []},
+        "technologyStack": {"backend": {"name": "FastAPI", "score": 8.0, "reasons": ["async"]}},
+        "feasibilityAssessment": {"overall_score": overall_score, "timeline_weeks": 10, "team_size": 4},
+        "riskAssessment": {"overall_risk_level": 4.0, "categories": {"security": {"severity": 5.0, "mitigation": "Audit"}}},
+        "technicalScores": {"maintainability": 8.0},
+        "recommendations": ["Start small"],
+        "confidence": 0.9,
+    }
+
+
+class FakeLLMClient:
+    """Returns a canned analysis per model in the dict shape the engine reads."""
+
+    def __init__(self, contents: Dict[str, str], delays: Dict[str, float] = None):
+        self.contents = contents
+        self.delays = delays or {}
+        self.cancelled = []
+
+    async def execute_prompt(self, prompt: str, model: str, **kwargs) -> Dict[str, Any]:
+        try:
+            await asyncio.sleep(self.delays.get(model, 0))
+        except asyncio.CancelledError:
+            self.cancelled.append(model)
+            raise
+        return {"content": self.contents[model], "cost": 0.01, "usage": {"total_tokens": 100}}
+
+
+class TestParsedTechnicalResponse:
+    """Test suite for the structured response view."""
+
+    def test_fields_from_json_in_prose(self):
+        content = f"Analysis {{draft}} below:\n```json\n{json.dumps(analysis('Microservices', 7.5))}\n```"
+
+        parsed = ParsedTechnicalResponse.from_content(content)
+
+        assert parsed.architecture_recommendation["pattern"] == "Microservices"
+        assert parsed.technology_stack["backend"]["name"] == "FastAPI"
+        assert parsed.feasibility_assessment["overall_score"] == 7.5
+        assert parsed.confidence == 0.9
+
+    def test_fallbacks_for_missing_or_broken_json(self):
+        missing = ParsedTechnicalResponse.from_content("I could not produce JSON.")
+        broken = ParsedTechnicalResponse.from_content('{"architectureRecommendation": {"pattern": "Monolith"},}')
+
+        assert missing.confidence == 0.5
+        assert missing.feasibility_assessment["timeline_weeks"] == 12
+        assert broken.confidence == 0.0
+        assert broken.architecture_recommendation == {}
+        assert "parsingError" in broken.raw
+
+
+class TestConsensusParsing:
+    """Test suite for parsing each response once per consensus run."""
+
+    @pytest.mark.asyncio
+    async def test_each_response_is_parsed_once(self):
+        contents = {
+            "gpt-4o": json.dumps(analysis("Microservices", 8.0)),
+            "claude-3-5-sonnet": "Here you go: " + json.dumps(analysis("Microservices", 7.0)),
+            "gemini-1.5-pro": json.dumps(analysis("Modular Monolith", 6.0)),
+        }
+        engine = MultiLLMConsensusEngine()
+
+        with patch("shared.multi_llm_consensus.extract_json_object", wraps=extract_json_object) as extract:
+            evaluation = await engine.evaluate_technical_architecture(
+                {"idea": {"title": "Tasks"}}, list(contents), FakeLLMClient(contents)
+            )
+
+        assert extract.call_count == len(contents)
+        assert evaluation.architecture_recommendation["pattern"] == "Microservices"
+        assert evaluation.technology_stack["backend"]["name"] == "FastAPI"
+        assert evaluation.feasibility_assessment["overall_feasibility_score"] == 7.0
+
+
+class TestEarlyConsensus:
+    """Test suite for incremental consensus with early stopping."""
+
+    @pytest.mark.asyncio
+    async def test_stops_once_weighted_models_strongly_agree(self):
+        agreed = json.dumps(analysis("Microservices", 8.0))
+        contents = {"gpt-4o": agreed, "claude-3-5-sonnet-20241022": agreed, "gemini-1.5-pro": agreed}
+        client = FakeLLMClient(contents, delays={"gpt-4o": 0.01, "claude-3-5-sonnet-20241022": 0.02, "gemini-1.5-pro": 10})
+
+        evaluation = await MultiLLMConsensusEngine().evaluate_technical_architecture(
+            {}, list(contents), client, early_consensus=True
+        )
+
+        assert evaluation.is_provisional
+        assert evaluation.pending_models == ["gemini-1.5-pro"]
+        assert client.cancelled == ["gemini-1.5-pro"]
+        metadata = evaluation.consensus_metadata.processing_metadata
+        assert metadata["early_stopped"] is True
+        assert [u["models_completed"] for u in metadata["consensus_updates"]] == [1, 2]
+        assert metadata["consensus_updates"][0]["agreement_score"] is None  # not enough weight yet
+        assert evaluation.architecture_recommendation["pattern"] == "Microservices"
+
+    @pytest.mark.asyncio
+    async def test_waits_for_all_models_without_agreement(self):
+        contents = {
+            "gpt-4o": json.dumps(analysis("Microservices", 9.0)),
+            "claude-3-5-sonnet-20241022": json.dumps(analysis("Serverless", 2.0)),
+            "gemini-1.5-pro": json.dumps(analysis("Microservices", 8.0)),
+        }
+        client = FakeLLMClient(contents, delays={"gemini-1.5-pro": 0.05})
+
+        evaluation = await MultiLLMConsensusEngine().evaluate_technical_architecture(
+            {}, list(contents), client, early_consensus=True
+        )
+
+        assert not evaluation.is_provisional
+        assert client.cancelled == []
+        assert len(evaluation.consensus_metadata.individual_responses) == 3
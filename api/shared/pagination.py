@@ -0,0 +1,184 @@
+"""
+Opaque cursor helpers for list endpoints.
+
+Cursors wrap whatever state the data layer needs to resume a listing (for example
+a Cosmos continuation token) in URL-safe base64, so clients treat them as opaque
+strings and never build queries from them.
+"""
+
+import base64
+import binascii
+import json
+from typing import Any, Dict, Optional, Tuple
+
+from .validation import ValidationException
+
+CURSOR_VERSION = 1
+
+
+def encode_cursor(state: Dict[str, Any]) -> str:
+    """Encode pagination state into an opaque, URL-safe cursor."""
+    payload = json.dumps({"v": CURSOR_VERSION, **state}, separators=(",", ":"), sort_keys=True)
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Decode a cursor produced by encode_cursor; returns None for an empty cursor."""
+    if not cursor:
+        return None
+
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        state = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8"))
+    except (ValueError, UnicodeError, binascii.Error):
+        raise ValidationException("Invalid pagination cursor", "cursor")
+
+    if not isinstance(state, dict) or state.pop("v", None) != CURSOR_VERSION:
+        raise ValidationException("Invalid pagination cursor", "cursor")
+    return state
+
+
+def encode_continuation_cursor(continuation_token: Optional[str]) -> Optional[str]:
+    """Wrap a Cosmos continuation token as an opaque cursor."""
+    if not continuation_token:
+        return None
+    return encode_cursor({"ct": continuation_token})
+
+
+def decode_continuation_cursor(cursor: Optional[str]) -> Optional[str]:
+    """Unwrap the Cosmos continuation token from a cursor."""
+    state = decode_cursor(cursor)
+    if state is None:
+        return None
+    token = state.get("ct")
+    if not isinstance(token, str):
+        raise ValidationException("Invalid pagination cursor", "cursor")
+    return token
+
+
+async def query_cursor_page(
+    db_manager: Any,
+    container_name: str,
+    query: str,
+    parameters: list,
+    partition_key: Optional[str],
+    limit: int,
+    cursor: Optional[str] = None,
+    offset: int = 0,
+) -> Tuple[list, Optional[str]]:
+    """
+    Fetch one page of an ordered query and return ``(items, next_cursor)``.
+
+    Cursor requests (and the first page) are served with Cosmos continuation
+    tokens. A non-zero offset from older page/skip clients is still honoured
+    with OFFSET/LIMIT, which returns no cursor.
+    """
+    if cursor or offset <= 0:
+        result = await db_manager.query_page(
+            container_name=container_name,
+            query=query,
+            parameters=parameters,
+            partition_key=partition_key,
+            page_size=limit,
+            continuation_token=decode_continuation_cursor(cursor),
+        )
+        return result.items, encode_continuation_cursor(result.continuation_token)
+
+    items = await db_manager.query_items(
+        container_name=container_name,
+        query=f"{query} OFFSET {offset} LIMIT {limit}",
+        parameters=parameters,
+    )
+    return items, None
+
+
+def encode_keyset_cursor(item: Dict[str, Any], sort_key: str, id_key: str = "id") -> str:
+    """Build a seek cursor from the last item of a page."""
+    return encode_cursor({"s": item.get(sort_key), "id": item.get(id_key)})
+
+
+def decode_keyset_cursor(cursor: Optional[str]) -> Optional[Tuple[Any, str]]:
+    """Return the ``(sort_value, id)`` position encoded in a seek cursor."""
+    state = decode_cursor(cursor)
+    if state is None:
+        return None
+    if "s" not in state or not isinstance(state.get("id"), str):
+        raise ValidationException("Invalid pagination cursor", "cursor")
+    return state["s"], state["id"]
+
+
+def apply_keyset(
+    query: str,
+    parameters: list,
+    limit: int,
+    sort_field: str,
+    cursor: Optional[str] = None,
+    id_field: str = "c.id",
+) -> Tuple[str, list]:
+    """
+    Extend a ``SELECT ... WHERE ...`` query with keyset (seek) pagination.
+
+    Results are ordered newest first on ``(sort_field, id_field)`` and the query
+    resumes strictly after the cursor position, so Cosmos never reads skipped
+    documents. One extra row is requested so the caller can tell whether another
+    page exists (see ``keyset_page``). The container needs a composite index on
+    ``(sort_field DESC, id_field DESC)``, as declared for Prompts and ForgeProjects
+    in infrastructure/unified.bicep; Cosmos rejects the query without it.
+    """
+    parameters = list(parameters)
+    position = decode_keyset_cursor(cursor)
+    if position is not None:
+        query += (
+            f" AND ({sort_field} < @keyset_sort OR ({sort_field} = @keyset_sort AND {id_field} < @keyset_id))"
+        )
+        parameters.append({"name": "@keyset_sort", "value": position[0]})
+        parameters.append({"name": "@keyset_id", "value": position[1]})
+
+    query += f" ORDER BY {sort_field} DESC, {id_field} DESC OFFSET 0 LIMIT {int(limit) + 1}"
+    return query, parameters
+
+
+def keyset_page(items: list, limit: int, sort_key: str, id_key: str = "id") -> Tuple[list, Optional[str]]:
+    """Trim the look-ahead row from a keyset query and build the next cursor."""
+    if len(items) <= limit:
+        return items, None
+    page = items[:limit]
+    return page, encode_keyset_cursor(page[-1], sort_key, id_key)
+
+
+async def query_keyset_page(
+    db_manager: Any,
+    container_name: str,
+    query: str,
+    parameters: list,
+    partition_key: Optional[str],
+    limit: int,
+    sort_field: str,
+    cursor: Optional[str] = None,
+    offset: int = 0,
+) -> Tuple[list, Optional[str]]:
+    """
+    Fetch one keyset-paginated page through DatabaseManager and return ``(items, next_cursor)``.
+
+    ``sort_field`` is the query path (e.g. ``c.updatedAt``); the matching document
+    key is derived from it. A non-zero offset without a cursor keeps the legacy
+    OFFSET/LIMIT behaviour for older clients and returns no cursor; it orders on
+    the same ``(sort_field, c.id)`` composite index so ties never shift between pages.
+    """
+    if offset > 0 and not cursor:
+        items = await db_manager.query_items(
+            container_name=container_name,
+            query=f"{query} ORDER BY {sort_field} DESC, c.id DESC OFFSET {offset} LIMIT {limit}",
+            parameters=parameters,
+            partition_key=partition_key,
+        )
+        return items, None
+
+    keyset_query, keyset_parameters = apply_keyset(query, parameters, limit, sort_field, cursor)
+    items = await db_manager.query_items(
+        container_name=container_name,
+        query=keyset_query,
+        parameters=keyset_parameters,
+        partition_key=partition_key,
+    )
+    return keyset_page(items, limit, sort_field.split(".", 1)[-1])
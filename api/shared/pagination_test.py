@@ -0,0 +1,147 @@
+"""
+Tests for pagination.py - opaque cursor helpers
+"""
+
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from shared.database import QueryPage
+from shared.pagination import (
+    apply_keyset,
+    decode_continuation_cursor,
+    decode_cursor,
+    decode_keyset_cursor,
+    encode_continuation_cursor,
+    encode_cursor,
+    encode_keyset_cursor,
+    keyset_page,
+    query_cursor_page,
+    query_keyset_page,
+)
+from shared.validation import ValidationException
+
+
+class TestCursorEncoding:
+    """Test suite for cursor encoding and decoding."""
+
+    def test_round_trip(self):
+        cursor = encode_cursor({"u": "2025-01-01T00:00:00Z", "id": "abc"})
+
+        assert "=" not in cursor
+        assert decode_cursor(cursor) == {"u": "2025-01-01T00:00:00Z", "id": "abc"}
+
+    def test_empty_cursor(self):
+        assert decode_cursor(None) is None
+        assert decode_cursor("") is None
+
+    def test_invalid_cursor(self):
+        with pytest.raises(ValidationException):
+            decode_cursor("%%%not-base64")
+
+    def test_rejects_unknown_version(self):
+        import base64
+
+        cursor = base64.urlsafe_b64encode(b'{"v": 99, "ct": "x"}').decode("ascii")
+        with pytest.raises(ValidationException):
+            decode_cursor(cursor)
+
+    def test_continuation_round_trip(self):
+        token = '{"token":"+RID:~abc==#RT:1","range":{"min":"","max":"FF"}}'
+        cursor = encode_continuation_cursor(token)
+
+        assert token not in cursor
+        assert decode_continuation_cursor(cursor) == token
+        assert encode_continuation_cursor(None) is None
+
+
+class TestQueryCursorPage:
+    """Test suite for query_cursor_page."""
+
+    @pytest.mark.asyncio
+    async def test_first_page_uses_continuation(self):
+        db_manager = Mock()
+        db_manager.query_page = AsyncMock(return_value=QueryPage(items=[{"id": "1"}], continuation_token="ct"))
+
+        items, next_cursor = await query_cursor_page(db_manager, "Prompts", "SELECT * FROM c", [], "u1", 10)
+
+        assert items == [{"id": "1"}]
+        assert decode_continuation_cursor(next_cursor) == "ct"
+        assert db_manager.query_page.call_args.kwargs["continuation_token"] is None
+
+    @pytest.mark.asyncio
+    async def test_legacy_offset_falls_back(self):
+        db_manager = Mock()
+        db_manager.query_items = AsyncMock(return_value=[{"id": "21"}])
+
+        items, next_cursor = await query_cursor_page(
+            db_manager, "Prompts", "SELECT * FROM c ORDER BY c.updatedAt DESC", [], "u1", 10, offset=20
+        )
+
+        assert items == [{"id": "21"}]
+        assert next_cursor is None
+        assert db_manager.query_items.call_args.kwargs["query"].endswith("OFFSET 20 LIMIT 10")
+
+
+class TestKeysetPagination:
+    """Test suite for keyset (seek) pagination helpers."""
+
+    def test_first_page_query(self):
+        query, params = apply_keyset(
+            "SELECT * FROM c WHERE c.userId = @user_id", [{"name": "@user_id", "value": "u1"}], 20, "c.updatedAt"
+        )
+
+        assert query.endswith("ORDER BY c.updatedAt DESC, c.id DESC OFFSET 0 LIMIT 21")
+        assert "@keyset_sort" not in query
+        assert params == [{"name": "@user_id", "value": "u1"}]
+
+    def test_resumes_after_cursor(self):
+        cursor = encode_keyset_cursor({"updatedAt": "2025-01-02T00:00:00Z", "id": "p9"}, "updatedAt")
+        base_params = [{"name": "@user_id", "value": "u1"}]
+
+        query, params = apply_keyset("SELECT * FROM c WHERE c.userId = @user_id", base_params, 20, "c.updatedAt", cursor)
+
+        assert "(c.updatedAt < @keyset_sort OR (c.updatedAt = @keyset_sort AND c.id < @keyset_id))" in query
+        assert {"name": "@keyset_sort", "value": "2025-01-02T00:00:00Z"} in params
+        assert {"name": "@keyset_id", "value": "p9"} in params
+        assert len(base_params) == 1
+
+    def test_keyset_page_trims_look_ahead(self):
+        items = [{"updatedAt": f"2025-01-0{i}", "id": str(i)} for i in (3, 2, 1)]
+
+        page, next_cursor = keyset_page(items, 2, "updatedAt")
+
+        assert page == items[:2]
+        assert decode_keyset_cursor(next_cursor) == ("2025-01-02", "2")
+        assert keyset_page(items[:2], 2, "updatedAt") == (items[:2], None)
+
+    def test_rejects_continuation_cursor(self):
+        with pytest.raises(ValidationException):
+            decode_keyset_cursor(encode_continuation_cursor("ct"))
+
+    @pytest.mark.asyncio
+    async def test_query_keyset_page(self):
+        db_manager = Mock()
+        db_manager.query_items = AsyncMock(return_value=[{"updatedAt": "b", "id": "2"}, {"updatedAt": "a", "id": "1"}])
+
+        items, next_cursor = await query_keyset_page(
+            db_manager, "Prompts", "SELECT * FROM c WHERE c.userId = @u", [], "u1", 1, "c.updatedAt"
+        )
+
+        assert items == [{"updatedAt": "b", "id": "2"}]
+        assert decode_keyset_cursor(next_cursor) == ("b", "2")
+        assert db_manager.query_items.call_args.kwargs["partition_key"] == "u1"
+
+    @pytest.mark.asyncio
+    async def test_query_keyset_page_legacy_offset(self):
+        db_manager = Mock()
+        db_manager.query_items = AsyncMock(return_value=[])
+
+        items, next_cursor = await query_keyset_page(
+            db_manager, "Prompts", "SELECT * FROM c", [], "u1", 10, "c.updatedAt", offset=30
+        )
+
+        assert next_cursor is None
+        assert db_manager.query_items.call_args.kwargs["query"].endswith(
+            "ORDER BY c.updatedAt DESC, c.id DESC OFFSET 30 LIMIT 10"
+        )
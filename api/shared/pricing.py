@@ -0,0 +1,208 @@
+"""
+Shared LLM pricing registry.
+
+One table of per-model prices used by every cost path: CostTracker charges,
+ProviderCostCalculator, BaseLLMProvider estimates and EnhancedBudgetManager.
+Prices are compiled once into integer picodollars per token, so a cost is a
+dict lookup plus two integer multiplies, rounded half-up to micro-dollars (the
+same 6-place precision CostTracker has always stored).
+
+Updates (``CostTracker.update_pricing_model``) swap in freshly compiled tables,
+so readers never lock and every path sees the new price on its next call.
+"""
+
+import logging
+import threading
+from dataclasses import dataclass
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+MICROS_PER_DOLLAR = 1_000_000
+# Picodollars per token == nanodollars per 1K tokens
+PICOS_PER_DOLLAR_PER_1K = 1_000_000_000
+PICOS_PER_MICRO = 1_000_000
+DEFAULT_CONTEXT_WINDOW = 4096
+
+Price = Union[Decimal, float, int, str]
+
+# Per 1K tokens: (input, output, context window). Aliases used by older callers
+# (claude-3-opus, gemini-ultra, ...) are listed alongside the dated model names.
+DEFAULT_PRICING: Dict[str, Dict[str, Tuple[str, str, int]]] = {
+    "openai": {
+        "gpt-4": ("0.03", "0.06", 8192),
+        "gpt-4-turbo": ("0.01", "0.03", 128000),
+        "gpt-4-1106-preview": ("0.01", "0.03", 128000),
+        "gpt-4o": ("0.005", "0.015", 128000),
+        "gpt-3.5-turbo": ("0.0015", "0.002", 16385),
+    },
+    "anthropic": {
+        "claude-3-5-sonnet-20241022": ("0.003", "0.015", 200000),
+        "claude-3-haiku-20240307": ("0.00025", "0.00125", 200000),
+        "claude-3-opus-20240229": ("0.015", "0.075", 200000),
+        "claude-3": ("0.015", "0.075", 200000),
+        "claude-3-opus": ("0.015", "0.075", 200000),
+        "claude-3-sonnet": ("0.003", "0.015", 200000),
+        "claude-3-haiku": ("0.00025", "0.00125", 200000),
+    },
+    "google": {
+        "gemini-1.5-pro": ("0.00125", "0.005", 1048576),
+        "gemini-1.5-flash": ("0.000075", "0.0003", 1048576),
+        "gemini-pro": ("0.0005", "0.0015", 32768),
+        "gemini-ultra": ("0.001", "0.003", 32768),
+    },
+}
+
+
+def _to_picos(price_per_1k: Price) -> int:
+    """Convert a price per 1K tokens to integer picodollars per token."""
+    scaled = Decimal(str(price_per_1k)) * PICOS_PER_DOLLAR_PER_1K
+    return int(scaled.quantize(Decimal("1"), rounding=ROUND_HALF_UP))
+
+
+def picos_to_micros(picos: int) -> int:
+    """Round picodollars half-up to whole micro-dollars."""
+    return (picos + PICOS_PER_MICRO // 2) // PICOS_PER_MICRO
+
+
+@dataclass(frozen=True)
+class ModelPrice:
+    """Compiled price for one model."""
+
+    __slots__ = ("input_picos", "output_picos", "context_window")
+
+    input_picos: int  # picodollars per input token
+    output_picos: int  # picodollars per output token
+    context_window: int
+
+    @property
+    def input_per_1k(self) -> Decimal:
+        return Decimal(self.input_picos) / PICOS_PER_DOLLAR_PER_1K
+
+    @property
+    def output_per_1k(self) -> Decimal:
+        return Decimal(self.output_picos) / PICOS_PER_DOLLAR_PER_1K
+
+
+class PricingRegistry:
+    """Process-wide table of model prices with integer micro-dollar cost math."""
+
+    def __init__(self, table: Optional[Dict[str, Dict[str, Tuple[Price, Price, int]]]] = None):
+        self._lock = threading.Lock()
+        self._prices: Dict[Tuple[str, str], ModelPrice] = {}
+        self._by_model: Dict[str, ModelPrice] = {}
+        self._model_table: Dict[str, Dict[str, float]] = {}
+        self.load(DEFAULT_PRICING if table is None else table)
+
+    def load(self, table: Dict[str, Dict[str, Tuple[Price, Price, int]]]) -> None:
+        """Replace every price with ``table`` (provider -> model -> (input, output, context window))."""
+        prices = {
+            (provider.lower(), model.lower()): ModelPrice(_to_picos(inp), _to_picos(out), int(window))
+            for provider, models in table.items()
+            for model, (inp, out, window) in models.items()
+        }
+        with self._lock:
+            self._publish(prices)
+
+    def update(
+        self, provider: str, model: str, input_price: Price, output_price: Price, context_window: Optional[int] = None
+    ) -> ModelPrice:
+        """Set the price of one model; takes effect for all callers immediately."""
+        key = (provider.lower(), model.lower())
+        with self._lock:
+            current = self._prices.get(key)
+            if context_window is None:
+                context_window = current.context_window if current else DEFAULT_CONTEXT_WINDOW
+            price = ModelPrice(_to_picos(input_price), _to_picos(output_price), int(context_window))
+            self._publish({**self._prices, key: price})
+        logger.info(f"Pricing updated for {provider}/{model}")
+        return price
+
+    def _publish(self, prices: Dict[Tuple[str, str], ModelPrice]) -> None:
+        # Build every derived view first, then swap references so readers never see a mix
+        by_model: Dict[str, ModelPrice] = {}
+        for (_, model), price in prices.items():
+            by_model.setdefault(model, price)
+        model_table = {
+            model: {
+                "input_cost_per_1k": float(price.input_per_1k),
+                "output_cost_per_1k": float(price.output_per_1k),
+                "context_window": price.context_window,
+            }
+            for model, price in by_model.items()
+        }
+        self._prices, self._by_model, self._model_table = prices, by_model, model_table
+
+    def get(self, provider: str, model: str) -> Optional[ModelPrice]:
+        """Price for ``provider``/``model``, or None when not listed."""
+        return self._prices.get((provider.lower(), model.lower()))
+
+    def get_model(self, model: str) -> Optional[ModelPrice]:
+        """Price for ``model`` under whichever provider lists it first."""
+        return self._by_model.get(model.lower())
+
+    def model_table(self) -> Dict[str, Dict[str, float]]:
+        """Provider-less view (model -> per-1K costs and context window); do not mutate."""
+        return self._model_table
+
+    def provider_table(self) -> Dict[str, Dict[str, Dict[str, Decimal]]]:
+        """Provider -> model -> {"input", "output"} per-1K Decimal prices."""
+        table: Dict[str, Dict[str, Dict[str, Decimal]]] = {}
+        for (provider, model), price in self._prices.items():
+            table.setdefault(provider, {})[model] = {"input": price.input_per_1k, "output": price.output_per_1k}
+        return table
+
+    @staticmethod
+    def price_micros(price: ModelPrice, input_tokens: int, output_tokens: int) -> Tuple[int, int, int]:
+        """(input, output, total) micro-dollars; total is rounded once from the exact sum."""
+        input_picos = input_tokens * price.input_picos
+        output_picos = output_tokens * price.output_picos
+        return (
+            picos_to_micros(input_picos),
+            picos_to_micros(output_picos),
+            picos_to_micros(input_picos + output_picos),
+        )
+
+    def cost_micros(
+        self, provider: str, model: str, input_tokens: int, output_tokens: int
+    ) -> Optional[Tuple[int, int, int]]:
+        """(input, output, total) micro-dollars, or None when the model has no price."""
+        price = self._prices.get((provider.lower(), model.lower()))
+        if price is None:
+            return None
+        return self.price_micros(price, input_tokens, output_tokens)
+
+    def cost(self, provider: str, model: str, input_tokens: int, output_tokens: int) -> Optional[float]:
+        """Total cost in dollars, or None when the model has no price."""
+        micros = self.cost_micros(provider, model, input_tokens, output_tokens)
+        return None if micros is None else micros[2] / MICROS_PER_DOLLAR
+
+    def bulk_cost_micros(
+        self, provider: str, model: str, input_tokens: Sequence[int], output_tokens: Sequence[int]
+    ) -> Optional[List[int]]:
+        """
+        Total micro-dollars for each (input, output) pair, with one price lookup.
+
+        Meant for analytics over columns of token counts; the loop is plain integer
+        arithmetic with no per-item lookups or Decimal allocation.
+        """
+        if len(input_tokens) != len(output_tokens):
+            raise ValueError("input_tokens and output_tokens must have the same length")
+        price = self._prices.get((provider.lower(), model.lower()))
+        if price is None:
+            return None
+        inp, out, half = price.input_picos, price.output_picos, PICOS_PER_MICRO // 2
+        return [(i * inp + o * out + half) // PICOS_PER_MICRO for i, o in zip(input_tokens, output_tokens)]
+
+
+# Global pricing registry - initialized lazily
+_pricing_registry: Optional[PricingRegistry] = None
+
+
+def get_pricing_registry() -> PricingRegistry:
+    """Get the global pricing registry."""
+    global _pricing_registry
+    if _pricing_registry is None:
+        _pricing_registry = PricingRegistry()
+    return _pricing_registry
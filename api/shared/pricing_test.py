@@ -0,0 +1,53 @@
+"""
+Tests for pricing.py - shared pricing registry and micro-dollar cost math
+"""
+
+from decimal import Decimal
+
+import pytest
+
+from shared.pricing import ModelPrice, PricingRegistry
+
+
+class TestPricingRegistry:
+    """Test suite for the compiled pricing registry."""
+
+    def test_cost_matches_per_1k_pricing(self):
+        registry = PricingRegistry()
+
+        assert registry.cost_micros("google", "gemini-1.5-pro", 1500, 750) == (1875, 3750, 5625)
+        assert registry.cost("OpenAI", "gpt-4", 1000, 500) == 0.06
+
+    def test_rounds_half_up_to_micro_dollars(self):
+        registry = PricingRegistry({"p": {"m": ("0.0005", "0", 4096)}})
+
+        # 1 token at $0.0005/1K is $0.0000005, which rounds up to one micro-dollar
+        assert registry.cost_micros("p", "m", 1, 0) == (1, 0, 1)
+
+    def test_unknown_model_has_no_price(self):
+        registry = PricingRegistry()
+
+        assert registry.get("openai", "unknown-model") is None
+        assert registry.cost("openai", "unknown-model", 10, 10) is None
+
+    def test_bulk_cost_matches_single_cost(self):
+        registry = PricingRegistry()
+        inputs, outputs = [1000, 3, 0, 12345], [500, 7, 1, 678]
+
+        bulk = registry.bulk_cost_micros("openai", "gpt-4o", inputs, outputs)
+
+        assert bulk == [registry.cost_micros("openai", "gpt-4o", i, o)[2] for i, o in zip(inputs, outputs)]
+        with pytest.raises(ValueError):
+            registry.bulk_cost_micros("openai", "gpt-4o", [1], [])
+
+    def test_update_is_visible_in_every_view(self):
+        registry = PricingRegistry()
+
+        registry.update("anthropic", "claude-3-haiku", Decimal("0.001"), Decimal("0.002"))
+
+        assert registry.get("anthropic", "claude-3-haiku") == ModelPrice(1_000_000, 2_000_000, 200000)
+        assert registry.provider_table()["anthropic"]["claude-3-haiku"] == {
+            "input": Decimal("0.001"),
+            "output": Decimal("0.002"),
+        }
+        assert registry.model_table()["claude-3-haiku"]["input_cost_per_1k"] == 0.001
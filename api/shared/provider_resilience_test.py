@@ -0,0 +1,254 @@
+"""
+Tests for llm_providers/resilience.py - adaptive concurrency limits and circuit breaking
+"""
+
+import asyncio
+from typing import Any, Dict
+from unittest.mock import patch
+
+import pytest
+
+from shared.llm_providers.base_provider import BaseLLMProvider, LLMResponse, ModelInfo, TokenUsage
+from shared.llm_providers.resilience import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    AdaptiveConcurrencyLimiter,
+    CircuitBreaker,
+    ConcurrencyConfig,
+    ModelGuard,
+    ProviderError,
+    ProviderUnavailableError,
+    parse_retry_after,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FlakyProvider(BaseLLMProvider):
+    """Provider whose upstream call fails with queued errors before succeeding."""
+
+    def __init__(self, errors=(), delay=0.0):
+        super().__init__("OpenAI")
+        self.errors = list(errors)
+        self.delay = delay
+        self.calls = 0
+        self.active = 0
+        self.peak = 0
+        self.enabled = True
+        self.models = self._get_available_models()
+        self.default_model = "gpt-4o"
+        self._initialized = True
+
+    @property
+    def provider_name(self) -> str:
+        return "openai"
+
+    def _get_available_models(self) -> Dict[str, ModelInfo]:
+        return {
+            "gpt-4o": ModelInfo(
+                name="gpt-4o", display_name="GPT-4o", max_tokens=4096, cost_per_input_token=0.005, cost_per_output_token=0.015
+            )
+        }
+
+    async def _execute_request(self, prompt: str, model: str, context: Dict[str, Any], stream: bool = False):
+        self.calls += 1
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+            if self.errors:
+                raise self.errors.pop(0)
+            return LLMResponse.create(self.name, model, "ok", TokenUsage(10, 5), cost=0.001)
+        finally:
+            self.active -= 1
+
+
+def config(**overrides) -> ConcurrencyConfig:
+    return ConcurrencyConfig(**{"retry_backoff": 0.0, **overrides})
+
+
+class TestParseRetryAfter:
+    """Test suite for retry-after header parsing."""
+
+    def test_seconds_and_milliseconds(self):
+        assert parse_retry_after({"retry-after": "7"}) == 7.0
+        assert parse_retry_after({"retry-after-ms": "250", "retry-after": "7"}) == 0.25
+        assert parse_retry_after({}) is None
+        assert parse_retry_after({"retry-after": "soon"}) is None
+
+    def test_http_date(self):
+        with patch("shared.llm_providers.resilience.time.time", return_value=1_700_000_000):
+            assert parse_retry_after({"retry-after": "Tue, 14 Nov 2023 22:13:50 GMT"}) == 30.0
+
+
+class TestAdaptiveConcurrencyLimiter:
+    """Test suite for the AIMD limit."""
+
+    def test_grows_only_when_saturated_and_backs_off_on_overload(self):
+        limiter = AdaptiveConcurrencyLimiter(config(initial_limit=4))
+        limiter.on_success(0.1)
+        limiter.on_success(0.1)
+        assert limiter.limit == 4  # idle: no reason to grow
+
+        limiter.in_flight = 4
+        limiter.on_success(0.1)
+        assert limiter.limit == 4.25
+
+        limiter.on_overload()
+        assert limiter.limit == 2.125
+
+    def test_latency_inflation_shrinks_limit(self):
+        limiter = AdaptiveConcurrencyLimiter(config(initial_limit=10))
+        limiter.on_success(0.1)
+
+        limiter.on_success(0.5)
+
+        assert limiter.limit == 9.0
+        assert limiter.baseline_latency == 0.1
+
+    @pytest.mark.asyncio
+    async def test_queued_acquire_times_out(self):
+        limiter = AdaptiveConcurrencyLimiter(config(initial_limit=1))
+        await limiter.acquire()
+
+        with pytest.raises(ProviderUnavailableError):
+            await limiter.acquire(timeout=0.01)
+
+        assert limiter.queued == 0
+        limiter.release()
+        assert limiter.in_flight == 0
+
+
+class TestCircuitBreaker:
+    """Test suite for circuit breaker state transitions."""
+
+    def test_opens_after_threshold_then_probes(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(config(failure_threshold=2, reset_timeout=10), clock)
+        breaker.on_failure()
+        assert breaker.state == CLOSED
+        breaker.on_failure()
+        assert breaker.state == OPEN
+
+        with pytest.raises(ProviderUnavailableError):
+            breaker.before_call()
+
+        clock.now += 10
+        breaker.before_call()
+        assert breaker.state == HALF_OPEN
+        with pytest.raises(ProviderUnavailableError):
+            breaker.before_call()  # only one probe at a time
+
+        breaker.on_failure()
+        assert breaker.state == OPEN
+        assert breaker.retry_in() == 20  # reset timeout doubles on repeated trips
+
+        clock.now += 20
+        breaker.before_call()
+        breaker.on_success()
+        assert breaker.state == CLOSED
+
+    def test_retry_after_blocks_until_given_time(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(config(failure_threshold=5), clock)
+
+        breaker.on_failure(retry_after=3)
+
+        assert breaker.state == OPEN
+        assert breaker.retry_in() == 3
+
+
+class TestModelGuard:
+    """Test suite for guarded provider calls."""
+
+    @pytest.mark.asyncio
+    async def test_retries_overload_then_succeeds(self):
+        guard = ModelGuard("openai/gpt-4o", config(max_retries=2))
+        outcomes = [ProviderError("busy", 503), ProviderError("busy", 429, retry_after=0), "ok"]
+
+        async def request():
+            outcome = outcomes.pop(0)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+
+        assert await guard.call(request) == "ok"
+        assert guard.retries == 2
+        assert guard.overloads == 2
+        assert guard.breaker.state == CLOSED
+
+    @pytest.mark.asyncio
+    async def test_client_errors_and_long_retry_after_are_not_retried(self):
+        guard = ModelGuard("openai/gpt-4o", config(max_retry_after=5))
+
+        async def bad_request():
+            raise ProviderError("bad request", 400)
+
+        async def throttled():
+            raise ProviderError("slow down", 429, retry_after=60)
+
+        with pytest.raises(ProviderError):
+            await guard.call(bad_request)
+        with pytest.raises(ProviderError):
+            await guard.call(throttled)
+
+        assert guard.retries == 0
+        assert guard.breaker.state == OPEN
+        with pytest.raises(ProviderUnavailableError):
+            await guard.call(bad_request)
+
+    @pytest.mark.asyncio
+    async def test_stream_holds_slot_until_exhausted(self):
+        guard = ModelGuard("openai/gpt-4o", config())
+
+        async def chunks():
+            yield "a"
+            yield "b"
+
+        async def request():
+            return chunks()
+
+        stream = guard.stream(request)
+        assert await stream.__anext__() == "a"
+        assert guard.limiter.in_flight == 1
+        assert [chunk async for chunk in stream] == ["b"]
+        assert guard.limiter.in_flight == 0
+
+
+class TestProviderIntegration:
+    """Test suite for the guard inside BaseLLMProvider.execute_prompt."""
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_capped_per_model(self):
+        provider = FlakyProvider(delay=0.01)
+        provider.concurrency_config = config(initial_limit=3, max_limit=3)
+
+        await asyncio.gather(*(provider.execute_prompt(f"p{i}", {"cache": False}) for i in range(10)))
+
+        assert provider.peak == 3
+        assert provider.calls == 10
+
+    @pytest.mark.asyncio
+    async def test_open_circuit_fails_fast_and_shows_in_status(self):
+        provider = FlakyProvider(errors=[ProviderError("down", 500)] * 3)
+        provider.concurrency_config = config(failure_threshold=3, max_retries=2)
+
+        with pytest.raises(ProviderError) as exc_info:
+            await provider.execute_prompt("hi")
+        assert exc_info.value.status_code == 500
+
+        with pytest.raises(ProviderError, match="circuit open"):
+            await provider.execute_prompt("hi")
+
+        assert provider.calls == 3
+        status = provider.get_status()
+        assert status["circuit_state"] == OPEN
+        assert status["concurrency"]["gpt-4o"]["overloads"] == 3
+        assert status["concurrency"]["gpt-4o"]["rejections"] == 1
@@ -0,0 +1,475 @@
+"""
+Shared storage backends for rate limiting.
+
+By default every Functions instance keeps its rate limit state in process
+memory, so scaling out to N instances multiplies every limit by N. Setting
+``RATE_LIMIT_BACKEND`` moves the counters into a store all instances share:
+
+- ``local`` (default): process-local state, the original behaviour
+- ``memory``: a process-wide ``InMemoryRateLimitStore`` (tests, single host)
+- ``cosmos``: ``CosmosRateLimitStore`` on the RateLimits container
+
+Fixed and sliding windows are per-window counters that the store increments
+atomically; the sliding window weights the previous window's count by how much
+of it still overlaps. Token buckets refill and deduct in a single conditional
+update. ``SharedRateLimitClient`` sits in front of the store and batches
+increments locally (``RATE_LIMIT_SYNC_BATCH`` hits or ``RATE_LIMIT_SYNC_SECONDS``,
+whichever comes first) and leases tokens in small blocks, so a request only
+costs a store round-trip once per batch. Each instance can overshoot a limit by
+at most one unsynced batch; batches shrink for small limits so tight rules such
+as login attempts stay exact.
+
+The client is async: store calls run in a worker thread (``asyncio.to_thread``)
+under an ``asyncio.Lock`` for that key only, so a round-trip for one key never
+holds up checks for other keys or blocks the event loop.
+"""
+
+import asyncio
+import hashlib
+import logging
+import math
+import os
+import threading
+import time
+import weakref
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from azure.core import MatchConditions
+from azure.cosmos.exceptions import (
+    CosmosAccessConditionFailedError,
+    CosmosHttpResponseError,
+    CosmosResourceExistsError,
+    CosmosResourceNotFoundError,
+)
+from cachetools import TTLCache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SYNC_BATCH = 10
+DEFAULT_SYNC_SECONDS = 1.0
+DEFAULT_LEASE_SIZE = 10
+DEFAULT_ETAG_RETRIES = 5
+# Local state for keys that have gone quiet is dropped after this long
+LOCAL_STATE_TTL_SECONDS = 3600
+LOCAL_STATE_MAX_KEYS = 200_000
+
+
+class RateLimitStore(ABC):
+    """Atomic counter and token bucket operations shared by all instances."""
+
+    name = "store"
+
+    @abstractmethod
+    def incr_counter(self, key: str, window_start: int, amount: int, ttl_seconds: int) -> int:
+        """Add ``amount`` to the counter for ``key`` in the window starting at ``window_start``; returns the new total."""
+
+    @abstractmethod
+    def get_counters(self, key: str, window_starts: Iterable[int]) -> Dict[int, int]:
+        """Current totals for the given windows (0 for windows with no hits)."""
+
+    @abstractmethod
+    def take_tokens(
+        self, key: str, requested: int, capacity: int, refill_rate: float, now: float, ttl_seconds: int
+    ) -> Tuple[int, float]:
+        """
+        Refill the bucket for ``key`` and take up to ``requested`` whole tokens.
+
+        Returns (tokens granted, tokens left in the bucket).
+        """
+
+
+class InMemoryRateLimitStore(RateLimitStore):
+    """Thread-safe in-process store; shared between limiter instances it stands in for a remote one."""
+
+    name = "memory"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[Tuple[str, int], Tuple[int, float]] = {}
+        self._buckets: Dict[str, Tuple[float, float, float]] = {}
+        self._last_purge = time.time()
+        self.calls = 0
+
+    def _purge(self, now: float) -> None:
+        if now - self._last_purge < 60:
+            return
+        self._counters = {k: v for k, v in self._counters.items() if v[1] > now}
+        self._buckets = {k: v for k, v in self._buckets.items() if v[2] > now}
+        self._last_purge = now
+
+    def incr_counter(self, key: str, window_start: int, amount: int, ttl_seconds: int) -> int:
+        now = time.time()
+        with self._lock:
+            self.calls += 1
+            self._purge(now)
+            count, _ = self._counters.get((key, window_start), (0, 0.0))
+            count += amount
+            self._counters[(key, window_start)] = (count, now + ttl_seconds)
+            return count
+
+    def get_counters(self, key: str, window_starts: Iterable[int]) -> Dict[int, int]:
+        now = time.time()
+        with self._lock:
+            self.calls += 1
+            result = {}
+            for window_start in window_starts:
+                count, expires = self._counters.get((key, window_start), (0, 0.0))
+                result[window_start] = count if expires > now else 0
+            return result
+
+    def take_tokens(
+        self, key: str, requested: int, capacity: int, refill_rate: float, now: float, ttl_seconds: int
+    ) -> Tuple[int, float]:
+        with self._lock:
+            self.calls += 1
+            tokens, updated, expires = self._buckets.get(key, (float(capacity), now, 0.0))
+            if expires and expires <= time.time():
+                tokens, updated = float(capacity), now
+            tokens = min(capacity, tokens + max(0.0, now - updated) * refill_rate)
+            granted = min(requested, int(tokens))
+            tokens -= granted
+            self._buckets[key] = (tokens, now, time.time() + ttl_seconds)
+            return granted, tokens
+
+
+def _doc_id(key: str, suffix: Any) -> str:
+    # Rate limit keys can contain URL paths; Cosmos ids may not contain '/', '\\', '?' or '#'
+    digest = hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]
+    return f"rl_{digest}_{suffix}"
+
+
+class CosmosRateLimitStore(RateLimitStore):
+    """
+    Rate limit state in a Cosmos container partitioned on ``/id``.
+
+    Counters are incremented with patch ``incr`` (atomic on the service side),
+    falling back to ETag-guarded replaces where patch is rejected. Token
+    buckets always use ETag-guarded replaces. Documents carry a ``ttl`` so the
+    container expires old windows by itself. The synchronous SDK is used
+    because the limiters are called from synchronous code; batching in
+    ``SharedRateLimitClient`` keeps those calls off the per-request path.
+    """
+
+    name = "cosmos"
+
+    def __init__(self, container: Any, use_patch: bool = True, max_etag_retries: int = DEFAULT_ETAG_RETRIES):
+        self.container = container
+        self.use_patch = use_patch
+        self.max_etag_retries = max_etag_retries
+
+    def incr_counter(self, key: str, window_start: int, amount: int, ttl_seconds: int) -> int:
+        doc_id = _doc_id(key, window_start)
+        if self.use_patch:
+            try:
+                return self._incr_patch(doc_id, key, window_start, amount, ttl_seconds)
+            except CosmosHttpResponseError as e:
+                if isinstance(e, CosmosResourceNotFoundError) or e.status_code not in (400, 405, 501):
+                    raise
+                logger.warning(f"Cosmos patch unavailable ({e.status_code}), using ETag updates for rate limits")
+                self.use_patch = False
+        return self._incr_etag(doc_id, key, window_start, amount, ttl_seconds)
+
+    def _new_counter(self, doc_id: str, key: str, window_start: int, amount: int, ttl_seconds: int) -> Dict[str, Any]:
+        return {
+            "id": doc_id,
+            "type": "rate_limit_window",
+            "key": key,
+            "window_start": window_start,
+            "count": amount,
+            "ttl": ttl_seconds,
+        }
+
+    def _incr_patch(self, doc_id: str, key: str, window_start: int, amount: int, ttl_seconds: int) -> int:
+        operations = [{"op": "incr", "path": "/count", "value": amount}]
+        try:
+            return self.container.patch_item(item=doc_id, partition_key=doc_id, patch_operations=operations)["count"]
+        except CosmosResourceNotFoundError:
+            pass
+        try:
+            self.container.create_item(self._new_counter(doc_id, key, window_start, amount, ttl_seconds))
+            return amount
+        except CosmosResourceExistsError:
+            # Another instance created the window first
+            return self.container.patch_item(item=doc_id, partition_key=doc_id, patch_operations=operations)["count"]
+
+    def _incr_etag(self, doc_id: str, key: str, window_start: int, amount: int, ttl_seconds: int) -> int:
+        for _ in range(self.max_etag_retries):
+            try:
+                doc = self.container.read_item(item=doc_id, partition_key=doc_id)
+            except CosmosResourceNotFoundError:
+                try:
+                    self.container.create_item(self._new_counter(doc_id, key, window_start, amount, ttl_seconds))
+                    return amount
+                except CosmosResourceExistsError:
+                    continue
+            etag = doc.get("_etag")
+            doc["count"] = doc.get("count", 0) + amount
+            try:
+                self.container.replace_item(item=doc_id, body=doc, etag=etag, match_condition=MatchConditions.IfNotModified)
+                return doc["count"]
+            except CosmosAccessConditionFailedError:
+                continue
+        raise RuntimeError(f"Gave up incrementing rate limit counter {doc_id} after {self.max_etag_retries} ETag conflicts")
+
+    def get_counters(self, key: str, window_starts: Iterable[int]) -> Dict[int, int]:
+        result = {}
+        for window_start in window_starts:
+            doc_id = _doc_id(key, window_start)
+            try:
+                result[window_start] = self.container.read_item(item=doc_id, partition_key=doc_id).get("count", 0)
+            except CosmosResourceNotFoundError:
+                result[window_start] = 0
+        return result
+
+    def take_tokens(
+        self, key: str, requested: int, capacity: int, refill_rate: float, now: float, ttl_seconds: int
+    ) -> Tuple[int, float]:
+        doc_id = _doc_id(key, "bucket")
+        for _ in range(self.max_etag_retries):
+            try:
+                doc = self.container.read_item(item=doc_id, partition_key=doc_id)
+            except CosmosResourceNotFoundError:
+                granted = min(requested, capacity)
+                doc = {
+                    "id": doc_id,
+                    "type": "rate_limit_bucket",
+                    "key": key,
+                    "tokens": capacity - granted,
+                    "updated_at": now,
+                    "ttl": ttl_seconds,
+                }
+                try:
+                    self.container.create_item(doc)
+                    return granted, doc["tokens"]
+                except CosmosResourceExistsError:
+                    continue
+
+            etag = doc.get("_etag")
+            tokens = min(capacity, doc.get("tokens", capacity) + max(0.0, now - doc.get("updated_at", now)) * refill_rate)
+            granted = min(requested, int(tokens))
+            doc.update({"tokens": tokens - granted, "updated_at": now, "ttl": ttl_seconds})
+            try:
+                self.container.replace_item(item=doc_id, body=doc, etag=etag, match_condition=MatchConditions.IfNotModified)
+                return granted, doc["tokens"]
+            except CosmosAccessConditionFailedError:
+                continue
+        raise RuntimeError(f"Gave up taking rate limit tokens for {doc_id} after {self.max_etag_retries} ETag conflicts")
+
+
+@dataclass
+class SharedLimitStatus:
+    """Outcome of a shared rate limit check."""
+
+    allowed: bool
+    count: int
+    remaining: int
+    reset_at: float
+
+
+@dataclass
+class _WindowState:
+    window_start: int
+    synced: int = 0  # cluster-wide total as of the last sync
+    pending: int = 0  # hits allowed here but not yet added to the store
+    previous: int = 0  # cluster-wide total of the previous window (sliding only)
+    last_sync: float = 0.0
+    needs_previous: bool = False
+
+
+@dataclass
+class _Lease:
+    tokens: int
+    bucket_remaining: float
+    retry_at: float = 0.0  # an empty bucket isn't asked again before a token can have refilled
+
+
+class SharedRateLimitClient:
+    """Locally batched access to a RateLimitStore."""
+
+    def __init__(
+        self,
+        store: RateLimitStore,
+        sync_batch_size: Optional[int] = None,
+        sync_interval: Optional[float] = None,
+        lease_size: Optional[int] = None,
+    ):
+        self.store = store
+        self.sync_batch_size = sync_batch_size or int(os.getenv("RATE_LIMIT_SYNC_BATCH", DEFAULT_SYNC_BATCH))
+        if sync_interval is None:
+            sync_interval = float(os.getenv("RATE_LIMIT_SYNC_SECONDS", DEFAULT_SYNC_SECONDS))
+        self.sync_interval = sync_interval
+        self.lease_size = lease_size or int(os.getenv("RATE_LIMIT_LEASE_SIZE", DEFAULT_LEASE_SIZE))
+        # One lock per key, alive only while a check for that key holds or waits on it
+        self._locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+        self._windows: TTLCache = TTLCache(maxsize=LOCAL_STATE_MAX_KEYS, ttl=LOCAL_STATE_TTL_SECONDS)
+        self._leases: TTLCache = TTLCache(maxsize=LOCAL_STATE_MAX_KEYS, ttl=LOCAL_STATE_TTL_SECONDS)
+        self.metrics = {"checks": 0, "store_calls": 0, "store_errors": 0}
+
+    def _batch_for(self, limit: int) -> int:
+        # Small limits sync every hit so the per-instance overshoot stays negligible
+        return max(1, min(self.sync_batch_size, limit // 10))
+
+    def _lock_for(self, key: str) -> asyncio.Lock:
+        lock = self._locks.get(key)
+        if lock is None:
+            lock = self._locks[key] = asyncio.Lock()
+        return lock
+
+    async def _sync(self, key: str, state: _WindowState, window_seconds: int, now: float) -> bool:
+        """Push pending hits and refresh the cluster-wide totals; on failure keep counting locally."""
+        state.last_sync = now
+        try:
+            self.metrics["store_calls"] += 1
+            if state.pending:
+                state.synced = await asyncio.to_thread(
+                    self.store.incr_counter, key, state.window_start, state.pending, window_seconds * 2
+                )
+                state.pending = 0
+            else:
+                counters = await asyncio.to_thread(self.store.get_counters, key, [state.window_start])
+                state.synced = counters[state.window_start]
+            if state.needs_previous:
+                self.metrics["store_calls"] += 1
+                previous_start = state.window_start - window_seconds
+                counters = await asyncio.to_thread(self.store.get_counters, key, [previous_start])
+                state.previous = counters[previous_start]
+                state.needs_previous = False
+            return True
+        except Exception as e:
+            self.metrics["store_errors"] += 1
+            logger.warning(f"Rate limit store unavailable, using local counts for {key}: {e}")
+            return False
+
+    async def hit(
+        self, key: str, limit: int, window_seconds: int, sliding: bool = False, now: Optional[float] = None
+    ) -> SharedLimitStatus:
+        """Count one request against a fixed or sliding window limit."""
+        now = time.time() if now is None else now
+        window_start = int(now // window_seconds) * window_seconds
+        batch = self._batch_for(limit)
+        self.metrics["checks"] += 1
+        async with self._lock_for(key):
+            state = self._windows.get(key)
+            if state is None or state.window_start != window_start:
+                previous = 0
+                if state is not None:
+                    if state.pending:
+                        # Land the last hits of the old window before moving on
+                        await self._sync(key, state, window_seconds, now)
+                    if state.window_start == window_start - window_seconds:
+                        # Good enough until the first sync reads the cluster-wide figure
+                        previous = state.synced + state.pending
+                state = _WindowState(window_start=window_start, previous=previous, last_sync=now, needs_previous=sliding)
+                self._windows[key] = state
+            elif batch > 1 and now - state.last_sync >= self.sync_interval:
+                await self._sync(key, state, window_seconds, now)
+
+            weight = 1.0 - (now - window_start) / window_seconds if sliding else 0.0
+            state.pending += 1
+            if batch == 1 and await self._sync(key, state, window_seconds, now):
+                # Reserved in the store first, so two instances can't both take the last slot
+                count = state.synced + int(state.previous * weight)
+                allowed = count <= limit
+                if not allowed:
+                    await self._release(key, state, window_seconds)
+                    count -= 1
+            else:
+                count = state.synced + state.pending + int(state.previous * weight)
+                allowed = count <= limit
+                if not allowed:
+                    state.pending -= 1
+                    count -= 1
+                elif batch > 1 and state.pending >= batch:
+                    await self._sync(key, state, window_seconds, now)
+
+        return SharedLimitStatus(
+            allowed=allowed, count=count, remaining=max(0, limit - count), reset_at=window_start + window_seconds
+        )
+
+    async def _release(self, key: str, state: _WindowState, window_seconds: int) -> None:
+        """Hand back a reservation for a rejected hit so it doesn't count against the window."""
+        state.synced -= 1
+        try:
+            self.metrics["store_calls"] += 1
+            await asyncio.to_thread(self.store.incr_counter, key, state.window_start, -1, window_seconds * 2)
+        except Exception as e:
+            self.metrics["store_errors"] += 1
+            logger.warning(f"Rate limit store unavailable, could not release reservation for {key}: {e}")
+
+    async def take_token(self, key: str, capacity: int, refill_rate: float, now: Optional[float] = None) -> SharedLimitStatus:
+        """Consume one token from a cluster-wide token bucket, leasing tokens in blocks."""
+        now = time.time() if now is None else now
+        self.metrics["checks"] += 1
+        async with self._lock_for(key):
+            lease = self._leases.get(key)
+            if lease is None or (lease.tokens < 1 and now >= lease.retry_at):
+                size = max(1, min(self.lease_size, capacity // 10))
+                ttl = int(math.ceil(capacity / refill_rate)) if refill_rate > 0 else LOCAL_STATE_TTL_SECONDS
+                try:
+                    self.metrics["store_calls"] += 1
+                    granted, bucket_remaining = await asyncio.to_thread(
+                        self.store.take_tokens, key, size, capacity, refill_rate, now, ttl * 2
+                    )
+                    lease = _Lease(tokens=granted, bucket_remaining=bucket_remaining)
+                    if not granted:
+                        lease.retry_at = now + (1 - bucket_remaining) / refill_rate if refill_rate > 0 else math.inf
+                except Exception as e:
+                    self.metrics["store_errors"] += 1
+                    logger.warning(f"Rate limit store unavailable, allowing request for {key}: {e}")
+                    lease = _Lease(tokens=1, bucket_remaining=0.0)
+                self._leases[key] = lease
+
+            allowed = lease.tokens >= 1
+            if allowed:
+                lease.tokens -= 1
+            remaining = int(lease.tokens + lease.bucket_remaining)
+
+        return SharedLimitStatus(
+            allowed=allowed,
+            count=max(0, capacity - remaining),
+            remaining=remaining,
+            reset_at=now + (capacity - remaining) / refill_rate if refill_rate > 0 else now,
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"backend": self.store.name, "tracked_keys": len(self._windows) + len(self._leases), **self.metrics}
+
+
+_store: Optional[RateLimitStore] = None
+_store_loaded = False
+
+
+def get_rate_limit_store() -> Optional[RateLimitStore]:
+    """Shared store selected by ``RATE_LIMIT_BACKEND``; None means process-local limiting."""
+    global _store, _store_loaded
+    if _store_loaded:
+        return _store
+
+    backend = os.getenv("RATE_LIMIT_BACKEND", "local").lower()
+    try:
+        if backend == "memory":
+            _store = InMemoryRateLimitStore()
+        elif backend == "cosmos":
+            from azure.cosmos import CosmosClient
+
+            from .async_database import DATABASE_NAME
+
+            connection_string = os.getenv("COSMOS_DB_CONNECTION_STRING")
+            if not connection_string:
+                raise ValueError("COSMOS_DB_CONNECTION_STRING environment variable is required")
+            container = (
+                CosmosClient.from_connection_string(connection_string)
+                .get_database_client(DATABASE_NAME)
+                .get_container_client(os.getenv("RATE_LIMIT_CONTAINER", "RateLimits"))
+            )
+            _store = CosmosRateLimitStore(container, use_patch=os.getenv("RATE_LIMIT_USE_PATCH", "true").lower() != "false")
+        elif backend != "local":
+            logger.warning(f"Unknown RATE_LIMIT_BACKEND '{backend}', using process-local rate limiting")
+    except Exception as e:
+        logger.error(f"Failed to initialize {backend} rate limit store, using process-local rate limiting: {e}")
+        _store = None
+
+    _store_loaded = True
+    return _store
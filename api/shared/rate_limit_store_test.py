@@ -0,0 +1,260 @@
+"""
+Tests for rate_limit_store.py - shared rate limit state across instances
+"""
+
+import asyncio
+import copy
+import itertools
+import os
+import threading
+from unittest.mock import patch
+
+import pytest
+from azure.cosmos.exceptions import (
+    CosmosAccessConditionFailedError,
+    CosmosHttpResponseError,
+    CosmosResourceExistsError,
+    CosmosResourceNotFoundError,
+)
+
+import shared.rate_limit_store as rate_limit_store
+from shared.middleware import RateLimiter as MiddlewareRateLimiter
+from shared.rate_limit_store import (
+    CosmosRateLimitStore,
+    InMemoryRateLimitStore,
+    SharedRateLimitClient,
+    get_rate_limit_store,
+)
+from shared.rate_limiter import RateLimiter, RateLimitRule, RateLimitScope, RateLimitStrategy
+
+_etags = itertools.count(1)
+
+
+class FakeSyncContainer:
+    """Synchronous container with the patch/ETag semantics the store relies on."""
+
+    def __init__(self, supports_patch=True):
+        self.items = {}
+        self.supports_patch = supports_patch
+        self.replace_conflicts = 0
+
+    def _store(self, body):
+        body = copy.deepcopy(body)
+        body["_etag"] = str(next(_etags))
+        self.items[body["id"]] = body
+        return body
+
+    def create_item(self, body):
+        if body["id"] in self.items:
+            raise CosmosResourceExistsError(message="exists")
+        return self._store(body)
+
+    def read_item(self, item, partition_key):
+        if item not in self.items:
+            raise CosmosResourceNotFoundError(message="not found")
+        return copy.deepcopy(self.items[item])
+
+    def replace_item(self, item, body, etag=None, match_condition=None):
+        if self.replace_conflicts:
+            self.replace_conflicts -= 1
+            self.items[item]["_etag"] = str(next(_etags))
+        if etag is not None and self.items[item]["_etag"] != etag:
+            raise CosmosAccessConditionFailedError(message="precondition failed")
+        return self._store(body)
+
+    def patch_item(self, item, partition_key, patch_operations):
+        if not self.supports_patch:
+            raise CosmosHttpResponseError(status_code=400, message="patch not supported")
+        if item not in self.items:
+            raise CosmosResourceNotFoundError(message="not found")
+        doc = self.items[item]
+        for op in patch_operations:
+            doc[op["path"].strip("/")] += op["value"]
+        doc["_etag"] = str(next(_etags))
+        return copy.deepcopy(doc)
+
+
+class TestSharedRateLimitClient:
+    """Test suite for batched access to a shared store."""
+
+    @pytest.mark.asyncio
+    async def test_limit_holds_across_instances(self):
+        store = InMemoryRateLimitStore()
+        instances = [SharedRateLimitClient(store, sync_batch_size=10, sync_interval=0) for _ in range(3)]
+
+        allowed = sum([(await instances[i % 3].hit("ip:1.2.3.4", 100, 60, now=1000.0)).allowed for i in range(300)])
+
+        # Each instance can run at most one unsynced batch past the limit
+        assert 100 <= allowed <= 100 + 3 * 10
+
+    @pytest.mark.asyncio
+    async def test_increments_are_batched(self):
+        store = InMemoryRateLimitStore()
+        client = SharedRateLimitClient(store, sync_batch_size=10, sync_interval=60)
+
+        for _ in range(50):
+            assert (await client.hit("ip:1.2.3.4", 1000, 60, now=1000.0)).allowed
+
+        assert store.calls == 5
+        assert store.get_counters("ip:1.2.3.4", [960])[960] == 50
+
+    @pytest.mark.asyncio
+    async def test_small_limits_are_exact(self):
+        store = InMemoryRateLimitStore()
+        instances = [SharedRateLimitClient(store, sync_batch_size=10, sync_interval=60) for _ in range(2)]
+
+        results = [(await instances[i % 2].hit("auth:ip:1.2.3.4", 10, 300, now=1000.0)).allowed for i in range(20)]
+
+        assert results.count(True) == 10
+
+    @pytest.mark.asyncio
+    async def test_sliding_window_counts_previous_window(self):
+        store = InMemoryRateLimitStore()
+        store.incr_counter("ip:1.2.3.4", 0, 100, 120)
+        client = SharedRateLimitClient(store, sync_batch_size=1, sync_interval=0)
+
+        # 15s into the next window, 75% of the previous window still counts
+        status = await client.hit("ip:1.2.3.4", 100, 60, sliding=True, now=75.0)
+        assert status.allowed
+        assert status.count == 76
+        assert (await client.hit("ip:1.2.3.4", 100, 60, sliding=True, now=75.0)).count == 77
+
+    @pytest.mark.asyncio
+    async def test_token_bucket_leases_tokens(self):
+        store = InMemoryRateLimitStore()
+        instances = [SharedRateLimitClient(store, lease_size=10) for _ in range(2)]
+
+        results = [(await instances[i % 2].take_token("ip:1.2.3.4", 100, 0.0, now=1000.0)).allowed for i in range(150)]
+
+        assert results.count(True) == 100
+        assert store.calls < 30
+
+    @pytest.mark.asyncio
+    async def test_store_errors_fall_back_to_local_counts(self):
+        store = InMemoryRateLimitStore()
+        client = SharedRateLimitClient(store, sync_batch_size=1, sync_interval=0)
+
+        with patch.object(store, "incr_counter", side_effect=RuntimeError("store down")):
+            results = [(await client.hit("ip:1.2.3.4", 10, 60, now=1000.0)).allowed for _ in range(12)]
+
+        assert results.count(True) == 10
+        assert client.get_stats()["store_errors"] == 12
+
+    @pytest.mark.asyncio
+    async def test_store_round_trip_does_not_hold_other_keys(self):
+        store = InMemoryRateLimitStore()
+        client = SharedRateLimitClient(store, sync_batch_size=1, sync_interval=0)
+        entered, release = threading.Event(), threading.Event()
+        incr_counter = store.incr_counter
+
+        def slow_incr(key, *args):
+            if key == "ip:slow":
+                entered.set()
+                release.wait(5)
+            return incr_counter(key, *args)
+
+        with patch.object(store, "incr_counter", side_effect=slow_incr):
+            slow = asyncio.create_task(client.hit("ip:slow", 10, 60, now=1000.0))
+            await asyncio.to_thread(entered.wait, 5)
+            # The slow key's round trip is in flight; another key is checked meanwhile
+            assert (await client.hit("ip:fast", 10, 60, now=1000.0)).allowed
+            assert not slow.done()
+            release.set()
+            assert (await slow).allowed
+
+
+class TestCosmosRateLimitStore:
+    """Test suite for the Cosmos-backed store."""
+
+    def test_counters_use_patch_increments(self):
+        container = FakeSyncContainer()
+        store = CosmosRateLimitStore(container)
+
+        assert store.incr_counter("endpoint:/api/prompts", 960, 5, 120) == 5
+        assert store.incr_counter("endpoint:/api/prompts", 960, 3, 120) == 8
+        assert store.get_counters("endpoint:/api/prompts", [900, 960]) == {900: 0, 960: 8}
+        doc = next(iter(container.items.values()))
+        assert "/" not in doc["id"]
+        assert doc["ttl"] == 120
+
+    def test_counters_fall_back_to_etag(self):
+        container = FakeSyncContainer(supports_patch=False)
+        store = CosmosRateLimitStore(container)
+        store.incr_counter("ip:1.2.3.4", 960, 1, 120)
+        container.replace_conflicts = 2
+
+        assert store.incr_counter("ip:1.2.3.4", 960, 1, 120) == 2
+        assert store.use_patch is False
+
+    def test_token_bucket_refills_and_retries_conflicts(self):
+        container = FakeSyncContainer()
+        store = CosmosRateLimitStore(container)
+
+        assert store.take_tokens("ip:1.2.3.4", 10, 20, 1.0, now=1000.0, ttl_seconds=40) == (10, 10)
+        container.replace_conflicts = 1
+        assert store.take_tokens("ip:1.2.3.4", 10, 20, 1.0, now=1005.0, ttl_seconds=40) == (10, 5)
+        assert store.take_tokens("ip:1.2.3.4", 10, 20, 1.0, now=1005.0, ttl_seconds=40) == (5, 0)
+
+
+class TestLimiterIntegration:
+    """Test suite for the limiters running against a shared store."""
+
+    @pytest.mark.asyncio
+    async def test_middleware_limit_is_cluster_wide(self):
+        store = InMemoryRateLimitStore()
+        with patch.dict(os.environ, {"SUTRA_MAX_REQUESTS_PER_MINUTE": "5"}):
+            instances = [MiddlewareRateLimiter(store=store) for _ in range(2)]
+
+        with patch("time.time", return_value=1000.0):
+            results = [await instances[i % 2].check("10.0.0.1") for i in range(10)]
+
+        assert sum(allowed for allowed, _ in results) == 5
+        allowed, info = results[-1]
+        assert info["remaining"] == 0
+        assert info["retry_after"] == 60
+        assert instances[0].clients == {}
+
+    @pytest.mark.asyncio
+    async def test_rule_strategies_share_state(self):
+        store = InMemoryRateLimitStore()
+        limiters = [RateLimiter(store=store) for _ in range(2)]
+        for limiter in limiters:
+            limiter.add_rule(
+                RateLimitRule(
+                    name="login",
+                    strategy=RateLimitStrategy.FIXED_WINDOW,
+                    scope=RateLimitScope.PER_IP,
+                    limit=5,
+                    window_seconds=300,
+                    penalty_multiplier=1.0,
+                )
+            )
+
+        results = [(await limiters[i % 2].check_rate_limit("x", ["login"], ip_address="10.0.0.1"))[0] for i in range(10)]
+
+        assert results.count(True) == 5
+        assert limiters[0].get_statistics()["backend"]["backend"] == "memory"
+
+
+class TestStoreSelection:
+    """Test suite for get_rate_limit_store."""
+
+    @pytest.fixture(autouse=True)
+    def reset_store(self):
+        with patch.object(rate_limit_store, "_store", None), patch.object(rate_limit_store, "_store_loaded", False):
+            yield
+
+    def test_local_by_default(self):
+        with patch.dict(os.environ, {}, clear=False):
+            os.environ.pop("RATE_LIMIT_BACKEND", None)
+            assert get_rate_limit_store() is None
+
+    def test_memory_backend(self):
+        with patch.dict(os.environ, {"RATE_LIMIT_BACKEND": "memory"}):
+            store = get_rate_limit_store()
+            assert isinstance(store, InMemoryRateLimitStore)
+            assert get_rate_limit_store() is store
+
+    def test_cosmos_without_connection_string_stays_local(self):
+        with patch.dict(os.environ, {"RATE_LIMIT_BACKEND": "cosmos", "COSMOS_DB_CONNECTION_STRING": ""}):
+            assert get_rate_limit_store() is None
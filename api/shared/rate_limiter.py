@@ -7,7 +7,7 @@ import hashlib
 import json
 import logging
 import time
-from collections import defaultdict, deque
+from collections import defaultdict
 from dataclasses import asdict, dataclass
 from datetime import datetime, timedelta
 from enum import Enum
@@ -16,6 +16,8 @@ from typing import Callable, Dict, List, Optional, Tuple, Union
 
 import azure.functions as func
 
+from .rate_limit_store import RateLimitStore, SharedRateLimitClient, get_rate_limit_store
+
 logger = logging.getLogger(__name__)
 
 
@@ -121,48 +123,79 @@ class TokenBucket:
 
 
 class SlidingWindowCounter:
-    """Sliding window counter for rate limiting"""
+    """
+    Sliding window counter for rate limiting.
+
+    Approximates a sliding log with two fixed-window counts: hits in the
+    current window plus the previous window's hits weighted by how much of it
+    the sliding window still covers. Memory and time per check are constant no
+    matter how large the limit, unlike keeping one timestamp per request.
+    """
+
+    __slots__ = ("window_seconds", "max_requests", "window_start", "current", "previous")
 
     def __init__(self, window_seconds: int, max_requests: int):
         self.window_seconds = window_seconds
         self.max_requests = max_requests
-        self.requests = deque()
+        self.window_start = 0
+        self.current = 0
+        self.previous = 0
+
+    def _roll(self, timestamp: float) -> None:
+        window_start = int(timestamp // self.window_seconds) * self.window_seconds
+        if window_start != self.window_start:
+            # Only the window right before the current one still overlaps the sliding window
+            self.previous = self.current if window_start - self.window_start == self.window_seconds else 0
+            self.current = 0
+            self.window_start = window_start
+
+    def _estimate(self, timestamp: float) -> int:
+        weight = 1.0 - (timestamp - self.window_start) / self.window_seconds
+        return self.current + int(self.previous * weight)
 
     def add_request(self, timestamp: float = None) -> bool:
         """Add a request and check if within limit"""
+        return self.check(time.time() if timestamp is None else timestamp)[0]
+
+    def check(self, timestamp: float) -> Tuple[bool, int]:
+        """Add a request if within limit; returns (allowed, count before this request)"""
+        # _roll and _estimate inlined: this runs on every request
+        window = self.window_seconds
+        window_start = timestamp - timestamp % window
+        if window_start != self.window_start:
+            self.previous = self.current if window_start - self.window_start == window else 0
+            self.current = 0
+            self.window_start = window_start
+        count = self.current
+        if self.previous:
+            count += int(self.previous * (1.0 - (timestamp - window_start) / window))
+        if count < self.max_requests:
+            self.current += 1
+            return True, count
+        return False, count
+
+    def get_count(self, timestamp: float = None) -> int:
+        """Get current request count in window"""
         if timestamp is None:
             timestamp = time.time()
+        self._roll(timestamp)
+        return self._estimate(timestamp)
 
-        # Remove old requests outside the window
-        window_start = timestamp - self.window_seconds
-        while self.requests and self.requests[0] <= window_start:
-            self.requests.popleft()
-
-        # Check if we can add this request
-        if len(self.requests) < self.max_requests:
-            self.requests.append(timestamp)
-            return True
-        return False
-
-    def get_count(self) -> int:
-        """Get current request count in window"""
-        now = time.time()
-        window_start = now - self.window_seconds
-        while self.requests and self.requests[0] <= window_start:
-            self.requests.popleft()
-        return len(self.requests)
+    def is_idle(self, timestamp: float) -> bool:
+        """True once no counted request can fall inside the window any more"""
+        return timestamp - self.window_start >= 2 * self.window_seconds
 
     def get_reset_time(self) -> datetime:
         """Get when the window will reset"""
-        if not self.requests:
+        if not self.get_count():
             return datetime.utcnow()
-        return datetime.fromtimestamp(self.requests[0] + self.window_seconds)
+        return datetime.fromtimestamp(self.window_start + self.window_seconds)
 
 
 class RateLimiter:
     """Advanced rate limiting system"""
 
-    def __init__(self):
+    def __init__(self, store: Optional[RateLimitStore] = None):
         self.rules: Dict[str, RateLimitRule] = {}
         self.buckets: Dict[str, TokenBucket] = {}
         self.counters: Dict[str, SlidingWindowCounter] = {}
@@ -175,6 +208,9 @@ class RateLimiter:
         # Adaptive rate limiting state
         self.adaptive_state: Dict[str, Dict] = defaultdict(dict)
 
+        # Cluster-wide counters; without a store, buckets and windows are per instance
+        self.shared = SharedRateLimitClient(store) if store is not None else None
+
         # Default rules
         self._setup_default_rules()
 
@@ -240,7 +276,7 @@ class RateLimiter:
         self.rules[rule.name] = rule
         logger.info(f"Added rate limit rule: {rule.name}")
 
-    def check_rate_limit(
+    async def check_rate_limit(
         self, identifier: str, rule_names: List[str] = None, user_id: str = None, ip_address: str = None, endpoint: str = None
     ) -> Tuple[bool, List[RateLimitStatus]]:
         """Check if request is within rate limits"""
@@ -284,7 +320,7 @@ class RateLimiter:
                     del self.penalties[penalty_key]
 
             # Check rate limit based on strategy
-            status = self._check_rule(rule, scope_identifier, user_id, ip_address, endpoint)
+            status = await self._check_rule(rule, scope_identifier, user_id, ip_address, endpoint)
             statuses.append(status)
 
             if status.is_limited:
@@ -339,26 +375,30 @@ class RateLimiter:
             return f"user:{user_id or identifier}:endpoint:{endpoint or identifier}"
         return identifier
 
-    def _check_rule(
+    async def _check_rule(
         self, rule: RateLimitRule, identifier: str, user_id: str = None, ip_address: str = None, endpoint: str = None
     ) -> RateLimitStatus:
         """Check a specific rule"""
         key = f"{rule.name}:{identifier}"
 
         if rule.strategy == RateLimitStrategy.TOKEN_BUCKET:
-            return self._check_token_bucket(rule, key)
+            return await self._check_token_bucket(rule, key)
         elif rule.strategy == RateLimitStrategy.SLIDING_WINDOW:
-            return self._check_sliding_window(rule, key)
+            return await self._check_sliding_window(rule, key)
         elif rule.strategy == RateLimitStrategy.FIXED_WINDOW:
-            return self._check_fixed_window(rule, key)
+            return await self._check_fixed_window(rule, key)
         elif rule.strategy == RateLimitStrategy.ADAPTIVE:
-            return self._check_adaptive(rule, key, user_id, ip_address, endpoint)
+            return await self._check_adaptive(rule, key, user_id, ip_address, endpoint)
         else:
             # Default to sliding window
-            return self._check_sliding_window(rule, key)
+            return await self._check_sliding_window(rule, key)
 
-    def _check_token_bucket(self, rule: RateLimitRule, key: str) -> RateLimitStatus:
+    async def _check_token_bucket(self, rule: RateLimitRule, key: str) -> RateLimitStatus:
         """Check token bucket rate limit"""
+        if self.shared is not None:
+            shared = await self.shared.take_token(key, rule.limit, rule.limit / rule.window_seconds)
+            return self._shared_status(rule, shared)
+
         if key not in self.buckets:
             refill_rate = rule.limit / rule.window_seconds
             self.buckets[key] = TokenBucket(rule.limit, refill_rate)
@@ -376,8 +416,11 @@ class RateLimiter:
             is_limited=not can_proceed,
         )
 
-    def _check_sliding_window(self, rule: RateLimitRule, key: str) -> RateLimitStatus:
+    async def _check_sliding_window(self, rule: RateLimitRule, key: str) -> RateLimitStatus:
         """Check sliding window rate limit"""
+        if self.shared is not None:
+            return self._shared_status(rule, await self.shared.hit(key, rule.limit, rule.window_seconds, sliding=True))
+
         if key not in self.counters:
             self.counters[key] = SlidingWindowCounter(rule.window_seconds, rule.limit)
 
@@ -395,8 +438,11 @@ class RateLimiter:
             is_limited=not can_proceed,
         )
 
-    def _check_fixed_window(self, rule: RateLimitRule, key: str) -> RateLimitStatus:
+    async def _check_fixed_window(self, rule: RateLimitRule, key: str) -> RateLimitStatus:
         """Check fixed window rate limit"""
+        if self.shared is not None:
+            return self._shared_status(rule, await self.shared.hit(key, rule.limit, rule.window_seconds))
+
         now = time.time()
         window_start = int(now // rule.window_seconds) * rule.window_seconds
 
@@ -429,7 +475,19 @@ class RateLimiter:
             is_limited=not can_proceed,
         )
 
-    def _check_adaptive(
+    def _shared_status(self, rule: RateLimitRule, shared) -> RateLimitStatus:
+        """Convert a shared store decision into a RateLimitStatus"""
+        return RateLimitStatus(
+            rule_name=rule.name,
+            current_count=shared.count,
+            limit=rule.limit,
+            window_seconds=rule.window_seconds,
+            reset_time=datetime.utcfromtimestamp(shared.reset_at),
+            remaining=shared.remaining,
+            is_limited=not shared.allowed,
+        )
+
+    async def _check_adaptive(
         self, rule: RateLimitRule, key: str, user_id: str = None, ip_address: str = None, endpoint: str = None
     ) -> RateLimitStatus:
         """Check adaptive rate limit"""
@@ -459,7 +517,7 @@ class RateLimiter:
             window_seconds=rule.window_seconds,
         )
 
-        return self._check_sliding_window(temp_rule, key)
+        return await self._check_sliding_window(temp_rule, key)
 
     def _adjust_adaptive_limit(self, rule: RateLimitRule, state: dict):
         """Adjust adaptive rate limit based on performance"""
@@ -515,6 +573,7 @@ class RateLimiter:
             "violations_24h": len(recent_violations),
             "active_buckets": len(self.buckets),
             "active_counters": len(self.counters),
+            "backend": self.shared.get_stats() if self.shared is not None else "local",
             "violations_by_rule": {},
         }
 
@@ -529,7 +588,7 @@ class RateLimiter:
 
 
 # Global rate limiter instance
-rate_limiter = RateLimiter()
+rate_limiter = RateLimiter(store=get_rate_limit_store())
 
 
 def rate_limit(rule_names: List[str] = None, identifier_func: Callable = None):
@@ -551,7 +610,7 @@ def rate_limit(rule_names: List[str] = None, identifier_func: Callable = None):
                     identifier = user_id or ip_address
 
                 # Check rate limits
-                is_allowed, statuses = rate_limiter.check_rate_limit(
+                is_allowed, statuses = await rate_limiter.check_rate_limit(
                     identifier=identifier, rule_names=rule_names, user_id=user_id, ip_address=ip_address, endpoint=endpoint
                 )
 
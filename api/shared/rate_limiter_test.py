@@ -0,0 +1,46 @@
+"""
+Tests for rate_limiter.py - constant-memory sliding window counter
+"""
+
+from shared.rate_limiter import SlidingWindowCounter
+
+
+class TestSlidingWindowCounter:
+    """Test suite for the two-window sliding counter."""
+
+    def test_enforces_limit_within_a_window(self):
+        counter = SlidingWindowCounter(window_seconds=60, max_requests=3)
+
+        results = [counter.add_request(1000.0 + i) for i in range(4)]
+
+        assert results == [True, True, True, False]
+        assert counter.get_count(1003.0) == 3
+
+    def test_previous_window_is_weighted_by_overlap(self):
+        counter = SlidingWindowCounter(window_seconds=60, max_requests=100)
+        for _ in range(100):
+            counter.add_request(1000.0)
+
+        # 15s into the next window, 3/4 of the previous window is still covered
+        assert counter.get_count(1035.0) == 75
+        assert counter.add_request(1035.0)
+        assert counter.get_count(1035.0) == 76
+        # Once the sliding window has moved past it, the old window no longer counts
+        assert counter.get_count(1080.0) == 1
+        assert counter.get_count(1200.0) == 0
+
+    def test_memory_does_not_grow_with_requests(self):
+        counter = SlidingWindowCounter(window_seconds=3600, max_requests=10000)
+        for i in range(10000):
+            counter.add_request(1000.0 + i * 0.01)
+
+        assert counter.current == 10000
+        assert not hasattr(counter, "__dict__")
+
+    def test_idle_after_two_windows(self):
+        counter = SlidingWindowCounter(window_seconds=60, max_requests=10)
+        counter.add_request(1000.0)
+
+        # The request lands in the 960-1020 window, which stops counting once 1080's window opens
+        assert not counter.is_idle(1079.0)
+        assert counter.is_idle(1080.0)
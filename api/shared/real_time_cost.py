@@ -14,10 +14,13 @@ from enum import Enum
 from typing import Any, Dict, List, Optional, Tuple
 
 import aiohttp
+from cachetools import TTLCache
 
 from .error_handling import SutraAPIError
 from .models import LLMProvider, User
+from .pricing import get_pricing_registry
 from .unified_auth import get_auth_provider
+from .usage_series import UsageSeriesStore
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -84,42 +87,27 @@ class BudgetAlert:
 class ProviderCostCalculator:
     """Calculate costs for different LLM providers"""
 
-    # Current pricing per 1K tokens (as of 2024)
-    PRICING = {
-        "openai": {
-            "gpt-4": {"input": 0.03, "output": 0.06},
-            "gpt-4-turbo": {"input": 0.01, "output": 0.03},
-            "gpt-3.5-turbo": {"input": 0.0015, "output": 0.002},
-        },
-        "anthropic": {
-            "claude-3-opus": {"input": 0.015, "output": 0.075},
-            "claude-3-sonnet": {"input": 0.003, "output": 0.015},
-            "claude-3-haiku": {"input": 0.00025, "output": 0.00125},
-        },
-        "google": {
-            "gemini-pro": {"input": 0.0005, "output": 0.0015},
-            "gemini-ultra": {"input": 0.001, "output": 0.003},
-        },
-    }
-
-    @classmethod
-    def calculate_cost(cls, provider: str, model: str, input_tokens: int, output_tokens: int) -> float:
+    @staticmethod
+    def calculate_cost(provider: str, model: str, input_tokens: int, output_tokens: int) -> float:
         """Calculate cost based on token usage"""
         try:
-            pricing = cls.PRICING.get(provider.lower(), {}).get(model.lower(), {})
-            if not pricing:
+            cost = get_pricing_registry().cost(provider, model, input_tokens, output_tokens)
+            if cost is None:
                 logger.warning(f"No pricing found for {provider}/{model}, using default")
                 return 0.01  # Default fallback cost
-
-            input_cost = (input_tokens / 1000) * pricing["input"]
-            output_cost = (output_tokens / 1000) * pricing["output"]
-            total_cost = input_cost + output_cost
-
-            return round(total_cost, 6)  # Round to 6 decimal places
+            return cost  # Already rounded to 6 decimal places
         except Exception as e:
             logger.error(f"Cost calculation error: {str(e)}")
             return 0.01  # Fallback cost
 
+    @staticmethod
+    def pricing_per_1k(provider: str, model: str) -> Dict[str, float]:
+        """Input/output price per 1K tokens, or {} when the model has no price."""
+        price = get_pricing_registry().get(provider, model)
+        if price is None:
+            return {}
+        return {"input": float(price.input_per_1k), "output": float(price.output_per_1k)}
+
 
 class ProviderAPIClient:
     """Client for integrating with LLM provider APIs for usage data"""
@@ -185,12 +173,16 @@ class RealTimeCostManager:
 
     def __init__(self):
         self.calculator = ProviderCostCalculator()
-        self.cost_records: List[RealTimeCostRecord] = []
-        self.usage_cache: Dict[str, LiveUsageMetrics] = {}
+        # Bucketed per-user usage with bounded retention, instead of every raw record
+        self.usage_series = UsageSeriesStore()
         self.budget_alerts: List[BudgetAlert] = []
 
         # Configuration
         self.cache_ttl = timedelta(minutes=5)  # Cache usage metrics for 5 minutes
+        # Three periods per user, bounded like the series itself
+        self.usage_cache: Dict[str, LiveUsageMetrics] = TTLCache(
+            maxsize=3 * self.usage_series.max_users, ttl=self.cache_ttl.total_seconds()
+        )
         self.alert_cooldown = timedelta(minutes=30)  # Don't spam alerts
         self.max_daily_requests = 1000  # Default daily limit
 
@@ -234,7 +226,7 @@ class RealTimeCostManager:
         )
 
         # Store record
-        self.cost_records.append(record)
+        self.usage_series.add(user_id, record.timestamp.timestamp(), provider, model, cost, total_tokens)
 
         # Update live metrics
         await self._update_live_metrics(user_id, record)
@@ -267,52 +259,11 @@ class RealTimeCostManager:
         """Calculate usage metrics for a specific period"""
         now = datetime.now(timezone.utc)
 
-        # Determine time range
-        if period == "hour":
-            start_time = now - timedelta(hours=1)
-        elif period == "day":
-            start_time = now - timedelta(days=1)
-        elif period == "month":
-            start_time = now - timedelta(days=30)
-        else:
-            start_time = now - timedelta(days=1)
-
-        # Filter records for user and time period
-        relevant_records = [
-            record for record in self.cost_records if record.user_id == user_id and record.timestamp >= start_time
-        ]
-
-        # Calculate totals
-        total_cost = sum(record.cost for record in relevant_records)
-        total_requests = len(relevant_records)
-        total_tokens = sum(record.total_tokens for record in relevant_records)
-
-        # Calculate by provider
-        by_provider = {}
-        for record in relevant_records:
-            if record.provider not in by_provider:
-                by_provider[record.provider] = {
-                    "cost": 0,
-                    "requests": 0,
-                    "tokens": 0,
-                    "models": {},
-                }
-
-            by_provider[record.provider]["cost"] += record.cost
-            by_provider[record.provider]["requests"] += 1
-            by_provider[record.provider]["tokens"] += record.total_tokens
-
-            # Track model usage
-            model_key = record.model
-            if model_key not in by_provider[record.provider]["models"]:
-                by_provider[record.provider]["models"][model_key] = {
-                    "cost": 0,
-                    "requests": 0,
-                    "tokens": 0,
-                }
-            by_provider[record.provider]["models"][model_key]["cost"] += record.cost
-            by_provider[record.provider]["models"][model_key]["requests"] += 1
-            by_provider[record.provider]["models"][model_key]["tokens"] += record.total_tokens
+        totals = self.usage_series.totals(user_id, period, now.timestamp())
+        total_cost = totals["total_cost"]
+        total_requests = totals["total_requests"]
+        total_tokens = totals["total_tokens"]
+        by_provider = totals["by_provider"]
 
         # Determine status
         status = CostTrackingStatus.ACTIVE
@@ -479,7 +430,7 @@ class RealTimeCostManager:
             "estimated_output_tokens": estimated_output_tokens,
             "estimated_total_tokens": estimated_input_tokens + estimated_output_tokens,
             "estimated_cost": round(estimated_cost, 6),
-            "pricing_per_1k_tokens": self.calculator.PRICING.get(provider, {}).get(model, {}),
+            "pricing_per_1k_tokens": self.calculator.pricing_per_1k(provider, model),
         }
 
     async def get_recent_alerts(self, user_id: str, limit: int = 10) -> List[Dict[str, Any]]:
@@ -0,0 +1,162 @@
+"""
+Bounded per-user usage time series for RealTimeCostManager.
+
+Each tracked request is added to two rings of time buckets per user: one-minute
+buckets covering the last hour and one-hour buckets covering the 30-day
+retention window. A bucket holds integer micro-dollar cost, request and token
+counts, broken down by provider/model, so an hour/day/month query touches at
+most 61, 25 or 721 buckets instead of every raw record ever tracked.
+
+Windows are resolved to bucket granularity: a bucket that overlaps the start of
+the window counts in full (at most one minute extra for "hour", one hour extra
+for "day" and "month"). Memory is capped by the ring sizes and by ``max_users``;
+the least recently active users are dropped first, as are users idle for longer
+than the retention window.
+"""
+
+import os
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+MINUTE = 60
+HOUR = 3600
+RETENTION_SECONDS = 30 * 24 * HOUR
+
+# Window length per LiveUsageMetrics period; unknown periods fall back to "day"
+PERIOD_SECONDS = {"hour": HOUR, "day": 24 * HOUR, "month": RETENTION_SECONDS}
+
+MICROS_PER_DOLLAR = 1_000_000
+DEFAULT_MAX_USERS = 10_000
+
+
+class UsageBucket:
+    """Usage totals for one time bucket."""
+
+    __slots__ = ("start", "cost_micros", "requests", "tokens", "by_model")
+
+    def __init__(self, start: int):
+        self.start = start
+        self.cost_micros = 0
+        self.requests = 0
+        self.tokens = 0
+        # (provider, model) -> [cost_micros, requests, tokens]
+        self.by_model: Dict[Tuple[str, str], List[int]] = {}
+
+    def add(self, provider: str, model: str, cost_micros: int, tokens: int) -> None:
+        self.cost_micros += cost_micros
+        self.requests += 1
+        self.tokens += tokens
+        counts = self.by_model.get((provider, model))
+        if counts is None:
+            self.by_model[(provider, model)] = [cost_micros, 1, tokens]
+        else:
+            counts[0] += cost_micros
+            counts[1] += 1
+            counts[2] += tokens
+
+
+class UserUsageSeries:
+    """Minute and hour bucket rings for one user."""
+
+    __slots__ = ("minutes", "hours", "last_seen")
+
+    def __init__(self):
+        # One spare bucket each so a full window plus the partial bucket at its start fits
+        self.minutes: Deque[UsageBucket] = deque(maxlen=HOUR // MINUTE + 1)
+        self.hours: Deque[UsageBucket] = deque(maxlen=RETENTION_SECONDS // HOUR + 1)
+        self.last_seen = 0.0
+
+    def add(self, timestamp: float, provider: str, model: str, cost_micros: int, tokens: int) -> None:
+        for buckets, width in ((self.minutes, MINUTE), (self.hours, HOUR)):
+            bucket = self._bucket_for(buckets, int(timestamp // width) * width)
+            if bucket is not None:
+                bucket.add(provider, model, cost_micros, tokens)
+        self.last_seen = max(self.last_seen, timestamp)
+
+    @staticmethod
+    def _bucket_for(buckets: Deque[UsageBucket], start: int) -> Optional[UsageBucket]:
+        if not buckets or buckets[-1].start < start:
+            buckets.append(UsageBucket(start))
+            return buckets[-1]
+        # Late arrivals land in an existing bucket; anything older than the ring is dropped
+        for bucket in reversed(buckets):
+            if bucket.start == start:
+                return bucket
+            if bucket.start < start:
+                break
+        return None
+
+    def buckets_since(self, since: float, window: int) -> List[UsageBucket]:
+        """Buckets overlapping [since, now), newest first."""
+        buckets, width = (self.minutes, MINUTE) if window <= HOUR else (self.hours, HOUR)
+        selected = []
+        for bucket in reversed(buckets):
+            if bucket.start + width <= since:
+                break
+            selected.append(bucket)
+        return selected
+
+
+class UsageSeriesStore:
+    """Per-user usage series with a cap on tracked users."""
+
+    def __init__(self, max_users: Optional[int] = None):
+        self.max_users = max_users or int(os.getenv("REALTIME_COST_MAX_USERS", str(DEFAULT_MAX_USERS)))
+        # Least recently active first
+        self.users: "OrderedDict[str, UserUsageSeries]" = OrderedDict()
+
+    def add(self, user_id: str, timestamp: float, provider: str, model: str, cost: float, tokens: int) -> None:
+        series = self.users.get(user_id)
+        if series is None:
+            series = self.users[user_id] = UserUsageSeries()
+        else:
+            self.users.move_to_end(user_id)
+        series.add(timestamp, provider, model, int(round(cost * MICROS_PER_DOLLAR)), tokens)
+        self._evict(timestamp)
+
+    def _evict(self, now: float) -> None:
+        while self.users:
+            user_id, series = next(iter(self.users.items()))
+            if len(self.users) <= self.max_users and now - series.last_seen < RETENTION_SECONDS:
+                break
+            del self.users[user_id]
+
+    def totals(self, user_id: str, period: str, now: float) -> Dict[str, Any]:
+        """Cost, request and token totals for the period ending at ``now``, by provider and model."""
+        window = PERIOD_SECONDS.get(period, PERIOD_SECONDS["day"])
+        series = self.users.get(user_id)
+        buckets = series.buckets_since(now - window, window) if series is not None else []
+
+        cost_micros = requests = tokens = 0
+        by_model: Dict[Tuple[str, str], List[int]] = {}
+        for bucket in buckets:
+            cost_micros += bucket.cost_micros
+            requests += bucket.requests
+            tokens += bucket.tokens
+            for key, counts in bucket.by_model.items():
+                merged = by_model.get(key)
+                if merged is None:
+                    by_model[key] = list(counts)
+                else:
+                    merged[0] += counts[0]
+                    merged[1] += counts[1]
+                    merged[2] += counts[2]
+
+        by_provider: Dict[str, Dict[str, Any]] = {}
+        for (provider, model), (model_cost, model_requests, model_tokens) in by_model.items():
+            entry = by_provider.setdefault(provider, {"cost": 0, "requests": 0, "tokens": 0, "models": {}})
+            entry["cost"] += model_cost / MICROS_PER_DOLLAR
+            entry["requests"] += model_requests
+            entry["tokens"] += model_tokens
+            entry["models"][model] = {
+                "cost": model_cost / MICROS_PER_DOLLAR,
+                "requests": model_requests,
+                "tokens": model_tokens,
+            }
+
+        return {
+            "total_cost": cost_micros / MICROS_PER_DOLLAR,
+            "total_requests": requests,
+            "total_tokens": tokens,
+            "by_provider": by_provider,
+        }
@@ -0,0 +1,59 @@
+"""
+Tests for usage_series.py - bucketed per-user usage for RealTimeCostManager
+"""
+
+from shared.usage_series import HOUR, RETENTION_SECONDS, UsageSeriesStore
+
+NOW = 1_700_000_000.0
+
+
+class TestUsageSeriesStore:
+    """Test suite for the bounded usage time series."""
+
+    def test_totals_by_period(self):
+        store = UsageSeriesStore(max_users=10)
+        store.add("user-1", NOW - 10 * 24 * HOUR, "openai", "gpt-4", 1.0, 100)
+        store.add("user-1", NOW - 5 * HOUR, "openai", "gpt-4o", 0.25, 50)
+        store.add("user-1", NOW - 120, "anthropic", "claude-3-haiku", 0.000125, 10)
+
+        hour = store.totals("user-1", "hour", NOW)
+        day = store.totals("user-1", "day", NOW)
+        month = store.totals("user-1", "month", NOW)
+
+        assert (hour["total_requests"], day["total_requests"], month["total_requests"]) == (1, 2, 3)
+        assert month["total_cost"] == 1.250125
+        assert month["total_tokens"] == 160
+        assert month["by_provider"]["openai"]["models"]["gpt-4"] == {"cost": 1.0, "requests": 1, "tokens": 100}
+        assert day["by_provider"]["openai"]["requests"] == 1
+
+    def test_unknown_user_is_empty(self):
+        store = UsageSeriesStore(max_users=10)
+
+        totals = store.totals("nobody", "month", NOW)
+
+        assert totals == {"total_cost": 0.0, "total_requests": 0, "total_tokens": 0, "by_provider": {}}
+
+    def test_buckets_are_bounded(self):
+        store = UsageSeriesStore(max_users=10)
+        for i in range(2 * 30 * 24):
+            store.add("user-1", NOW + i * HOUR, "openai", "gpt-4", 0.01, 1)
+
+        series = store.users["user-1"]
+        assert len(series.hours) == series.hours.maxlen
+        assert len(series.minutes) == series.minutes.maxlen
+
+    def test_evicts_least_recently_active_users(self):
+        store = UsageSeriesStore(max_users=2)
+        store.add("user-1", NOW, "openai", "gpt-4", 0.01, 1)
+        store.add("user-2", NOW + 1, "openai", "gpt-4", 0.01, 1)
+        store.add("user-1", NOW + 2, "openai", "gpt-4", 0.01, 1)
+        store.add("user-3", NOW + 3, "openai", "gpt-4", 0.01, 1)
+
+        assert list(store.users) == ["user-1", "user-3"]
+
+    def test_evicts_users_idle_past_retention(self):
+        store = UsageSeriesStore(max_users=10)
+        store.add("idle", NOW, "openai", "gpt-4", 0.01, 1)
+        store.add("active", NOW + RETENTION_SECONDS, "openai", "gpt-4", 0.01, 1)
+
+        assert list(store.users) == ["active"]
@@ -0,0 +1,452 @@
+"""
+Write-behind buffer for telemetry documents (cost entries and usage records).
+
+Callers ``put`` a document and return immediately; a background task groups
+pending documents by (container, partition key) and writes each group as one
+transactional batch once it reaches ``max_batch_size`` or ``flush_interval``
+seconds have passed. When Cosmos throttles a batch (429) the buffer backs off for
+the advertised retry-after and, if the queue keeps growing past ``max_queue``,
+``put`` makes callers wait briefly for space.
+
+With ``WRITE_BEHIND_SPILL_DIR`` set, every accepted document is also appended to
+a per-process spill file (JSON lines) and acknowledged there once written.
+Documents still pending when a worker dies are replayed by the next buffer with
+the same name (``recover`` runs before its first write). Batches use upserts,
+which keeps a replay of an already-written document harmless.
+
+The buffer is opt-in (``WRITE_BEHIND_ENABLED=true``); without it every document
+is written before the request returns. Enable it together with a spill
+directory on durable storage. Queued documents are flushed when the worker
+exits, and any that cannot be written then are logged as
+``WRITE_BEHIND_FAILURE``. Audit events never go through the buffer.
+"""
+
+import asyncio
+import atexit
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from azure.cosmos.exceptions import CosmosHttpResponseError
+
+logger = logging.getLogger(__name__)
+
+# Cosmos transactional batches are limited to 100 operations
+DEFAULT_MAX_BATCH_SIZE = 100
+DEFAULT_FLUSH_INTERVAL_SECONDS = 1.0
+DEFAULT_MAX_QUEUE = 10_000
+DEFAULT_BACKPRESSURE_TIMEOUT_SECONDS = 1.0
+DEFAULT_MAX_ATTEMPTS = 5
+DEFAULT_THROTTLE_BACKOFF_SECONDS = 1.0
+SHUTDOWN_FLUSH_TIMEOUT_SECONDS = 10.0
+
+# write_batch(container_name, partition_key, items)
+BatchWriter = Callable[[str, str, List[Dict[str, Any]]], Awaitable[Any]]
+PartitionKey = Tuple[str, str]
+
+
+@dataclass
+class _Pending:
+    seq: int
+    item: Dict[str, Any]
+    attempts: int = 0
+
+
+@dataclass
+class WriteBehindMetrics:
+    """Counters and gauges for the write-behind pipeline."""
+
+    enqueued: int = 0
+    written: int = 0
+    batches: int = 0
+    failed: int = 0
+    throttled: int = 0
+    backpressure_waits: int = 0
+    recovered: int = 0
+    last_flush_ms: float = 0.0
+    max_flush_ms: float = 0.0
+    total_flush_ms: float = 0.0
+
+    def to_dict(self, queue_depth: int) -> Dict[str, Any]:
+        return {
+            "queue_depth": queue_depth,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "batches": self.batches,
+            "failed": self.failed,
+            "throttled": self.throttled,
+            "backpressure_waits": self.backpressure_waits,
+            "recovered": self.recovered,
+            "last_flush_ms": round(self.last_flush_ms, 1),
+            "max_flush_ms": round(self.max_flush_ms, 1),
+            "avg_flush_ms": round(self.total_flush_ms / self.batches, 1) if self.batches else 0.0,
+        }
+
+
+def _retry_after_seconds(error: CosmosHttpResponseError) -> float:
+    headers = getattr(getattr(error, "response", None), "headers", None) or getattr(error, "headers", None) or {}
+    retry_after_ms = headers.get("x-ms-retry-after-ms")
+    try:
+        return float(retry_after_ms) / 1000 if retry_after_ms else DEFAULT_THROTTLE_BACKOFF_SECONDS
+    except (TypeError, ValueError):
+        return DEFAULT_THROTTLE_BACKOFF_SECONDS
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True
+    return True
+
+
+def _unacknowledged(path: Path) -> List[Dict[str, Any]]:
+    pending: Dict[int, Dict[str, Any]] = {}
+    with path.open(encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # A crash mid-write leaves at most one partial line
+                continue
+            if "ack" in record:
+                for seq in record["ack"]:
+                    pending.pop(seq, None)
+            else:
+                pending[record["seq"]] = record
+    return list(pending.values())
+
+
+class WriteBehindBuffer:
+    """Coalesces document writes into per-partition batches off the request path."""
+
+    def __init__(
+        self,
+        name: str,
+        writer: BatchWriter,
+        max_batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        max_queue: Optional[int] = None,
+        spill_dir: Optional[str] = None,
+        backpressure_timeout: float = DEFAULT_BACKPRESSURE_TIMEOUT_SECONDS,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+    ):
+        self.name = name
+        self.writer = writer
+        self.max_batch_size = int(max_batch_size or os.getenv("WRITE_BEHIND_BATCH_SIZE", DEFAULT_MAX_BATCH_SIZE))
+        if flush_interval is None:
+            flush_interval = os.getenv("WRITE_BEHIND_FLUSH_SECONDS", DEFAULT_FLUSH_INTERVAL_SECONDS)
+        self.flush_interval = float(flush_interval)
+        self.max_queue = int(max_queue or os.getenv("WRITE_BEHIND_MAX_QUEUE", DEFAULT_MAX_QUEUE))
+        self.backpressure_timeout = backpressure_timeout
+        self.max_attempts = max_attempts
+
+        spill_dir = spill_dir if spill_dir is not None else os.getenv("WRITE_BEHIND_SPILL_DIR")
+        self.spill_dir = Path(spill_dir) if spill_dir else None
+        self.spill_path = self.spill_dir / f"{name}-{os.getpid()}.jsonl" if self.spill_dir else None
+        self._recovered = False
+
+        self.metrics = WriteBehindMetrics()
+        self._partitions: "OrderedDict[PartitionKey, List[_Pending]]" = OrderedDict()
+        self._depth = 0
+        self._in_flight = 0
+        self._seq = 0
+        self._throttled_until = 0.0
+        self._flusher: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._space: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def queue_depth(self) -> int:
+        return self._depth
+
+    async def put(self, container_name: str, partition_key: str, item: Dict[str, Any]) -> None:
+        """Accept a document for writing; waits only while the queue is over ``max_queue``."""
+        if not self._recovered:
+            await self.recover()
+        self._ensure_flusher()
+        if self._depth >= self.max_queue:
+            self.metrics.backpressure_waits += 1
+            self._space.clear()
+            self._wakeup.set()
+            try:
+                async with asyncio.timeout(self.backpressure_timeout):
+                    await self._space.wait()
+            except asyncio.TimeoutError:
+                # The spill file still holds the document if the worker dies
+                logger.warning(f"Write-behind queue full ({self._depth} pending), accepting over limit")
+
+        self._seq += 1
+        self._spill({"seq": self._seq, "container": container_name, "pk": partition_key, "item": item})
+        self._enqueue(container_name, partition_key, _Pending(self._seq, item))
+        self.metrics.enqueued += 1
+
+        if len(self._partitions[(container_name, partition_key)]) >= self.max_batch_size:
+            self._wakeup.set()
+
+    async def flush(self) -> None:
+        """Write everything currently queued (honouring throttling back-off)."""
+        while self._depth:
+            delay = self._throttled_until - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            await self._flush_once(full_only=False)
+
+    async def close(self) -> None:
+        """Flush pending documents and stop the background task."""
+        await self.flush()
+        if self._flusher is not None:
+            self._flusher.cancel()
+            await asyncio.gather(self._flusher, return_exceptions=True)
+            self._flusher = None
+
+    def close_at_exit(self) -> None:
+        """Flush from an exit handler, on whichever loop the buffer was last used from."""
+        if not self._depth:
+            return
+        loop = self._loop
+        try:
+            if loop is None or loop.is_closed():
+                raise RuntimeError("event loop is closed")
+            if loop.is_running():
+                asyncio.run_coroutine_threadsafe(self.close(), loop).result(timeout=SHUTDOWN_FLUSH_TIMEOUT_SECONDS)
+            else:
+                loop.run_until_complete(self.close())
+        except Exception as e:
+            for (container_name, _), queue in self._partitions.items():
+                for pending in queue:
+                    logger.critical(
+                        f"WRITE_BEHIND_FAILURE {container_name}: {json.dumps(pending.item, default=str)} (shutdown: {e})"
+                    )
+
+    async def recover(self) -> int:
+        """Re-queue unacknowledged documents left in spill files by dead workers."""
+        self._recovered = True
+        if self.spill_dir is None or not self.spill_dir.exists():
+            return 0
+
+        pending: List[Dict[str, Any]] = []
+        for path in sorted(self.spill_dir.glob(f"{self.name}-*.jsonl")):
+            pid = path.stem.rsplit("-", 1)[-1]
+            if pid.isdigit() and int(pid) != os.getpid() and _pid_alive(int(pid)):
+                continue
+            # Claim the file by renaming it so two recovering workers can't both replay it
+            claimed = path.with_suffix(f".recovering-{os.getpid()}")
+            try:
+                path.rename(claimed)
+            except OSError:
+                continue
+            pending.extend(_unacknowledged(claimed))
+            claimed.unlink(missing_ok=True)
+
+        self._ensure_flusher()
+        for record in pending:
+            self._seq += 1
+            self._spill({**record, "seq": self._seq})
+            self._enqueue(record["container"], record["pk"], _Pending(self._seq, record["item"]))
+        self.metrics.recovered += len(pending)
+        if pending:
+            logger.info(f"Recovered {len(pending)} unwritten {self.name} documents from spill files")
+            self._wakeup.set()
+        return len(pending)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        data = self.metrics.to_dict(self._depth)
+        data["partitions"] = len(self._partitions)
+        data["throttled_for_ms"] = max(0, round((self._throttled_until - time.monotonic()) * 1000))
+        return data
+
+    def _enqueue(self, container_name: str, partition_key: str, pending: _Pending) -> None:
+        self._partitions.setdefault((container_name, partition_key), []).append(pending)
+        self._depth += 1
+
+    def _ensure_flusher(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Events and tasks are bound to the loop that created them
+            self._loop = loop
+            self._wakeup = asyncio.Event()
+            self._space = asyncio.Event()
+            self._flusher = None
+        if self._flusher is None or self._flusher.done():
+            self._flusher = loop.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                # asyncio.timeout (unlike wait_for) never swallows a cancellation from close()
+                async with asyncio.timeout(self.flush_interval):
+                    await self._wakeup.wait()
+                # Woken for a full batch, or to drain everything under backpressure
+                full_only = self._depth < self.max_queue
+            except asyncio.TimeoutError:
+                full_only = False
+            self._wakeup.clear()
+
+            delay = self._throttled_until - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            try:
+                await self._flush_once(full_only=full_only)
+            except Exception as e:
+                logger.error(f"Write-behind flush failed: {e}")
+
+    async def _flush_once(self, full_only: bool) -> bool:
+        """Write one batch per ready partition; returns False if a batch was throttled."""
+        for key in list(self._partitions):
+            queue = self._partitions.get(key)
+            if not queue or (full_only and len(queue) < self.max_batch_size):
+                continue
+
+            batch = queue[: self.max_batch_size]
+            del queue[: self.max_batch_size]
+            if not queue:
+                del self._partitions[key]
+            self._depth -= len(batch)
+
+            self._in_flight += len(batch)
+            try:
+                written = await self._write(key, batch)
+            finally:
+                self._in_flight -= len(batch)
+            if not written:
+                return False
+
+        if self._depth < self.max_queue:
+            self._space.set()
+        if not self._depth and not self._in_flight:
+            self._truncate_spill()
+        return True
+
+    async def _write(self, key: PartitionKey, batch: List[_Pending]) -> bool:
+        container_name, partition_key = key
+        started = time.perf_counter()
+        try:
+            await self.writer(container_name, partition_key, [pending.item for pending in batch])
+        except CosmosHttpResponseError as e:
+            if e.status_code == 429:
+                backoff = _retry_after_seconds(e)
+                self._throttled_until = time.monotonic() + backoff
+                self.metrics.throttled += 1
+                self._requeue(key, batch)
+                logger.warning(f"Write-behind throttled on {container_name}, backing off {backoff:.2f}s")
+                return False
+            self._retry_or_drop(key, batch, e)
+            return True
+        except Exception as e:
+            self._retry_or_drop(key, batch, e)
+            return True
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.metrics.batches += 1
+        self.metrics.written += len(batch)
+        self.metrics.last_flush_ms = elapsed_ms
+        self.metrics.max_flush_ms = max(self.metrics.max_flush_ms, elapsed_ms)
+        self.metrics.total_flush_ms += elapsed_ms
+        self._spill({"ack": [pending.seq for pending in batch]})
+        return True
+
+    def _requeue(self, key: PartitionKey, batch: List[_Pending]) -> None:
+        self._partitions[key] = batch + self._partitions.get(key, [])
+        self._partitions.move_to_end(key, last=False)
+        self._depth += len(batch)
+
+    def _retry_or_drop(self, key: PartitionKey, batch: List[_Pending], error: Exception) -> None:
+        retry, dropped = [], []
+        for pending in batch:
+            pending.attempts += 1
+            (retry if pending.attempts < self.max_attempts else dropped).append(pending)
+        if retry:
+            self._requeue(key, retry)
+        if dropped:
+            self.metrics.failed += len(dropped)
+            self._spill({"ack": [pending.seq for pending in dropped]})
+            for pending in dropped:
+                logger.critical(f"WRITE_BEHIND_FAILURE {key[0]}: {json.dumps(pending.item, default=str)} ({error})")
+        else:
+            logger.warning(f"Write-behind batch for {key[0]} failed, will retry: {error}")
+
+    def _spill(self, record: Dict[str, Any]) -> None:
+        if self.spill_path is None:
+            return
+        try:
+            self.spill_path.parent.mkdir(parents=True, exist_ok=True)
+            with self.spill_path.open("a", encoding="utf-8") as f:
+                f.write(json.dumps(record, default=str) + "\n")
+        except OSError as e:
+            logger.warning(f"Could not write write-behind spill file {self.spill_path}: {e}")
+
+    def _truncate_spill(self) -> None:
+        if self.spill_path is not None and self.spill_path.exists():
+            try:
+                self.spill_path.unlink()
+            except OSError as e:
+                logger.debug(f"Could not truncate spill file {self.spill_path}: {e}")
+
+
+def cosmos_batch_writer(cosmos_client: Any, database_name: str) -> BatchWriter:
+    """Batch writer for an async CosmosClient (used by CostTracker)."""
+
+    async def write_batch(container_name: str, partition_key: str, items: List[Dict[str, Any]]) -> Any:
+        container = cosmos_client.get_database_client(database_name).get_container_client(container_name)
+        return await container.execute_item_batch(
+            batch_operations=[("upsert", (item,)) for item in items], partition_key=partition_key
+        )
+
+    return write_batch
+
+
+def database_manager_writer(db_manager: Any) -> BatchWriter:
+    """Batch writer for the shared DatabaseManager (used by BudgetManager)."""
+
+    async def write_batch(container_name: str, partition_key: str, items: List[Dict[str, Any]]) -> Any:
+        return await db_manager.upsert_items_batch(container_name, items, partition_key)
+
+    return write_batch
+
+
+def write_behind_enabled() -> bool:
+    return os.getenv("WRITE_BEHIND_ENABLED", "false").lower() == "true"
+
+
+# Named buffers (cost_entries, usage_records) - created lazily
+_buffers: Dict[str, WriteBehindBuffer] = {}
+
+
+def get_write_behind_buffer(name: str, writer: BatchWriter) -> Optional[WriteBehindBuffer]:
+    """
+    Get the named buffer, writing through ``writer``, or None unless WRITE_BEHIND_ENABLED=true.
+
+    The writer is rebound on every call so the buffer always writes through the
+    caller's current client.
+    """
+    if not write_behind_enabled():
+        return None
+    buffer = _buffers.get(name)
+    if buffer is None:
+        if not _buffers:
+            atexit.register(close_write_behind_buffers_at_exit)
+        buffer = _buffers[name] = WriteBehindBuffer(name, writer)
+        if buffer.spill_dir is None:
+            logger.warning(f"Write-behind buffer {name} has no WRITE_BEHIND_SPILL_DIR; a worker crash loses queued documents")
+    buffer.writer = writer
+    return buffer
+
+
+def get_write_behind_metrics() -> Dict[str, Dict[str, Any]]:
+    """Queue depth and flush latency for every live buffer."""
+    return {name: buffer.get_metrics() for name, buffer in _buffers.items()}
+
+
+def close_write_behind_buffers_at_exit() -> None:
+    """Exit handler: write whatever is still queued in every buffer."""
+    for buffer in list(_buffers.values()):
+        buffer.close_at_exit()
@@ -0,0 +1,195 @@
+"""
+Tests for write_behind.py - batched write-behind buffer for telemetry documents
+"""
+
+import asyncio
+import json
+import os
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+from azure.cosmos.exceptions import CosmosHttpResponseError
+
+from shared.write_behind import WriteBehindBuffer, database_manager_writer, get_write_behind_buffer
+
+
+class RecordingWriter:
+    """Batch writer that records batches and can be told to throttle or fail."""
+
+    def __init__(self, throttle_times=0, fail_times=0, delay=0.0):
+        self.batches = []
+        self.throttle_times = throttle_times
+        self.fail_times = fail_times
+        self.delay = delay
+
+    async def __call__(self, container_name, partition_key, items):
+        await asyncio.sleep(self.delay)
+        if self.throttle_times:
+            self.throttle_times -= 1
+            error = CosmosHttpResponseError(status_code=429, message="Request rate is large")
+            error.headers = {"x-ms-retry-after-ms": "20"}
+            raise error
+        if self.fail_times:
+            self.fail_times -= 1
+            raise RuntimeError("service unavailable")
+        self.batches.append((container_name, partition_key, [item["id"] for item in items]))
+
+    @property
+    def written(self):
+        return [item_id for _, _, ids in self.batches for item_id in ids]
+
+
+class TestWriteBehindBuffer:
+    """Test suite for WriteBehindBuffer."""
+
+    @pytest.mark.asyncio
+    async def test_groups_writes_per_partition(self):
+        writer = RecordingWriter()
+        buffer = WriteBehindBuffer("test", writer, max_batch_size=100, flush_interval=60)
+
+        for i in range(5):
+            await buffer.put("CostEntries", f"user-{i % 2}", {"id": f"e{i}"})
+        assert buffer.queue_depth == 5
+        assert writer.batches == []
+
+        await buffer.close()
+
+        assert sorted(writer.batches) == [
+            ("CostEntries", "user-0", ["e0", "e2", "e4"]),
+            ("CostEntries", "user-1", ["e1", "e3"]),
+        ]
+        metrics = buffer.get_metrics()
+        assert metrics["queue_depth"] == 0
+        assert metrics["batches"] == 2
+        assert metrics["written"] == 5
+
+    @pytest.mark.asyncio
+    async def test_flushes_on_size_and_time(self):
+        writer = RecordingWriter()
+        buffer = WriteBehindBuffer("test", writer, max_batch_size=3, flush_interval=0.05)
+
+        for i in range(3):
+            await buffer.put("usage_tracking", "2026-10-16", {"id": f"full{i}"})
+        await asyncio.sleep(0.01)
+        assert writer.written == ["full0", "full1", "full2"]
+
+        await buffer.put("usage_tracking", "2026-10-16", {"id": "late"})
+        await asyncio.sleep(0.1)
+        assert writer.written[-1] == "late"
+        await buffer.close()
+
+    @pytest.mark.asyncio
+    async def test_backs_off_and_retries_when_throttled(self):
+        writer = RecordingWriter(throttle_times=2)
+        buffer = WriteBehindBuffer("test", writer, flush_interval=60)
+        await buffer.put("usage_tracking", "user-1", {"id": "a1"})
+
+        await buffer.flush()
+
+        assert writer.written == ["a1"]
+        assert buffer.get_metrics()["throttled"] == 2
+
+    @pytest.mark.asyncio
+    async def test_put_waits_for_space_when_queue_is_full(self):
+        writer = RecordingWriter(delay=0.01)
+        buffer = WriteBehindBuffer("test", writer, max_batch_size=10, flush_interval=60, max_queue=2)
+
+        for i in range(3):
+            await buffer.put("usage_tracking", f"user-{i}", {"id": f"a{i}"})
+
+        assert buffer.get_metrics()["backpressure_waits"] == 1
+        assert len(writer.written) >= 2
+        await buffer.close()
+
+    @pytest.mark.asyncio
+    async def test_failed_batches_are_retried_then_dropped(self):
+        writer = RecordingWriter(fail_times=10)
+        buffer = WriteBehindBuffer("test", writer, flush_interval=60, max_attempts=3)
+        await buffer.put("usage_tracking", "user-1", {"id": "a1"})
+
+        await buffer.flush()
+
+        assert writer.written == []
+        assert buffer.get_metrics()["failed"] == 1
+        assert buffer.queue_depth == 0
+
+    @pytest.mark.asyncio
+    async def test_spill_file_replays_unwritten_documents(self, tmp_path):
+        crashed = WriteBehindBuffer("cost_entries", RecordingWriter(), flush_interval=60, spill_dir=str(tmp_path))
+        await crashed.put("CostEntries", "user-1", {"id": "written"})
+        await crashed.flush()
+        await crashed.put("CostEntries", "user-1", {"id": "pending"})
+        crashed._flusher.cancel()
+        # Simulate a worker that died: its spill file carries a dead pid
+        dead_pid_file = tmp_path / "cost_entries-999999999.jsonl"
+        crashed.spill_path.rename(dead_pid_file)
+
+        writer = RecordingWriter()
+        restarted = WriteBehindBuffer("cost_entries", writer, flush_interval=60, spill_dir=str(tmp_path))
+        await restarted.put("CostEntries", "user-1", {"id": "new"})
+        await restarted.close()
+
+        assert writer.written == ["pending", "new"]
+        assert restarted.get_metrics()["recovered"] == 1
+        assert list(tmp_path.iterdir()) == []
+
+    def test_exit_handler_flushes_on_the_buffers_loop(self):
+        writer = RecordingWriter()
+        buffer = WriteBehindBuffer("test", writer, flush_interval=60)
+        loop = asyncio.new_event_loop()
+        try:
+            loop.run_until_complete(buffer.put("CostEntries", "user-1", {"id": "queued"}))
+
+            buffer.close_at_exit()
+        finally:
+            loop.close()
+
+        assert writer.written == ["queued"]
+        assert buffer.queue_depth == 0
+
+    def test_exit_handler_logs_what_it_cannot_write(self, caplog):
+        buffer = WriteBehindBuffer("test", RecordingWriter(), flush_interval=60)
+        loop = asyncio.new_event_loop()
+        loop.run_until_complete(buffer.put("CostEntries", "user-1", {"id": "queued"}))
+        loop.close()
+
+        buffer.close_at_exit()
+
+        assert "WRITE_BEHIND_FAILURE CostEntries" in caplog.text
+        assert '"queued"' in caplog.text
+
+
+class TestWriteBehindIntegration:
+    """Test suite for the buffers used by BudgetManager and AuditLogger."""
+
+    def test_disabled_buffer(self):
+        assert get_write_behind_buffer("usage_records", RecordingWriter()) is None
+        with patch.dict(os.environ):
+            del os.environ["WRITE_BEHIND_ENABLED"]
+            # Opt-in: unset means every write is synchronous
+            assert get_write_behind_buffer("usage_records", RecordingWriter()) is None
+
+    @pytest.mark.asyncio
+    async def test_track_usage_returns_before_the_write(self):
+        from shared.budget import BudgetManager
+        from shared.models import LLMProvider
+
+        db_manager = Mock()
+        db_manager.create_item = AsyncMock()
+        db_manager.upsert_items_batch = AsyncMock()
+        db_manager.partition_key_path = AsyncMock(return_value="/user_id")
+
+        with patch.dict(os.environ, {"WRITE_BEHIND_ENABLED": "true"}):
+            manager = BudgetManager()
+            manager._db_manager = db_manager
+            record = await manager.track_usage("user-1", LLMProvider.OPENAI, "completion", 0.05, 100, 500)
+            buffer = get_write_behind_buffer("usage_records", database_manager_writer(db_manager))
+
+            db_manager.upsert_items_batch.assert_not_awaited()
+            await buffer.close()
+
+        db_manager.create_item.assert_not_awaited()
+        container, items, partition_key = db_manager.upsert_items_batch.call_args.args
+        assert (container, partition_key) == ("usage_tracking", record.user_id)
+        assert json.dumps(items)  # JSON-safe: enum and datetime already serialized
+        assert items[0]["provider"] == "openai"
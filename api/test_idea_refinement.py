@@ -181,7 +181,7 @@ class TestIdeaRefinementEndpoints:
 
     @pytest.mark.asyncio
     @patch("api.forge_api.idea_refinement_endpoints.extract_user_info")
-    @patch("api.forge_api.idea_refinement_endpoints.LLMManager")
+    @patch("api.forge_api.idea_refinement_endpoints.get_llm_manager")
     @patch("api.forge_api.idea_refinement_endpoints.CostTracker")
     async def test_refine_idea_with_llm_success(
         self, mock_cost_tracker, mock_llm_manager, mock_extract_user, mock_user_info, sample_idea_data
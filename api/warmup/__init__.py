@@ -0,0 +1,42 @@
+"""
+Warmup trigger for Sutra API instances.
+Runs when the Functions host adds an instance, before it receives traffic, so the
+first user request does not pay for LLM provider and Cosmos client initialization.
+"""
+
+import logging
+import os
+import sys
+
+import azure.functions as func
+
+# Add the root directory to Python path for proper imports
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from shared.async_database import get_connection_string, get_cosmos_pool
+from shared.llm_client import warm_up_llm_manager
+
+# Initialize logging
+logger = logging.getLogger(__name__)
+
+
+async def main(warmupContext: func.Context) -> None:
+    """
+    Eagerly initialize shared clients for a new instance.
+
+    Set WARM_UP_LLM_PROVIDERS=false to skip provider initialization (it then
+    happens lazily on the first LLM request).
+    """
+    if os.getenv("WARM_UP_LLM_PROVIDERS", "true").lower() != "false":
+        try:
+            report = await warm_up_llm_manager()
+            logger.info(f"LLM providers warmed up: {report}")
+        except Exception as e:
+            logger.warning(f"LLM provider warm-up failed, will initialize on first request: {e}")
+
+    if get_connection_string():
+        try:
+            await get_cosmos_pool().warm_up()
+            logger.info("Cosmos client pool warmed up")
+        except Exception as e:
+            logger.warning(f"Cosmos pool warm-up failed, will connect on first request: {e}")
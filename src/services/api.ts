@@ -588,8 +588,13 @@ export const forgeApi = {
     stage?: string;
     limit?: number;
     offset?: number;
+    cursor?: string;
   }) =>
-    apiService.get<{ projects: ForgeProject[]; total: number }>(
+    apiService.get<{
+      projects: ForgeProject[];
+      total: number;
+      next_cursor?: string | null;
+    }>(
       "/forge/list",
       params,
     ),